@@ -21,6 +21,7 @@ from cirq._version import (
 from cirq.circuits import (
     Circuit,
     CircuitDag,
+    FrozenCircuit,
     InsertStrategy,
     PointOptimizationSummary,
     PointOptimizer,
@@ -49,6 +50,7 @@ from cirq.linalg import (
     all_near_zero_mod,
     allclose_up_to_global_phase,
     apply_matrix_to_slices,
+    batch_kak_decomposition,
     bidiagonalize_real_matrix_pair_with_symmetric_products,
     bidiagonalize_unitary_with_special_orthogonals,
     block_diag,
@@ -68,6 +70,7 @@ from cirq.linalg import (
     kak_canonicalize_vector,
     kak_decomposition,
     KakDecomposition,
+    KakDecompositionBatch,
     kron,
     kron_bases,
     kron_factor_4x4_to_2x2s,
@@ -170,6 +173,8 @@ from cirq.ops import (
     transform_op_tree,
     TwoQubitGate,
     TwoQubitMatrixGate,
+    UNITARY_CACHE,
+    UnitaryCache,
     WaveFunctionDisplay,
     X,
     XPowGate,
@@ -186,6 +191,8 @@ from cirq.ops import (
 )
 
 from cirq.optimizers import (
+    batch_single_qubit_matrix_to_pauli_rotations,
+    batch_single_qubit_matrix_to_phased_x_z,
     ConvertToCzAndSingleGates,
     DropEmptyMoments,
     DropNegligible,
@@ -196,11 +203,14 @@ from cirq.optimizers import (
     merge_single_qubit_gates_into_phased_x_z,
     MergeInteractions,
     MergeSingleQubitGates,
+    PassManager,
+    PassStats,
     single_qubit_matrix_to_gates,
     single_qubit_matrix_to_pauli_rotations,
     single_qubit_matrix_to_phased_x_z,
     single_qubit_op_to_framed_phase_form,
     two_qubit_matrix_to_operations,
+    TwoQubitDecompositionCache,
 )
 
 from cirq.schedules import (
@@ -211,6 +221,9 @@ from cirq.schedules import (
 
 from cirq.sim import (
     bloch_vector_from_state_vector,
+    CliffordSimulator,
+    CliffordSimulatorStepResult,
+    CliffordTableau,
     density_matrix_from_state_vector,
     DensityMatrixSimulator,
     DensityMatrixSimulatorState,
@@ -235,6 +248,7 @@ from cirq.sim import (
     StepResult,
     to_valid_density_matrix,
     to_valid_state_vector,
+    TrajectorySimulator,
     validate_normalized_state,
     WaveFunctionSimulatorState,
     WaveFunctionStepResult,
@@ -245,6 +259,7 @@ from cirq.study import (
     ComputeDisplaysResult,
     Linspace,
     ParamResolver,
+    PackedMeasurements,
     ParamResolverOrSimilarType,
     plot_state_histogram,
     Points,
@@ -261,7 +276,9 @@ from cirq.value import (
     chosen_angle_to_half_turns,
     Duration,
     LinearDict,
+    parse_random_state,
     PeriodicValue,
+    RANDOM_STATE_OR_SEED_LIKE,
     Timestamp,
     validate_probability,
     value_equality,
@@ -270,6 +287,7 @@ from cirq.value import (
 # pylint: disable=redefined-builtin
 from cirq.protocols import (
     apply_channel,
+    apply_diagonal,
     apply_unitary,
     ApplyChannelArgs,
     ApplyUnitaryArgs,
@@ -314,8 +332,10 @@ from cirq.protocols import (
     SupportsQasmWithArgsAndQubits,
     SupportsTraceDistanceBound,
     SupportsUnitary,
+    SupportsUnitaryDiagonal,
     trace_distance_bound,
     unitary,
+    unitary_diagonal,
     validate_mixture,
 )
 
@@ -22,6 +22,8 @@ from cirq.circuits.qasm_output import (
 
 from cirq.circuits.circuit import (
     Circuit,)
+from cirq.circuits.frozen_circuit import (
+    FrozenCircuit,)
 from cirq.circuits.circuit_dag import (
     CircuitDag,
     Unique,
@@ -19,6 +19,7 @@ Operations. Each Operation is a Gate that acts on some Qubits, for a given
 Moment the Operations must all act on distinct Qubits.
 """
 
+import bisect
 from collections import defaultdict
 from fractions import Fraction
 from itertools import groupby
@@ -90,6 +91,9 @@ class Circuit:
             k times.
     and mutated,
         circuit[1:7] = [Moment(...)]
+    and frozen,
+        circuit.freeze() is an immutable, hashable cirq.FrozenCircuit with the
+            same moments.
     """
 
     def __init__(self,
@@ -102,6 +106,14 @@ class Circuit:
             device: Hardware that the circuit should be able to run on.
         """
         self._moments = list(moments)
+        # The indices of the moments operating on each qubit, in increasing
+        # order. Built lazily, kept up to date by edits that don't shift
+        # moments and discarded (set to None) by edits that do.
+        self._qubit_moments = None  # type: Optional[Dict[ops.Qid, List[int]]]
+        # How many moments lookups have scanned since the indices were last
+        # built. While the indices are discarded, lookups scan moments until
+        # they've done about as much work as rebuilding the indices would.
+        self._moments_scanned = 0
         self._device = device
         self._device.validate_circuit(self)
 
@@ -137,7 +149,20 @@ class Circuit:
         return self.copy()
 
     def copy(self) -> 'Circuit':
-        return Circuit(self._moments, self._device)
+        copied = Circuit(self._moments, self._device)
+        if self._qubit_moments is not None:
+            copied._qubit_moments = {
+                q: list(indices) for q, indices in self._qubit_moments.items()
+            }
+        return copied
+
+    def freeze(self) -> 'cirq.FrozenCircuit':
+        """Returns an immutable copy of this circuit, sharing its moments.
+
+        See `cirq.FrozenCircuit`.
+        """
+        from cirq.circuits.frozen_circuit import FrozenCircuit
+        return FrozenCircuit(self._moments, self._device)
 
     def __bool__(self):
         return bool(self._moments)
@@ -209,11 +234,16 @@ class Circuit:
             for moment in value:
                 self._device.validate_moment(moment)
 
-        self._moments[key] = value
+        if isinstance(key, int):
+            self._set_moment(key, value)
+        else:
+            self._moments[key] = value
+            self._qubit_moments = None
     # pylint: enable=function-redefined
 
     def __delitem__(self, key: Union[int, slice]):
         del self._moments[key]
+        self._qubit_moments = None
 
     def __iadd__(self, other):
         if not isinstance(other, type(self)):
@@ -223,7 +253,8 @@ class Circuit:
             raise ValueError("Other circuit's device is not compatible.")
         for moment in other:
             self._device.validate_moment(moment)
-        self._moments += other._moments
+        for moment in other._moments:
+            self._append_moment(moment)
         return self
 
     def __add__(self, other):
@@ -250,6 +281,7 @@ class Circuit:
         if not isinstance(repetitions, int):
             return NotImplemented
         self._moments *= repetitions
+        self._qubit_moments = None
         return self
 
     def __mul__(self, repetitions: int):
@@ -342,15 +374,72 @@ class Circuit:
                 + self.to_text_diagram()
                 + '</pre>')
 
+    def _qubit_moment_indices(self) -> Dict[ops.Qid, List[int]]:
+        """The indices of the moments operating on each qubit, in order."""
+        if self._qubit_moments is None:
+            index = defaultdict(list)  # type: Dict[ops.Qid, List[int]]
+            for i, moment in enumerate(self._moments):
+                for op in moment.operations:
+                    for q in op.qubits:
+                        index[q].append(i)
+            self._qubit_moments = dict(index)
+            self._moments_scanned = 0
+        return self._qubit_moments
+
+    def _should_scan_moments(self) -> bool:
+        """Whether a lookup should scan moments instead of using the indices.
+
+        Optimizers that repeatedly insert moments and look up nearby ones
+        would otherwise rebuild the indices for every lookup.
+        """
+        return (self._qubit_moments is None and
+                self._moments_scanned < len(self._moments))
+
     def _first_moment_operating_on(self,
                                    qubits: Iterable[ops.Qid],
                                    indices: Iterable[int]) -> Optional[int]:
         qubits = frozenset(qubits)
         for m in indices:
-            if self._has_op_at(m, qubits):
+            self._moments_scanned += 1
+            if self._moments[m].operates_on(qubits):
                 return m
         return None
 
+    def _set_moment(self, moment_index: int, moment: ops.Moment) -> None:
+        """Replaces a moment, updating the per-qubit moment indices."""
+        old_moment = self._moments[moment_index]
+        self._moments[moment_index] = moment
+        if self._qubit_moments is None:
+            return
+        moment_index %= len(self._moments)
+        for q in old_moment.qubits - moment.qubits:
+            indices = self._qubit_moments[q]
+            del indices[bisect.bisect_left(indices, moment_index)]
+        for q in moment.qubits - old_moment.qubits:
+            indices = self._qubit_moments.setdefault(q, [])
+            if not indices or indices[-1] < moment_index:
+                indices.append(moment_index)
+            else:
+                bisect.insort(indices, moment_index)
+
+    def _append_moment(self, moment: ops.Moment) -> None:
+        """Appends a moment, updating the per-qubit moment indices."""
+        self._moments.append(moment)
+        if self._qubit_moments is not None:
+            for op in moment.operations:
+                for q in op.qubits:
+                    self._qubit_moments.setdefault(
+                        q, []).append(len(self._moments) - 1)
+
+    def _insert_moment(self, moment_index: int, moment: ops.Moment) -> None:
+        """Inserts a moment before the given index (at most the length)."""
+        if moment_index == len(self._moments):
+            self._append_moment(moment)
+            return
+        self._moments.insert(moment_index, moment)
+        # Later moments are shifted, so the indices are rebuilt when needed.
+        self._qubit_moments = None
+
     def next_moment_operating_on(self,
                                  qubits: Iterable[ops.Qid],
                                  start_moment_index: int = 0,
@@ -378,9 +467,21 @@ class Circuit:
         else:
             max_distance = min(max_distance, max_circuit_distance)
 
-        return self._first_moment_operating_on(
-            qubits,
-            range(start_moment_index, start_moment_index + max_distance))
+        end_moment_index = start_moment_index + max_distance
+        start_moment_index = max(start_moment_index, 0)
+        if self._should_scan_moments():
+            return self._first_moment_operating_on(
+                qubits, range(start_moment_index, end_moment_index))
+        qubit_moments = self._qubit_moment_indices()
+        result = None  # type: Optional[int]
+        for q in frozenset(qubits):
+            indices = qubit_moments.get(q, ())
+            i = bisect.bisect_left(indices, start_moment_index)
+            if i < len(indices) and indices[i] < end_moment_index:
+                if result is None or indices[i] < result:
+                    result = indices[i]
+                    end_moment_index = result
+        return result
 
     def next_moments_operating_on(self,
                                   qubits: Iterable[ops.Qid],
@@ -447,23 +548,34 @@ class Circuit:
         if max_distance <= 0:
             return None
 
-        return self._first_moment_operating_on(qubits,
-                                               (end_moment_index - k - 1
-                                                for k in range(max_distance)))
+        start_moment_index = max(end_moment_index - max_distance, 0)
+        if self._should_scan_moments():
+            return self._first_moment_operating_on(
+                qubits, range(end_moment_index - 1, start_moment_index - 1, -1))
+        qubit_moments = self._qubit_moment_indices()
+        result = None  # type: Optional[int]
+        for q in frozenset(qubits):
+            indices = qubit_moments.get(q, ())
+            i = bisect.bisect_left(indices, end_moment_index) - 1
+            if i >= 0 and indices[i] >= start_moment_index:
+                if result is None or indices[i] > result:
+                    result = indices[i]
+                    start_moment_index = result
+        return result
 
     def _prev_moment_available(
             self,
             op: ops.Operation,
             end_moment_index: int) -> Optional[int]:
-        last_available = end_moment_index
-        k = end_moment_index
-        while k > 0:
-            k -= 1
-            if not self._can_commute_past(k, op):
-                return last_available
+        # The op can't move back past the last moment touching its qubits,
+        # so it goes into the earliest moment after that which can take it.
+        blocker = self.prev_moment_operating_on(op.qubits, end_moment_index)
+        k = 0 if blocker is None else blocker + 1
+        while k < end_moment_index:
             if self._can_add_op_at(k, op):
-                last_available = k
-        return last_available
+                return k
+            k += 1
+        return end_moment_index
 
     def reachable_frontier_from(
             self,
@@ -701,19 +813,16 @@ class Circuit:
             and the second item is the operation itself.
         """
         op_list = []
-        max_index = len(self._moments)
+        qubit_moments = self._qubit_moment_indices()
         for qubit in start_frontier:
-            current_index = start_frontier[qubit]
-            if current_index < 0:
-                current_index = 0
-            while current_index < max_index:
-                if self[current_index].operates_on_single_qubit(qubit):
-                    next_op = self.operation_at(qubit, current_index)
-                    if next_op is not None:
-                        if is_blocker(next_op):
-                            break
-                        op_list.append((current_index,next_op))
-                current_index+=1
+            indices = qubit_moments.get(qubit, [])
+            start = bisect.bisect_left(indices, max(start_frontier[qubit], 0))
+            for current_index in indices[start:]:
+                next_op = self.operation_at(qubit, current_index)
+                assert next_op is not None
+                if is_blocker(next_op):
+                    break
+                op_list.append((current_index, next_op))
         return op_list
 
     def operation_at(self,
@@ -819,7 +928,7 @@ class Circuit:
 
         if (strategy is InsertStrategy.NEW or
                 strategy is InsertStrategy.NEW_THEN_INLINE):
-            self._moments.insert(splitter_index, ops.Moment())
+            self._insert_moment(splitter_index, ops.Moment())
             return splitter_index
 
         if strategy is InsertStrategy.INLINE:
@@ -840,12 +949,6 @@ class Circuit:
 
         raise ValueError('Unrecognized append strategy: {}'.format(strategy))
 
-    def _has_op_at(self,
-                   moment_index: int,
-                   qubits: Iterable[ops.Qid]) -> bool:
-        return (0 <= moment_index < len(self._moments) and
-                self._moments[moment_index].operates_on(qubits))
-
     def _can_add_op_at(self,
                        moment_index: int,
                        operation: ops.Operation) -> bool:
@@ -855,11 +958,6 @@ class Circuit:
             operation,
             self._moments[moment_index])
 
-    def _can_commute_past(self,
-                          moment_index: int,
-                          operation: ops.Operation) -> bool:
-        return not self._moments[moment_index].operates_on(operation.qubits)
-
     def insert(
             self,
             index: int,
@@ -898,22 +996,81 @@ class Circuit:
         # limit index to 0..len(self._moments), also deal with indices smaller 0
         k = max(min(index if index >= 0 else len(self._moments) + index,
                     len(self._moments)), 0)
+        if (strategy is InsertStrategy.EARLIEST and k == len(self._moments) and
+                self._device == devices.UnconstrainedDevice):
+            self._append_earliest(moments_and_operations)
+            return len(self._moments)
         for moment_or_op in moments_and_operations:
             if isinstance(moment_or_op, ops.Moment):
-                self._moments.insert(k, moment_or_op)
+                self._insert_moment(k, moment_or_op)
                 k += 1
             else:
                 p = self._pick_or_create_inserted_op_moment_index(
                     k, moment_or_op, strategy)
                 while p >= len(self._moments):
-                    self._moments.append(ops.Moment())
-                self._moments[p] = self._moments[p].with_operation(moment_or_op)
+                    self._append_moment(ops.Moment())
+                self._set_moment(p,
+                                 self._moments[p].with_operation(moment_or_op))
                 self._device.validate_moment(self._moments[p])
                 k = max(k, p + 1)
                 if strategy is InsertStrategy.NEW_THEN_INLINE:
                     strategy = InsertStrategy.INLINE
         return k
 
+    def _append_earliest(
+            self,
+            moments_and_operations: Iterable[Union[ops.Moment, ops.Operation]]
+    ) -> None:
+        """Appends operations with the EARLIEST strategy in a single pass.
+
+        Places everything exactly where inserting each item at the end of the
+        circuit would, on a device without placement constraints. Instead of
+        searching the circuit for every operation, the next free moment of
+        each qubit is tracked and every affected moment is built only once.
+        """
+        start = len(self._moments)
+        qubit_moments = self._qubit_moment_indices()
+        frontier = {}  # type: Dict[ops.Qid, int]
+        extended = defaultdict(list)  # type: Dict[int, List[ops.Operation]]
+        new_operations = []  # type: List[List[ops.Operation]]
+        # Moments from the operation tree that are still unmodified.
+        intact = []  # type: List[Optional[ops.Moment]]
+
+        for moment_or_op in moments_and_operations:
+            if isinstance(moment_or_op, ops.Moment):
+                new_operations.append(list(moment_or_op.operations))
+                intact.append(moment_or_op)
+                for q in moment_or_op.qubits:
+                    frontier[q] = start + len(new_operations)
+                continue
+
+            op = cast(ops.Operation, moment_or_op)
+            p = 0
+            for q in op.qubits:
+                f = frontier.get(q)
+                if f is None:
+                    indices = qubit_moments.get(q)
+                    f = indices[-1] + 1 if indices else 0
+                p = max(p, f)
+            for q in op.qubits:
+                frontier[q] = p + 1
+
+            if p < start:
+                extended[p].append(op)
+                continue
+            while p - start >= len(new_operations):
+                new_operations.append([])
+                intact.append(None)
+            new_operations[p - start].append(op)
+            intact[p - start] = None
+
+        for i, operations in extended.items():
+            self._set_moment(
+                i, ops.Moment(self._moments[i].operations + tuple(operations)))
+        for operations, moment in zip(new_operations, intact):
+            self._append_moment(
+                ops.Moment(operations) if moment is None else moment)
+
     def insert_into_range(self,
                           operations: ops.OP_TREE,
                           start: int,
@@ -952,7 +1109,7 @@ class Circuit:
                 i += 1
             if i >= end:
                 break
-            self._moments[i] = self._moments[i].with_operation(op)
+            self._set_moment(i, self._moments[i].with_operation(op))
             op_index += 1
 
         if op_index >= len(operations):
@@ -1028,6 +1185,7 @@ class Circuit:
             insert_index = min(late_frontier.values())
             self._moments[insert_index:insert_index] = (
                 [ops.Moment()] * n_new_moments)
+            self._qubit_moments = None
             for q in update_qubits:
                 if early_frontier.get(q, 0) > insert_index:
                     early_frontier[q] += n_new_moments
@@ -1054,16 +1212,17 @@ class Circuit:
         if len(operations) != len(insertion_indices):
             raise ValueError('operations and insertion_indices must have the'
                              'same length.')
-        self._moments += [
-            ops.Moment() for _ in range(1 + max(insertion_indices) - len(self))
-        ]
+        for _ in range(1 + max(insertion_indices) - len(self)):
+            self._append_moment(ops.Moment())
         moment_to_ops = defaultdict(list
                                     )  # type: Dict[int, List[ops.Operation]]
         for op_index, moment_index in enumerate(insertion_indices):
             moment_to_ops[moment_index].append(operations[op_index])
         for moment_index, new_ops in moment_to_ops.items():
-            self._moments[moment_index] = ops.Moment(
-                self._moments[moment_index].operations + tuple(new_ops))
+            self._set_moment(
+                moment_index,
+                ops.Moment(self._moments[moment_index].operations +
+                           tuple(new_ops)))
 
     def insert_at_frontier(self,
                            operations: ops.OP_TREE,
@@ -1121,12 +1280,13 @@ class Circuit:
                 raise ValueError(
                     "Can't remove {} @ {} because it doesn't exist.".format(
                         op, i))
-            copy._moments[i] = ops.Moment(
-                old_op
-                for old_op in copy._moments[i].operations
-                if op != old_op)
+            copy._set_moment(
+                i,
+                ops.Moment(old_op for old_op in copy._moments[i].operations
+                           if op != old_op))
         self._device.validate_circuit(copy)
         self._moments = copy._moments
+        self._qubit_moments = copy._qubit_moments
 
     def batch_insert_into(self,
                           insert_intos: Iterable[Tuple[int, ops.Operation]]
@@ -1148,9 +1308,10 @@ class Circuit:
         """
         copy = self.copy()
         for i, op in insert_intos:
-            copy._moments[i] = copy._moments[i].with_operation(op)
+            copy._set_moment(i, copy._moments[i].with_operation(op))
         self._device.validate_circuit(copy)
         self._moments = copy._moments
+        self._qubit_moments = copy._qubit_moments
 
     def batch_insert(self,
                      insertions: Iterable[Tuple[int, ops.OP_TREE]]) -> None:
@@ -1190,6 +1351,7 @@ class Circuit:
             if next_index > insert_index:
                 shift += next_index - insert_index
         self._moments = copy._moments
+        self._qubit_moments = copy._qubit_moments
 
     def append(
             self,
@@ -1218,8 +1380,8 @@ class Circuit:
         qubits = frozenset(qubits)
         for k in moment_indices:
             if 0 <= k < len(self._moments):
-                self._moments[k] = self._moments[k].without_operations_touching(
-                    qubits)
+                self._set_moment(
+                    k, self._moments[k].without_operations_touching(qubits))
 
     def all_qubits(self) -> FrozenSet[ops.Qid]:
         """Returns the qubits acted upon by Operations in this circuit."""
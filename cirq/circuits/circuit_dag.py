@@ -12,9 +12,12 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
-from typing import Any, Callable, Dict, Generic, Iterator, TypeVar, cast
+from typing import (Any, Callable, Dict, Generic, Iterable, Iterator, List,
+                    TypeVar, cast)
 
+from collections import defaultdict
 import functools
+import heapq
 import networkx
 
 from cirq import ops, devices
@@ -61,7 +64,8 @@ class CircuitDag(networkx.DiGraph):
     application order between two operations.  The first must be applied before
     the second.
 
-    The graph is maximalist (transitive completion).
+    The graph is maximalist (transitive completion), unless it was created
+    by `from_ops` or `from_circuit` with `transitive_edges=False`.
     """
 
     disjoint_qubits = staticmethod(_disjoint_qubits)
@@ -95,25 +99,91 @@ class CircuitDag(networkx.DiGraph):
         return Unique(op)
 
     @staticmethod
-    def from_circuit(circuit: circuit.Circuit,
-                     can_reorder: Callable[[ops.Operation, ops.Operation],
-                                           bool] = _disjoint_qubits
-                     ) -> 'CircuitDag':
+    def from_circuit(
+            circuit: circuit.Circuit,
+            can_reorder: Callable[[ops.Operation, ops.
+                                   Operation], bool] = _disjoint_qubits,
+            transitive_edges: bool = True) -> 'CircuitDag':
         return CircuitDag.from_ops(circuit.all_operations(),
                                    can_reorder=can_reorder,
-                                   device=circuit.device)
+                                   device=circuit.device,
+                                   transitive_edges=transitive_edges)
 
     @staticmethod
     def from_ops(*operations: ops.OP_TREE,
-                 can_reorder: Callable[[ops.Operation, ops.Operation],
-                                       bool] = _disjoint_qubits,
-                 device: devices.Device = devices.UnconstrainedDevice
-                 ) -> 'CircuitDag':
+                 can_reorder: Callable[[ops.Operation, ops.
+                                        Operation], bool] = _disjoint_qubits,
+                 device: devices.Device = devices.UnconstrainedDevice,
+                 transitive_edges: bool = True) -> 'CircuitDag':
+        """Creates a CircuitDag containing the given operations.
+
+        Args:
+            operations: The operations, in the order they're applied.
+            can_reorder: A predicate that determines if two operations may be
+                reordered. See `CircuitDag.__init__`.
+            device: Hardware that the circuit should be able to run on.
+            transitive_edges: Whether every pair of operations that can't be
+                reordered gets an edge (the default), even when the edge is
+                implied by a path through other operations. Otherwise, each
+                operation only gets edges from the latest operation before it
+                on each of its qubits. That orders the operations in the same
+                way with far fewer edges, but removing nodes from such a
+                graph can drop ordering constraints. Only supported with the
+                default can_reorder predicate.
+
+        Returns:
+            The constructed CircuitDag.
+
+        Raises:
+            ValueError: transitive_edges is False with a custom can_reorder
+                predicate.
+        """
         dag = CircuitDag(can_reorder=can_reorder, device=device)
-        for op in ops.flatten_op_tree(operations):
-            dag.append(cast(ops.Operation, op))
+        flat_ops = (
+            cast(ops.Operation, op) for op in ops.flatten_op_tree(operations))
+        if can_reorder is _disjoint_qubits:
+            dag._append_disjoint_qubit_ops(flat_ops, transitive_edges)
+            return dag
+
+        if not transitive_edges:
+            raise ValueError('Omitting transitive edges is only supported '
+                             'with the default can_reorder predicate.')
+        for op in flat_ops:
+            dag.append(op)
         return dag
 
+    def _append_disjoint_qubit_ops(self, operations: Iterable[ops.Operation],
+                                   transitive_edges: bool) -> None:
+        """Appends operations that can be reordered iff their qubits differ.
+
+        Only the operations sharing a qubit with a new operation need to be
+        looked at, so they're tracked per qubit instead of comparing the new
+        operation against every node. Edges are added in the same order as
+        `append` would add them.
+        """
+        node_indices = {}  # type: Dict[Unique[ops.Operation], int]
+        qubit_nodes = defaultdict(
+            list)  # type: Dict[ops.Qid, List[Unique[ops.Operation]]]
+        for op in operations:
+            new_node = self.make_node(op)
+            if transitive_edges:
+                preds = {node for q in op.qubits for node in qubit_nodes[q]}
+            else:
+                preds = {
+                    qubit_nodes[q][-1] for q in op.qubits if qubit_nodes[q]
+                }
+            self.add_node(new_node)
+            self.add_edges_from(
+                (node, new_node)
+                for node in sorted(preds, key=node_indices.__getitem__))
+
+            node_indices[new_node] = len(node_indices)
+            for q in op.qubits:
+                if transitive_edges:
+                    qubit_nodes[q].append(new_node)
+                else:
+                    qubit_nodes[q][-1:] = [new_node]
+
     def append(self, op: ops.Operation) -> None:
         new_node = self.make_node(op)
         self.add_edges_from([(node, new_node)
@@ -140,37 +210,24 @@ class CircuitDag(networkx.DiGraph):
     __hash__ = None  # type: ignore
 
     def ordered_nodes(self) -> Iterator[Unique[ops.Operation]]:
-        if not self.nodes():
-            return
-        g = self.copy()
-
-        def get_root_node(some_node: Unique[ops.Operation]
-                          ) -> Unique[ops.Operation]:
-            pred = g.pred
-            while pred[some_node]:
-                some_node = next(iter(pred[some_node]))
-            return some_node
-
-        def get_first_node() -> Unique[ops.Operation]:
-            return get_root_node(next(iter(g.nodes())))
-
-        def get_next_node(succ: networkx.classes.coreviews.AtlasView
-                          ) -> Unique[ops.Operation]:
-            if succ:
-                return get_root_node(next(iter(succ)))
-            else:
-                return get_first_node()
+        """Iterates over the nodes in a topological order.
 
-        node = get_first_node()
-        while True:
+        Of the nodes whose predecessors have all been yielded, the one that
+        was added to the graph first comes next, so a circuit's operations
+        come back in their original order.
+        """
+        nodes = list(self.nodes())
+        in_degrees = [len(self.pred[node]) for node in nodes]
+        indices = {node: i for i, node in enumerate(nodes)}
+        available = [i for i, d in enumerate(in_degrees) if not d]
+        while available:
+            node = nodes[heapq.heappop(available)]
             yield node
-            succ = g.succ[node]
-            g.remove_node(node)
-
-            if not g.nodes():
-                return
-
-            node = get_next_node(succ)
+            for succ in self.succ[node]:
+                i = indices[succ]
+                in_degrees[i] -= 1
+                if not in_degrees[i]:
+                    heapq.heappush(available, i)
 
     def all_operations(self) -> Iterator[ops.Operation]:
         return (node.val for node in self.ordered_nodes())
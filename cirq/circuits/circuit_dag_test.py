@@ -12,6 +12,8 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import random
+
 import pytest
 
 import networkx
@@ -244,3 +246,96 @@ def test_larger_circuit():
         circuit.to_unitary_matrix(),
         dag.to_circuit().to_unitary_matrix(),
         atol=1e-7)
+
+
+def _random_ops(qubits, n):
+    return [
+        cirq.CZ(*random.sample(qubits, 2)) if random.random() < 0.5 else cirq.X(
+            random.choice(qubits)) for _ in range(n)
+    ]
+
+
+def _closure_edges(dag):
+    return {
+        (n1.val, n2.val) for n1, n2 in networkx.transitive_closure(dag).edges()
+    }
+
+
+def test_from_ops_without_transitive_edges():
+    q0, q1, q2 = cirq.LineQubit.range(3)
+    dag = cirq.CircuitDag.from_ops(cirq.X(q0),
+                                   cirq.CZ(q0, q1),
+                                   cirq.Y(q0),
+                                   cirq.CZ(q1, q2),
+                                   transitive_edges=False)
+    assert networkx.dag.is_directed_acyclic_graph(dag)
+    assert (set((n1.val, n2.val) for n1, n2 in dag.edges()) == {
+        (cirq.X(q0), cirq.CZ(q0, q1)), (cirq.CZ(q0, q1), cirq.Y(q0)),
+        (cirq.CZ(q0, q1), cirq.CZ(q1, q2))
+    })
+
+    circuit = cirq.Circuit.from_ops(_random_ops(cirq.LineQubit.range(5), 100))
+    full = cirq.CircuitDag.from_circuit(circuit)
+    sparse = cirq.CircuitDag.from_circuit(circuit, transitive_edges=False)
+    assert sparse.number_of_edges() < full.number_of_edges()
+    assert _closure_edges(sparse) == _closure_edges(full)
+    assert ([set(moment.operations) for moment in sparse.to_circuit()
+            ] == [set(moment.operations) for moment in circuit])
+
+
+def test_from_ops_matches_append():
+    qubits = cirq.LineQubit.range(4)
+    for _ in range(5):
+        operations = _random_ops(qubits, 30)
+        dag = cirq.CircuitDag.from_ops(operations)
+        appended = cirq.CircuitDag()
+        for op in operations:
+            appended.append(op)
+        assert ([(n1.val, n2.val) for n1, n2 in dag.edges()
+                ] == [(n1.val, n2.val) for n1, n2 in appended.edges()])
+
+
+def test_from_ops_custom_predicate():
+    q0, q1 = cirq.LineQubit.range(2)
+    never = lambda op1, op2: False
+    dag = cirq.CircuitDag.from_ops(cirq.X(q0), cirq.Y(q1), can_reorder=never)
+    assert ([(n1.val, n2.val) for n1, n2 in dag.edges()] == [(cirq.X(q0),
+                                                              cirq.Y(q1))])
+    with pytest.raises(ValueError, match='transitive'):
+        _ = cirq.CircuitDag.from_ops(cirq.X(q0),
+                                     can_reorder=never,
+                                     transitive_edges=False)
+
+
+def test_ordered_nodes_is_topological():
+    dag = cirq.CircuitDag.from_ops(_random_ops(cirq.LineQubit.range(5), 200))
+    position = {node: i for i, node in enumerate(dag.ordered_nodes())}
+    assert len(position) == len(dag)
+    assert all(position[n1] < position[n2] for n1, n2 in dag.edges())
+    assert list(cirq.CircuitDag().ordered_nodes()) == []
+
+
+def test_to_circuit_keeps_operation_order_within_moments():
+    q0, q1, q2, q3 = cirq.LineQubit.range(4)
+    circuit = cirq.Circuit.from_ops(
+        cirq.X(q1),
+        cirq.Z(q3),
+        cirq.CZ(q0, q1),
+        cirq.CZ(q0, q3),
+        cirq.H(q1),
+        cirq.CZ(q3, q1),
+        cirq.X(q2),
+        cirq.H(q2),
+    )
+    dag = cirq.CircuitDag.from_circuit(circuit)
+    assert (list(
+        dag.to_circuit()[2].operations) == [cirq.CZ(q0, q3),
+                                            cirq.H(q1)])
+    assert dag.to_circuit() == circuit
+    for transitive_edges in [True, False]:
+        for _ in range(20):
+            ops = _random_ops(cirq.LineQubit.range(4), 15)
+            circuit = cirq.Circuit.from_ops(ops)
+            dag = cirq.CircuitDag.from_ops(ops,
+                                           transitive_edges=transitive_edges)
+            assert dag.to_circuit() == circuit
@@ -3056,3 +3056,118 @@ def test_moment_groups():
 (0, 7): ────H──────H─────────────────────
            └──┘   └───┘   └───┘   └──┘
 """, use_unicode_characters=True)
+
+
+def _assert_moment_queries_match_scan(circuit):
+    qubits = sorted(circuit.all_qubits()) + [cirq.NamedQubit('unused')]
+    for q in qubits:
+        touching = [
+            i for i, moment in enumerate(circuit) if moment.operates_on([q])
+        ]
+        for start in range(-1, len(circuit) + 1):
+            later = [i for i in touching if i >= start]
+            earlier = [i for i in touching if i < start]
+            assert circuit.next_moment_operating_on(
+                [q], start) == (later[0] if later else None)
+            assert circuit.prev_moment_operating_on(
+                [q], start) == (earlier[-1] if earlier else None)
+
+
+def test_moment_queries_track_edits():
+    a, b, c, d = cirq.LineQubit.range(4)
+    circuit = cirq.Circuit.from_ops(cirq.H(a), cirq.CZ(a, b), cirq.X(c),
+                                    cirq.CNOT(b, c), cirq.H(a))
+    _assert_moment_queries_match_scan(circuit)
+
+    edits = [
+        lambda: circuit.append(cirq.CZ(c, d)),
+        lambda: circuit.insert(1, cirq.X(d), InsertStrategy.NEW),
+        lambda: circuit.insert(0, Moment([cirq.Y(b)])),
+        lambda: circuit.insert(2, cirq.Z(c), InsertStrategy.INLINE),
+        lambda: circuit.__setitem__(2, Moment([cirq.CZ(b, d)])),
+        lambda: circuit.__setitem__(-1, Moment()),
+        lambda: circuit.__setitem__(slice(0, 1), [Moment([cirq.X(c)])] * 2),
+        lambda: circuit.__delitem__(1),
+        lambda: circuit.clear_operations_touching([b, c], range(3)),
+        lambda: circuit.batch_insert([(1, cirq.H(b)), (3, cirq.CZ(a, d))]),
+        lambda: circuit.batch_insert_into([(len(circuit) - 1, cirq.X(b))]),
+        lambda: circuit.batch_remove([(len(circuit) - 1, cirq.X(b))]),
+        lambda: circuit.insert_at_frontier([cirq.H(a), cirq.CZ(a, b)], 1),
+        lambda: circuit.insert_into_range([cirq.X(d)], 0, 2),
+        lambda: circuit.__iadd__(cirq.Circuit.from_ops(cirq.CZ(b, c))),
+        lambda: circuit.__imul__(2),
+    ]
+    for edit in edits:
+        edit()
+        _assert_moment_queries_match_scan(circuit)
+        _assert_moment_queries_match_scan(circuit.copy())
+
+
+def test_moment_queries_on_random_circuits():
+    for _ in range(10):
+        circuit = random_circuit(randint(1, 10), randint(1, 20), random())
+        _assert_moment_queries_match_scan(circuit)
+        circuit.append(random_circuit(5, randint(1, 5), random()))
+        _assert_moment_queries_match_scan(circuit)
+
+
+def test_append_earliest_matches_per_operation_insertion():
+    a, b, c = cirq.LineQubit.range(3)
+    circuit = cirq.Circuit.from_ops(cirq.H(a), cirq.CZ(a, b))
+    given = cirq.Moment([cirq.X(c)])
+    assert circuit.insert(
+        len(circuit),
+        [cirq.H(c), given, cirq.Y(b),
+         cirq.Z(a), cirq.T(c)]) == 4
+    assert circuit == cirq.Circuit([
+        cirq.Moment([cirq.H(a), cirq.H(c)]),
+        cirq.Moment([cirq.CZ(a, b)]),
+        cirq.Moment([cirq.X(c), cirq.Y(b), cirq.Z(a)]),
+        cirq.Moment([cirq.T(c)]),
+    ])
+
+    # Moments from the operation tree are kept when nothing joins them.
+    circuit.append([cirq.X(a), given])
+    assert circuit[-1] is given
+
+
+def test_append_earliest_matches_per_operation_insertion_randomly():
+    qubits = cirq.LineQubit.range(6)
+    for _ in range(20):
+        start = random_circuit(qubits[:randint(1, 6)], randint(0, 5), random())
+        contents = []
+        for _ in range(randint(0, 30)):
+            if random() < 0.1:
+                contents.append(
+                    cirq.Moment([cirq.X(q) for q in sample(qubits, 2)]))
+            else:
+                contents.append(
+                    cirq.CZ(*sample(qubits, 2)) if random() < 0.5 else cirq.
+                    H(qubits[randrange(6)]))
+
+        fast = start.copy()
+        fast.append(contents)
+        reference = cirq.Circuit(start,
+                                 device=moment_and_op_type_validating_device)
+        reference.append(contents)
+        assert fast == cirq.Circuit(reference)
+        _assert_moment_queries_match_scan(fast)
+
+
+def test_moment_queries_scan_until_rebuilding_indices_pays_off():
+    a, b = cirq.LineQubit.range(2)
+    circuit = cirq.Circuit.from_ops([cirq.X(a), cirq.Y(b)] * 10)
+    assert circuit.next_moment_operating_on([b], 0) == 0
+    assert circuit._qubit_moments is not None
+
+    # Nearby lookups after inserting a moment don't rebuild the indices.
+    circuit.insert(3, Moment([cirq.Z(a)]))
+    assert circuit.next_moment_operating_on([a], 2) == 2
+    assert circuit.prev_moment_operating_on([b], 4) == 2
+    assert circuit._qubit_moments is None
+
+    # Repeated long scans do.
+    for _ in range(len(circuit)):
+        assert circuit.next_moment_operating_on([b], 5) == 5
+    assert circuit._qubit_moments is not None
+    _assert_moment_queries_match_scan(circuit)
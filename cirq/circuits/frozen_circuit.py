@@ -0,0 +1,208 @@
+# Copyright 2019 The Cirq Developers
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     https://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""An immutable circuit that caches the properties derived from it."""
+
+from typing import (Any, Callable, FrozenSet, Iterable, Iterator, Optional,
+                    Tuple, Union)
+
+import numpy as np
+
+from cirq import devices, ops, study
+from cirq.circuits.circuit import Circuit
+from cirq.type_workarounds import NotImplementedType
+
+# Unitaries of circuits on at most this many qubits are kept after being
+# computed. Larger ones take too much memory to hold on to.
+MAX_CACHED_UNITARY_QUBITS = 10
+
+
+class FrozenCircuit(Circuit):
+    """An immutable circuit.
+
+    A frozen circuit shares its moments (and their operations) with the
+    circuit it was made from, but can't be modified afterwards. This makes it
+    hashable, so it can be used as a dictionary key (e.g. to cache the results
+    of compiling it), and lets it remember the values that are otherwise
+    recomputed from the whole circuit whenever they are requested:
+
+        all_qubits
+        all_operations (and `cirq.decompose`)
+        are_all_measurements_terminal
+        cirq.has_unitary
+        cirq.is_parameterized
+        cirq.unitary (for circuits on at most MAX_CACHED_UNITARY_QUBITS
+            qubits)
+
+    Operations that derive a new circuit from a frozen one (slicing, adding,
+    multiplying, inverting, `with_device` and `cirq.resolve_parameters`)
+    return frozen circuits. Methods that would modify the circuit raise a
+    TypeError; use `unfreeze` to get a mutable copy instead.
+
+    Frozen circuits are equal to circuits with the same moments and device,
+    whether or not those are frozen.
+    """
+
+    def __init__(self,
+                 moments: Iterable[ops.Moment] = (),
+                 device: devices.Device = devices.UnconstrainedDevice) -> None:
+        """Initializes a frozen circuit.
+
+        Args:
+            moments: The moments defining the circuit.
+            device: Hardware that the circuit should be able to run on.
+        """
+        self._hash = None  # type: Optional[int]
+        self._all_qubits = None  # type: Optional[FrozenSet[ops.Qid]]
+        self._all_operations = None  # type: Optional[Tuple[ops.Operation, ...]]
+        self._all_measurements_terminal = None  # type: Optional[bool]
+        self._has_unitary = None  # type: Optional[bool]
+        self._is_parameterized = None  # type: Optional[bool]
+        self._unitary = None  # type: Optional[np.ndarray]
+        # Devices validate the circuit on construction, which may already
+        # fill in some of the values above.
+        super().__init__(moments, device)
+
+    @property
+    def device(self) -> devices.Device:
+        return self._device
+
+    @device.setter
+    def device(self, new_device: devices.Device) -> None:
+        raise TypeError("Can't change the device of a FrozenCircuit. Use "
+                        "with_device to get a frozen copy on the new device.")
+
+    def freeze(self) -> 'FrozenCircuit':
+        return self
+
+    def unfreeze(self) -> Circuit:
+        """Returns a mutable copy of this circuit, sharing its moments."""
+        return Circuit(self._moments, self._device)
+
+    def copy(self) -> Circuit:
+        return self.unfreeze()
+
+    def __hash__(self):
+        if self._hash is None:
+            self._hash = hash(
+                (FrozenCircuit, tuple(self._moments), self._device))
+        return self._hash
+
+    def __eq__(self, other):
+        if self is other:
+            return True
+        if not isinstance(other, Circuit):
+            return NotImplemented
+        if isinstance(other, FrozenCircuit) and hash(self) != hash(other):
+            return False
+        return (self._moments == other._moments and
+                self._device == other._device)
+
+    def __repr__(self):
+        return 'cirq.Frozen' + super().__repr__()[len('cirq.'):]
+
+    def __getitem__(self, key):
+        result = super().__getitem__(key)
+        return result.freeze() if isinstance(result, Circuit) else result
+
+    def __add__(self, other):
+        if not isinstance(other, Circuit):
+            return NotImplemented
+        return (self.unfreeze() + other).freeze()
+
+    def __iadd__(self, other):
+        # Like tuples, `frozen += other` rebinds to the sum.
+        return NotImplemented
+
+    def __mul__(self, repetitions: int):
+        result = super().__mul__(repetitions)
+        return result if result is NotImplemented else result.freeze()
+
+    def __imul__(self, repetitions: int):
+        return NotImplemented
+
+    def __pow__(self, exponent: int):
+        result = super().__pow__(exponent)
+        return result if result is NotImplemented else result.freeze()
+
+    def with_device(
+            self,
+            new_device: devices.Device,
+            qubit_mapping: Callable[[ops.Qid], ops.Qid] = lambda e: e,
+    ) -> 'FrozenCircuit':
+        return self.unfreeze().with_device(new_device, qubit_mapping).freeze()
+
+    def all_qubits(self) -> FrozenSet[ops.Qid]:
+        if self._all_qubits is None:
+            self._all_qubits = super().all_qubits()
+        return self._all_qubits
+
+    def _operations(self) -> Tuple[ops.Operation, ...]:
+        if self._all_operations is None:
+            self._all_operations = tuple(super().all_operations())
+        return self._all_operations
+
+    def all_operations(self) -> Iterator[ops.Operation]:
+        return iter(self._operations())
+
+    def _decompose_(self) -> ops.OP_TREE:
+        return self._operations()
+
+    def are_all_measurements_terminal(self) -> bool:
+        if self._all_measurements_terminal is None:
+            self._all_measurements_terminal = (
+                super().are_all_measurements_terminal())
+        return self._all_measurements_terminal
+
+    def _has_unitary_(self) -> bool:
+        if self._has_unitary is None:
+            self._has_unitary = super()._has_unitary_()
+        return self._has_unitary
+
+    def _unitary_(self) -> Union[np.ndarray, NotImplementedType]:
+        if self._unitary is not None:
+            return self._unitary.copy()
+        result = super()._unitary_()
+        if (result is not NotImplemented and
+                len(self.all_qubits()) <= MAX_CACHED_UNITARY_QUBITS):
+            self._unitary = result.copy()
+        return result
+
+    def _is_parameterized_(self) -> bool:
+        if self._is_parameterized is None:
+            self._is_parameterized = super()._is_parameterized_()
+        return self._is_parameterized
+
+    def _resolve_parameters_(self, param_resolver: study.ParamResolver
+                            ) -> 'FrozenCircuit':
+        if not self._is_parameterized_():
+            return self
+        return super()._resolve_parameters_(param_resolver).freeze()
+
+
+def _raise_frozen(name: str) -> Callable[..., Any]:
+
+    def method(self, *args, **kwargs):
+        raise TypeError("Can't call {} on a FrozenCircuit. Use unfreeze() to "
+                        "get a mutable copy.".format(name))
+
+    method.__name__ = name
+    return method
+
+
+for _name in [
+        '__setitem__', '__delitem__', 'insert', 'append', 'insert_into_range',
+        'insert_at_frontier', 'clear_operations_touching', 'batch_remove',
+        'batch_insert', 'batch_insert_into'
+]:
+    setattr(FrozenCircuit, _name, _raise_frozen(_name))
@@ -0,0 +1,211 @@
+# Copyright 2019 The Cirq Developers
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     https://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import numpy as np
+import pytest
+import sympy
+
+import cirq
+
+
+class CountingGate(cirq.SingleQubitGate):
+
+    def __init__(self):
+        self.calls = 0
+
+    def _has_unitary_(self):
+        self.calls += 1
+        return True
+
+    def _unitary_(self):
+        self.calls += 1
+        return np.array([[0, 1], [1, 0]])
+
+    def _is_parameterized_(self):
+        self.calls += 1
+        return False
+
+
+def test_freeze_shares_moments():
+    a, b = cirq.LineQubit.range(2)
+    circuit = cirq.Circuit.from_ops(cirq.H(a), cirq.CNOT(a, b))
+    frozen = circuit.freeze()
+    assert isinstance(frozen, cirq.FrozenCircuit)
+    assert isinstance(frozen, cirq.Circuit)
+    assert all(f is m for f, m in zip(frozen, circuit))
+    assert frozen.freeze() is frozen
+
+    circuit.append(cirq.X(b))
+    assert len(frozen) == 2
+
+    unfrozen = frozen.unfreeze()
+    assert type(unfrozen) is cirq.Circuit
+    assert unfrozen == frozen
+    unfrozen.append(cirq.X(a))
+    assert len(frozen) == 2
+    assert type(frozen.copy()) is cirq.Circuit
+
+
+def test_equality_and_hash():
+    a, b = cirq.LineQubit.range(2)
+    moments = [cirq.Moment([cirq.H(a)]), cirq.Moment([cirq.CZ(a, b)])]
+
+    eq = cirq.testing.EqualsTester()
+    eq.make_equality_group(lambda: cirq.FrozenCircuit(moments))
+    eq.add_equality_group(cirq.FrozenCircuit(moments[:1]))
+    eq.add_equality_group(cirq.FrozenCircuit())
+    eq.add_equality_group(cirq.FrozenCircuit(device=cirq.google.Foxtail))
+
+    assert cirq.FrozenCircuit(moments) == cirq.Circuit(moments)
+    assert cirq.Circuit(moments) == cirq.FrozenCircuit(moments)
+    assert cirq.Circuit(moments) != cirq.FrozenCircuit(moments[:1])
+
+    cache = {cirq.FrozenCircuit(moments): 'compiled'}
+    assert cache[cirq.Circuit(moments).freeze()] == 'compiled'
+
+
+def test_repr():
+    a, b = cirq.LineQubit.range(2)
+    cirq.testing.assert_equivalent_repr(cirq.FrozenCircuit())
+    cirq.testing.assert_equivalent_repr(
+        cirq.Circuit.from_ops(cirq.H(a), cirq.CZ(a, b)).freeze())
+    assert repr(cirq.FrozenCircuit()) == 'cirq.FrozenCircuit()'
+
+
+def test_mutation_raises():
+    a = cirq.NamedQubit('a')
+    frozen = cirq.Circuit.from_ops(cirq.X(a)).freeze()
+    with pytest.raises(TypeError, match='unfreeze'):
+        frozen.append(cirq.X(a))
+    with pytest.raises(TypeError, match='unfreeze'):
+        frozen.insert(0, cirq.X(a))
+    with pytest.raises(TypeError, match='unfreeze'):
+        frozen[0] = cirq.Moment()
+    with pytest.raises(TypeError, match='unfreeze'):
+        del frozen[0]
+    with pytest.raises(TypeError, match='unfreeze'):
+        frozen.clear_operations_touching([a], [0])
+    with pytest.raises(TypeError, match='unfreeze'):
+        frozen.batch_remove([(0, cirq.X(a))])
+    with pytest.raises(TypeError, match='with_device'):
+        frozen.device = cirq.UnconstrainedDevice
+    assert frozen == cirq.Circuit.from_ops(cirq.X(a))
+
+
+def test_derived_circuits_are_frozen():
+    a, b = cirq.LineQubit.range(2)
+    frozen = cirq.Circuit.from_ops(cirq.H(a), cirq.CZ(a, b)).freeze()
+    circuit = frozen.unfreeze()
+
+    assert isinstance(frozen[1:], cirq.FrozenCircuit)
+    assert frozen[1:] == circuit[1:]
+    assert frozen[0] is circuit[0]
+
+    assert isinstance(frozen + circuit, cirq.FrozenCircuit)
+    assert frozen + circuit == circuit + circuit
+    assert type(circuit + frozen) is cirq.Circuit
+    assert frozen.__add__(1) is NotImplemented
+
+    total = frozen
+    total += circuit
+    assert isinstance(total, cirq.FrozenCircuit)
+    assert len(total) == 4 and len(frozen) == 2
+
+    assert isinstance(frozen * 2, cirq.FrozenCircuit)
+    assert isinstance(2 * frozen, cirq.FrozenCircuit)
+    assert frozen * 2 == circuit * 2
+    product = frozen
+    product *= 3
+    assert product == circuit * 3 and len(frozen) == 2
+
+    assert isinstance(frozen**-1, cirq.FrozenCircuit)
+    assert frozen**-1 == circuit**-1
+
+    device_frozen = frozen.with_device(
+        cirq.UnconstrainedDevice, lambda q: cirq.LineQubit(q.x + 1))
+    assert isinstance(device_frozen, cirq.FrozenCircuit)
+    assert device_frozen.all_qubits() == set(cirq.LineQubit.range(1, 3))
+
+
+def test_caches_derived_properties():
+    a, b = cirq.LineQubit.range(2)
+    gate = CountingGate()
+    frozen = cirq.Circuit.from_ops(gate(a), cirq.CZ(a, b),
+                                   cirq.measure(b)).freeze()
+
+    assert frozen.all_qubits() is frozen.all_qubits()
+    assert frozen.all_qubits() == {a, b}
+    assert list(frozen.all_operations()) == list(
+        frozen.unfreeze().all_operations())
+    assert cirq.decompose(frozen) == cirq.decompose(frozen.unfreeze())
+    assert frozen.are_all_measurements_terminal()
+
+    assert cirq.has_unitary(frozen)
+    assert not cirq.is_parameterized(frozen)
+    calls = gate.calls
+    assert cirq.has_unitary(frozen)
+    assert not cirq.is_parameterized(frozen)
+    assert gate.calls == calls
+
+    unitary = cirq.unitary(frozen)
+    calls = gate.calls
+    np.testing.assert_allclose(unitary, cirq.unitary(frozen.unfreeze()))
+    assert gate.calls > calls
+
+    calls = gate.calls
+    cached = cirq.unitary(frozen)
+    assert gate.calls == calls
+    np.testing.assert_allclose(cached, unitary)
+    # Callers get their own copy.
+    cached[0, 0] = 5
+    np.testing.assert_allclose(cirq.unitary(frozen), unitary)
+
+
+def test_unitary_cache_size_limit(monkeypatch):
+    monkeypatch.setattr(cirq.circuits.frozen_circuit,
+                        'MAX_CACHED_UNITARY_QUBITS', 1)
+    gate = CountingGate()
+    a, b = cirq.LineQubit.range(2)
+    frozen = cirq.Circuit.from_ops(gate(a), gate(b)).freeze()
+    cirq.unitary(frozen)
+    calls = gate.calls
+    cirq.unitary(frozen)
+    assert gate.calls > calls
+
+
+def test_non_unitary():
+    a = cirq.NamedQubit('a')
+    frozen = cirq.Circuit.from_ops(cirq.measure(a), cirq.X(a)).freeze()
+    assert not frozen.are_all_measurements_terminal()
+    assert not cirq.has_unitary(frozen)
+    assert cirq.unitary(frozen, None) is None
+
+
+def test_resolve_parameters():
+    a = cirq.NamedQubit('a')
+    frozen = cirq.Circuit.from_ops(cirq.X(a)**sympy.Symbol('t')).freeze()
+    assert cirq.is_parameterized(frozen)
+    resolved = cirq.resolve_parameters(frozen, {'t': 0.5})
+    assert isinstance(resolved, cirq.FrozenCircuit)
+    assert resolved == cirq.Circuit.from_ops(cirq.X(a)**0.5)
+
+    assert cirq.resolve_parameters(resolved, {'t': 1}) is resolved
+
+
+def test_simulate():
+    a, b = cirq.LineQubit.range(2)
+    frozen = cirq.Circuit.from_ops(cirq.X(a), cirq.CNOT(a, b),
+                                   cirq.measure(a, b, key='m')).freeze()
+    result = cirq.Simulator().run(frozen, repetitions=3)
+    np.testing.assert_equal(result.measurements['m'], [[1, 1]] * 3)
@@ -64,7 +64,7 @@ def rectify_acquaintance_strategy(
                                      reverse=acquaint_first):
             rectified_moments.append(
                     ops.Moment(gate_type_to_ops[acquaint_first]))
-    circuit._moments = rectified_moments
+    circuit[:] = rectified_moments
 
 
 def replace_acquaintance_with_swap_network(
@@ -111,7 +111,7 @@ def replace_acquaintance_with_swap_network(
             swap_network_op = swap_network_gate(*qubit_order)
             moment = ops.Moment([swap_network_op])
             reflected = not reflected
-        circuit._moments[moment_index] = moment
+        circuit[moment_index] = moment
     return reflected
 
 
@@ -57,5 +57,5 @@ def remove_redundant_acquaintance_opportunities(
             else:
                 new_moment.append(op)
         new_moments.append(ops.Moment(new_moment))
-    strategy._moments = new_moments
+    strategy[:] = new_moments
     return n_removed
@@ -13,9 +13,9 @@
 # limitations under the License.
 
 import random
-from typing import Callable, Iterable, TypeVar, cast, Sequence
+from typing import (Callable, Dict, FrozenSet, Iterable, List, Optional,
+                    Sequence, Tuple, TypeVar)
 
-from cirq.circuits import InsertStrategy
 from cirq import circuits, devices, google, ops
 
 
@@ -42,43 +42,43 @@ def generate_supremacy_circuit_google_v2(qubits: Iterable[devices.GridQubit],
     non_diagonal_gates = [ops.pauli_gates.X**(1/2), ops.pauli_gates.Y**(1/2)]
     rand_gen = random.Random(seed).random
 
-    circuit = circuits.Circuit()
+    # The moments are built directly, one at a time, from the gate that was
+    # applied to each qubit in the previous moment.
+    qubits = list(qubits)
+    qubit_set = frozenset(qubits)
 
     # Add an initial moment of Hadamards
-    circuit.append(ops.common_gates.H(qubit) for qubit in qubits)
+    moments = [ops.Moment(ops.common_gates.H(qubit) for qubit in qubits)]
 
     layer_index = 0
-    if cz_depth:
-        layer_index = _add_cz_layer(layer_index, circuit)
-        # In the first moment, add T gates when possible
+    previous_gates = {}  # type: Dict[ops.Qid, ops.Gate]
+    for moment_index in range(1, cz_depth + 1):
+        cz_layer, layer_index = _next_cz_layer(layer_index, qubit_set)
+        gates = {}  # type: Dict[ops.Qid, ops.Gate]
+        for cz in cz_layer:
+            for qubit in cz.qubits:
+                gates[qubit] = ops.CZ
+        single_qubit_ops = []
         for qubit in qubits:
-            if not circuit.operation_at(qubit, 1):
-                circuit.append(ops.common_gates.T(qubit),
-                               strategy=InsertStrategy.EARLIEST)
-
-    for moment_index in range(2, cz_depth+1):
-        layer_index = _add_cz_layer(layer_index, circuit)
-        # Add single qubit gates in the same moment
-        for qubit in qubits:
-            if not circuit.operation_at(qubit, moment_index):
-                last_op = circuit.operation_at(qubit, moment_index-1)
-                if last_op:
-                    gate = cast(ops.GateOperation, last_op).gate
-                    # Add a random non diagonal gate after a CZ
-                    if gate == ops.CZ:
-                        circuit.append(_choice(rand_gen,
-                                               non_diagonal_gates).on(qubit),
-                                       strategy=InsertStrategy.EARLIEST)
-                    # Add a T gate after a non diagonal gate
-                    elif not gate == ops.T:
-                        circuit.append(ops.common_gates.T(qubit),
-                                       strategy=InsertStrategy.EARLIEST)
+            if qubit in gates:
+                continue
+            if moment_index == 1:
+                # In the first moment, add T gates when possible
+                gate = ops.common_gates.T  # type: Optional[ops.Gate]
+            else:
+                # Add single qubit gates in the same moment
+                gate = _next_single_qubit_gate(previous_gates.get(qubit),
+                                               rand_gen, non_diagonal_gates)
+            if gate is not None:
+                gates[qubit] = gate
+                single_qubit_ops.append(gate(qubit))
+        moments.append(ops.Moment(cz_layer + single_qubit_ops))
+        previous_gates = gates
 
     # Add a final moment of Hadamards
-    circuit.append([ops.common_gates.H(qubit) for qubit in qubits],
-                   strategy=InsertStrategy.NEW_THEN_INLINE)
+    moments.append(ops.Moment(ops.common_gates.H(qubit) for qubit in qubits))
 
-    return circuit
+    return circuits.Circuit(moments)
 
 
 def generate_supremacy_circuit_google_v2_grid(n_rows: int, n_cols: int,
@@ -160,15 +160,28 @@ def _choice(rand_gen: Callable[[], float], sequence: Sequence[T]) -> T:
     return sequence[int(rand_gen() * len(sequence))]
 
 
-def _add_cz_layer(layer_index: int, circuit: circuits.Circuit) -> int:
-    cz_layer = None
+def _next_single_qubit_gate(previous_gate: Optional[ops.Gate],
+                            rand_gen: Callable[[], float],
+                            non_diagonal_gates: Sequence[ops.Gate]
+                           ) -> Optional[ops.Gate]:
+    if previous_gate is None:
+        return None
+    # Add a random non diagonal gate after a CZ
+    if previous_gate == ops.CZ:
+        return _choice(rand_gen, non_diagonal_gates)
+    # Add a T gate after a non diagonal gate
+    if not previous_gate == ops.T:
+        return ops.common_gates.T
+    return None
+
+
+def _next_cz_layer(layer_index: int, qubits: FrozenSet[devices.GridQubit]
+                  ) -> Tuple[List[ops.Operation], int]:
+    cz_layer = []  # type: List[ops.Operation]
     while not cz_layer:
-        qubits = cast(Iterable[devices.GridQubit], circuit.all_qubits())
         cz_layer = list(_make_cz_layer(qubits, layer_index))
         layer_index += 1
-
-    circuit.append(cz_layer, strategy=InsertStrategy.NEW_THEN_INLINE)
-    return layer_index
+    return cz_layer, layer_index
 
 
 def _make_cz_layer(qubits: Iterable[devices.GridQubit], layer_index: int
@@ -219,7 +232,9 @@ def _make_cz_layer(qubits: Iterable[devices.GridQubit], layer_index: int
     dir_col = 1 - dir_row
     shift = (internal_layer_index >> 1) % 4
 
-    for q in qubits:
+    # Sorted so that the order of the CZs doesn't depend on how a set of
+    # qubits happens to iterate, which varies between processes.
+    for q in sorted(qubits):
         q2 = devices.GridQubit(q.row + dir_row, q.col + dir_col)
         if q2 not in qubits:
             continue  # This edge isn't on the device.
@@ -63,3 +63,13 @@ def test_google_v2_supremacy_bristlecone():
         ops.CZPowGate))) == 79
     assert len(list(circuit.findall_operations_with_gate_type(
         ops.XPowGate))) == 32
+
+
+def test_google_v2_supremacy_cz_order_is_deterministic():
+    circuit = supremacy_v2.generate_supremacy_circuit_google_v2_grid(n_rows=4,
+                                                                     n_cols=5,
+                                                                     cz_depth=9,
+                                                                     seed=0)
+    for moment in circuit:
+        czs = [op.qubits for op in moment.operations if op.gate == ops.CZ]
+        assert czs == sorted(czs)
@@ -54,6 +54,7 @@ from cirq.google.programs import (
     schedule_from_proto_dicts,
     schedule_to_proto_dicts,
     unpack_results,
+    unpack_results_lazily,
     xmon_op_from_proto_dict,
 )
 
@@ -23,28 +23,32 @@ In order to run on must have access to the Quantum Engine API. Access to this
 API is (as of June 22, 2018) restricted to invitation only.
 """
 
+import asyncio
 import base64
+import concurrent.futures
 import random
 import re
 import string
+import threading
 import time
 import urllib.parse
 from collections import Iterable
-from typing import cast, Dict, List, Optional, Sequence, TYPE_CHECKING, Union
+from typing import (Any, Callable, cast, Dict, List, Optional, Sequence, Tuple,
+                    Union)
 from apiclient import discovery
+from google.protobuf import json_format
 
-from cirq import optimizers, circuits
+from cirq import devices, optimizers, circuits
+from cirq.api.google.v2 import result_pb2, run_context_pb2
+from cirq.google import params_v2, programs_v2
 from cirq.google.convert_to_xmon_gates import ConvertToXmonGates
 from cirq.google.params import sweep_to_proto_dict
-from cirq.google.programs import schedule_to_proto_dicts, unpack_results
+from cirq.google.programs import (schedule_to_proto_dicts,
+                                  unpack_results_lazily)
 from cirq.schedules import Schedule, moment_by_moment_schedule
 from cirq.study import ParamResolver, Sweep, Sweepable, TrialResult
 from cirq.study.sweeps import Points, UnitSweep, Zip
 
-if TYPE_CHECKING:
-    # pylint: disable=unused-import
-    from typing import Any
-
 gcs_prefix_pattern = re.compile('gs://[a-z0-9._/-]+')
 TERMINAL_STATES = ['SUCCESS', 'FAILURE', 'CANCELLED']
 
@@ -125,6 +129,14 @@ class Engine:
     Quantum Engine:
         run
         run_sweep
+        run_batch
+        run_async
+        run_sweep_async
+        run_batch_async
+
+    The async methods are coroutines, so that many programs can be submitted
+    and waited on at the same time, e.g. with `asyncio.gather`. Their HTTP
+    requests are made from a pool of worker threads.
 
     Another set of methods return information about programs and jobs that
     have been previously created on the Quantum Engine:
@@ -149,8 +161,8 @@ class Engine:
                  default_project_id: Optional[str] = None,
                  discovery_url: Optional[str] = None,
                  default_gcs_prefix: Optional[str] = None,
-                 **kwargs
-                 ) -> None:
+                 max_concurrent_requests: int = 8,
+                 **kwargs) -> None:
         """Engine service client.
 
         Args:
@@ -165,6 +177,11 @@ class Engine:
             default_gcs_prefix: A fallback gcs_prefix to use when one isn't
                 specified in the JobConfig given to 'run' methods.
                 See JobConfig for more information on gcs_prefix.
+            max_concurrent_requests: The most HTTP requests that the async
+                methods make at the same time. The threads making them are
+                kept until `close` is called, or until the end of a `with`
+                block using the engine.
+            **kwargs: Passed on to `apiclient.discovery.build`.
         """
         self.api_key = api_key
         self.api = api
@@ -174,16 +191,73 @@ class Engine:
                                                '$discovery/rest'
                                                '?version={apiVersion}')
         self.default_gcs_prefix = default_gcs_prefix
+        self.max_concurrent_requests = max_concurrent_requests
 
+        self._build_kwargs = kwargs
+        self.service = self._build_service()
+        self._executor = None  # type: Optional[concurrent.futures.Executor]
+        self._thread_local = threading.local()
+
+    def _build_service(self):
         discovery_service_url = (
             self.discovery_url if self.api_key is None else (
                 "%s&key=%s" % (self.discovery_url, urllib.parse.quote_plus(
                                self.api_key))))
-        self.service = discovery.build(
-            self.api,
-            self.version,
-            discoveryServiceUrl=discovery_service_url,
-            **kwargs)
+        return discovery.build(self.api,
+                               self.version,
+                               discoveryServiceUrl=discovery_service_url,
+                               **self._build_kwargs)
+
+    def _thread_service(self):
+        # The HTTP objects used by services aren't thread safe, so each worker
+        # thread gets a service of its own.
+        service = getattr(self._thread_local, 'service', None)
+        if service is None:
+            # Reuse the discovery document that was fetched for the main
+            # service, instead of fetching it again for every thread.
+            kwargs = {
+                k: v
+                for k, v in self._build_kwargs.items()
+                if k not in ('cache_discovery', 'cache')
+            }
+            service = discovery.build_from_document(self.service._rootDesc,
+                                                    **kwargs)
+            self._thread_local.service = service
+        return service
+
+    def close(self) -> None:
+        """Stops the threads used by the async methods.
+
+        The engine can still be used afterwards, and starts new threads if it
+        needs them.
+        """
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+            self._thread_local = threading.local()
+
+    def __enter__(self) -> 'Engine':
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
+
+    async def _execute_async(self, make_request: Callable[[Any], Any]) -> Dict:
+        """Makes a request from a worker thread.
+
+        Args:
+            make_request: Builds the request to execute, given the service of
+                the worker thread.
+
+        Returns:
+            The response to the request.
+        """
+        if self._executor is None:
+            self._executor = concurrent.futures.ThreadPoolExecutor(
+                max_workers=self.max_concurrent_requests)
+        return await asyncio.get_event_loop().run_in_executor(
+            self._executor, lambda: make_request(self._thread_service()).
+            execute())
 
     def run(
             self,
@@ -216,6 +290,30 @@ class Engine:
                            priority=priority,
                            processor_ids=processor_ids))[0]
 
+    async def run_async(
+            self,
+            *,  # Force keyword args.
+            program: Union[circuits.Circuit, Schedule],
+            job_config: Optional[JobConfig] = None,
+            param_resolver: ParamResolver = ParamResolver({}),
+            repetitions: int = 1,
+            priority: int = 50,
+            processor_ids: Sequence[str] = ('xmonsim',)) -> TrialResult:
+        """Runs the supplied Circuit or Schedule via Quantum Engine.
+
+        The coroutine version of `run`. Takes the same arguments.
+
+        Returns:
+            A single TrialResult for this run.
+        """
+        job = await self.run_sweep_async(program=program,
+                                         job_config=job_config,
+                                         params=[param_resolver],
+                                         repetitions=repetitions,
+                                         priority=priority,
+                                         processor_ids=processor_ids)
+        return (await job.results_async())[0]
+
     def _infer_project_id(self, job_config) -> None:
         if job_config.project_id is not None:
             return
@@ -344,6 +442,233 @@ class Engine:
         """
 
         job_config = self.implied_job_config(job_config)
+        request = self._program_request(job_config, program, params,
+                                        repetitions, priority)
+        response = self.service.projects().programs().create(
+            parent='projects/%s' % job_config.project_id,
+            body=request).execute()
+
+        request = self._job_request(job_config, response['name'], priority,
+                                    processor_ids)
+        response = self.service.projects().programs().jobs().create(
+            parent=response['name'], body=request).execute()
+
+        return EngineJob(job_config, response, self)
+
+    async def run_sweep_async(
+            self,
+            *,  # Force keyword args.
+            program: Union[circuits.Circuit, Schedule],
+            job_config: Optional[JobConfig] = None,
+            params: Sweepable = None,
+            repetitions: int = 1,
+            priority: int = 500,
+            processor_ids: Sequence[str] = ('xmonsim',)) -> 'EngineJob':
+        """Runs the supplied Circuit or Schedule via Quantum Engine.
+
+        The coroutine version of `run_sweep`. Takes the same arguments. The
+        program is validated and serialized right away, then the coroutine
+        waits while the program and the job are created.
+
+        Returns:
+            An EngineJob. Use its `results_async` method to wait for the
+            TrialResults, one for each parameter sweep.
+        """
+        job_config = self.implied_job_config(job_config)
+        request = self._program_request(job_config, program, params,
+                                        repetitions, priority)
+        parent = 'projects/%s' % job_config.project_id
+        response = await self._execute_async(lambda service: service.projects(
+        ).programs().create(parent=parent, body=request))
+
+        request = self._job_request(job_config, response['name'], priority,
+                                    processor_ids)
+        parent = response['name']
+        response = await self._execute_async(lambda service: service.projects(
+        ).programs().jobs().create(parent=parent, body=request))
+
+        return EngineJob(job_config, response, self)
+
+    def run_batch(
+            self,
+            *,  # Force keyword args.
+            programs: Sequence[Union[circuits.Circuit, Schedule]],
+            job_config: Optional[JobConfig] = None,
+            params_list: Optional[Sequence[Sweepable]] = None,
+            repetitions: Union[int, Sequence[int]] = 1,
+            priority: int = 500,
+            processor_ids: Sequence[str] = ('xmonsim',)) -> List['EngineJob']:
+        """Runs many Circuits or Schedules via Quantum Engine.
+
+        Each program is sent as an ordinary v2 Program proto, with its
+        parameters in a v2 RunContext proto, and gets a program and a job of
+        its own. Every program is checked against its device before anything
+        is submitted. Use `run_batch_async` to create the programs and jobs
+        concurrently.
+
+        Args:
+            programs: The Circuits or Schedules to execute. If a circuit is
+                provided, a moment by moment schedule will be used.
+            job_config: Configures the names of programs and jobs. The id of
+                each program is the program id of this config followed by the
+                index of the program, e.g. 'prog-ABCD-0', 'prog-ABCD-1'.
+            params_list: Parameters to run each program with, in the same
+                order as the programs. Defaults to no parameters.
+            repetitions: The number of circuit repetitions to run, either for
+                all of the programs or for each one in order.
+            priority: The priority to run at, 0-100.
+            processor_ids: The engine processors to run against.
+
+        Returns:
+            One EngineJob per program, in the same order as the programs.
+            Iterating over a job gives the TrialResults of its program, one
+            for each parameter sweep.
+
+        Raises:
+            ValueError: There are no programs, some of the programs are
+                invalid, or the numbers of programs, parameters and
+                repetitions don't match.
+        """
+        jobs = []
+        for job_config, program_request, run_context, measurements in (
+                self._batch_requests(programs, job_config, params_list,
+                                     repetitions, priority)):
+            response = self.service.projects().programs().create(
+                parent='projects/%s' % job_config.project_id,
+                body=program_request).execute()
+
+            request = self._job_request(job_config, response['name'], priority,
+                                        processor_ids)
+            request['run_context'] = run_context
+            response = self.service.projects().programs().jobs().create(
+                parent=response['name'], body=request).execute()
+
+            jobs.append(
+                EngineJob(job_config, response, self,
+                          measurements=measurements))
+        return jobs
+
+    async def run_batch_async(
+            self,
+            *,  # Force keyword args.
+            programs: Sequence[Union[circuits.Circuit, Schedule]],
+            job_config: Optional[JobConfig] = None,
+            params_list: Optional[Sequence[Sweepable]] = None,
+            repetitions: Union[int, Sequence[int]] = 1,
+            priority: int = 500,
+            processor_ids: Sequence[str] = ('xmonsim',)) -> List['EngineJob']:
+        """Runs many Circuits or Schedules via Quantum Engine.
+
+        The coroutine version of `run_batch`. Takes the same arguments. The
+        programs are validated and serialized right away, then the coroutine
+        waits while the programs and jobs are created, up to
+        `max_concurrent_requests` at a time.
+
+        Returns:
+            One EngineJob per program, in the same order as the programs.
+        """
+
+        async def submit(job_config: JobConfig, program_request: Dict,
+                         run_context: Dict,
+                         measurements: Dict[str, Sequence[devices.GridQubit]]
+                        ) -> EngineJob:
+            parent = 'projects/%s' % job_config.project_id
+            response = await self._execute_async(
+                lambda service: service.projects().programs().create(
+                    parent=parent, body=program_request))
+
+            request = self._job_request(job_config, response['name'], priority,
+                                        processor_ids)
+            request['run_context'] = run_context
+            parent = response['name']
+            response = await self._execute_async(
+                lambda service: service.projects().programs().jobs().create(
+                    parent=parent, body=request))
+
+            return EngineJob(job_config,
+                             response,
+                             self,
+                             measurements=measurements)
+
+        requests = self._batch_requests(programs, job_config, params_list,
+                                        repetitions, priority)
+        return list(await asyncio.gather(*[submit(*r) for r in requests]))
+
+    def _batch_requests(self,
+                        programs: Sequence[Union[circuits.Circuit, Schedule]],
+                        job_config: Optional[JobConfig],
+                        params_list: Optional[Sequence[Sweepable]],
+                        repetitions: Union[int, Sequence[int]], priority: int
+                       ) -> List[Tuple[JobConfig, Dict, Dict, Dict]]:
+        """Validates the programs of a batch and serializes each of them.
+
+        Returns:
+            For each program, its JobConfig, the request creating it, its run
+            context, and the qubits measured by each of its measurement keys.
+        """
+        if not programs:
+            raise ValueError('No programs to run.')
+        job_config = self.implied_job_config(job_config)
+        if not 0 <= priority < 1000:
+            raise ValueError('priority must be between 0 and 1000')
+        all_params = ([None] *
+                      len(programs) if params_list is None else params_list
+                     )  # type: Sequence[Optional[Sweepable]]
+        if isinstance(repetitions, int):
+            repetitions = [repetitions] * len(programs)
+        if not len(programs) == len(all_params) == len(repetitions):
+            raise ValueError(
+                'Got {} programs, {} params and {} repetitions.'.format(
+                    len(programs), len(all_params), len(repetitions)))
+
+        schedules = []  # type: List[Schedule]
+        measurements = []  # type: List[Dict[str, Sequence[devices.GridQubit]]]
+        errors = []  # type: List[str]
+        for i, program in enumerate(programs):
+            try:
+                schedule = self.program_as_schedule(program)
+                schedule.device.validate_schedule(schedule)
+                measurements.append(programs_v2.find_measurements(schedule))
+            except ValueError as e:
+                errors.append('Program {}: {}'.format(i, e))
+            else:
+                schedules.append(schedule)
+        if errors:
+            raise ValueError('Invalid programs:\n' + '\n'.join(errors))
+
+        requests = []
+        for i, (schedule, params, reps, measured) in enumerate(
+                zip(schedules, all_params, repetitions, measurements)):
+            program_config = job_config.copy()
+            program_config.program_id = '{}-{}'.format(job_config.program_id, i)
+            program_config.gcs_program = None
+            program_config.gcs_results = None
+            program_config = self.implied_job_config(program_config)
+
+            run_context = run_context_pb2.RunContext()
+            for sweep in _sweepable_to_sweeps(params or ParamResolver({})):
+                run_context.parameter_sweeps.add().CopyFrom(
+                    params_v2.sweep_to_proto(sweep, reps))
+            program_request = {
+                'name':
+                'projects/%s/programs/%s' % (
+                    program_config.project_id,
+                    program_config.program_id,
+                ),
+                'gcs_code_location': {
+                    'uri': program_config.gcs_program
+                },
+                'code':
+                _any_dict(programs_v2.schedule_to_proto(schedule)),
+            }
+            requests.append((program_config, program_request,
+                             _any_dict(run_context), measured))
+        return requests
+
+    def _program_request(self, job_config: JobConfig,
+                         program: Union[circuits.Circuit, Schedule],
+                         params: Optional[Sweepable], repetitions: int,
+                         priority: int) -> Dict:
         schedule = self.program_as_schedule(program)
 
         # Check program to run and program parameters.
@@ -352,7 +677,6 @@ class Engine:
 
         schedule.device.validate_schedule(schedule)
 
-        # Create program.
         sweeps = _sweepable_to_sweeps(params or ParamResolver({}))
         program_dict = {}  # type: Dict[str, Any]
 
@@ -364,19 +688,23 @@ class Engine:
         code = {
             '@type': 'type.googleapis.com/cirq.api.google.v1.Program'}
         code.update(program_dict)
-        request = {
-            'name': 'projects/%s/programs/%s' % (job_config.project_id,
-                                                 job_config.program_id,),
-            'gcs_code_location': {'uri': job_config.gcs_program},
-            'code': code,
+        return {
+            'name':
+            'projects/%s/programs/%s' % (
+                job_config.project_id,
+                job_config.program_id,
+            ),
+            'gcs_code_location': {
+                'uri': job_config.gcs_program
+            },
+            'code':
+            code,
         }
-        response = self.service.projects().programs().create(
-            parent='projects/%s' % job_config.project_id,
-            body=request).execute()
 
-        # Create job.
-        request = {
-            'name': '%s/jobs/%s' % (response['name'], job_config.job_id),
+    def _job_request(self, job_config: JobConfig, program_resource_name: str,
+                     priority: int, processor_ids: Sequence[str]) -> Dict:
+        return {
+            'name': '%s/jobs/%s' % (program_resource_name, job_config.job_id),
             'output_config': {
                 'gcs_results_location': {
                     'uri': job_config.gcs_results
@@ -393,10 +721,6 @@ class Engine:
                 }
             },
         }
-        response = self.service.projects().programs().jobs().create(
-            parent=response['name'], body=request).execute()
-
-        return EngineJob(job_config, response, self)
 
     def get_program(self, program_resource_name: str) -> Dict:
         """Returns the previously created quantum program.
@@ -427,12 +751,25 @@ class Engine:
         return self.service.projects().programs().jobs().get(
             name=job_resource_name).execute()
 
-    def get_job_results(self, job_resource_name: str) -> List[TrialResult]:
+    async def get_job_async(self, job_resource_name: str) -> Dict:
+        """The coroutine version of `get_job`."""
+        return await self._execute_async(lambda service: service.projects(
+        ).programs().jobs().get(name=job_resource_name))
+
+    def get_job_results(self,
+                        job_resource_name: str,
+                        measurements: Optional[
+                            Dict[str, Sequence[devices.GridQubit]]] = None
+                       ) -> List[TrialResult]:
         """Returns the actual results (not metadata) of a completed job.
 
         Params:
             job_resource_name: A string of the form
                 `projects/project_id/programs/program_id/jobs/job_id`.
+            measurements: For the results of a v2 program, the qubits measured
+                by each measurement key. See
+                `cirq.google.programs_v2.find_measurements`. Defaults to the
+                order of the qubits in the results.
 
         Returns:
             An iterable over the TrialResult, one per parameter in the
@@ -440,22 +777,18 @@ class Engine:
         """
         response = self.service.projects().programs().jobs().getResult(
             parent=job_resource_name).execute()
-        trial_results = []
-        for sweep_result in response['result']['sweepResults']:
-            sweep_repetitions = sweep_result['repetitions']
-            key_sizes = [(m['key'], len(m['qubits']))
-                         for m in sweep_result['measurementKeys']]
-            for result in sweep_result['parameterizedResults']:
-                data = base64.standard_b64decode(result['measurementResults'])
-                measurements = unpack_results(data, sweep_repetitions,
-                                              key_sizes)
-
-                trial_results.append(TrialResult(
-                    params=ParamResolver(
-                        result.get('params', {}).get('assignments', {})),
-                    repetitions=sweep_repetitions,
-                    measurements=measurements))
-        return trial_results
+        return _trial_results_from_response(response, measurements)
+
+    async def get_job_results_async(
+            self,
+            job_resource_name: str,
+            measurements: Optional[
+                Dict[str, Sequence[devices.GridQubit]]] = None
+    ) -> List[TrialResult]:
+        """The coroutine version of `get_job_results`."""
+        response = await self._execute_async(lambda service: service.projects(
+        ).programs().jobs().getResult(parent=job_resource_name))
+        return _trial_results_from_response(response, measurements)
 
     def cancel_job(self, job_resource_name: str):
         """Cancels the given job.
@@ -554,13 +887,17 @@ class EngineJob:
     def __init__(self,
                  job_config: JobConfig,
                  job: Dict,
-                 engine: Engine) -> None:
+                 engine: Engine,
+                 measurements: Optional[
+                     Dict[str, Sequence[devices.GridQubit]]] = None) -> None:
         """A job submitted to the engine.
 
         Args:
             job_config: The JobConfig used to create the job.
             job: A full Job Dict.
             engine: Engine connected to the job.
+            measurements: For a job running a v2 program, the qubits measured
+                by each measurement key of the program.
         """
         self.job_config = job_config
         self._job = job
@@ -568,12 +905,18 @@ class EngineJob:
         self.job_resource_name = job['name']
         self.program_resource_name = self.job_resource_name.split('/jobs')[0]
         self._results = None  # type: Optional[List[TrialResult]]
+        self._measurements = measurements
 
     def _update_job(self):
         if self._job['executionStatus']['state'] not in TERMINAL_STATES:
             self._job = self._engine.get_job(self.job_resource_name)
         return self._job
 
+    async def _update_job_async(self):
+        if self._job['executionStatus']['state'] not in TERMINAL_STATES:
+            self._job = await self._engine.get_job_async(self.job_resource_name)
+        return self._job
+
     def status(self):
         """Return the execution status of the job."""
         return self._update_job()['executionStatus']['state']
@@ -582,27 +925,108 @@ class EngineJob:
         """Cancel the job."""
         self._engine.cancel_job(self.job_resource_name)
 
+    def _wait_until_succeeded(self) -> None:
+        job = self._update_job()
+        for _ in range(1000):
+            if job['executionStatus']['state'] in TERMINAL_STATES:
+                break
+            time.sleep(0.5)
+            job = self._update_job()
+        _raise_unless_succeeded(job)
+
     def results(self) -> List[TrialResult]:
         """Returns the job results, blocking until the job is complete."""
         if not self._results:
-            job = self._update_job()
-            for _ in range(1000):
-                if job['executionStatus']['state'] in TERMINAL_STATES:
-                    break
-                time.sleep(0.5)
-                job = self._update_job()
-            if job['executionStatus']['state'] != 'SUCCESS':
-                raise RuntimeError(
-                    'Job %s did not succeed. It is in state %s.' % (
-                        job['name'], job['executionStatus']['state']))
+            self._wait_until_succeeded()
             self._results = self._engine.get_job_results(
-                self.job_resource_name)
+                self.job_resource_name, self._measurements)
+        return self._results
+
+    async def results_async(self,
+                            *,
+                            initial_poll_interval: float = 0.5,
+                            max_poll_interval: float = 8.0,
+                            timeout: float = 500.0) -> List[TrialResult]:
+        """Returns the job results, once the job is complete.
+
+        The coroutine version of `results`. While the job is running, its
+        status is polled with exponential backoff, so that waiting on many
+        jobs at once doesn't flood the service with requests.
+
+        Args:
+            initial_poll_interval: Seconds to wait before polling the status
+                for the second time.
+            max_poll_interval: The longest wait between two polls. The wait
+                doubles after each poll until it reaches this.
+            timeout: Seconds to wait for the job to finish, in total.
+
+        Raises:
+            RuntimeError: The job didn't succeed, or didn't finish in time.
+        """
+        if not self._results:
+            job = await self._update_job_async()
+            interval = initial_poll_interval
+            waited = 0.0
+            while (job['executionStatus']['state'] not in TERMINAL_STATES and
+                   waited < timeout):
+                delay = min(interval, timeout - waited)
+                await asyncio.sleep(delay)
+                waited += delay
+                interval = min(interval * 2, max_poll_interval)
+                job = await self._update_job_async()
+            _raise_unless_succeeded(job)
+            self._results = await self._engine.get_job_results_async(
+                self.job_resource_name, self._measurements)
         return self._results
 
     def __iter__(self):
         return self.results().__iter__()
 
 
+def _raise_unless_succeeded(job: Dict) -> None:
+    if job['executionStatus']['state'] != 'SUCCESS':
+        raise RuntimeError('Job %s did not succeed. It is in state %s.' %
+                           (job['name'], job['executionStatus']['state']))
+
+
+_V2_RESULT_TYPE = ('type.googleapis.com/' +
+                   result_pb2.Result.DESCRIPTOR.full_name)
+
+
+def _any_dict(msg) -> Dict:
+    """Converts a proto to the JSON form of a `google.protobuf.Any`."""
+    result = {'@type': 'type.googleapis.com/' + msg.DESCRIPTOR.full_name}
+    result.update(json_format.MessageToDict(msg))
+    return result
+
+
+def _trial_results_from_response(
+        response: Dict,
+        measurements: Optional[Dict[str, Sequence[devices.GridQubit]]] = None
+) -> List[TrialResult]:
+    result = dict(response['result'])
+    if result.pop('@type', None) == _V2_RESULT_TYPE:
+        return programs_v2.results_from_proto(
+            json_format.ParseDict(result, result_pb2.Result()), measurements)
+
+    trial_results = []
+    for sweep_result in response['result']['sweepResults']:
+        sweep_repetitions = sweep_result['repetitions']
+        key_sizes = [(m['key'], len(m['qubits']))
+                     for m in sweep_result['measurementKeys']]
+        for result in sweep_result['parameterizedResults']:
+            data = base64.standard_b64decode(result['measurementResults'])
+            measurements = unpack_results_lazily(data, sweep_repetitions,
+                                                 key_sizes)
+
+            trial_results.append(
+                TrialResult(params=ParamResolver(
+                    result.get('params', {}).get('assignments', {})),
+                            repetitions=sweep_repetitions,
+                            measurements=measurements))
+    return trial_results
+
+
 def _sweepable_to_sweeps(sweepable: Sweepable) -> List[Sweep]:
     if isinstance(sweepable, ParamResolver):
         return [_resolver_to_sweep(sweepable)]
@@ -13,16 +13,22 @@
 # limitations under the License.
 
 """Tests for engine."""
+import asyncio
 import base64
 import re
+import threading
+import time
 from unittest import mock
 import numpy as np
 import pytest
+import sympy
 
 from apiclient import discovery
+from google.protobuf import json_format
 
 import cirq
 import cirq.google as cg
+from cirq.api.google.v2 import program_pb2, result_pb2, run_context_pb2
 
 
 _A_RESULT = {
@@ -538,3 +544,371 @@ def test_bad_job_config_inference_order(build):
 
     eng._infer_gcs_results(config)
     eng._infer_gcs_program(config)
+
+
+class _FakeQuantumEngine:
+    """An in-memory stand-in for the Quantum Engine REST service.
+
+    Each job reports the RUNNING state for `polls_until_done` status requests,
+    and `final_state` afterwards. Every request takes `latency` seconds.
+    """
+
+    # The discovery document that services are built from.
+    _rootDesc = {'name': 'quantum'}
+
+    def __init__(self, polls_until_done=0, final_state='SUCCESS', latency=0.0):
+        self.polls_until_done = polls_until_done
+        self.final_state = final_state
+        self.latency = latency
+        self.programs_created = []
+        self.polls = {}
+        self.max_in_flight = 0
+        self._in_flight = 0
+        self._lock = threading.Lock()
+
+    def projects(self):
+        return self
+
+    def programs(self):
+        return self
+
+    def jobs(self):
+        return self
+
+    def create(self, parent, body):
+        if '/programs/' not in parent:
+            return self._request(self._create_program, body)
+        return self._request(self._create_job, body)
+
+    def get(self, name):
+        return self._request(self._get_job, name)
+
+    def getResult(self, parent):
+        return self._request(lambda _: {'result': _A_RESULT}, parent)
+
+    def _create_program(self, body):
+        self.programs_created.append(body['name'])
+        return {'name': body['name']}
+
+    def _create_job(self, body):
+        self.polls[body['name']] = 0
+        return {'name': body['name'], 'executionStatus': {'state': 'READY'}}
+
+    def _get_job(self, name):
+        self.polls[name] += 1
+        state = (self.final_state
+                 if self.polls[name] > self.polls_until_done else 'RUNNING')
+        return {'name': name, 'executionStatus': {'state': state}}
+
+    def _request(self, func, arg):
+        request = mock.Mock()
+        request.execute.side_effect = lambda: self._execute(func, arg)
+        return request
+
+    def _execute(self, func, arg):
+        with self._lock:
+            self._in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self._in_flight)
+        time.sleep(self.latency)
+        with self._lock:
+            self._in_flight -= 1
+            return func(arg)
+
+
+def _run(coroutine):
+    loop = asyncio.new_event_loop()
+    try:
+        return loop.run_until_complete(coroutine)
+    finally:
+        loop.close()
+
+
+@mock.patch.object(discovery, 'build_from_document')
+@mock.patch.object(discovery, 'build')
+def test_run_sweep_async_submits_and_polls_concurrently(build,
+                                                        build_from_document):
+    fake = _FakeQuantumEngine(polls_until_done=2, latency=0.01)
+    build.return_value = build_from_document.return_value = fake
+    engine = cg.Engine(api_key="key", max_concurrent_requests=4)
+
+    async def run_all():
+        jobs = await asyncio.gather(*[
+            engine.run_sweep_async(program=cirq.Circuit(),
+                                   job_config=cg.JobConfig(
+                                       'project-id',
+                                       program_id='prog-{}'.format(i),
+                                       gcs_prefix='gs://bucket/folder'))
+            for i in range(12)
+        ])
+        return await asyncio.gather(
+            *[job.results_async(initial_poll_interval=0.001) for job in jobs])
+
+    results = _run(run_all())
+    assert len(results) == 12
+    assert all(r[0].params.param_dict == {'a': 1} for r in results)
+    assert sorted(fake.programs_created) == sorted(
+        'projects/project-id/programs/prog-{}'.format(i) for i in range(12))
+    assert all(polls == 3 for polls in fake.polls.values())
+    assert 1 < fake.max_in_flight <= 4
+    # The discovery document is only fetched once, for the main service.
+    assert build.call_count == 1
+    assert 1 < build_from_document.call_count <= 4
+    build_from_document.assert_called_with({'name': 'quantum'})
+
+
+@mock.patch.object(discovery, 'build_from_document')
+@mock.patch.object(discovery, 'build')
+def test_close_stops_request_threads(build, build_from_document):
+    build.return_value = build_from_document.return_value = (
+        _FakeQuantumEngine())
+    job_config = cg.JobConfig('project-id', gcs_prefix='gs://bucket/folder')
+    with cg.Engine(api_key="key", cache_discovery=False) as engine:
+        _run(engine.run_async(program=cirq.Circuit(), job_config=job_config))
+        executor = engine._executor
+        assert executor is not None
+    assert engine._executor is None
+    with pytest.raises(RuntimeError):
+        executor.submit(lambda: None)
+    # The engine starts new threads if it's used again.
+    _run(engine.run_async(program=cirq.Circuit(), job_config=job_config))
+    assert engine._executor is not None
+    engine.close()
+    engine.close()
+    assert engine._executor is None
+    # Arguments that only apply to fetching the discovery document are
+    # dropped.
+    build_from_document.assert_called_with({'name': 'quantum'})
+
+
+@mock.patch.object(discovery, 'build_from_document')
+@mock.patch.object(discovery, 'build')
+def test_run_async(build, build_from_document):
+    build.return_value = build_from_document.return_value = (
+        _FakeQuantumEngine())
+    result = _run(
+        cg.Engine(api_key="key").run_async(
+            program=cirq.Circuit(),
+            job_config=cg.JobConfig('project-id',
+                                    gcs_prefix='gs://bucket/folder')))
+    assert result.repetitions == 1
+    assert result.measurements == {'q': np.array([[0]], dtype='uint8')}
+
+
+@mock.patch.object(discovery, 'build_from_document')
+@mock.patch.object(discovery, 'build')
+def test_results_async_backs_off(build, build_from_document, monkeypatch):
+    fake = _FakeQuantumEngine(polls_until_done=6)
+    build.return_value = build_from_document.return_value = fake
+    engine = cg.Engine(api_key="key")
+    job = engine.run_sweep(program=cirq.Circuit(),
+                           job_config=cg.JobConfig(
+                               'project-id', gcs_prefix='gs://bucket/folder'))
+    delays = []
+
+    async def sleep(delay):
+        delays.append(delay)
+
+    monkeypatch.setattr(asyncio, 'sleep', sleep)
+    results = _run(
+        job.results_async(initial_poll_interval=0.5, max_poll_interval=2))
+    assert delays == [0.5, 1, 2, 2, 2, 2]
+    assert len(results) == 1
+
+    # Results are only fetched once.
+    assert _run(job.results_async()) is results
+    assert len(delays) == 6
+
+
+@mock.patch.object(discovery, 'build_from_document')
+@mock.patch.object(discovery, 'build')
+def test_results_async_fails(build, build_from_document, monkeypatch):
+    fake = _FakeQuantumEngine(polls_until_done=1000)
+    build.return_value = build_from_document.return_value = fake
+    engine = cg.Engine(api_key="key")
+
+    async def sleep(delay):
+        pass
+
+    monkeypatch.setattr(asyncio, 'sleep', sleep)
+    job = engine.run_sweep(program=cirq.Circuit(),
+                           job_config=cg.JobConfig(
+                               'project-id', gcs_prefix='gs://bucket/folder'))
+    with pytest.raises(RuntimeError, match='It is in state RUNNING'):
+        _run(job.results_async(timeout=3))
+    assert fake.polls[job.job_resource_name] == 4
+
+    fake.final_state = 'FAILURE'
+    fake.polls_until_done = 0
+    with pytest.raises(RuntimeError, match='It is in state FAILURE'):
+        _run(job.results_async())
+
+
+def _v2_result_dict(bits):
+    result = result_pb2.Result()
+    sweep_result = result.sweep_results.add(repetitions=len(bits))
+    measurement = sweep_result.parameterized_results.add(
+    ).measurement_results.add(key='m')
+    for qubit_id, column in [('0_1', bits), ('0_0', [0] * len(bits))]:
+        qubit_result = measurement.qubit_measurement_results.add()
+        qubit_result.qubit.id = qubit_id
+        qubit_result.results = np.packbits(
+            np.pad(column, (0, -len(column) % 8), 'constant').reshape(
+                (-1, 8))[:, ::-1]).tobytes()
+    result_dict = {'@type': 'type.googleapis.com/cirq.api.google.v2.Result'}
+    result_dict.update(json_format.MessageToDict(result))
+    return {'result': result_dict}
+
+
+def _batch_service(bits_per_program):
+    results = {
+        'projects/project-id/programs/prog-{}/jobs/job-0'.format(i):
+        _v2_result_dict(bits) for i, bits in enumerate(bits_per_program)
+    }
+
+    def create_program(parent, body):
+        return mock.Mock(execute=lambda: {'name': body['name']})
+
+    def create_job(parent, body):
+        job = {'name': body['name'], 'executionStatus': {'state': 'SUCCESS'}}
+        return mock.Mock(execute=lambda: job)
+
+    def get_result(parent):
+        return mock.Mock(execute=lambda: results[parent])
+
+    service = mock.Mock()
+    programs = service.projects().programs()
+    programs.create.side_effect = create_program
+    programs.jobs().create.side_effect = create_job
+    programs.jobs().getResult.side_effect = get_result
+    return service
+
+
+def _batch_circuits():
+    q0, q1 = cirq.GridQubit(0, 0), cirq.GridQubit(0, 1)
+    return [
+        cirq.Circuit.from_ops(
+            cirq.X(q1)**sympy.Symbol('t'), cirq.measure(q0, q1, key='m')),
+        cirq.Circuit.from_ops(cirq.measure(q1, q0, key='m')),
+    ]
+
+
+@mock.patch.object(discovery, 'build')
+def test_run_batch(build):
+    service = _batch_service([[1, 0, 1], [0, 1]])
+    build.return_value = service
+    jobs = cg.Engine(api_key="key").run_batch(
+        programs=_batch_circuits(),
+        job_config=cg.JobConfig('project-id',
+                                program_id='prog',
+                                gcs_prefix='gs://bucket/folder'),
+        params_list=[cirq.Points('t', [0.5]), None],
+        repetitions=[3, 2])
+
+    # Each program is an ordinary v2 program, with a job of its own.
+    program_requests = [
+        c[1]['body']
+        for c in service.projects().programs().create.call_args_list
+    ]
+    assert [r['name'] for r in program_requests] == [
+        'projects/project-id/programs/prog-0',
+        'projects/project-id/programs/prog-1'
+    ]
+    assert [r['gcs_code_location']['uri'] for r in program_requests] == [
+        'gs://bucket/folder/programs/prog-0/prog-0',
+        'gs://bucket/folder/programs/prog-1/prog-1'
+    ]
+    code = program_requests[1]['code']
+    assert code.pop('@type') == 'type.googleapis.com/cirq.api.google.v2.Program'
+    program = json_format.ParseDict(code, program_pb2.Program())
+    assert program.schedule.scheduled_operations[0].operation.gate.id == 'meas'
+
+    contexts = []
+    for c in service.projects().programs().jobs().create.call_args_list:
+        run_context = c[1]['body']['run_context']
+        assert run_context.pop('@type') == (
+            'type.googleapis.com/cirq.api.google.v2.RunContext')
+        contexts.append(
+            json_format.ParseDict(run_context, run_context_pb2.RunContext()))
+    assert [c.parameter_sweeps[0].repetitions for c in contexts] == [3, 2]
+    assert contexts[0].parameter_sweeps[
+        0].sweep.single_sweep.parameter_key == 't'
+    assert not contexts[1].parameter_sweeps[0].HasField('sweep')
+
+    assert [job.program_resource_name for job in jobs] == [
+        'projects/project-id/programs/prog-0',
+        'projects/project-id/programs/prog-1'
+    ]
+    # Columns follow the qubit order of each measurement, not of the result.
+    np.testing.assert_equal(jobs[0].results()[0].measurements['m'],
+                            [[0, 1], [0, 0], [0, 1]])
+    np.testing.assert_equal(
+        list(jobs[1])[0].measurements['m'], [[0, 0], [1, 0]])
+
+
+@mock.patch.object(discovery, 'build_from_document')
+@mock.patch.object(discovery, 'build')
+def test_run_batch_async(build, build_from_document):
+    service = _batch_service([[1, 0, 1], [0, 1]])
+    build.return_value = build_from_document.return_value = service
+    job_config = cg.JobConfig('project-id',
+                              program_id='prog',
+                              gcs_prefix='gs://bucket/folder')
+
+    async def run_all(engine):
+        jobs = await engine.run_batch_async(
+            programs=_batch_circuits(),
+            job_config=job_config,
+            params_list=[cirq.ParamResolver({'t': 1}), None])
+        return await asyncio.gather(*[job.results_async() for job in jobs])
+
+    with cg.Engine(api_key="key") as engine:
+        results = _run(run_all(engine))
+    assert [len(r) for r in results] == [1, 1]
+    np.testing.assert_equal(results[0][0].measurements['m'],
+                            [[0, 1], [0, 0], [0, 1]])
+    np.testing.assert_equal(results[1][0].measurements['m'], [[0, 0], [1, 0]])
+    assert sorted(
+        c[1]['body']['name']
+        for c in service.projects().programs().create.call_args_list) == [
+            'projects/project-id/programs/prog-0',
+            'projects/project-id/programs/prog-1'
+        ]
+
+
+@mock.patch.object(discovery, 'build')
+def test_run_batch_validates_before_submitting(build):
+    service = mock.Mock()
+    build.return_value = service
+    engine = cg.Engine(api_key="key")
+    job_config = cg.JobConfig('project-id', gcs_prefix='gs://bucket/folder')
+    bad = cirq.Circuit(device=cg.Foxtail)
+    bad._moments.append(cirq.Moment([cirq.Z(cirq.NamedQubit("dorothy"))]))
+    good = cirq.Circuit.from_ops(cirq.X(cirq.GridQubit(0, 0)))
+
+    with pytest.raises(ValueError, match='Program 1:.*\n.*Program 3:'):
+        engine.run_batch(programs=[good, bad, good, bad], job_config=job_config)
+    repeated_key = cirq.Circuit.from_ops(
+        cirq.measure(cirq.GridQubit(0, 0), key='m'),
+        cirq.measure(cirq.GridQubit(0, 1), key='m'))
+    with pytest.raises(ValueError, match='Program 1: Duplicate measurement'):
+        engine.run_batch(programs=[good, repeated_key], job_config=job_config)
+    with pytest.raises(ValueError, match='2 programs, 1 params'):
+        engine.run_batch(programs=[good, good],
+                         job_config=job_config,
+                         params_list=[None])
+    with pytest.raises(ValueError, match='priority'):
+        engine.run_batch(programs=[good], job_config=job_config, priority=1000)
+    with pytest.raises(ValueError, match='No programs'):
+        engine.run_batch(programs=[], job_config=job_config)
+    assert not service.projects().programs().create.called
+
+
+@mock.patch.object(discovery, 'build')
+def test_get_job_results_v2(build):
+    service = mock.Mock()
+    build.return_value = service
+    service.projects().programs().jobs().getResult().execute.return_value = (
+        _v2_result_dict([1, 0]))
+    results = cg.Engine(api_key="key").get_job_results('job')
+    # Without the measured qubits, columns follow the order of the result.
+    np.testing.assert_equal(results[0].measurements['m'], [[1, 0], [0, 0]])
@@ -0,0 +1,106 @@
+# Copyright 2018 The Cirq Developers
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     https://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Conversion of sweeps to and from the v2 protos in cirq/api/google/v2."""
+
+from cirq.api.google.v2 import run_context_pb2
+from cirq.study.sweeps import (
+    Linspace,
+    Points,
+    Product,
+    Sweep,
+    UnitSweep,
+    Zip,
+)
+
+
+def sweep_to_proto(sweep: Sweep,
+                   repetitions: int = 1) -> run_context_pb2.ParameterSweep:
+    """Converts a sweep into an equivalent ParameterSweep proto.
+
+    Unlike the v1 format, products and zips can be nested in any way. The
+    protos store parameter values as 32 bit floats, so the values of the
+    sweep are rounded to the nearest float32 (about 7 significant digits).
+
+    Args:
+        sweep: The sweep to convert.
+        repetitions: How many times to sample each point of the sweep.
+
+    Raises:
+        ValueError: The sweep contains a kind of sweep that the protos can't
+            describe.
+    """
+    msg = run_context_pb2.ParameterSweep(repetitions=repetitions)
+    if sweep != UnitSweep:
+        _sweep_to_proto(sweep, msg.sweep)
+    return msg
+
+
+def _sweep_to_proto(sweep: Sweep, msg: run_context_pb2.Sweep) -> None:
+    if isinstance(sweep, (Product, Zip)):
+        function = msg.sweep_function
+        if isinstance(sweep, Product):
+            function.function_type = run_context_pb2.SweepFunction.PRODUCT
+            factors = sweep.factors
+        else:
+            function.function_type = run_context_pb2.SweepFunction.ZIP
+            factors = sweep.sweeps
+        for factor in factors:
+            _sweep_to_proto(factor, function.sweeps.add())
+    elif isinstance(sweep, Linspace):
+        msg.single_sweep.parameter_key = sweep.key
+        msg.single_sweep.linspace.first_point = sweep.start
+        msg.single_sweep.linspace.last_point = sweep.stop
+        msg.single_sweep.linspace.num_points = sweep.length
+    elif isinstance(sweep, Points):
+        msg.single_sweep.parameter_key = sweep.key
+        for point in sweep.points:
+            msg.single_sweep.points.points.add().float_value = point
+    else:
+        raise ValueError('invalid sweep: {}'.format(sweep))
+
+
+def sweep_from_proto(msg: run_context_pb2.ParameterSweep) -> Sweep:
+    """Converts a ParameterSweep proto into an equivalent sweep.
+
+    The repetitions of the proto are not part of the sweep.
+
+    Raises:
+        ValueError: The proto contains an unknown kind of sweep.
+    """
+    if not msg.HasField('sweep'):
+        return UnitSweep
+    return _sweep_from_proto(msg.sweep)
+
+
+def _sweep_from_proto(msg: run_context_pb2.Sweep) -> Sweep:
+    which = msg.WhichOneof('sweep')
+    if which == 'sweep_function':
+        function = msg.sweep_function
+        factors = [_sweep_from_proto(s) for s in function.sweeps]
+        if function.function_type == run_context_pb2.SweepFunction.PRODUCT:
+            return Product(*factors)
+        if function.function_type == run_context_pb2.SweepFunction.ZIP:
+            return Zip(*factors)
+        raise ValueError('invalid sweep function type: {}'.format(
+            function.function_type))
+    if which == 'single_sweep':
+        single = msg.single_sweep
+        if single.WhichOneof('sweep') == 'linspace':
+            return Linspace(single.parameter_key, single.linspace.first_point,
+                            single.linspace.last_point,
+                            single.linspace.num_points)
+        if single.WhichOneof('sweep') == 'points':
+            return Points(single.parameter_key,
+                          [p.float_value for p in single.points.points])
+    raise ValueError('invalid sweep: {}'.format(msg))
@@ -0,0 +1,110 @@
+# Copyright 2019 The Cirq Developers
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     https://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+import numpy as np
+import pytest
+
+from cirq.api.google.v2 import run_context_pb2
+from cirq.google import params_v2
+from cirq.study.sweeps import Linspace, Points, Product, Sweep, UnitSweep, Zip
+
+
+def test_sweep_to_proto_unit_sweep():
+    msg = params_v2.sweep_to_proto(UnitSweep, repetitions=5)
+    assert msg.repetitions == 5
+    assert not msg.HasField('sweep')
+
+
+def test_sweep_to_proto_linspace():
+    msg = params_v2.sweep_to_proto(Linspace('a', 0, 1, 3))
+    assert msg.repetitions == 1
+    single = msg.sweep.single_sweep
+    assert single.parameter_key == 'a'
+    assert single.linspace.first_point == 0
+    assert single.linspace.last_point == 1
+    assert single.linspace.num_points == 3
+
+
+def test_sweep_to_proto_points():
+    msg = params_v2.sweep_to_proto(Points('b', [0.5, 2]))
+    single = msg.sweep.single_sweep
+    assert single.parameter_key == 'b'
+    assert [p.float_value for p in single.points.points] == [0.5, 2]
+
+
+def test_sweep_to_proto_nested():
+    sweep = Product(Points('a', [1, 2]),
+                    Zip(Points('b', [3, 4]), Linspace('c', 0, 1, 2)))
+    msg = params_v2.sweep_to_proto(sweep, repetitions=10)
+    function = msg.sweep.sweep_function
+    assert function.function_type == run_context_pb2.SweepFunction.PRODUCT
+    assert len(function.sweeps) == 2
+    assert function.sweeps[0].single_sweep.parameter_key == 'a'
+    inner = function.sweeps[1].sweep_function
+    assert inner.function_type == run_context_pb2.SweepFunction.ZIP
+    assert [s.single_sweep.parameter_key for s in inner.sweeps] == ['b', 'c']
+
+
+class UnknownSweep(Sweep):
+
+    def __eq__(self, other):
+        return isinstance(other, UnknownSweep)
+
+    @property
+    def keys(self):
+        return ['a']
+
+    def __len__(self):
+        return 1
+
+    def param_tuples(self):
+        yield (('a', 0),)
+
+
+def test_sweep_to_proto_invalid():
+    with pytest.raises(ValueError, match='invalid sweep'):
+        params_v2.sweep_to_proto(UnknownSweep())
+    with pytest.raises(ValueError, match='invalid sweep'):
+        params_v2.sweep_to_proto(Zip(Points('b', [1]), UnknownSweep()))
+
+
+@pytest.mark.parametrize('sweep', [
+    UnitSweep,
+    Linspace('a', 0, 1, 5),
+    Points('b', [0.5, 2, -1]),
+    Product(Points('a', [1, 2]), Linspace('b', 0, 1, 3)),
+    Zip(Points('a', [1, 2]), Product(Points('b', [3]), Points('c', [4, 5]))),
+])
+def test_sweep_proto_round_trip(sweep):
+    msg = params_v2.sweep_to_proto(sweep, repetitions=7)
+    assert params_v2.sweep_from_proto(msg) == sweep
+
+
+def test_sweep_proto_rounds_to_float32():
+    msg = params_v2.sweep_to_proto(Points('a', [0.1]))
+    point, = params_v2.sweep_from_proto(msg).points
+    assert point == np.float32(0.1)
+    assert point != 0.1
+
+
+def test_sweep_from_proto_invalid():
+    msg = run_context_pb2.ParameterSweep()
+    msg.sweep.sweep_function.sweeps.add().CopyFrom(
+        params_v2.sweep_to_proto(Points('a', [1])).sweep)
+    with pytest.raises(ValueError, match='invalid sweep function type'):
+        params_v2.sweep_from_proto(msg)
+
+    msg = run_context_pb2.ParameterSweep()
+    msg.sweep.single_sweep.parameter_key = 'a'
+    with pytest.raises(ValueError, match='invalid sweep'):
+        params_v2.sweep_from_proto(msg)
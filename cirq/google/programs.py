@@ -20,6 +20,7 @@ import sympy
 
 from cirq import devices, ops, protocols
 from cirq.schedules import Schedule, ScheduledOperation
+from cirq.study import PackedMeasurements
 from cirq.value import Timestamp
 
 if TYPE_CHECKING:
@@ -207,36 +208,12 @@ def pack_results(measurements: Sequence[Tuple[str, np.ndarray]]) -> bytes:
     """
     if not measurements:
         return b''
+    return PackedMeasurements.pack(measurements).data.tobytes()
 
-    shapes = [(key, np.shape(data)) for key, data in measurements]
-    if not all(len(shape) == 2 for _, shape in shapes):
-        raise ValueError("Expected 2-D data: shapes={}".format(shapes))
 
-    reps = shapes[0][1][0]
-    if not all(shape[0] == reps for _, shape in shapes):
-        raise ValueError(
-            "Expected same reps for all keys: shapes={}".format(shapes))
-
-    bits = np.hstack([np.asarray(data, dtype=bool) for _, data in measurements])
-    bits = bits.reshape(-1)
-
-    # Pad length to multiple of 8 if needed.
-    remainder = len(bits) % 8
-    if remainder:
-        bits = np.pad(bits, (0, 8 - remainder), 'constant')
-
-    # Pack in little-endian bit order.
-    bits = bits.reshape((-1, 8))[:, ::-1]
-    byte_arr = np.packbits(bits, axis=1).reshape(-1)
-
-    return byte_arr.tobytes()
-
-
-def unpack_results(
-        data: bytes,
-        repetitions: int,
-        key_sizes: Sequence[Tuple[str, int]]
-) -> Dict[str, np.ndarray]:
+def unpack_results(data: bytes, repetitions: int,
+                   key_sizes: Sequence[Tuple[str, int]]
+                  ) -> Dict[str, np.ndarray]:
     """Unpack data from a bitstring into individual measurement results.
 
     Args:
@@ -249,21 +226,34 @@ def unpack_results(
     Returns:
         Dict mapping measurement key to a 2D array of boolean results. Each
         array has shape (repetitions, size) with size for that measurement.
+
+    Raises:
+        ValueError: There is not enough data for the repetitions and
+            measurements.
     """
-    bits_per_rep = sum(size for _, size in key_sizes)
-    total_bits = repetitions * bits_per_rep
+    packed = unpack_results_lazily(data, repetitions, key_sizes)
+    return {key: packed.unpack(key) for key in packed}
+
 
-    byte_arr = np.frombuffer(data, dtype='uint8').reshape((len(data), 1))
-    bits = np.unpackbits(byte_arr, axis=1)[:, ::-1].reshape(-1).astype(bool)
-    bits = bits[:total_bits].reshape((repetitions, bits_per_rep))
+def unpack_results_lazily(data: bytes, repetitions: int,
+                          key_sizes: Sequence[Tuple[str, int]]
+                         ) -> PackedMeasurements:
+    """Wraps packed measurement results without unpacking them.
 
-    results = {}
-    ofs = 0
-    for key, size in key_sizes:
-        results[key] = bits[:, ofs:ofs + size]
-        ofs += size
+    Like `unpack_results`, but returns a read-only `cirq.PackedMeasurements`
+    that uses the data without copying it, and only decodes the results of a
+    key when it is first looked up.
+
+    Args:
+        data: Packed measurement results, as described in `unpack_results`.
+        repetitions: number of repetitions.
+        key_sizes: Keys and sizes of the measurements in the data.
 
-    return results
+    Raises:
+        ValueError: There is not enough data for the repetitions and
+            measurements.
+    """
+    return PackedMeasurements(data, repetitions, key_sizes)
 
 
 def is_native_xmon_op(op: ops.Operation) -> bool:
@@ -169,6 +169,44 @@ def test_unpack_results():
          [1, 0], ])
 
 
+def test_unpack_results_returns_writable_dict():
+    data = make_bytes("""
+        000 00
+        001 01
+        010 10
+    """)
+    results = cg.unpack_results(data, 3, [('a', 3), ('b', 2)])
+    assert isinstance(results, dict)
+    results['a'][0, 0] = True
+    assert results['a'][0, 0]
+
+
+def test_unpack_results_lazily():
+    data = make_bytes("""
+        000 00
+        001 01
+        010 10
+        011 11
+        100 00
+        101 01
+        110 10
+    """)
+    key_sizes = [('a', 3), ('b', 2)]
+    results = cg.unpack_results_lazily(data, 7, key_sizes)
+    assert isinstance(results, cirq.PackedMeasurements)
+    expected = cg.unpack_results(data, 7, key_sizes)
+    assert sorted(results) == sorted(expected)
+    for key in expected:
+        np.testing.assert_array_equal(results[key], expected[key])
+
+
+def test_unpack_results_not_enough_data():
+    with pytest.raises(ValueError):
+        cg.unpack_results(b'\x00', 7, [('a', 3), ('b', 2)])
+    with pytest.raises(ValueError):
+        cg.unpack_results_lazily(b'\x00', 7, [('a', 3), ('b', 2)])
+
+
 def test_single_qubit_measurement_proto_dict_convert():
     gate = cirq.MeasurementGate(1, 'test')
     proto_dict = {
@@ -0,0 +1,383 @@
+# Copyright 2018 The Cirq Developers
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     https://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Conversion of programs and results to and from the v2 protos.
+
+The operations use the xmon gate set, with these gate ids and arguments:
+
+    exp_w: [axis_half_turns, half_turns] on one qubit.
+    exp_z: [half_turns] on one qubit.
+    exp_11: [half_turns] on two qubits.
+    meas: On any number of qubits, with the measurement key as its only key.
+        When some results are inverted, there is one 0 or 1 argument per qubit
+        saying whether that qubit's result is inverted.
+
+Numeric arguments are 32-bit floats in the protos, so they lose precision
+beyond about seven significant digits.
+
+The results of each qubit are packed into bytes, eight repetitions per byte,
+with the first repetition in the least significant bit of the first byte.
+"""
+
+from typing import cast, Dict, Iterable, List, Optional, Sequence, Union
+
+import numpy as np
+import sympy
+
+from cirq import circuits, devices, ops, protocols
+from cirq.api.google.v2 import program_pb2, result_pb2
+from cirq.google import gate_sets
+from cirq.schedules import Schedule, ScheduledOperation
+from cirq.study import ParamResolver, TrialResult
+from cirq.value import Timestamp
+
+
+def qubit_to_proto_id(q: devices.GridQubit) -> str:
+    """Returns the id of a qubit in the protos, e.g. '2_3' for row 2 col 3."""
+    return '{}_{}'.format(q.row, q.col)
+
+
+def qubit_from_proto_id(proto_id: str) -> devices.GridQubit:
+    """Returns the qubit with an id such as '2_3' in the protos.
+
+    Raises:
+        ValueError: The id is not of the form 'row_col'.
+    """
+    parts = proto_id.split('_')
+    try:
+        row, col = (int(part) for part in parts)
+    except ValueError:
+        raise ValueError('Invalid qubit id: {!r}'.format(proto_id))
+    return devices.GridQubit(row, col)
+
+
+def circuit_to_proto(circuit: circuits.Circuit) -> program_pb2.Program:
+    """Converts a circuit into a Program proto.
+
+    Args:
+        circuit: The circuit to convert. Must contain only gates that can be
+            cast to xmon gates, on grid qubits.
+
+    Returns:
+        The Program proto, which specifies the circuit moment by moment.
+    """
+    msg = program_pb2.Program()
+    msg.language.gate_set = gate_sets.XMON
+    msg.circuit.scheduling_strategy = program_pb2.Circuit.MOMENT_BY_MOMENT
+    for moment in circuit:
+        moment_msg = msg.circuit.moments.add()
+        for op in moment.operations:
+            _operation_to_proto(cast(ops.GateOperation, op),
+                                moment_msg.operations.add())
+    return msg
+
+
+def schedule_to_proto(schedule: Schedule) -> program_pb2.Program:
+    """Converts a schedule into a Program proto.
+
+    Args:
+        schedule: The schedule to convert. Must contain only gates that can be
+            cast to xmon gates, on grid qubits.
+
+    Returns:
+        The Program proto, which specifies the schedule's operations together
+        with their start times.
+    """
+    msg = program_pb2.Program()
+    msg.language.gate_set = gate_sets.XMON
+    for so in schedule.scheduled_operations:
+        scheduled = msg.schedule.scheduled_operations.add()
+        scheduled.start_time_picos = so.time.raw_picos()
+        _operation_to_proto(cast(ops.GateOperation, so.operation),
+                            scheduled.operation)
+    return msg
+
+
+def _operation_to_proto(op: ops.GateOperation,
+                        msg: program_pb2.Operation) -> None:
+    gate = op.gate
+    for q in op.qubits:
+        msg.qubits.add().id = qubit_to_proto_id(cast(devices.GridQubit, q))
+
+    if isinstance(gate, ops.MeasurementGate):
+        msg.gate.id = 'meas'
+        msg.keys.append(protocols.measurement_key(gate))
+        if any(gate.invert_mask):
+            invert_mask = gate.invert_mask + (False,) * (len(op.qubits) -
+                                                         len(gate.invert_mask))
+            for inverted in invert_mask:
+                _arg_to_proto(float(inverted), msg.args.add())
+        return
+
+    args = []  # type: List[Union[sympy.Basic, float]]
+    if isinstance(gate, ops.XPowGate):
+        msg.gate.id = 'exp_w'
+        args = [0, gate.exponent]
+    elif isinstance(gate, ops.YPowGate):
+        msg.gate.id = 'exp_w'
+        args = [0.5, gate.exponent]
+    elif isinstance(gate, ops.PhasedXPowGate):
+        msg.gate.id = 'exp_w'
+        args = [gate.phase_exponent, gate.exponent]
+    elif isinstance(gate, ops.ZPowGate):
+        msg.gate.id = 'exp_z'
+        args = [gate.exponent]
+    elif isinstance(gate, ops.CZPowGate):
+        msg.gate.id = 'exp_11'
+        args = [gate.exponent]
+    else:
+        raise ValueError(
+            "Don't know how to serialize this gate: {!r}".format(gate))
+    for arg in args:
+        _arg_to_proto(arg, msg.args.add())
+
+
+def _arg_to_proto(value: Union[sympy.Basic, float],
+                  msg: program_pb2.Arg) -> None:
+    if isinstance(value, sympy.Symbol):
+        msg.symbol = str(value)
+    elif isinstance(value, sympy.Basic) and value.free_symbols:
+        raise ValueError('Only plain symbols can be serialized, not the '
+                         'expression {!r}.'.format(value))
+    else:
+        msg.arg_value.float_value = float(value)
+
+
+def circuit_from_proto(msg: program_pb2.Program,
+                       device: devices.Device = devices.UnconstrainedDevice
+                      ) -> circuits.Circuit:
+    """Converts a Program proto containing a circuit into a Circuit.
+
+    Args:
+        msg: The Program proto.
+        device: The device of the returned circuit.
+
+    Raises:
+        ValueError: The proto doesn't contain an xmon circuit.
+    """
+    _check_program(msg, 'circuit')
+    moments = [
+        ops.Moment(_operation_from_proto(op)
+                   for op in moment.operations)
+        for moment in msg.circuit.moments
+    ]
+    return circuits.Circuit(moments, device=device)
+
+
+def schedule_from_proto(msg: program_pb2.Program,
+                        device: devices.Device) -> Schedule:
+    """Converts a Program proto containing a schedule into a Schedule.
+
+    Args:
+        msg: The Program proto.
+        device: The device of the returned schedule.
+
+    Raises:
+        ValueError: The proto doesn't contain an xmon schedule.
+    """
+    _check_program(msg, 'schedule')
+    scheduled_ops = []
+    for scheduled in msg.schedule.scheduled_operations:
+        scheduled_ops.append(
+            ScheduledOperation.op_at_on(
+                operation=_operation_from_proto(scheduled.operation),
+                time=Timestamp(picos=scheduled.start_time_picos),
+                device=device,
+            ))
+    return Schedule(device, scheduled_ops)
+
+
+def _check_program(msg: program_pb2.Program, kind: str) -> None:
+    if msg.language.gate_set != gate_sets.XMON:
+        raise ValueError('Unsupported gate set: {!r}'.format(
+            msg.language.gate_set))
+    if msg.WhichOneof('program') != kind:
+        raise ValueError('Program proto does not contain a {}.'.format(kind))
+
+
+def _operation_from_proto(msg: program_pb2.Operation) -> ops.Operation:
+    qubits = [qubit_from_proto_id(q.id) for q in msg.qubits]
+    args = [_arg_from_proto(arg) for arg in msg.args]
+    gate_id = msg.gate.id
+
+    if gate_id == 'meas':
+        if len(msg.keys) != 1 or len(args) not in (0, len(qubits)):
+            raise ValueError('Invalid measurement: {}'.format(msg))
+        return ops.MeasurementGate(num_qubits=len(qubits),
+                                   key=msg.keys[0],
+                                   invert_mask=tuple(
+                                       bool(arg) for arg in args)).on(*qubits)
+
+    num_args = {'exp_w': 2, 'exp_z': 1, 'exp_11': 1}.get(gate_id)
+    if num_args is None:
+        raise ValueError('Unsupported gate id: {!r}'.format(gate_id))
+    if len(args) != num_args:
+        raise ValueError('{} expects {} args but got {}.'.format(
+            gate_id, num_args, len(args)))
+    if gate_id == 'exp_w':
+        return ops.PhasedXPowGate(phase_exponent=args[0],
+                                  exponent=args[1]).on(*qubits)
+    if gate_id == 'exp_z':
+        return ops.ZPowGate(exponent=args[0]).on(*qubits)
+    return ops.CZPowGate(exponent=args[0]).on(*qubits)
+
+
+def _arg_from_proto(msg: program_pb2.Arg) -> Union[sympy.Basic, float]:
+    which = msg.WhichOneof('arg')
+    if which == 'symbol':
+        return sympy.Symbol(msg.symbol)
+    if which == 'arg_value' and msg.arg_value.WhichOneof(
+            'arg_value') == 'float_value':
+        return msg.arg_value.float_value
+    raise ValueError('Unsupported arg: {}'.format(msg))
+
+
+def find_measurements(schedule: Schedule
+                     ) -> Dict[str, Sequence[devices.GridQubit]]:
+    """Returns the qubits measured by each measurement key of a schedule."""
+    measurements = {}  # type: Dict[str, Sequence[devices.GridQubit]]
+    for so in schedule.scheduled_operations:
+        if protocols.is_measurement(so.operation):
+            key = protocols.measurement_key(so.operation)
+            if key in measurements:
+                raise ValueError('Duplicate measurement key: {}'.format(key))
+            measurements[key] = cast(List[devices.GridQubit],
+                                     list(so.operation.qubits))
+    return measurements
+
+
+def results_to_proto(trial_sweeps: Iterable[Iterable[TrialResult]],
+                     measurements: Dict[str, Sequence[devices.GridQubit]]
+                    ) -> result_pb2.Result:
+    """Converts TrialResults into a Result proto.
+
+    Args:
+        trial_sweeps: The TrialResults of each parameter sweep. All the
+            results of a sweep must have the same number of repetitions.
+        measurements: The qubits measured by each measurement key, in the
+            order of the columns of the results. See `find_measurements`.
+
+    Returns:
+        The Result proto, with the results of each qubit packed into bytes.
+
+    Raises:
+        ValueError: The results don't match the measurements, or the results
+            of a sweep have different numbers of repetitions.
+    """
+    msg = result_pb2.Result()
+    for trial_sweep in trial_sweeps:
+        sweep_result = msg.sweep_results.add()
+        for i, trial_result in enumerate(trial_sweep):
+            if i == 0:
+                sweep_result.repetitions = trial_result.repetitions
+            elif trial_result.repetitions != sweep_result.repetitions:
+                raise ValueError(
+                    'Different numbers of repetitions in one sweep: '
+                    '{} and {}.'.format(sweep_result.repetitions,
+                                        trial_result.repetitions))
+            result = sweep_result.parameterized_results.add()
+            for key, value in trial_result.params.param_dict.items():
+                result.params.assignments[key] = float(value)
+            for key, qubits in measurements.items():
+                _measurement_to_proto(key, qubits, trial_result,
+                                      result.measurement_results.add())
+    return msg
+
+
+def _measurement_to_proto(key: str, qubits: Sequence[devices.GridQubit],
+                          trial_result: TrialResult,
+                          msg: result_pb2.MeasurementResult) -> None:
+    if key not in trial_result.measurements:
+        raise ValueError('No results for measurement key {!r}.'.format(key))
+    bits = trial_result.measurements[key]
+    shape = (trial_result.repetitions, len(qubits))
+    if bits.shape != shape:
+        raise ValueError('Results for key {!r} have shape {}, not {}.'.format(
+            key, bits.shape, shape))
+    msg.key = key
+    for q, packed in zip(qubits, _pack_bits(bits)):
+        qubit_result = msg.qubit_measurement_results.add()
+        qubit_result.qubit.id = qubit_to_proto_id(q)
+        qubit_result.results = packed
+
+
+def _pack_bits(bits: np.ndarray) -> List[bytes]:
+    # Packs each column of a (repetitions, qubits) array of bits separately.
+    repetitions, num_qubits = bits.shape
+    padded = np.zeros((num_qubits, -(-repetitions // 8) * 8), dtype=bool)
+    padded[:, :repetitions] = bits.T
+    packed = np.packbits(padded.reshape((num_qubits, -1, 8))[:, :, ::-1],
+                         axis=-1)
+    return [row.tobytes() for row in packed.reshape((num_qubits, -1))]
+
+
+def results_from_proto(
+        msg: result_pb2.Result,
+        measurements: Optional[Dict[str, Sequence[devices.GridQubit]]] = None,
+) -> List[TrialResult]:
+    """Converts a Result proto into TrialResults.
+
+    Args:
+        msg: The Result proto.
+        measurements: The qubits measured by each measurement key, in the
+            order of the columns of the results. Defaults to the order of the
+            qubits in the proto.
+
+    Returns:
+        One TrialResult for each point of each parameter sweep, in order.
+
+    Raises:
+        ValueError: The results of a measurement don't match the qubits it
+            was expected to measure.
+    """
+    trial_results = []
+    for sweep_result in msg.sweep_results:
+        repetitions = sweep_result.repetitions
+        for result in sweep_result.parameterized_results:
+            trial_results.append(
+                TrialResult(
+                    params=ParamResolver(dict(result.params.assignments)),
+                    repetitions=repetitions,
+                    measurements={
+                        m.key: _measurement_from_proto(m, repetitions,
+                                                       measurements)
+                        for m in result.measurement_results
+                    }))
+    return trial_results
+
+
+def _measurement_from_proto(
+        msg: result_pb2.MeasurementResult, repetitions: int,
+        measurements: Optional[Dict[str, Sequence[devices.GridQubit]]]
+) -> np.ndarray:
+    by_id = {
+        r.qubit.id: _unpack_bits(r.results, repetitions)
+        for r in msg.qubit_measurement_results
+    }
+    if measurements is None:
+        ids = [r.qubit.id for r in msg.qubit_measurement_results]
+    else:
+        ids = [qubit_to_proto_id(q) for q in measurements[msg.key]]
+        if sorted(ids) != sorted(by_id):
+            raise ValueError(
+                'Results for key {!r} are for qubits {}, not {}.'.format(
+                    msg.key, sorted(by_id), ids))
+    if not ids:
+        return np.zeros((repetitions, 0), dtype=bool)
+    return np.stack([by_id[i] for i in ids], axis=1)
+
+
+def _unpack_bits(data: bytes, repetitions: int) -> np.ndarray:
+    # The first bit is the least significant bit of the first byte.
+    bits = np.unpackbits(np.frombuffer(data, dtype=np.uint8))
+    return bits.reshape((-1, 8))[:, ::-1].reshape(-1)[:repetitions].astype(bool)
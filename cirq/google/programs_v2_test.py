@@ -0,0 +1,340 @@
+# Copyright 2019 The Cirq Developers
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     https://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import numpy as np
+import pytest
+import sympy
+
+import cirq
+import cirq.google as cg
+from cirq.api.google.v2 import result_pb2
+from cirq.google import programs_v2
+from cirq.schedules import moment_by_moment_schedule
+
+
+def _pack_bits(bits):
+    # The first bit is the least significant bit of the first byte.
+    return np.packbits(
+        np.reshape(np.pad(bits, (0, -len(bits) % 8), 'constant'),
+                   (-1, 8))[:, ::-1]).tobytes()
+
+
+def test_qubit_to_proto_id():
+    assert programs_v2.qubit_to_proto_id(cirq.GridQubit(2, 3)) == '2_3'
+
+
+def test_schedule_to_proto():
+    q0, q1 = cirq.GridQubit(1, 1), cirq.GridQubit(1, 2)
+    circuit = cirq.Circuit.from_ops(
+        cirq.X(q0)**0.5,
+        cirq.Y(q1)**sympy.Symbol('t'),
+        cirq.PhasedXPowGate(phase_exponent=0.25)(q0),
+        cirq.CZ(q0, q1),
+        cirq.Z(q1)**0.25,
+        cirq.measure(q0, q1, key='m', invert_mask=(True,)),
+    )
+    schedule = moment_by_moment_schedule(cg.Foxtail, circuit)
+    msg = programs_v2.schedule_to_proto(schedule)
+    assert msg.language.gate_set == cg.gate_sets.XMON
+
+    scheduled = msg.schedule.scheduled_operations
+    assert [s.start_time_picos for s in scheduled
+           ] == [so.time.raw_picos() for so in schedule.scheduled_operations]
+    assert len(scheduled) == 6
+    by_gate = [(s.operation.gate.id, [q.id
+                                      for q in s.operation.qubits],
+                [a.symbol or a.arg_value.float_value
+                 for a in s.operation.args], list(s.operation.keys))
+               for s in scheduled]
+    assert ('exp_w', ['1_1'], [0, 0.5], []) in by_gate
+    assert ('exp_w', ['1_2'], [0.5, 't'], []) in by_gate
+    assert ('exp_w', ['1_1'], [0.25, 1], []) in by_gate
+    assert ('exp_11', ['1_1', '1_2'], [1], []) in by_gate
+    assert ('exp_z', ['1_2'], [0.25], []) in by_gate
+    assert ('meas', ['1_1', '1_2'], [1, 0], ['m']) in by_gate
+
+
+def test_schedule_to_proto_measurement_without_inversion():
+    q = cirq.GridQubit(0, 0)
+    schedule = moment_by_moment_schedule(
+        cg.Foxtail, cirq.Circuit.from_ops(cirq.measure(q, key='a')))
+    op = programs_v2.schedule_to_proto(
+        schedule).schedule.scheduled_operations[0].operation
+    assert op.gate.id == 'meas'
+    assert list(op.keys) == ['a']
+    assert not op.args
+
+
+def test_schedule_to_proto_unsupported_gate():
+    q0, q1 = cirq.GridQubit(0, 0), cirq.GridQubit(0, 1)
+    schedule = cirq.Schedule(cirq.UnconstrainedDevice, [
+        cirq.ScheduledOperation.op_at_on(cirq.SWAP(q0, q1), cirq.Timestamp(),
+                                         cirq.UnconstrainedDevice)
+    ])
+    with pytest.raises(ValueError, match='serialize'):
+        programs_v2.schedule_to_proto(schedule)
+
+
+def test_circuit_to_proto_symbolic_args():
+    q = cirq.GridQubit(0, 0)
+    msg = programs_v2.circuit_to_proto(
+        cirq.Circuit.from_ops(
+            cirq.Z(q)**sympy.Symbol('a'),
+            cirq.Z(q)**(sympy.Integer(1) / 2)))
+    args = [m.operations[0].args[0] for m in msg.circuit.moments]
+    assert args[0].symbol == 'a'
+    assert args[1].arg_value.float_value == 0.5
+
+    with pytest.raises(ValueError, match='Only plain symbols'):
+        programs_v2.circuit_to_proto(
+            cirq.Circuit.from_ops(cirq.Z(q)**(2 * sympy.Symbol('a'))))
+
+
+def test_find_measurements():
+    q0, q1 = cirq.GridQubit(0, 0), cirq.GridQubit(0, 1)
+    circuit = cirq.Circuit.from_ops(
+        cirq.X(q0),
+        cirq.measure(q1, q0, key='a'),
+        cirq.measure(q0, key='b'),
+    )
+    schedule = moment_by_moment_schedule(cg.Foxtail, circuit)
+    assert programs_v2.find_measurements(schedule) == {'a': [q1, q0], 'b': [q0]}
+
+    circuit.append(cirq.measure(q1, key='a'))
+    schedule = moment_by_moment_schedule(cg.Foxtail, circuit)
+    with pytest.raises(ValueError, match='Duplicate'):
+        programs_v2.find_measurements(schedule)
+
+
+def _result_proto():
+    msg = result_pb2.Result()
+    for repetitions, values in [(3, [0.5]), (10, [1.0, 2.0])]:
+        sweep_result = msg.sweep_results.add(repetitions=repetitions)
+        for i, value in enumerate(values):
+            result = sweep_result.parameterized_results.add()
+            result.params.assignments['t'] = value
+            measurement = result.measurement_results.add(key='m')
+            for j, qubit_id in enumerate(['0_0', '0_1']):
+                bits = [(k + i + j) % 2 for k in range(repetitions)]
+                qubit_result = measurement.qubit_measurement_results.add()
+                qubit_result.qubit.id = qubit_id
+                qubit_result.results = _pack_bits(bits)
+    return msg
+
+
+def test_results_from_proto():
+    results = programs_v2.results_from_proto(_result_proto())
+    assert [r.params.param_dict for r in results] == [{
+        't': 0.5
+    }, {
+        't': 1.0
+    }, {
+        't': 2.0
+    }]
+    assert [r.repetitions for r in results] == [3, 10, 10]
+    np.testing.assert_equal(results[0].measurements['m'],
+                            [[0, 1], [1, 0], [0, 1]])
+    expected = np.array(
+        [[(k + 1 + j) % 2 for j in range(2)] for k in range(10)], dtype=bool)
+    np.testing.assert_equal(results[2].measurements['m'], expected)
+    assert results[2].measurements['m'].dtype == bool
+
+
+def test_results_from_proto_qubit_order():
+    q0, q1 = cirq.GridQubit(0, 0), cirq.GridQubit(0, 1)
+    results = programs_v2.results_from_proto(_result_proto(), {'m': [q1, q0]})
+    np.testing.assert_equal(results[0].measurements['m'],
+                            [[1, 0], [0, 1], [1, 0]])
+
+    with pytest.raises(ValueError, match='qubits'):
+        programs_v2.results_from_proto(_result_proto(),
+                                       {'m': [q0, cirq.GridQubit(1, 1)]})
+
+
+def test_results_from_proto_empty_measurement():
+    msg = result_pb2.Result()
+    sweep_result = msg.sweep_results.add(repetitions=4)
+    sweep_result.parameterized_results.add().measurement_results.add(key='m')
+    results = programs_v2.results_from_proto(msg)
+    assert results[0].measurements['m'].shape == (4, 0)
+
+
+def test_qubit_from_proto_id():
+    assert programs_v2.qubit_from_proto_id('2_3') == cirq.GridQubit(2, 3)
+    assert programs_v2.qubit_from_proto_id('-1_0') == cirq.GridQubit(-1, 0)
+    for bad in ['2', '2_3_4', 'a_b', '']:
+        with pytest.raises(ValueError, match='Invalid qubit id'):
+            programs_v2.qubit_from_proto_id(bad)
+
+
+def _xmon_circuit():
+    q0, q1 = cirq.GridQubit(1, 1), cirq.GridQubit(1, 2)
+    return cirq.Circuit([
+        cirq.Moment([cirq.X(q0)**0.5,
+                     cirq.Y(q1)**sympy.Symbol('t')]),
+        cirq.Moment(),
+        cirq.Moment([cirq.PhasedXPowGate(phase_exponent=0.25)(q1)]),
+        cirq.Moment([cirq.CZ(q0, q1)**0.5]),
+        cirq.Moment([cirq.Z(q1)**0.25]),
+        cirq.Moment([cirq.measure(q0, q1, key='m', invert_mask=(True, False))]),
+    ])
+
+
+def test_circuit_proto_round_trip():
+    circuit = _xmon_circuit()
+    msg = programs_v2.circuit_to_proto(circuit)
+    assert msg.language.gate_set == cg.gate_sets.XMON
+    assert msg.WhichOneof('program') == 'circuit'
+    assert len(msg.circuit.moments) == 6
+    cirq.testing.assert_same_circuits(programs_v2.circuit_from_proto(msg),
+                                      circuit)
+
+    decoded = programs_v2.circuit_from_proto(msg, device=cg.Foxtail)
+    assert decoded.device == cg.Foxtail
+
+    empty = programs_v2.circuit_to_proto(cirq.Circuit())
+    assert empty.WhichOneof('program') == 'circuit'
+    assert programs_v2.circuit_from_proto(empty) == cirq.Circuit()
+
+
+def test_schedule_proto_round_trip():
+    schedule = moment_by_moment_schedule(cg.Foxtail, _xmon_circuit())
+    msg = programs_v2.schedule_to_proto(schedule)
+    assert programs_v2.schedule_from_proto(msg, cg.Foxtail) == schedule
+
+
+def test_program_from_proto_wrong_contents():
+    circuit_msg = programs_v2.circuit_to_proto(_xmon_circuit())
+    with pytest.raises(ValueError, match='does not contain a schedule'):
+        programs_v2.schedule_from_proto(circuit_msg, cg.Foxtail)
+    schedule_msg = programs_v2.schedule_to_proto(
+        moment_by_moment_schedule(cg.Foxtail, _xmon_circuit()))
+    with pytest.raises(ValueError, match='does not contain a circuit'):
+        programs_v2.circuit_from_proto(schedule_msg)
+
+    circuit_msg.language.gate_set = 'other'
+    with pytest.raises(ValueError, match='Unsupported gate set'):
+        programs_v2.circuit_from_proto(circuit_msg)
+
+
+def _circuit_proto_with_operation(gate_id, args=(), qubits=('0_0',), keys=()):
+    msg = programs_v2.circuit_to_proto(cirq.Circuit())
+    op = msg.circuit.moments.add().operations.add()
+    op.gate.id = gate_id
+    for arg in args:
+        if isinstance(arg, str):
+            op.args.add().symbol = arg
+        elif isinstance(arg, bytes):
+            op.args.add().arg_value.bytes_value = arg
+        else:
+            op.args.add().arg_value.float_value = arg
+    for qubit_id in qubits:
+        op.qubits.add().id = qubit_id
+    op.keys.extend(keys)
+    return msg
+
+
+def test_operation_from_proto():
+    q0, q1 = cirq.GridQubit(0, 0), cirq.GridQubit(0, 1)
+    decode = programs_v2.circuit_from_proto
+    assert decode(_circuit_proto_with_operation(
+        'exp_z', ['a']))[0].operations == (cirq.Z(q0)**sympy.Symbol('a'),)
+    assert decode(_circuit_proto_with_operation(
+        'exp_11', [0.5], ['0_0', '0_1']))[0].operations == (cirq.CZ(q0,
+                                                                    q1)**0.5,)
+    assert decode(_circuit_proto_with_operation(
+        'meas', [], ['0_0'], ['k']))[0].operations == (cirq.measure(q0,
+                                                                    key='k'),)
+
+
+@pytest.mark.parametrize('msg,match', [
+    (_circuit_proto_with_operation('exp_foo'), 'Unsupported gate id'),
+    (_circuit_proto_with_operation('exp_w', [0.5]), 'expects 2 args'),
+    (_circuit_proto_with_operation('exp_z', [b'x']), 'Unsupported arg'),
+    (_circuit_proto_with_operation('meas', [], ['0_0']), 'Invalid measurement'),
+    (_circuit_proto_with_operation('meas', [1], ['0_0', '0_1'],
+                                   ['k']), 'Invalid measurement'),
+])
+def test_operation_from_proto_invalid(msg, match):
+    with pytest.raises(ValueError, match=match):
+        programs_v2.circuit_from_proto(msg)
+
+
+def _trial_result(params, bits):
+    bits = np.array(bits, dtype=bool)
+    return cirq.TrialResult(params=cirq.ParamResolver(params),
+                            repetitions=bits.shape[0],
+                            measurements={'m': bits})
+
+
+def test_results_to_proto_packs_bits():
+    bits = [[k % 2, (k + 1) % 2] for k in range(10)]
+    msg = programs_v2.results_to_proto(
+        [[_trial_result({'t': 1.0}, bits)]],
+        {'m': [cirq.GridQubit(0, 0), cirq.GridQubit(0, 1)]})
+    assert msg.sweep_results[0].repetitions == 10
+    result = msg.sweep_results[0].parameterized_results[0]
+    assert dict(result.params.assignments) == {'t': 1.0}
+    qubit_results = result.measurement_results[0].qubit_measurement_results
+    assert [r.qubit.id for r in qubit_results] == ['0_0', '0_1']
+    assert [r.results for r in qubit_results] == [
+        _pack_bits([k % 2 for k in range(10)]),
+        _pack_bits([(k + 1) % 2 for k in range(10)]),
+    ]
+    assert qubit_results[0].results == b'\xaa\x02'
+
+
+def test_results_proto_round_trip():
+    q0, q1, q2 = [
+        cirq.GridQubit(0, 0),
+        cirq.GridQubit(0, 1),
+        cirq.GridQubit(1, 1)
+    ]
+    measurements = {'m': [q2, q0, q1]}
+    prng = np.random.RandomState(1234)
+    trial_sweeps = [
+        [_trial_result({'a': 0.5}, prng.randint(2, size=(17, 3)))],
+        [
+            _trial_result({
+                'a': 1.0,
+                'b': 2.0
+            }, prng.randint(2, size=(8, 3))),
+            _trial_result({
+                'a': 3.0,
+                'b': 4.0
+            }, prng.randint(2, size=(8, 3))),
+        ],
+    ]
+    msg = programs_v2.results_to_proto(trial_sweeps, measurements)
+    results = programs_v2.results_from_proto(msg, measurements)
+    expected = [r for trial_sweep in trial_sweeps for r in trial_sweep]
+    assert len(results) == len(expected)
+    for result, original in zip(results, expected):
+        assert result.params == original.params
+        assert result.repetitions == original.repetitions
+        np.testing.assert_equal(result.measurements, original.measurements)
+
+
+def test_results_to_proto_invalid():
+    q0, q1 = cirq.GridQubit(0, 0), cirq.GridQubit(0, 1)
+    with pytest.raises(ValueError, match='No results'):
+        programs_v2.results_to_proto([[_trial_result({}, [[0]])]],
+                                     {'other': [q0]})
+    with pytest.raises(ValueError, match='shape'):
+        programs_v2.results_to_proto([[_trial_result({}, [[0]])]],
+                                     {'m': [q0, q1]})
+    with pytest.raises(ValueError, match='repetitions'):
+        programs_v2.results_to_proto(
+            [[_trial_result({}, [[0]]),
+              _trial_result({}, [[0], [1]])]], {'m': [q0]})
@@ -27,10 +27,13 @@ from cirq.linalg.combinators import (
 )
 
 from cirq.linalg.decompositions import (
+    batch_deconstruct_single_qubit_matrix_into_angles,
+    batch_kak_decomposition,
     deconstruct_single_qubit_matrix_into_angles,
     kak_canonicalize_vector,
     kak_decomposition,
     KakDecomposition,
+    KakDecompositionBatch,
     kron_factor_4x4_to_2x2s,
     map_eigenvalues,
     so4_to_magic_su2s,
@@ -74,6 +74,56 @@ def deconstruct_single_qubit_matrix_into_angles(
     return right_phase + diagonal_phase, rotation * 2, bottom_phase
 
 
+def batch_deconstruct_single_qubit_matrix_into_angles(mats: np.ndarray
+                                                     ) -> np.ndarray:
+    """Breaks down a stack of 2x2 unitaries into ZYZ angle parameters.
+
+    Vectorized `cirq.linalg.deconstruct_single_qubit_matrix_into_angles`.
+
+    Args:
+        mats: An array of shape (N, 2, 2) holding the unitary matrices to
+            break down.
+
+    Returns:
+        An array of shape (N, 3). Row n contains the amount to phase around Z,
+        then rotate around Y, then phase around Z (all in radians) for
+        mats[n].
+
+    Raises:
+        ValueError: Bad matrices.
+    """
+    mats = np.asarray(mats, dtype=np.complex128)
+    if mats.ndim != 3 or mats.shape[1:] != (2, 2):
+        raise ValueError('mats must have shape (N, 2, 2), not {}.'.format(
+            mats.shape))
+
+    # The same steps as deconstruct_single_qubit_matrix_into_angles.
+    right_phase = np.angle(mats[:, 0, 1] * np.conj(mats[:, 0, 0])) + math.pi
+    mats = np.matmul(mats, _batch_phase_matrices(-right_phase))
+
+    bottom_phase = np.angle(mats[:, 1, 0] * np.conj(mats[:, 0, 0]))
+    mats = np.matmul(_batch_phase_matrices(-bottom_phase), mats)
+
+    rotation = np.arctan2(np.abs(mats[:, 1, 0]), np.abs(mats[:, 0, 0]))
+    c, s = np.cos(-rotation), np.sin(-rotation)
+    mats = np.matmul(
+        np.stack([np.stack([c, -s], axis=-1),
+                  np.stack([s, c], axis=-1)],
+                 axis=-2), mats)
+
+    diagonal_phase = np.angle(mats[:, 1, 1] * np.conj(mats[:, 0, 0]))
+
+    return np.stack([right_phase + diagonal_phase, rotation * 2, bottom_phase],
+                    axis=-1)
+
+
+def _batch_phase_matrices(angles: np.ndarray) -> np.ndarray:
+    result = np.zeros((len(angles), 2, 2), dtype=np.complex128)
+    result[:, 0, 0] = 1
+    result[:, 1, 1] = np.exp(1j * angles)
+    return result
+
+
 def _group_similar(items: List[T],
                    comparer: Callable[[T, T], bool]) -> List[List[T]]:
     """Combines similar items into groups.
@@ -535,3 +585,267 @@ def kak_decomposition(
         global_phase=g * inner_cannon.global_phase,
         single_qubit_operations_before=(b1, b0),
         single_qubit_operations_after=(a1, a0))
+
+
+class KakDecompositionBatch:
+    """The KAK decompositions of a stack of two-qubit operations.
+
+    Entry n describes the n'th operation U_n as
+
+        U_n = g_n · (a1_n ⊗ a0_n) · exp(i·(x_n·XX + y_n·YY + z_n·ZZ))
+              · (b1_n ⊗ b0_n)
+
+    in the same way as a `cirq.KakDecomposition`, with the values for all the
+    operations stored together in arrays.
+
+    Attributes:
+        global_phases: An array of shape (N,) holding each g.
+        single_qubit_operations_before: An array of shape (N, 2, 2, 2)
+            holding each (b1, b0).
+        interaction_coefficients: An array of shape (N, 3) holding each
+            (x, y, z).
+        single_qubit_operations_after: An array of shape (N, 2, 2, 2)
+            holding each (a1, a0).
+    """
+
+    def __init__(self, *, global_phases: np.ndarray,
+                 single_qubit_operations_before: np.ndarray,
+                 interaction_coefficients: np.ndarray,
+                 single_qubit_operations_after: np.ndarray) -> None:
+        self.global_phases = global_phases
+        self.single_qubit_operations_before = single_qubit_operations_before
+        self.interaction_coefficients = interaction_coefficients
+        self.single_qubit_operations_after = single_qubit_operations_after
+
+    def __len__(self):
+        return len(self.global_phases)
+
+    def __getitem__(self, index: int) -> KakDecomposition:
+        b1, b0 = self.single_qubit_operations_before[index]
+        a1, a0 = self.single_qubit_operations_after[index]
+        x, y, z = self.interaction_coefficients[index]
+        return KakDecomposition(global_phase=complex(self.global_phases[index]),
+                                single_qubit_operations_before=(b1, b0),
+                                interaction_coefficients=(float(x), float(y),
+                                                          float(z)),
+                                single_qubit_operations_after=(a1, a0))
+
+    def __repr__(self):
+        return ('cirq.KakDecompositionBatch(\n'
+                '    interaction_coefficients={},\n'
+                '    single_qubit_operations_before={},\n'
+                '    single_qubit_operations_after={},\n'
+                '    global_phases={})').format(
+                    proper_repr(self.interaction_coefficients),
+                    proper_repr(self.single_qubit_operations_before),
+                    proper_repr(self.single_qubit_operations_after),
+                    proper_repr(self.global_phases))
+
+    def unitaries(self) -> np.ndarray:
+        """Returns the (N, 4, 4) array of the decomposed unitary matrices."""
+        x, y, z = np.transpose(self.interaction_coefficients)
+        phases = np.stack([x - y + z, x + y - z, -x - y - z, -x + y + z],
+                          axis=-1)
+        interactions = np.einsum('ij,nj,jk->nik', MAGIC, np.exp(1j * phases),
+                                 MAGIC_CONJ_T)
+        return self.global_phases[:, np.newaxis, np.newaxis] * np.matmul(
+            _batch_kron(self.single_qubit_operations_after),
+            np.matmul(interactions,
+                      _batch_kron(self.single_qubit_operations_before)))
+
+
+def batch_kak_decomposition(mats: np.ndarray,
+                            rtol: float = 1e-5,
+                            atol: float = 1e-8) -> KakDecompositionBatch:
+    """Decomposes a stack of 2-qubit unitaries, like `cirq.kak_decomposition`.
+
+    Most of the matrices are decomposed together using vectorized numpy
+    operations, which is much faster than decomposing them one at a time. The
+    few that this fails for (e.g. when two eigenvalues are very close but not
+    equal) are decomposed individually with `cirq.kak_decomposition`.
+
+    Args:
+        mats: An array of shape (N, 4, 4) holding the unitary matrices to
+            decompose.
+        rtol: Per-matrix-entry relative tolerance on equality.
+        atol: Per-matrix-entry absolute tolerance on equality.
+
+    Returns:
+        A `cirq.KakDecompositionBatch` whose n'th entry is a decomposition of
+        mats[n], canonicalized in the same way as the result of
+        `cirq.kak_decomposition`.
+
+    Raises:
+        ValueError: Bad matrices.
+        ArithmeticError: Failed to perform a decomposition.
+    """
+    mats = np.asarray(mats, dtype=np.complex128)
+    if mats.ndim != 3 or mats.shape[1:] != (4, 4):
+        raise ValueError('mats must have shape (N, 4, 4), not {}.'.format(
+            mats.shape))
+    n = len(mats)
+
+    # Diagonalize in magic basis. B.T @ B is symmetric and unitary, so its real
+    # and imaginary parts commute and are diagonalized by the same real
+    # orthogonal matrix R. Then B @ R = Q @ D for a real orthogonal Q and a
+    # diagonal D.
+    b = np.matmul(np.matmul(MAGIC_CONJ_T, mats), MAGIC)
+    btb = np.matmul(np.swapaxes(b, 1, 2), b)
+    # Diagonalizing a generic real combination of the parts diagonalizes both,
+    # unless the combination happens to merge two different eigenvalues.
+    # Those matrices are caught by the verification below.
+    _, right = np.linalg.eigh(btb.real + _EIGENSPACE_SEPARATOR * btb.imag)
+    right[np.linalg.det(right) < 0, :, 0] *= -1
+    d = np.sqrt(np.einsum('nji,njk,nki->ni', right, btb, right))
+    left_t = np.matmul(b, right) / d[:, np.newaxis, :]
+    flip = np.linalg.det(left_t).real < 0
+    left_t[flip, :, 0] *= -1
+    d[flip, 0] *= -1
+    left_t = left_t.real
+
+    # Recover pieces.
+    a1, a0 = _batch_so4_to_magic_su2s(left_t)
+    b1, b0 = _batch_so4_to_magic_su2s(np.swapaxes(right, 1, 2))
+    w, x, y, z = np.dot(_KAK_GAMMA, np.angle(d).T)
+
+    # Canonicalize.
+    phases, before, coefficients, after = _batch_kak_canonicalize_vectors(
+        x, y, z)
+    result = KakDecompositionBatch(
+        global_phases=np.exp(1j * w) * phases,
+        single_qubit_operations_before=np.matmul(before,
+                                                 np.stack([b1, b0], axis=1)),
+        interaction_coefficients=coefficients,
+        single_qubit_operations_after=np.matmul(np.stack([a1, a0], axis=1),
+                                                after))
+
+    # Fall back to decomposing the matrices the vectorized method failed for
+    # one at a time.
+    errors = np.abs(result.unitaries() - mats) - rtol * np.abs(mats)
+    for i in np.flatnonzero(np.any(errors.reshape((n, 16)) > atol, axis=1)):
+        kak = kak_decomposition(mats[i], rtol=rtol, atol=atol)
+        result.global_phases[i] = kak.global_phase
+        result.single_qubit_operations_before[i] = (
+            kak.single_qubit_operations_before)
+        result.interaction_coefficients[i] = kak.interaction_coefficients
+        result.single_qubit_operations_after[i] = (
+            kak.single_qubit_operations_after)
+    return result
+
+
+# An arbitrary irrational-looking weight for the imaginary part of B.T @ B.
+_EIGENSPACE_SEPARATOR = 0.5773502691896258 * np.e
+
+_KAK_GAMMA = np.array([[1, 1, 1, 1], [1, 1, -1, -1], [-1, 1, -1, 1],
+                       [1, -1, -1, 1]]) * 0.25
+
+# Special-unitary matrices that flip the X, Y, and Z axes respectively, and
+# that swap the other two axes than X, Y, and Z respectively. See
+# kak_canonicalize_vector.
+_FLIPPERS = np.array([
+    [[0, 1j], [1j, 0]],
+    [[0, 1], [-1, 0]],
+    [[1j, 0], [0, -1j]],
+])
+_SWAPPERS = np.array([
+    np.array([[1, -1j], [1j, -1]]) * 1j * np.sqrt(0.5),
+    np.array([[1, 1], [1, -1]]) * 1j * np.sqrt(0.5),
+    np.array([[0, 1 - 1j], [1 + 1j, 0]]) * 1j * np.sqrt(0.5),
+])
+
+
+def _batch_kron(pairs: np.ndarray) -> np.ndarray:
+    """Returns kron(a, b) for each (a, b) in an (N, 2, 2, 2) array."""
+    return np.einsum('nij,nkl->nikjl', pairs[:, 0], pairs[:, 1]).reshape(
+        (-1, 4, 4))
+
+
+def _batch_so4_to_magic_su2s(mats: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Vectorized `so4_to_magic_su2s` for an (N, 4, 4) array."""
+    ab = np.matmul(np.matmul(MAGIC, mats), MAGIC_CONJ_T)
+    n = len(ab)
+    rows = np.arange(n)
+
+    # Rearranged so that entry [(i, j), (k, l)] is A[i, j] * B[k, l].
+    outer = ab.reshape((n, 2, 2, 2, 2)).transpose((0, 1, 3, 2, 4)).reshape(
+        (n, 4, 4))
+    # Use the entry with the largest magnitude as a reference point.
+    ref = np.argmax(np.abs(outer).reshape((n, 16)), axis=1)
+    a_index, b_index = ref // 4, ref % 4
+    a = outer[rows, :, b_index].reshape((n, 2, 2))
+    b = outer[rows, a_index, :].reshape((n, 2, 2))
+
+    # Rescale factors to have unit determinants.
+    a /= np.sqrt(np.linalg.det(a))[:, np.newaxis, np.newaxis]
+    b /= np.sqrt(np.linalg.det(b))[:, np.newaxis, np.newaxis]
+
+    # Fix the sign shared between the factors.
+    g = outer[rows, a_index, b_index] / (a.reshape(
+        (n, 4))[rows, a_index] * b.reshape((n, 4))[rows, b_index])
+    a[np.real(g) < 0] *= -1
+    return a, b
+
+
+def _batch_kak_canonicalize_vectors(
+        x: np.ndarray, y: np.ndarray,
+        z: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """Vectorized `kak_canonicalize_vector`.
+
+    Returns:
+        The global phases, the (N, 2, 2, 2) single-qubit operations before
+        and after, and the (N, 3) canonical interaction coefficients.
+    """
+    n = len(x)
+    phase = np.ones(n, dtype=np.complex128)
+    # Per-qubit left and right factors, indexed like the factors of
+    # kak_canonicalize_vector.
+    left = np.tile(np.eye(2, dtype=np.complex128), (n, 2, 1, 1))
+    right = np.tile(np.eye(2, dtype=np.complex128), (n, 2, 1, 1))
+    v = np.stack([x, y, z], axis=1)
+
+    def shift(k, step, mask):
+        v[mask, k] += step * np.pi / 2
+        phase[mask] *= 1j**step
+        right[mask] = np.matmul(_FLIPPERS[k]**(step % 4), right[mask])
+
+    def negate(k1, k2, mask):
+        v[mask, k1] *= -1
+        v[mask, k2] *= -1
+        phase[mask] *= -1
+        s = _FLIPPERS[3 - k1 - k2]
+        left[mask, 1] = np.matmul(left[mask, 1], s)
+        right[mask, 1] = np.matmul(s, right[mask, 1])
+
+    def swap(k1, k2, mask):
+        v[mask, k1], v[mask, k2] = v[mask, k2], v[mask, k1]
+        s = _SWAPPERS[3 - k1 - k2]
+        left[mask] = np.matmul(left[mask], s)
+        right[mask] = np.matmul(s, right[mask])
+
+    def canonical_shift(k):
+        while True:
+            mask = v[:, k] <= -np.pi / 4
+            if not np.any(mask):
+                break
+            shift(k, +1, mask)
+        while True:
+            mask = v[:, k] > np.pi / 4
+            if not np.any(mask):
+                break
+            shift(k, -1, mask)
+
+    def sort():
+        swap(0, 1, np.abs(v[:, 0]) < np.abs(v[:, 1]))
+        swap(1, 2, np.abs(v[:, 1]) < np.abs(v[:, 2]))
+        swap(0, 1, np.abs(v[:, 0]) < np.abs(v[:, 1]))
+
+    canonical_shift(0)
+    canonical_shift(1)
+    canonical_shift(2)
+    sort()
+
+    negate(0, 2, v[:, 0] < 0)
+    negate(1, 2, v[:, 1] < 0)
+    canonical_shift(2)
+
+    return phase, right[:, ::-1], v, left[:, ::-1]
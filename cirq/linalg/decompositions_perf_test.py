@@ -18,3 +18,38 @@ from .decompositions_test import SWAP, CNOT, CZ
 def test_kak_decomposition_perf(target, benchmark):
     kak = benchmark(cirq.kak_decomposition, target)
     np.testing.assert_allclose(cirq.unitary(kak), target, atol=1e-8)
+
+
+@pytest.mark.parametrize('cached', [False, True])
+def test_two_qubit_matrix_to_operations_perf(cached, benchmark):
+    a, b = cirq.LineQubit.range(2)
+    # A circuit's two-qubit blocks tend to repeat a few unitaries.
+    targets = [CNOT, CZ, SWAP.dot(CZ)
+              ] + [cirq.testing.random_unitary(4) for _ in range(3)]
+    cache = cirq.TwoQubitDecompositionCache()
+    decompose = (cache.two_qubit_matrix_to_operations
+                 if cached else cirq.two_qubit_matrix_to_operations)
+
+    def decompose_all():
+        return [decompose(a, b, target, True) for target in targets * 10]
+
+    results = benchmark(decompose_all)
+    for target, operations in zip(targets, results):
+        cirq.testing.assert_allclose_up_to_global_phase(
+            cirq.Circuit.from_ops(operations).to_unitary_matrix(
+                qubit_order=[a, b], qubits_that_should_be_present=[a, b]),
+            target,
+            atol=1e-6)
+
+
+@pytest.mark.parametrize('batched', [False, True])
+def test_batch_kak_decomposition_perf(batched, benchmark):
+    targets = np.array([cirq.testing.random_unitary(4) for _ in range(1000)])
+
+    def decompose_all():
+        if batched:
+            return cirq.batch_kak_decomposition(targets).unitaries()
+        return [cirq.unitary(cirq.kak_decomposition(t)) for t in targets]
+
+    unitaries = benchmark(decompose_all)
+    np.testing.assert_allclose(unitaries, targets, atol=1e-8)
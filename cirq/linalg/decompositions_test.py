@@ -304,3 +304,78 @@ cirq.KakDecomposition(
     ),
     global_phase=1)
 """.strip()
+
+
+def test_batch_kak_decomposition_matches_kak_decomposition():
+    np.random.seed(0)
+    targets = np.array([
+        np.eye(4),
+        SWAP,
+        SWAP * 1j,
+        CZ,
+        CNOT,
+        SWAP.dot(CZ),
+        cirq.unitary(cirq.ISWAP**0.5),
+        np.kron(H, SQRT_X / np.sqrt(2j)),
+    ] + [cirq.testing.random_unitary(4) for _ in range(20)])
+
+    batch = cirq.batch_kak_decomposition(targets)
+    assert len(batch) == len(targets)
+    assert batch.interaction_coefficients.shape == (len(targets), 3)
+    assert batch.single_qubit_operations_before.shape == (len(targets), 2, 2, 2)
+    np.testing.assert_allclose(batch.unitaries(), targets, atol=1e-8)
+    for target, kak in zip(targets, (batch[i] for i in range(len(batch)))):
+        assert isinstance(kak, cirq.KakDecomposition)
+        np.testing.assert_allclose(cirq.unitary(kak), target, atol=1e-8)
+        np.testing.assert_allclose(
+            kak.interaction_coefficients,
+            cirq.kak_decomposition(target).interaction_coefficients,
+            atol=1e-8)
+
+
+def test_batch_kak_decomposition_falls_back(monkeypatch):
+    # Without separating the eigenspaces using the imaginary part, matrices
+    # with only an XX interaction can't be diagonalized.
+    monkeypatch.setattr(cirq.linalg.decompositions, '_EIGENSPACE_SEPARATOR', 0)
+    xx = cirq.unitary(cirq.XX**0.3)
+    targets = [
+        xx.dot(np.kron(a, b)) for a, b in [(H, SQRT_SQRT_X), (X, SQRT_X)]
+    ]
+    targets = np.array([m / np.linalg.det(m)**0.25 for m in targets])
+    batch = cirq.batch_kak_decomposition(targets)
+    np.testing.assert_allclose(batch.unitaries(), targets, atol=1e-8)
+    np.testing.assert_allclose(batch.interaction_coefficients[:, 0],
+                               [np.pi * 0.15] * 2,
+                               atol=1e-8)
+
+
+def test_batch_kak_decomposition_shapes():
+    assert len(cirq.batch_kak_decomposition(np.zeros((0, 4, 4)))) == 0
+    with pytest.raises(ValueError, match='shape'):
+        cirq.batch_kak_decomposition(np.eye(4))
+    with pytest.raises(ValueError, match='shape'):
+        cirq.batch_kak_decomposition(np.zeros((2, 2, 2)))
+    assert repr(cirq.batch_kak_decomposition(np.array([CZ]))).startswith(
+        'cirq.KakDecompositionBatch(\n    interaction_coefficients=np.array(')
+
+
+def test_batch_deconstruct_single_qubit_matrix_into_angles():
+    np.random.seed(0)
+    mats = [np.eye(2), X, H, SQRT_X, cirq.unitary(cirq.Z**0.25)]
+    mats += [cirq.testing.random_unitary(2) for _ in range(20)]
+    angles = cirq.linalg.batch_deconstruct_single_qubit_matrix_into_angles(
+        np.array(mats))
+    assert angles.shape == (len(mats), 3)
+    for mat, row in zip(mats, angles):
+        expected = cirq.linalg.deconstruct_single_qubit_matrix_into_angles(mat)
+        np.testing.assert_allclose(row, expected, atol=1e-8)
+
+    assert cirq.linalg.batch_deconstruct_single_qubit_matrix_into_angles(
+        np.zeros((0, 2, 2))).shape == (0, 3)
+
+
+@pytest.mark.parametrize('shape', [(2, 2), (3, 4, 4), (2, 2, 2, 2)])
+def test_batch_deconstruct_single_qubit_matrix_into_angles_bad_shape(shape):
+    with pytest.raises(ValueError, match='shape'):
+        cirq.linalg.batch_deconstruct_single_qubit_matrix_into_angles(
+            np.zeros(shape))
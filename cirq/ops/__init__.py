@@ -172,3 +172,8 @@ from cirq.ops.three_qubit_gates import (
     FREDKIN,
     TOFFOLI,
 )
+
+from cirq.ops.unitary_cache import (
+    UNITARY_CACHE,
+    UnitaryCache,
+)
@@ -38,7 +38,8 @@ import sympy
 
 from cirq import protocols, value
 from cirq._compat import proper_repr
-from cirq.ops import gate_features, eigen_gate, raw_types, gate_operation
+from cirq.ops import (gate_features, eigen_gate, raw_types, gate_operation,
+                      unitary_cache)
 
 from cirq.type_workarounds import NotImplementedType
 
@@ -46,6 +47,7 @@ from cirq.type_workarounds import NotImplementedType
 import cirq.ops.phased_x_gate
 
 
+@unitary_cache.cache_unitaries
 @value.value_equality
 class XPowGate(eigen_gate.EigenGate,
                gate_features.SingleQubitGate):
@@ -90,6 +92,9 @@ class XPowGate(eigen_gate.EigenGate,
             (1, np.array([[0.5, -0.5], [-0.5, 0.5]])),
         ]
 
+    def _eigen_shifts(self):
+        return [0, 1]
+
     def _pauli_expansion_(self) -> value.LinearDict[str]:
         if protocols.is_parameterized(self):
             return NotImplemented
@@ -162,6 +167,7 @@ class XPowGate(eigen_gate.EigenGate,
         ).format(proper_repr(self._exponent), self._global_shift)
 
 
+@unitary_cache.cache_unitaries
 @value.value_equality
 class YPowGate(eigen_gate.EigenGate,
                gate_features.SingleQubitGate):
@@ -193,6 +199,9 @@ class YPowGate(eigen_gate.EigenGate,
             (1, np.array([[0.5, 0.5j], [-0.5j, 0.5]])),
         ]
 
+    def _eigen_shifts(self):
+        return [0, 1]
+
     def _pauli_expansion_(self) -> value.LinearDict[str]:
         if protocols.is_parameterized(self):
             return NotImplemented
@@ -265,6 +274,7 @@ class YPowGate(eigen_gate.EigenGate,
         ).format(proper_repr(self._exponent), self._global_shift)
 
 
+@unitary_cache.cache_unitaries
 @value.value_equality
 class ZPowGate(eigen_gate.EigenGate,
                gate_features.SingleQubitGate):
@@ -307,6 +317,9 @@ class ZPowGate(eigen_gate.EigenGate,
             (1, np.diag([0, 1])),
         ]
 
+    def _eigen_shifts(self):
+        return [0, 1]
+
     def _pauli_expansion_(self) -> value.LinearDict[str]:
         if protocols.is_parameterized(self):
             return NotImplemented
@@ -581,6 +594,9 @@ class IdentityGate(raw_types.Gate):
     def _unitary_(self):
         return np.identity(2 ** self.num_qubits())
 
+    def _unitary_diagonal_(self):
+        return np.ones(2**self.num_qubits())
+
     def _apply_unitary_(
         self, args: protocols.ApplyUnitaryArgs) -> Optional[np.ndarray]:
         return args.target_tensor
@@ -608,6 +624,7 @@ class IdentityGate(raw_types.Gate):
         return self.num_qubits(),
 
 
+@unitary_cache.cache_unitaries
 class HPowGate(eigen_gate.EigenGate, gate_features.SingleQubitGate):
     """A Gate that performs a rotation around the X+Z axis of the Bloch sphere.
 
@@ -642,6 +659,9 @@ class HPowGate(eigen_gate.EigenGate, gate_features.SingleQubitGate):
 
         return [(0, component0), (1, component1)]
 
+    def _eigen_shifts(self):
+        return [0, 1]
+
     def _pauli_expansion_(self) -> value.LinearDict[str]:
         if protocols.is_parameterized(self):
             return NotImplemented
@@ -713,6 +733,7 @@ class HPowGate(eigen_gate.EigenGate, gate_features.SingleQubitGate):
         ).format(proper_repr(self._exponent), self._global_shift)
 
 
+@unitary_cache.cache_unitaries
 class CZPowGate(eigen_gate.EigenGate,
                 gate_features.TwoQubitGate,
                 gate_features.InterchangeableQubitsGate):
@@ -739,6 +760,9 @@ class CZPowGate(eigen_gate.EigenGate,
             (1, np.diag([0, 0, 0, 1])),
         ]
 
+    def _eigen_shifts(self):
+        return [0, 1]
+
     def _apply_unitary_(self, args: protocols.ApplyUnitaryArgs
                         ) -> Union[np.ndarray, NotImplementedType]:
         if protocols.is_parameterized(self):
@@ -811,6 +835,7 @@ def _rads_func_symbol(func_name: str,
     return '{}({}{})'.format(func_name, half_turns, unit)
 
 
+@unitary_cache.cache_unitaries
 class CNotPowGate(eigen_gate.EigenGate, gate_features.TwoQubitGate):
     """A gate that applies a controlled power of an X gate.
 
@@ -854,6 +879,9 @@ class CNotPowGate(eigen_gate.EigenGate, gate_features.TwoQubitGate):
                           [0, 0, -0.5, 0.5]])),
         ]
 
+    def _eigen_shifts(self):
+        return [0, 1]
+
     def _circuit_diagram_info_(self, args: protocols.CircuitDiagramInfoArgs
                                ) -> protocols.CircuitDiagramInfo:
         return protocols.CircuitDiagramInfo(
@@ -923,6 +951,7 @@ class CNotPowGate(eigen_gate.EigenGate, gate_features.TwoQubitGate):
                 args, kwargs))
 
 
+@unitary_cache.cache_unitaries
 class SwapPowGate(eigen_gate.EigenGate,
                   gate_features.TwoQubitGate,
                   gate_features.InterchangeableQubitsGate):
@@ -964,6 +993,9 @@ class SwapPowGate(eigen_gate.EigenGate,
                           [0,  0,    0,   0]])),
         ]
 
+    def _eigen_shifts(self):
+        return [0, 1]
+
     def _apply_unitary_(self, args: protocols.ApplyUnitaryArgs
                         ) -> Optional[np.ndarray]:
         if self._exponent != 1:
@@ -1026,6 +1058,7 @@ class SwapPowGate(eigen_gate.EigenGate,
         ).format(proper_repr(self._exponent), self._global_shift)
 
 
+@unitary_cache.cache_unitaries
 class ISwapPowGate(eigen_gate.EigenGate,
                    gate_features.InterchangeableQubitsGate,
                    gate_features.TwoQubitGate):
@@ -1065,6 +1098,9 @@ class ISwapPowGate(eigen_gate.EigenGate,
                              [0, 0, 0, 0]])),
         ]
 
+    def _eigen_shifts(self):
+        return [0, +0.5, -0.5]
+
     def _decompose_(self, qubits):
         a, b = qubits
 
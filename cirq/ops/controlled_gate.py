@@ -122,6 +122,14 @@ class ControlledGate(raw_types.Gate):
                     np.eye(pow(2, self.num_qubits())-sub_matrix.shape[0]),
                     sub_matrix)
 
+    def _unitary_diagonal_(self) -> Union[np.ndarray, NotImplementedType]:
+        sub_diagonal = protocols.unitary_diagonal(self.sub_gate, None)
+        if sub_diagonal is None:
+            return NotImplemented
+        return np.concatenate([
+            np.ones(pow(2, self.num_qubits()) - len(sub_diagonal)), sub_diagonal
+        ])
+
     def __pow__(self, exponent: Any) -> 'ControlledGate':
         new_sub_gate = protocols.pow(self.sub_gate,
                                      exponent,
@@ -98,6 +98,14 @@ class ControlledOperation(raw_types.Operation):
                     np.eye(pow(2, len(self.qubits))-sub_matrix.shape[0]),
                     sub_matrix)
 
+    def _unitary_diagonal_(self) -> Union[np.ndarray, NotImplementedType]:
+        sub_diagonal = protocols.unitary_diagonal(self.sub_operation, None)
+        if sub_diagonal is None:
+            return NotImplemented
+        return np.concatenate([
+            np.ones(pow(2, len(self.qubits)) - len(sub_diagonal)), sub_diagonal
+        ])
+
     def __str__(self):
         if isinstance(self.sub_operation, gate_operation.GateOperation):
             return '{}{}({})'.format(
@@ -22,7 +22,7 @@ import numpy as np
 import sympy
 
 from cirq import value, protocols
-from cirq.ops import raw_types
+from cirq.ops import raw_types, unitary_cache
 from cirq.type_workarounds import NotImplementedType
 
 
@@ -103,6 +103,8 @@ class EigenGate(raw_types.Gate):
         self._exponent = exponent
         self._global_shift = global_shift
         self._canonical_exponent_cached = None
+        self._diagonal_eigen_components_cached = (
+            None)  # type: Optional[List[Tuple[float, np.ndarray]]]
 
     @property
     def exponent(self) -> Union[sympy.Basic, float]:
@@ -302,6 +304,7 @@ class EigenGate(raw_types.Gate):
     def _has_unitary_(self) -> bool:
         return not self._is_parameterized_()
 
+    @unitary_cache.cached_unitary
     def _unitary_(self) -> Union[np.ndarray, NotImplementedType]:
         if self._is_parameterized_():
             return NotImplemented
@@ -312,6 +315,35 @@ class EigenGate(raw_types.Gate):
             for half_turns, component in self._eigen_components()
         ], axis=0)
 
+    def _unitary_diagonal_(self) -> Union[np.ndarray, NotImplementedType]:
+        if self._is_parameterized_():
+            return NotImplemented
+        components = self._diagonal_eigen_components()
+        if not components:
+            return NotImplemented
+        e = cast(float, self._exponent)
+        return np.sum([
+            diagonal * 1j**(2 * e * (half_turns + self._global_shift))
+            for half_turns, diagonal in components
+        ],
+                      axis=0)
+
+    def _diagonal_eigen_components(self) -> List[Tuple[float, np.ndarray]]:
+        """The diagonals of the eigenspace projectors, if they're diagonal.
+
+        Returns an empty list if any of the projectors isn't diagonal.
+        """
+        if self._diagonal_eigen_components_cached is None:
+            components = []  # type: List[Tuple[float, np.ndarray]]
+            for half_turns, projector in self._eigen_components():
+                diagonal = np.diag(projector)
+                if np.any(projector != np.diag(diagonal)):
+                    components = []
+                    break
+                components.append((half_turns, diagonal))
+            self._diagonal_eigen_components_cached = components
+        return self._diagonal_eigen_components_cached
+
     def _is_parameterized_(self) -> bool:
         return protocols.is_parameterized(self._exponent)
 
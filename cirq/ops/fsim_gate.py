@@ -30,9 +30,10 @@ import numpy as np
 import cirq
 from cirq import protocols, value
 from cirq._compat import proper_repr
-from cirq.ops import gate_features
+from cirq.ops import gate_features, unitary_cache
 
 
+@unitary_cache.cache_unitaries
 @value.value_equality(approximate=True)
 class FSimGate(gate_features.TwoQubitGate,
                gate_features.InterchangeableQubitsGate):
@@ -66,6 +67,7 @@ class FSimGate(gate_features.TwoQubitGate,
         return cirq.is_parameterized(self.theta) or cirq.is_parameterized(
             self.phi)
 
+    @unitary_cache.cached_unitary
     def _unitary_(self) -> Optional[np.ndarray]:
         if cirq.is_parameterized(self):
             return None
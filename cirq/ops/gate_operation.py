@@ -117,6 +117,9 @@ class GateOperation(raw_types.Operation):
     def _unitary_(self) -> Union[np.ndarray, NotImplementedType]:
         return protocols.unitary(self.gate, NotImplemented)
 
+    def _unitary_diagonal_(self) -> Union[np.ndarray, NotImplementedType]:
+        return protocols.unitary_diagonal(self.gate, NotImplemented)
+
     def _has_mixture_(self) -> bool:
         return protocols.has_mixture(self.gate)
 
@@ -14,7 +14,8 @@
 
 """A simplified time-slice of operations within a sequenced circuit."""
 
-from typing import Any, Callable, Iterable, Sequence, TypeVar, Union
+from typing import (Any, Callable, FrozenSet, Iterable, Optional, Sequence,
+                    TypeVar, Union)
 
 from cirq.protocols import approx_eq
 from cirq.ops import raw_types
@@ -37,6 +38,8 @@ class Moment:
         qubits: A set of the qubits acted upon by this Moment.
     """
 
+    __slots__ = ('operations', '_qubits')
+
     def __init__(self, operations: Iterable[raw_types.Operation] = ()) -> None:
         """Constructs a moment with the given operations.
 
@@ -48,14 +51,26 @@ class Moment:
             ValueError: A qubit appears more than once.
         """
         self.operations = tuple(operations)
+        self._qubits = None  # type: Optional[FrozenSet[raw_types.Qid]]
 
-        # Check that operations don't overlap.
+        # Check that operations don't overlap. A lone single-qubit operation
+        # can't, so the set of qubits of such a moment is built only if it's
+        # asked for.
+        if (len(self.operations) == 1 and len(self.operations[0].qubits) <= 1):
+            return
         affected_qubits = [q for op in self.operations for q in op.qubits]
-        self.qubits = frozenset(affected_qubits)
-        if len(affected_qubits) != len(self.qubits):
+        self._qubits = frozenset(affected_qubits)
+        if len(affected_qubits) != len(self._qubits):
             raise ValueError(
                 'Overlapping operations: {}'.format(self.operations))
 
+    @property
+    def qubits(self) -> FrozenSet[raw_types.Qid]:
+        if self._qubits is None:
+            self._qubits = frozenset(
+                q for op in self.operations for q in op.qubits)
+        return self._qubits
+
     def operates_on_single_qubit(self, qubit: raw_types.Qid) -> bool:
         """Determines if the moment has operations touching the given qubit.
         Args:
@@ -74,7 +89,7 @@ class Moment:
         Returns:
             Whether this moment has operations involving the qubits.
         """
-        return any(q in qubits for q in self.qubits)
+        return not self.qubits.isdisjoint(qubits)
 
     def with_operation(self, operation: raw_types.Operation):
         """Returns an equal moment, but with the given op added.
@@ -12,6 +12,8 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import pickle
+
 import pytest
 
 import cirq
@@ -38,6 +40,8 @@ def test_validation():
         _ = Moment([cirq.CZ(a, c), cirq.X(c)])
     with pytest.raises(ValueError):
         _ = Moment([cirq.CZ(a, c), cirq.CZ(c, d)])
+    with pytest.raises(ValueError):
+        _ = Moment([cirq.CZ(a, a)])
 
 
 def test_equality():
@@ -206,6 +210,24 @@ def test_qubits():
     assert Moment([cirq.X(a), cirq.X(b)]).qubits == {a , b}
     assert Moment([cirq.X(a)]).qubits == {a}
     assert Moment([cirq.CZ(a, b)]).qubits == {a, b}
+    assert Moment().qubits == frozenset()
+
+    m = Moment([cirq.X(a)])
+    assert m.operates_on([a])
+    assert not m.operates_on([b])
+    assert m.operates_on_single_qubit(a)
+    assert isinstance(m.qubits, frozenset)
+    assert m.qubits is m.qubits
+
+
+def test_compact_storage():
+    a = cirq.NamedQubit('a')
+    b = cirq.NamedQubit('b')
+    m = Moment([cirq.X(a), cirq.CZ(b, cirq.NamedQubit('c'))])
+    assert not hasattr(m, '__dict__')
+    assert pickle.loads(pickle.dumps(m)) == m
+    assert pickle.loads(pickle.dumps(m)).qubits == m.qubits
+    assert pickle.loads(pickle.dumps(Moment([cirq.X(b)]))).qubits == {b}
 
 
 def test_container_methods():
@@ -20,10 +20,11 @@ import numpy as np
 
 from cirq import protocols
 from cirq._compat import proper_repr
-from cirq.ops import gate_features, eigen_gate
+from cirq.ops import gate_features, eigen_gate, unitary_cache
 from cirq.ops.common_gates import _rads_func_symbol
 
 
+@unitary_cache.cache_unitaries
 class XXPowGate(eigen_gate.EigenGate,
                 gate_features.TwoQubitGate,
                 gate_features.InterchangeableQubitsGate):
@@ -93,6 +94,7 @@ class XXPowGate(eigen_gate.EigenGate,
                 ).format(proper_repr(self._exponent), self._global_shift)
 
 
+@unitary_cache.cache_unitaries
 class YYPowGate(eigen_gate.EigenGate,
                 gate_features.TwoQubitGate,
                 gate_features.InterchangeableQubitsGate):
@@ -134,6 +136,7 @@ class YYPowGate(eigen_gate.EigenGate,
                 ).format(proper_repr(self._exponent), self._global_shift)
 
 
+@unitary_cache.cache_unitaries
 class ZZPowGate(eigen_gate.EigenGate,
                 gate_features.TwoQubitGate,
                 gate_features.InterchangeableQubitsGate):
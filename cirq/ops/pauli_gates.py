@@ -15,7 +15,7 @@ import abc
 from typing import Union, TYPE_CHECKING, Tuple, Optional
 
 import sympy
-from cirq.ops import common_gates, raw_types
+from cirq.ops import common_gates, raw_types, unitary_cache
 
 if TYPE_CHECKING:
     # pylint: disable=unused-import
@@ -83,18 +83,21 @@ class Pauli(raw_types.Gate, metaclass=abc.ABCMeta):
         return SingleQubitPauliStringGateOperation(self, qubits[0])
 
 
+@unitary_cache.cache_unitaries
 class _PauliX(Pauli, common_gates.XPowGate):
     def __init__(self, *, exponent: Union[sympy.Basic, float] = 1.0):
         Pauli.__init__(self, index=0, name='X')
         common_gates.XPowGate.__init__(self, exponent=exponent)
 
 
+@unitary_cache.cache_unitaries
 class _PauliY(Pauli, common_gates.YPowGate):
     def __init__(self, *, exponent: Union[sympy.Basic, float] = 1.0):
         Pauli.__init__(self, index=1, name='Y')
         common_gates.YPowGate.__init__(self, exponent=exponent)
 
 
+@unitary_cache.cache_unitaries
 class _PauliZ(Pauli, common_gates.ZPowGate):
     def __init__(self, *, exponent: Union[sympy.Basic, float] = 1.0):
         Pauli.__init__(self, index=2, name='Z')
@@ -21,13 +21,14 @@ import sympy
 
 from cirq import value, protocols
 from cirq._compat import proper_repr
-from cirq.ops import gate_features, raw_types, op_tree
+from cirq.ops import gate_features, raw_types, op_tree, unitary_cache
 from cirq.type_workarounds import NotImplementedType
 
 # Note: avoiding 'from/as' because it creates a circular dependency in python 2.
 import cirq.ops.common_gates
 
 
+@unitary_cache.cache_unitaries
 @value.value_equality
 class PhasedXPowGate(gate_features.SingleQubitGate):
     """A gate equivalent to the circuit ───Z^-p───X^t───Z^p───."""
@@ -79,6 +80,7 @@ class PhasedXPowGate(gate_features.SingleQubitGate):
         self._phase_exponent = value.canonicalize_half_turns(phase_exponent)
         self._exponent = exponent
         self._global_shift = global_shift
+        self._canonical_exponent_cached = None
 
     def _qasm_(self,
                args: protocols.QasmArgs,
@@ -136,6 +138,7 @@ class PhasedXPowGate(gate_features.SingleQubitGate):
         """See `cirq.SupportsTraceDistanceBound`."""
         return protocols.trace_distance_bound(cirq.X**self._exponent)
 
+    @unitary_cache.cached_unitary
     def _unitary_(self) -> Union[np.ndarray, NotImplementedType]:
         """See `cirq.SupportsUnitary`."""
         if self._is_parameterized_():
@@ -217,11 +220,13 @@ class PhasedXPowGate(gate_features.SingleQubitGate):
 
     @property
     def _canonical_exponent(self):
-        period = self._period()
-        if not period or isinstance(self._exponent, sympy.Symbol):
-            return self._exponent
-        else:
-            return self._exponent % period
+        if self._canonical_exponent_cached is None:
+            period = self._period()
+            if not period or isinstance(self._exponent, sympy.Symbol):
+                self._canonical_exponent_cached = self._exponent
+            else:
+                self._canonical_exponent_cached = self._exponent % period
+        return self._canonical_exponent_cached
 
     def _value_equality_values_(self):
         return self.phase_exponent, self._canonical_exponent, self._global_shift
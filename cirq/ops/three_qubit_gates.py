@@ -28,9 +28,11 @@ from cirq.ops import (
     pauli_gates,
     op_tree,
     raw_types,
+    unitary_cache,
 )
 
 
+@unitary_cache.cache_unitaries
 class CCZPowGate(eigen_gate.EigenGate,
                  gate_features.ThreeQubitGate,
                  gate_features.InterchangeableQubitsGate):
@@ -145,6 +147,7 @@ class CCZPowGate(eigen_gate.EigenGate,
         return 'CCZ**{}'.format(self._exponent)
 
 
+@unitary_cache.cache_unitaries
 class CCXPowGate(eigen_gate.EigenGate,
                  gate_features.ThreeQubitGate,
                  gate_features.InterchangeableQubitsGate):
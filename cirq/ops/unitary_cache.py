@@ -0,0 +1,165 @@
+# Copyright 2019 The Cirq Developers
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     https://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""A shared cache of the unitary matrices of common gates."""
+
+import collections
+import functools
+import threading
+from typing import (Any, Callable, Dict, Hashable, NamedTuple, Optional, Set,
+                    TypeVar)
+
+import numpy as np
+
+from cirq import protocols
+
+TFunc = TypeVar('TFunc', bound=Callable)
+TClass = TypeVar('TClass', bound=type)
+
+UnitaryCacheInfo = NamedTuple(
+    'UnitaryCacheInfo',
+    [
+        # How many lookups found a cached matrix.
+        ('hits', int),
+        # How many lookups had to compute the matrix.
+        ('misses', int),
+        # The most matrices kept for each gate type.
+        ('maxsize', int),
+        # How many matrices are currently kept.
+        ('currsize', int),
+    ])
+
+
+class UnitaryCache:
+    """Remembers the unitary matrices of recently seen gates.
+
+    Simulators, optimizers and `cirq.Circuit.to_unitary_matrix` ask for the
+    unitary of the same few gates over and over, and gates such as
+    `cirq.EigenGate` build their matrix from scratch each time. This cache
+    keeps one bounded table per gate type, keyed on the values that the gate
+    uses for equality (for an `EigenGate`, its canonical exponent and global
+    shift). Equal gates therefore share a single matrix.
+
+    Cached matrices are read-only, because they are handed out to every
+    caller. Copy a matrix before modifying it in place.
+
+    The cache may be used from several threads at once. A matrix that two
+    threads miss at the same time is computed by both.
+
+    Attributes:
+        maxsize: The most matrices to keep for each gate type. The least
+            recently used one is forgotten to make room for a new one.
+        enabled: When False, matrices are computed from scratch every time
+            and nothing is cached.
+    """
+
+    def __init__(self, maxsize: int = 1024) -> None:
+        self.maxsize = maxsize
+        self.enabled = True
+        self._tables = {}  # type: Dict[type, Dict[Hashable, np.ndarray]]
+        self._hits = collections.Counter()  # type: Dict[type, int]
+        self._misses = collections.Counter()  # type: Dict[type, int]
+        self._lock = threading.Lock()
+
+    def unitary(self, gate: Any, compute: Callable[[], Any]) -> Any:
+        """Returns the unitary of a gate, computing it if it isn't cached.
+
+        Args:
+            gate: The gate. Must support `cirq.value_equality`, which
+                determines the cache key.
+            compute: Computes the gate's unitary. Results other than numpy
+                arrays (e.g. `NotImplemented`) are returned without being
+                cached.
+        """
+        # Parameterized gates can compare equal to resolved ones, e.g. when
+        # their exponent is `sympy.Integer(0)`, so they must not share keys.
+        if not self.enabled or protocols.is_parameterized(gate):
+            return compute()
+        gate_type = type(gate)
+        key = gate._value_equality_values_()
+        with self._lock:
+            table = self._tables.get(gate_type)
+            if table is None:
+                table = self._tables[gate_type] = collections.OrderedDict()
+            result = table.get(key)
+            if result is not None:
+                self._hits[gate_type] += 1
+                table.move_to_end(key)  # type: ignore
+                return result
+            self._misses[gate_type] += 1
+
+        result = compute()
+        if isinstance(result, np.ndarray) and self.maxsize > 0:
+            result.flags.writeable = False
+            with self._lock:
+                if key not in table and len(table) >= self.maxsize:
+                    table.popitem(last=False)  # type: ignore
+                table[key] = result
+        return result
+
+    def cache_info(self, gate_type: Optional[type] = None) -> UnitaryCacheInfo:
+        """Returns statistics about the cache.
+
+        Args:
+            gate_type: Only count the given type of gate. Defaults to counting
+                all of them.
+        """
+        types = list(self._tables) if gate_type is None else [gate_type]
+        return UnitaryCacheInfo(
+            hits=sum(self._hits[t] for t in types),
+            misses=sum(self._misses[t] for t in types),
+            maxsize=self.maxsize,
+            currsize=sum(len(self._tables.get(t, ())) for t in types))
+
+    def clear(self) -> None:
+        """Forgets all cached matrices and resets the statistics."""
+        with self._lock:
+            self._tables.clear()
+            self._hits.clear()
+            self._misses.clear()
+
+    def __repr__(self):
+        return 'cirq.UnitaryCache(maxsize={!r})'.format(self.maxsize)
+
+
+# The cache used by the `_unitary_` methods of cirq's common gates.
+UNITARY_CACHE = UnitaryCache()
+
+# The gate types whose `cached_unitary` methods use `UNITARY_CACHE`.
+_CACHED_GATE_TYPES = set()  # type: Set[type]
+
+
+def cached_unitary(func: TFunc) -> TFunc:
+    """Decorates a gate's `_unitary_` method to go through `UNITARY_CACHE`.
+
+    Only gates whose type was registered with `cache_unitaries` are cached.
+    """
+
+    @functools.wraps(func)
+    def _unitary_(self):
+        if type(self) not in _CACHED_GATE_TYPES:
+            return func(self)
+        return UNITARY_CACHE.unitary(self, lambda: func(self))
+
+    return _unitary_  # type: ignore
+
+
+def cache_unitaries(cls: TClass) -> TClass:
+    """Class decorator caching the unitaries of exactly the given gate type.
+
+    The cache key only includes the values the gate's class uses for
+    equality, so subclasses aren't cached: they may add state that changes
+    the unitary without changing the key.
+    """
+    _CACHED_GATE_TYPES.add(cls)
+    return cls
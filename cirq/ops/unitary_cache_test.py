@@ -0,0 +1,170 @@
+# Copyright 2019 The Cirq Developers
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     https://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import threading
+
+import numpy as np
+import pytest
+import sympy
+
+import cirq
+
+
+def test_unitary_cache_shares_matrices_of_equal_gates():
+    cache = cirq.UnitaryCache()
+    calls = []
+
+    def compute(gate):
+        calls.append(gate)
+        return np.eye(2) * gate.exponent
+
+    for gate in [cirq.X**0.5, cirq.X**0.5, cirq.X**2.5, cirq.X**0.25]:
+        cache.unitary(gate, lambda: compute(gate))
+    assert calls == [cirq.X**0.5, cirq.X**0.25]
+    assert cache.cache_info() == (2, 2, 1024, 2)
+    assert cache.cache_info(type(cirq.X**0.5)) == (2, 2, 1024, 2)
+    assert cache.cache_info(cirq.ZPowGate) == (0, 0, 1024, 0)
+
+    m = cache.unitary(cirq.X**2.5, lambda: None)
+    np.testing.assert_allclose(m, np.eye(2) * 0.5)
+    with pytest.raises(ValueError):
+        m[0, 0] = 2
+
+    cache.clear()
+    assert cache.cache_info() == (0, 0, 1024, 0)
+
+
+def test_unitary_cache_evicts_least_recently_used():
+    cache = cirq.UnitaryCache(maxsize=2)
+    a, b, c = cirq.Z**0.1, cirq.Z**0.2, cirq.Z**0.3
+    for gate in [a, b, a, c]:
+        cache.unitary(gate, lambda: np.eye(2))
+    assert cache.cache_info().currsize == 2
+    assert cache.unitary(a, lambda: None) is not None
+    assert cache.unitary(b, lambda: None) is None
+
+    assert cirq.UnitaryCache(maxsize=0).unitary(a, lambda: None) is None
+    assert repr(cache) == 'cirq.UnitaryCache(maxsize=2)'
+
+
+def test_unitary_cache_skips_parameterized_and_non_matrix_results():
+    cache = cirq.UnitaryCache()
+    cache.unitary(cirq.FSimGate(0, 0), lambda: np.eye(4))
+    # Compares equal to FSimGate(0, 0), but is parameterized.
+    resolved_zero = cirq.FSimGate(sympy.Integer(0), sympy.Integer(0))
+    assert cache.unitary(resolved_zero, lambda: None) is None
+
+    assert cache.unitary(cirq.CZ, lambda: NotImplemented) is NotImplemented
+    assert cache.cache_info(cirq.CZPowGate).currsize == 0
+
+
+def test_unitary_cache_disabled():
+    cache = cirq.UnitaryCache()
+    cache.enabled = False
+    m = cache.unitary(cirq.H, lambda: np.eye(2))
+    m[0, 0] = 2
+    assert cache.cache_info() == (0, 0, 1024, 0)
+
+
+@pytest.mark.parametrize('gate', [
+    cirq.X**0.3,
+    cirq.Rx(0.2),
+    cirq.CZ**0.7,
+    cirq.ISWAP**-0.5,
+    cirq.PhasedXPowGate(phase_exponent=0.25, exponent=0.5),
+    cirq.FSimGate(theta=0.3, phi=0.2),
+])
+def test_common_gates_use_unitary_cache(gate):
+    cache = cirq.UNITARY_CACHE
+    before = cache.cache_info(type(gate))
+    first = cirq.unitary(gate)
+    second = cirq.unitary(gate)
+    after = cache.cache_info(type(gate))
+    assert after.hits >= before.hits + 1
+    assert second is first
+    assert not first.flags.writeable
+
+    cache.enabled = False
+    try:
+        uncached = cirq.unitary(gate)
+    finally:
+        cache.enabled = True
+    assert uncached is not first
+    np.testing.assert_allclose(uncached, first, atol=1e-8)
+
+
+class _ScaledZPowGate(cirq.EigenGate, cirq.SingleQubitGate):
+    """Has state, the scale, that the EigenGate equality values leave out."""
+
+    def __init__(self, scale, exponent=1.0):
+        super().__init__(exponent=exponent)
+        self.scale = scale
+
+    def _eigen_components(self):
+        return [
+            (0, np.diag([1, 0])),
+            (self.scale, np.diag([0, 1])),
+        ]
+
+    def _with_exponent(self, exponent):
+        return _ScaledZPowGate(self.scale, exponent)
+
+
+class _NamedXPowGate(cirq.XPowGate):
+
+    def __init__(self, name, exponent=1.0):
+        super().__init__(exponent=exponent)
+        self.name = name
+
+
+def test_only_registered_gate_types_use_unitary_cache():
+    cache = cirq.UNITARY_CACHE
+    np.testing.assert_allclose(cirq.unitary(_ScaledZPowGate(1.0, 0.5)),
+                               np.diag([1, 1j]),
+                               atol=1e-8)
+    np.testing.assert_allclose(cirq.unitary(_ScaledZPowGate(2.0, 0.5)),
+                               np.diag([1, -1]),
+                               atol=1e-8)
+    assert cache.cache_info(_ScaledZPowGate) == (0, 0, 1024, 0)
+
+    # Subclasses of cached gate types aren't cached either.
+    m = cirq.unitary(_NamedXPowGate('a', 0.5))
+    np.testing.assert_allclose(m, cirq.unitary(cirq.X**0.5), atol=1e-8)
+    assert m.flags.writeable
+    assert cache.cache_info(_NamedXPowGate) == (0, 0, 1024, 0)
+
+
+def test_unitary_cache_from_several_threads():
+    cache = cirq.UnitaryCache(maxsize=4)
+    gates = [cirq.Z**(i / 8) for i in range(8)]
+    errors = []
+
+    def work():
+        try:
+            for _ in range(200):
+                for gate in gates:
+                    m = cache.unitary(gate, lambda: cirq.unitary(gate))
+                    np.testing.assert_allclose(m, cirq.unitary(gate))
+        except Exception as e:  # coverage: ignore
+            errors.append(e)
+
+    threads = [threading.Thread(target=work) for _ in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert errors == []
+    info = cache.cache_info()
+    assert info.hits + info.misses == 4 * 200 * 8
+    assert info.currsize == 4
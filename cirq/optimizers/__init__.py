@@ -35,12 +35,19 @@ from cirq.optimizers.expand_composite import (
 from cirq.optimizers.merge_interactions import (
     MergeInteractions,)
 
+from cirq.optimizers.pass_manager import (
+    PassManager,
+    PassStats,
+)
+
 from cirq.optimizers.merge_single_qubit_gates import (
     merge_single_qubit_gates_into_phased_x_z,
     MergeSingleQubitGates,
 )
 
 from cirq.optimizers.decompositions import (
+    batch_single_qubit_matrix_to_pauli_rotations,
+    batch_single_qubit_matrix_to_phased_x_z,
     is_negligible_turn,
     single_qubit_matrix_to_gates,
     single_qubit_matrix_to_pauli_rotations,
@@ -49,4 +56,6 @@ from cirq.optimizers.decompositions import (
 )
 
 from cirq.optimizers.two_qubit_decompositions import (
-    two_qubit_matrix_to_operations,)
+    two_qubit_matrix_to_operations,
+    TwoQubitDecompositionCache,
+)
@@ -44,6 +44,38 @@ def single_qubit_matrix_to_pauli_rotations(
         A list of (Pauli, half_turns) tuples that, when applied in order,
         perform the desired operation.
     """
+    return _pauli_rotations_from_angles(
+        *linalg.deconstruct_single_qubit_matrix_into_angles(mat), atol=atol)
+
+
+def batch_single_qubit_matrix_to_pauli_rotations(
+        mats: np.ndarray,
+        atol: float = 0) -> List[List[Tuple[ops.Pauli, float]]]:
+    """Implements many single-qubit operations with few rotations each.
+
+    Like `cirq.single_qubit_matrix_to_pauli_rotations`, but breaks down all
+    the matrices at once.
+
+    Args:
+        mats: An array of shape (N, 2, 2) holding the unitary matrices of the
+            operations to implement.
+        atol: A limit on the amount of absolute error introduced by the
+            construction.
+
+    Returns:
+        For each matrix, a list of (Pauli, half_turns) tuples that, when
+        applied in order, perform the operation.
+    """
+    angles = linalg.batch_deconstruct_single_qubit_matrix_into_angles(mats)
+    return [
+        _pauli_rotations_from_angles(z_rad_before, y_rad, z_rad_after, atol)
+        for z_rad_before, y_rad, z_rad_after in angles.tolist()
+    ]
+
+
+def _pauli_rotations_from_angles(z_rad_before: float, y_rad: float,
+                                 z_rad_after: float,
+                                 atol: float) -> List[Tuple[ops.Pauli, float]]:
 
     def is_clifford_rotation(half_turns):
         return near_zero_mod(half_turns, 0.5, atol=atol)
@@ -63,9 +95,6 @@ def single_qubit_matrix_to_pauli_rotations(
         return (is_clifford_rotation(half_turns) and
                 to_quarter_turns(half_turns) == 0)
 
-    # Decompose matrix
-    z_rad_before, y_rad, z_rad_after = (
-        linalg.deconstruct_single_qubit_matrix_into_angles(mat))
     z_ht_before = z_rad_before / np.pi - 0.5
     m_ht = y_rad / np.pi
     m_pauli = ops.pauli_gates.X  # type: ops.pauli_gates.Pauli
@@ -158,7 +187,11 @@ def _deconstruct_single_qubit_matrix_into_gate_turns(
     """
     pre_phase, rotation, post_phase = (
         linalg.deconstruct_single_qubit_matrix_into_angles(mat))
+    return _angles_to_gate_turns(pre_phase, rotation, post_phase)
 
+
+def _angles_to_gate_turns(pre_phase, rotation, post_phase):
+    """Converts ZYZ angles into gate turns. Works on arrays of angles too."""
     # Figure out parameters of the actual gates we will do.
     tau = 2 * np.pi
     xy_turn = rotation / tau
@@ -188,9 +221,37 @@ def single_qubit_matrix_to_phased_x_z(
             operation.
     """
 
-    xy_turn, xy_phase_turn, total_z_turn = (
-        _deconstruct_single_qubit_matrix_into_gate_turns(mat))
+    return _phased_x_z_gates(
+        *_deconstruct_single_qubit_matrix_into_gate_turns(mat), atol=atol)
+
+
+def batch_single_qubit_matrix_to_phased_x_z(mats: np.ndarray, atol: float = 0
+                                           ) -> List[List[ops.SingleQubitGate]]:
+    """Implements many single-qubit operations with a PhasedX and Z gate each.
+
+    Like `cirq.single_qubit_matrix_to_phased_x_z`, but breaks down all the
+    matrices at once.
+
+    Args:
+        mats: An array of shape (N, 2, 2) holding the unitary matrices of the
+            operations to implement.
+        atol: A limit on the amount of error introduced by the
+            construction.
+
+    Returns:
+        For each matrix, a list of gates that, when applied in order, perform
+        the operation.
+    """
+    angles = linalg.batch_deconstruct_single_qubit_matrix_into_angles(mats)
+    turns = np.transpose(_angles_to_gate_turns(*np.transpose(angles)))
+    return [
+        _phased_x_z_gates(xy_turn, xy_phase_turn, total_z_turn, atol)
+        for xy_turn, xy_phase_turn, total_z_turn in turns.tolist()
+    ]
+
 
+def _phased_x_z_gates(xy_turn: float, xy_phase_turn: float, total_z_turn: float,
+                      atol: float) -> List[ops.SingleQubitGate]:
     # Build the intended operation out of non-negligible XY and Z rotations.
     result = [
         ops.PhasedXPowGate(exponent=2 * xy_turn,
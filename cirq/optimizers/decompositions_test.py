@@ -268,3 +268,40 @@ def test_single_qubit_matrix_to_native_gates_tolerance_half_turn_phasing():
     kept = cirq.single_qubit_matrix_to_phased_x_z(
         phased_nearly_x, atol=0.0001)
     assert len(kept) == 2
+
+
+def test_batch_single_qubit_matrix_to_pauli_rotations_matches_scalar():
+    np.random.seed(0)
+    mats = [cirq.testing.random_unitary(2) for _ in range(10)]
+    mats += [np.eye(2), cirq.unitary(cirq.X), cirq.unitary(cirq.H)]
+    batched = cirq.batch_single_qubit_matrix_to_pauli_rotations(np.array(mats),
+                                                                atol=1e-8)
+    assert len(batched) == len(mats)
+    for mat, rotations in zip(mats, batched):
+        expected = cirq.single_qubit_matrix_to_pauli_rotations(mat, atol=1e-8)
+        assert [pauli for pauli, _ in rotations
+               ] == [pauli for pauli, _ in expected]
+        np.testing.assert_allclose([half_turns for _, half_turns in rotations],
+                                   [half_turns for _, half_turns in expected],
+                                   atol=1e-8)
+
+
+def test_batch_single_qubit_matrix_to_phased_x_z_matches_scalar():
+    np.random.seed(0)
+    mats = [cirq.testing.random_unitary(2) for _ in range(10)]
+    mats += [np.eye(2), cirq.unitary(cirq.Y**0.5), cirq.unitary(cirq.Z**0.25)]
+    batched = cirq.batch_single_qubit_matrix_to_phased_x_z(np.array(mats),
+                                                           atol=1e-8)
+    assert len(batched) == len(mats)
+    for mat, gates in zip(mats, batched):
+        expected = cirq.single_qubit_matrix_to_phased_x_z(mat, atol=1e-8)
+        assert len(gates) == len(expected)
+        for gate, expected_gate in zip(gates, expected):
+            assert cirq.approx_eq(gate, expected_gate, atol=1e-8)
+        if gates:
+            assert_gates_implement_unitary(gates, mat, atol=1e-7)
+
+
+def test_batch_single_qubit_matrix_to_phased_x_z_empty():
+    assert cirq.batch_single_qubit_matrix_to_phased_x_z(np.zeros(
+        (0, 2, 2))) == []
@@ -29,12 +29,26 @@ class MergeInteractions(circuits.PointOptimizer):
     def __init__(self,
                  tolerance: float = 1e-8,
                  allow_partial_czs: bool = True,
-                 post_clean_up: Callable[
-                     [Sequence[ops.Operation]], ops.OP_TREE
-                 ] = lambda op_list: op_list) -> None:
+                 post_clean_up: Callable[[Sequence[ops.Operation]], ops.
+                                         OP_TREE] = lambda op_list: op_list,
+                 cache: Optional[
+                     two_qubit_decompositions.TwoQubitDecompositionCache] = None
+                ) -> None:
+        """
+        Args:
+            tolerance: A limit on the amount of absolute error introduced by
+                the decompositions.
+            allow_partial_czs: Enables the use of Partial-CZ gates.
+            post_clean_up: Applied to each replacement list of operations.
+            cache: Where to remember the decompositions of the two-qubit
+                matrices this optimizer has seen. Defaults to a new cache
+                for this optimizer.
+        """
         super().__init__(post_clean_up=post_clean_up)
         self.tolerance = tolerance
         self.allow_partial_czs = allow_partial_czs
+        self.cache = (two_qubit_decompositions.TwoQubitDecompositionCache()
+                      if cache is None else cache)
 
     def optimization_at(self,
                         circuit: circuits.Circuit,
@@ -66,14 +80,9 @@ class MergeInteractions(circuits.PointOptimizer):
             return None
 
         # Find a max-3-cz construction.
-        new_operations = (
-            two_qubit_decompositions.two_qubit_matrix_to_operations(
-                op.qubits[0],
-                op.qubits[1],
-                matrix,
-                self.allow_partial_czs,
-                self.tolerance,
-                False))
+        new_operations = (self.cache.two_qubit_matrix_to_operations(
+            op.qubits[0], op.qubits[1], matrix, self.allow_partial_czs,
+            self.tolerance, False))
         new_interaction_count = len([new_op for new_op in new_operations
                                      if len(new_op.qubits) == 2])
 
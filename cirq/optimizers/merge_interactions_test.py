@@ -217,3 +217,22 @@ def test_post_clean_up():
     u_after = circuit[1:-1].to_unitary_matrix()
     cirq.testing.assert_allclose_up_to_global_phase(
         u_before, u_after, atol=1e-8)
+
+
+def test_reuses_decompositions():
+    a, b, c = cirq.LineQubit.range(3)
+    block = [cirq.CNOT(a, b), cirq.H(a), cirq.CNOT(a, b)]
+    circuit = cirq.Circuit.from_ops(
+        block, [op.transform_qubits({
+            a: b,
+            b: c
+        }.__getitem__) for op in block])
+    assert_optimization_not_broken(circuit.copy())
+
+    cache = cirq.TwoQubitDecompositionCache()
+    optimizer = cirq.MergeInteractions(cache=cache)
+    assert optimizer.cache is cache
+    optimizer.optimize_circuit(circuit)
+    assert (cache.hits, cache.misses) == (1, 1)
+
+    assert cirq.MergeInteractions().cache is not cirq.MergeInteractions().cache
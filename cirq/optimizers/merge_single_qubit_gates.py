@@ -14,7 +14,7 @@
 
 """An optimization pass that combines adjacent single-qubit rotations."""
 
-from typing import Optional, Callable, List
+from typing import Dict, Optional, Callable, List, Sequence, Tuple, cast
 
 import numpy as np
 
@@ -25,12 +25,16 @@ from cirq.optimizers import decompositions
 class MergeSingleQubitGates(circuits.PointOptimizer):
     """Optimizes runs of adjacent unitary 1-qubit operations."""
 
-    def __init__(self,
-                 *,
-                 rewriter: Optional[Callable[[List[ops.Operation]],
-                                             Optional[ops.OP_TREE]]] = None,
-                 synthesizer: Optional[Callable[[ops.Qid, np.ndarray],
-                                                Optional[ops.OP_TREE]]] = None):
+    def __init__(
+            self,
+            *,
+            rewriter: Optional[
+                Callable[[List[ops.Operation]], Optional[ops.OP_TREE]]] = None,
+            synthesizer: Optional[
+                Callable[[ops.Qid, np.ndarray], Optional[ops.OP_TREE]]] = None,
+            batch_synthesizer: Optional[
+                Callable[[Sequence[ops.Qid], np.
+                          ndarray], Sequence[Optional[ops.OP_TREE]]]] = None):
         """
         Args:
             rewriter: Specifies how to merge runs of single-qubit operations
@@ -45,12 +49,21 @@ class MergeSingleQubitGates(circuits.PointOptimizer):
                 be specified at the same time as `rewriter`. If `synthesizer`
                 returns `None`, that means "do not rewrite the operations used
                 to make this matrix".
+            batch_synthesizer: A synthesizer that handles every run of
+                operations in the circuit at once. Takes the qubit of each run
+                and an (N, 2, 2) array of their unitary matrices, and returns
+                the operations (or `None`) for each run. The circuit is then
+                rewritten in a single pass, instead of one run at a time. Can't
+                be specified at the same time as `rewriter` or `synthesizer`.
         """
         super().__init__()
-        if rewriter is not None and synthesizer is not None:
-            raise ValueError("Can't specify both rewriter and synthesizer.")
+        if sum(e is not None
+               for e in [rewriter, synthesizer, batch_synthesizer]) > 1:
+            raise ValueError("Can't specify more than one of rewriter, "
+                             "synthesizer and batch_synthesizer.")
         self._rewriter = rewriter
         self._synthesizer = synthesizer
+        self._batch_synthesizer = batch_synthesizer
 
     def _rewrite(self, operations: List[ops.Operation]
                  ) -> Optional[ops.OP_TREE]:
@@ -97,6 +110,117 @@ class MergeSingleQubitGates(circuits.PointOptimizer):
             clear_qubits=op.qubits,
             new_operations=rewritten)
 
+    def optimize_circuit(self, circuit: circuits.Circuit):
+        if self._batch_synthesizer is None:
+            return super().optimize_circuit(circuit)
+
+        runs = _find_single_qubit_runs(circuit)
+        if not runs:
+            return None
+        matrices = np.array([
+            linalg.dot(*(protocols.unitary(op)
+                         for op in run.operations[::-1]))
+            for run in runs
+        ])
+        replacements = self._batch_synthesizer([run.qubit for run in runs],
+                                               matrices)
+        _rewrite_runs(circuit, runs, replacements)
+        return None
+
+
+class _Run:
+    """A run of unitary operations on one qubit.
+
+    Attributes:
+        qubit: The qubit.
+        operations: The operations, in order.
+        indices: The indices of the moments of the operations.
+        next_index: The index of the next moment operating on the qubit, or
+            the length of the circuit if there's none.
+    """
+
+    def __init__(self, qubit: ops.Qid) -> None:
+        self.qubit = qubit
+        self.operations = []  # type: List[ops.Operation]
+        self.indices = []  # type: List[int]
+        self.next_index = 0
+
+
+def _find_single_qubit_runs(circuit: circuits.Circuit) -> List[_Run]:
+    """Finds the maximal runs of unitary single-qubit operations.
+
+    The runs are in the order a point optimizer would encounter them.
+    """
+    runs = []  # type: List[_Run]
+    open_runs = {}  # type: Dict[ops.Qid, _Run]
+    for i, moment in enumerate(circuit):
+        for op in moment.operations:
+            if len(op.qubits) == 1 and protocols.has_unitary(op):
+                q = op.qubits[0]
+                run = open_runs.get(q)
+                if run is None:
+                    run = open_runs[q] = _Run(q)
+                    runs.append(run)
+                run.operations.append(op)
+                run.indices.append(i)
+                continue
+            for q in op.qubits:
+                run = open_runs.pop(q, None)
+                if run is not None:
+                    run.next_index = i
+    for run in open_runs.values():
+        run.next_index = len(circuit)
+    return runs
+
+
+def _rewrite_runs(circuit: circuits.Circuit, runs: Sequence[_Run],
+                  replacements: Sequence[Optional[ops.OP_TREE]]) -> None:
+    """Replaces runs of operations, building each changed moment once.
+
+    Each replacement goes into consecutive moments starting at the first
+    moment of its run. When it doesn't fit before the next operation on the
+    qubit, empty moments are inserted before that operation, as the point
+    optimizer's `insert_at_frontier` would do.
+    """
+    cleared = {}  # type: Dict[int, List[ops.Qid]]
+    placements = []  # type: List[Tuple[int, Tuple[ops.Operation, ...]]]
+    # The number of empty moments to insert before each moment.
+    extra = {}  # type: Dict[int, int]
+    for run, replacement in zip(runs, replacements):
+        if replacement is None:
+            continue
+        new_operations = tuple(
+            cast(ops.Operation, op) for op in ops.flatten_op_tree(replacement))
+        for i in run.indices:
+            cleared.setdefault(i, []).append(run.qubit)
+        placements.append((run.indices[0], new_operations))
+        overflow = len(new_operations) - (run.next_index - run.indices[0])
+        if overflow > extra.get(run.next_index, 0):
+            extra[run.next_index] = overflow
+    if not placements:
+        return
+
+    # Where each original moment ends up once the empty moments are inserted.
+    new_indices = []  # type: List[int]
+    shift = 0
+    for i in range(len(circuit)):
+        shift += extra.get(i, 0)
+        new_indices.append(i + shift)
+    moments = [ops.Moment()
+              ] * (len(circuit) + shift + extra.get(len(circuit), 0))
+    for i, moment in enumerate(circuit):
+        if i in cleared:
+            moment = moment.without_operations_touching(cleared[i])
+        moments[new_indices[i]] = moment
+
+    added = {}  # type: Dict[int, List[ops.Operation]]
+    for start, new_operations in placements:
+        for k, op in enumerate(new_operations, new_indices[start]):
+            added.setdefault(k, []).append(op)
+    for k, added_operations in added.items():
+        moments[k] = ops.Moment(moments[k].operations + tuple(added_operations))
+    circuit[:] = moments
+
 
 def merge_single_qubit_gates_into_phased_x_z(
         circuit: circuits.Circuit,
@@ -112,9 +236,12 @@ def merge_single_qubit_gates_into_phased_x_z(
             negligible gates to be dropped, smaller values increase accuracy.
     """
 
-    def synth(qubit: ops.Qid, matrix: np.ndarray) -> List[ops.Operation]:
-        out_gates = decompositions.single_qubit_matrix_to_phased_x_z(
-            matrix, atol)
-        return [gate(qubit) for gate in out_gates]
+    def synth(qubits: Sequence[ops.Qid],
+              matrices: np.ndarray) -> List[List[ops.Operation]]:
+        out_gates = decompositions.batch_single_qubit_matrix_to_phased_x_z(
+            matrices, atol)
+        return [[gate(qubit)
+                 for gate in gates]
+                for qubit, gates in zip(qubits, out_gates)]
 
-    MergeSingleQubitGates(synthesizer=synth).optimize_circuit(circuit)
+    MergeSingleQubitGates(batch_synthesizer=synth).optimize_circuit(circuit)
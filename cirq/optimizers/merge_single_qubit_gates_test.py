@@ -185,3 +185,102 @@ def test_merge_single_qubit_gates_into_phased_x_z():
             cirq.Y(a)**-0.5,
         ),
         optimizer=cirq.merge_single_qubit_gates_into_phased_x_z)
+
+
+def test_not_both_batch():
+    with pytest.raises(ValueError):
+        _ = cirq.MergeSingleQubitGates(synthesizer=lambda *args: None,
+                                       batch_synthesizer=lambda *args: None)
+
+
+def test_batch_synthesizer_sees_every_run():
+    a, b = cirq.LineQubit.range(2)
+    c = cirq.Circuit.from_ops(
+        cirq.X(a),
+        cirq.Y(a),
+        cirq.Z(b),
+        cirq.CZ(a, b),
+        cirq.H(a),
+    )
+    seen = []
+
+    def synth(qubits, matrices):
+        seen.append((list(qubits), matrices))
+        return [None] * len(qubits)
+
+    before = c.copy()
+    cirq.MergeSingleQubitGates(batch_synthesizer=synth).optimize_circuit(c)
+    assert c == before
+    assert len(seen) == 1
+    assert seen[0][0] == [a, b, a]
+    assert seen[0][1].shape == (3, 2, 2)
+    cirq.testing.assert_allclose_up_to_global_phase(seen[0][1][0],
+                                                    cirq.unitary(cirq.Z),
+                                                    atol=1e-8)
+
+
+def test_batch_synthesizer_inserts_moments_for_overflow():
+    a, b = cirq.LineQubit.range(2)
+    c = cirq.Circuit.from_ops(
+        cirq.X(a),
+        cirq.CZ(a, b),
+    )
+
+    def synth(qubits, matrices):
+        return [[cirq.Y(q), cirq.Z(q), cirq.Y(q)] for q in qubits]
+
+    cirq.MergeSingleQubitGates(batch_synthesizer=synth).optimize_circuit(c)
+    cirq.testing.assert_same_circuits(
+        c,
+        cirq.Circuit([
+            cirq.Moment([cirq.Y(a)]),
+            cirq.Moment([cirq.Z(a)]),
+            cirq.Moment([cirq.Y(a)]),
+            cirq.Moment([cirq.CZ(a, b)]),
+        ]))
+
+
+def test_batch_merge_preserves_random_circuits():
+    for _ in range(20):
+        circuit = cirq.testing.random_circuit(qubits=4,
+                                              n_moments=12,
+                                              op_density=0.8)
+        merged = circuit.copy()
+        cirq.merge_single_qubit_gates_into_phased_x_z(merged)
+        cirq.testing.assert_circuits_with_terminal_measurements_are_equivalent(
+            merged, circuit, atol=1e-6)
+
+
+@pytest.mark.parametrize('offset', range(-4, 5))
+def test_batch_merge_matches_per_run_merge_at_tolerance(offset):
+    atol = 1e-3
+    a, b = cirq.LineQubit.range(2)
+    # Runs whose Z or PhasedX part has a trace distance bound within rounding
+    # error of the tolerance, so the gate is kept or dropped depending on the
+    # last bits of the decomposition.
+    exponent = atol / 3.5 * (1 + offset * 1e-12)
+    circuit = cirq.Circuit.from_ops(
+        cirq.Z(a)**exponent,
+        cirq.X(b)**0.5,
+        cirq.Z(b)**exponent,
+        cirq.X(b)**-0.5,
+        cirq.CZ(a, b),
+        cirq.X(a)**(1 - exponent),
+        cirq.Z(a)**0.25,
+    )
+
+    def synth(q, matrix):
+        return [
+            gate(q)
+            for gate in cirq.single_qubit_matrix_to_phased_x_z(matrix,
+                                                               atol=atol)
+        ]
+
+    expected = circuit.copy()
+    cirq.MergeSingleQubitGates(synthesizer=synth).optimize_circuit(expected)
+    actual = circuit.copy()
+    cirq.merge_single_qubit_gates_into_phased_x_z(actual, atol=atol)
+    cirq.testing.assert_same_circuits(actual, expected)
+    # The offsets cover both sides of the threshold.
+    if abs(offset) == 4:
+        assert len(list(actual.all_operations())) == (4 if offset > 0 else 2)
@@ -0,0 +1,245 @@
+# Copyright 2019 The Cirq Developers
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     https://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Runs optimization passes to a fixpoint, revisiting only changed moments."""
+
+import collections
+import time
+import types
+from typing import (Any, Callable, Iterable, List, Optional, Sequence, Tuple)
+
+from cirq import circuits, ops
+
+# A half-open range of moment indices.
+_Interval = Tuple[int, int]
+
+
+class PassStats:
+    """How much work a pass managed by a `cirq.PassManager` did.
+
+    Attributes:
+        name: The name of the pass.
+        runs: The number of times the pass was run on (part of) a circuit.
+        seconds: The total time spent running the pass.
+        rewrites: The number of operations the pass removed or added, in
+            rounds whose changes were kept.
+    """
+
+    def __init__(self, name: str) -> None:
+        self.name = name
+        self.runs = 0
+        self.seconds = 0.0
+        self.rewrites = 0
+
+    def __repr__(self):
+        return ('cirq.PassStats(name={!r}, runs={!r}, seconds={!r}, '
+                'rewrites={!r})'.format(self.name, self.runs, self.seconds,
+                                        self.rewrites))
+
+
+class PassManager:
+    """Runs a sequence of optimization passes until none of them helps.
+
+    Each pass is a callable that modifies a circuit in place, such as the
+    `optimize_circuit` method of `cirq.EjectZ` or `cirq.MergeInteractions`.
+    Passes are run on contiguous ranges of moments, cut out of the circuit
+    and spliced back in afterwards, so they must preserve the effect of
+    whatever part of a circuit they're given (all of the optimizers in
+    `cirq.optimizers` do).
+
+    The first round runs every pass over the whole range being optimized.
+    After that, a pass is only run again on the moments that other passes
+    changed since it last ran (plus `context` moments on each side), until
+    no pass changes anything or `max_rounds` rounds have run. Because passes
+    can undo each other's work indefinitely (e.g. one expanding operations
+    that another one merges), the changes made by a round after the first
+    are only kept if they reduce the number of operations, or keep it and
+    reduce the number of moments; otherwise the circuit is restored to how
+    it was before the round and optimization stops. Optimizing a
+    circuit again after a small edit, by passing the edited range to
+    `optimize_circuit`, costs time proportional to the edit rather than to
+    the circuit.
+
+    Restricting passes to a range limits what they can see: an optimization
+    that needs operations from both sides of a range boundary won't happen
+    until a later change includes both sides in one range.
+
+    Attributes:
+        stats: A `cirq.PassStats` for each pass, accumulated over all the
+            circuits this manager has optimized.
+    """
+
+    def __init__(self,
+                 passes: Iterable[Callable[[circuits.Circuit], Any]],
+                 *,
+                 context: int = 1,
+                 max_rounds: int = 10) -> None:
+        """
+        Args:
+            passes: The optimization passes, in the order to run them. Each
+                is called with a circuit to modify in place.
+            context: How many moments around a changed range of moments are
+                also given to the passes revisiting it.
+            max_rounds: The maximum number of rounds of passes to run.
+        """
+        self.passes = list(passes)
+        self.context = context
+        self.max_rounds = max_rounds
+        self.stats = [PassStats(_pass_name(p)) for p in self.passes]
+
+    def __call__(self, circuit: circuits.Circuit) -> None:
+        self.optimize_circuit(circuit)
+
+    def optimize_circuit(self,
+                         circuit: circuits.Circuit,
+                         start: int = 0,
+                         end: Optional[int] = None) -> None:
+        """Optimizes (part of) a circuit in place.
+
+        Args:
+            circuit: The circuit to optimize.
+            start: The index of the first moment that needs optimizing.
+            end: The index after the last moment that needs optimizing.
+                Defaults to the end of the circuit.
+        """
+        if end is None:
+            end = len(circuit)
+        # The ranges each pass still has to look at.
+        pending = [[(start, end)] for _ in self.passes
+                  ]  # type: List[List[_Interval]]
+
+        for round_index in range(self.max_rounds):
+            if not any(pending):
+                return
+            snapshot = list(circuit)
+            rewrites = [0] * len(self.passes)
+            # The change in the number of operations and moments.
+            cost_change = [0, 0]
+
+            for i, optimize in enumerate(self.passes):
+                intervals = _merged_intervals(pending[i], len(circuit),
+                                              self.context)
+                pending[i] = []
+                # Going backwards keeps the earlier intervals' indices valid.
+                for s, e in reversed(intervals):
+                    change = self._run_pass(i, optimize, circuit, s, e)
+                    if change is None:
+                        continue
+                    before, after, prefix, suffix = change
+                    old_ops = [
+                        op for m in before[prefix:len(before) - suffix]
+                        for op in m
+                    ]
+                    new_ops = [
+                        op for m in after[prefix:len(after) - suffix]
+                        for op in m
+                    ]
+                    rewrites[i] += _count_rewrites(old_ops, new_ops)
+                    cost_change[0] += len(new_ops) - len(old_ops)
+                    cost_change[1] += len(after) - len(before)
+
+                    new_end = s + len(after)
+                    dirty = (s + prefix, new_end - suffix)
+                    for j, others in enumerate(pending):
+                        pending[j] = [
+                            _shifted(interval, s, e, new_end)
+                            for interval in others
+                        ]
+                        if j != i:
+                            pending[j].append(dirty)
+
+            # The first round does whatever the passes do, e.g. converting
+            # gates. Later rounds are only kept if they make things better,
+            # since passes may undo each other's work forever.
+            if round_index and tuple(cost_change) >= (0, 0):
+                circuit[:] = snapshot
+                return
+            for stats, count in zip(self.stats, rewrites):
+                stats.rewrites += count
+
+    def _run_pass(
+            self, index: int, optimize: Callable[[circuits.Circuit], Any],
+            circuit: circuits.Circuit, start: int, end: int
+    ) -> Optional[Tuple[List[ops.Moment], List[ops.Moment], int, int]]:
+        """Runs a pass on a range of moments and splices the result back in.
+
+        Returns:
+            None if the pass didn't change the range. Otherwise the moments
+            before and after the pass, and how many moments at their start
+            and end are the same.
+        """
+        stats = self.stats[index]
+        part = circuit[start:end]
+        before = list(part)
+        started = time.perf_counter()
+        optimize(part)
+        stats.seconds += time.perf_counter() - started
+        stats.runs += 1
+        after = list(part)
+
+        prefix = 0
+        while (prefix < min(len(before), len(after)) and
+               before[prefix] == after[prefix]):
+            prefix += 1
+        if prefix == len(before) == len(after):
+            return None
+        suffix = 0
+        while (suffix < min(len(before), len(after)) - prefix and
+               before[-1 - suffix] == after[-1 - suffix]):
+            suffix += 1
+
+        circuit[start:end] = after
+        return before, after, prefix, suffix
+
+
+def _pass_name(optimize: Callable[[circuits.Circuit], Any]) -> str:
+    if isinstance(optimize, types.MethodType):
+        return type(optimize.__self__).__name__
+    return getattr(optimize, '__name__', type(optimize).__name__)
+
+
+def _count_rewrites(before: Sequence[ops.Operation],
+                    after: Sequence[ops.Operation]) -> int:
+    """Counts the operations only in one of the given lists."""
+    old = collections.Counter(before)
+    new = collections.Counter(after)
+    return sum(((old - new) + (new - old)).values())
+
+
+def _merged_intervals(intervals: Iterable[_Interval], length: int,
+                      context: int) -> List[_Interval]:
+    """Widens intervals by the context and merges the ones that touch."""
+    merged = []  # type: List[_Interval]
+    for s, e in sorted(intervals):
+        s = max(s - context, 0)
+        e = min(e + context, length)
+        if s >= e:
+            continue
+        if merged and s <= merged[-1][1]:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], e))
+        else:
+            merged.append((s, e))
+    return merged
+
+
+def _shifted(interval: _Interval, start: int, old_end: int,
+             new_end: int) -> _Interval:
+    """Moves an interval to follow the replacement of a range of moments."""
+    s, e = interval
+    if e <= start:
+        return interval
+    delta = new_end - old_end
+    if s >= old_end:
+        return s + delta, e + delta
+    # The interval overlaps the replaced range, so it covers all of it.
+    return min(s, start), max(e + delta, new_end)
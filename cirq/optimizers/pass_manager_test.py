@@ -0,0 +1,185 @@
+# Copyright 2019 The Cirq Developers
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     https://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import cirq
+
+
+def _merge_rotations(circuit):
+    cirq.merge_single_qubit_gates_into_phased_x_z(circuit, 1e-8)
+
+
+def test_runs_passes_to_fixpoint():
+    a, b = cirq.LineQubit.range(2)
+    circuit = cirq.Circuit.from_ops(cirq.X(a),
+                                    cirq.X(a),
+                                    cirq.CZ(a, b),
+                                    cirq.Y(b)**0.5,
+                                    cirq.Y(b)**-0.5,
+                                    strategy=cirq.InsertStrategy.NEW)
+    original = circuit.copy()
+    manager = cirq.PassManager([
+        cirq.DropEmptyMoments(),
+        _merge_rotations,
+        cirq.DropNegligible().optimize_circuit,
+    ])
+
+    manager.optimize_circuit(circuit)
+
+    # Dropping the moments emptied by the later passes takes a second round.
+    assert circuit == cirq.Circuit([cirq.Moment([cirq.CZ(a, b)])])
+    cirq.testing.assert_circuits_with_terminal_measurements_are_equivalent(
+        circuit, original, atol=1e-8)
+    assert [s.name for s in manager.stats
+           ] == ['DropEmptyMoments', '_merge_rotations', 'DropNegligible']
+    assert [s.runs for s in manager.stats] == [2, 2, 2]
+    assert manager.stats[0].rewrites == 0
+    assert manager.stats[1].rewrites > 0
+    assert all(s.seconds >= 0 for s in manager.stats)
+
+
+def test_only_revisits_changed_moments():
+    qubits = cirq.LineQubit.range(4)
+    circuit = cirq.Circuit.from_ops(
+        [cirq.CZ(qubits[i % 3], qubits[i % 3 + 1]) for i in range(30)])
+    seen_lengths = []
+
+    def record(part):
+        seen_lengths.append(len(part))
+
+    manager = cirq.PassManager([record, _merge_rotations], context=1)
+    n = len(circuit)
+    manager.optimize_circuit(circuit)
+    assert seen_lengths == [n]
+    assert len(circuit) == n
+
+    del seen_lengths[:]
+    circuit.insert(10, [cirq.X(qubits[0]), cirq.X(qubits[0])],
+                   strategy=cirq.InsertStrategy.NEW)
+    manager.optimize_circuit(circuit, 10, 12)
+    # The cancelled rotations are revisited with a moment of context each
+    # side, and the moments they leave empty are kept.
+    assert seen_lengths == [4, 4]
+    assert len(circuit) == n + 2
+    assert len(list(circuit.all_operations())) == 30
+
+
+def test_call_optimizes_whole_circuit():
+    a = cirq.NamedQubit('a')
+    circuit = cirq.Circuit.from_ops(cirq.X(a), cirq.X(a))
+    manager = cirq.PassManager([_merge_rotations, cirq.DropEmptyMoments()])
+    manager(circuit)
+    assert circuit == cirq.Circuit()
+    assert [s.runs for s in manager.stats] == [1, 1]
+
+
+def test_shifts_pending_ranges_past_changed_moment_counts():
+    q = cirq.NamedQubit('q')
+    given_to_drop_y = []
+
+    def drop_y(circuit):
+        given_to_drop_y.append(list(circuit))
+        circuit[:] = [
+            m.without_operations_touching([q])
+            if m == cirq.Moment([cirq.Y(q)]) else m for m in circuit
+        ]
+
+    def merge_xx(circuit):
+        moments = list(circuit)
+        result = []
+        while moments:
+            if moments[:2] == [cirq.Moment([cirq.X(q)])] * 2:
+                result.append(cirq.Moment([cirq.Z(q)]))
+                moments = moments[2:]
+            else:
+                result.append(moments.pop(0))
+        circuit[:] = result
+
+    h = cirq.Moment([cirq.H(q)])
+    z = cirq.Moment([cirq.Z(q)])
+    for ops, expected, expected_given in [
+            # Merging the Xs at the end moves the moments after the Ys that
+            # were dropped at the start.
+        ([cirq.Y(q)] * 2 + [cirq.H(q)] * 4 + [cirq.X(q)] * 2, [h, h, h,
+                                                               h, z], [[h, z],
+                                                                       [h]]),
+            # Merging the Xs at the start moves the moments before the Ys
+            # that were dropped at the end.
+        ([cirq.X(q)] * 2 + [cirq.H(q)] * 4 + [cirq.Y(q)] * 2, [z, h, h,
+                                                               h, h], [[h],
+                                                                       [z, h]]),
+    ]:
+        circuit = cirq.Circuit.from_ops(ops, strategy=cirq.InsertStrategy.NEW)
+        del given_to_drop_y[:]
+        manager = cirq.PassManager([drop_y, cirq.DropEmptyMoments(), merge_xx])
+        manager.optimize_circuit(circuit)
+
+        assert circuit == cirq.Circuit(expected)
+        # The second round revisits the two ends separately, the later one
+        # first, each with a moment of context.
+        assert given_to_drop_y[1:] == expected_given
+
+
+def test_undoes_rounds_that_do_not_help():
+    q = cirq.NamedQubit('q')
+
+    def expand(circuit):
+        circuit[:] = [
+            moment for old in circuit
+            for moment in ([cirq.Moment([cirq.S(q)])] *
+                           2 if old == cirq.Moment([cirq.Z(q)]) else [old])
+        ]
+
+    def contract(circuit):
+        moments = list(circuit)
+        result = []
+        while moments:
+            if moments[:2] == [cirq.Moment([cirq.S(q)])] * 2:
+                result.append(cirq.Moment([cirq.Z(q)]))
+                moments = moments[2:]
+            else:
+                result.append(moments.pop(0))
+        circuit[:] = result
+
+    circuit = cirq.Circuit.from_ops(cirq.Z(q), cirq.X(q), cirq.S(q), cirq.S(q))
+    manager = cirq.PassManager([contract, expand])
+    manager.optimize_circuit(circuit)
+
+    # The passes keep undoing each other, but the first round is kept.
+    assert circuit == cirq.Circuit.from_ops(cirq.S(q), cirq.S(q), cirq.X(q),
+                                            cirq.S(q), cirq.S(q))
+    assert [s.runs for s in manager.stats] == [2, 2]
+    assert [s.rewrites for s in manager.stats] == [3, 6]
+
+
+def test_max_rounds():
+    a = cirq.NamedQubit('a')
+    circuit = cirq.Circuit.from_ops(cirq.X(a), cirq.X(a))
+    manager = cirq.PassManager([
+        cirq.DropEmptyMoments(), _merge_rotations,
+        cirq.DropNegligible().optimize_circuit
+    ],
+                               max_rounds=1)
+    manager.optimize_circuit(circuit)
+    assert circuit == cirq.Circuit([cirq.Moment(), cirq.Moment()])
+
+
+def test_pass_stats_repr():
+    stats = cirq.PassStats('EjectZ')
+    assert repr(stats) == ("cirq.PassStats(name='EjectZ', runs=0, "
+                           "seconds=0.0, rewrites=0)")
+    assert [
+        s.name for s in cirq.PassManager(
+            [cirq.EjectZ().optimize_circuit,
+             cirq.DropEmptyMoments(), repr]).stats
+    ] == ['EjectZ', 'DropEmptyMoments', 'repr']
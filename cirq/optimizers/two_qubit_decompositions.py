@@ -14,7 +14,9 @@
 
 """Utility methods related to optimizing quantum circuits."""
 
-from typing import Iterable, List, Tuple, Optional, cast
+import collections
+import threading
+from typing import Hashable, Iterable, List, Tuple, Optional, cast
 
 import numpy as np
 
@@ -58,6 +60,109 @@ def two_qubit_matrix_to_operations(q0: ops.Qid,
         return operations
 
 
+# A cached decomposition, and the qubits that its operations act on.
+_CacheEntry = Tuple[ops.Qid, ops.Qid, List[ops.Operation]]
+
+
+class TwoQubitDecompositionCache:
+    """Remembers the decompositions of recently seen two-qubit matrices.
+
+    Circuits tend to contain the same few two-qubit unitaries many times over
+    (e.g. every CNOT surrounded by the same single-qubit gates), and finding
+    the KAK decomposition of each one is expensive. This cache decomposes each
+    distinct matrix once, using `cirq.two_qubit_matrix_to_operations`, and
+    afterwards returns the same operations moved onto the requested qubits.
+
+    The cache may be used from several threads at once. A matrix that two
+    threads miss at the same time is decomposed by both.
+
+    Matrices are looked up up to global phase (which the decomposition
+    ignores anyway), with entries rounded to a multiple of the tolerance. So
+    a cached decomposition may differ from the requested matrix by about the
+    tolerance, on top of the error of the decomposition itself.
+
+    Attributes:
+        maxsize: The most decompositions to keep. The least recently used
+            one is forgotten to make room for a new one.
+        hits: How many lookups found a cached decomposition.
+        misses: How many lookups had to decompose the matrix.
+    """
+
+    def __init__(self, maxsize: int = 1024) -> None:
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._entries = collections.OrderedDict(
+        )  # type: collections.OrderedDict[Hashable, _CacheEntry]
+        self._lock = threading.Lock()
+
+    def two_qubit_matrix_to_operations(
+            self,
+            q0: ops.Qid,
+            q1: ops.Qid,
+            mat: np.ndarray,
+            allow_partial_czs: bool,
+            atol: float = 1e-8,
+            clean_operations: bool = True,
+    ) -> List[ops.Operation]:
+        """Decomposes a two-qubit operation into Z/XY/CZ gates.
+
+        Takes the same arguments, and returns the same kind of result, as
+        `cirq.two_qubit_matrix_to_operations`.
+        """
+        key = (_matrix_key(mat,
+                           atol), allow_partial_czs, atol, clean_operations)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+                self._entries.move_to_end(key)
+        if entry is None:
+            operations = two_qubit_matrix_to_operations(q0, q1, mat,
+                                                        allow_partial_czs, atol,
+                                                        clean_operations)
+            if self.maxsize > 0:
+                with self._lock:
+                    if (key not in self._entries and
+                            len(self._entries) >= self.maxsize):
+                        self._entries.popitem(last=False)
+                    self._entries[key] = (q0, q1, operations)
+            return list(operations)
+
+        c0, c1, operations = entry
+        if (c0, c1) == (q0, q1):
+            return list(operations)
+        qubit_map = {c0: q0, c1: q1}
+        return [op.transform_qubits(qubit_map.__getitem__) for op in operations]
+
+    def clear(self) -> None:
+        """Forgets all cached decompositions and resets the statistics."""
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __repr__(self):
+        return 'cirq.TwoQubitDecompositionCache(maxsize={!r})'.format(
+            self.maxsize)
+
+
+def _matrix_key(mat: np.ndarray, atol: float) -> bytes:
+    """Quantizes a matrix, with its global phase removed, into a dict key."""
+    flat = np.asarray(mat, dtype=np.complex128).ravel()
+    # Every column of a unitary has an entry of magnitude at least 1/2, so
+    # the first entry above 1/4 is far enough from zero to fix the phase by.
+    pivot = flat[np.argmax(np.abs(flat) > 0.25)]
+    normalized = flat * (abs(pivot) / pivot) if pivot else flat
+    return np.round(normalized.view(np.float64) / atol).astype(
+        np.int64).tobytes()
+
+
 def _xx_interaction_via_full_czs(q0: ops.Qid,
                                  q1: ops.Qid,
                                  x: float):
@@ -14,6 +14,7 @@
 
 import cmath
 import random
+import threading
 
 import numpy as np
 import pytest
@@ -266,3 +267,78 @@ def test_kak_decomposition_depth_partial_cz():
     c = cirq.Circuit.from_ops(operations_with_part)
     # 1 CP, 1+1 PhasedX, 1 Z
     assert len(c) <= 4
+
+
+def test_decomposition_cache():
+    a, b, c = cirq.LineQubit.range(3)
+    cache = cirq.TwoQubitDecompositionCache(maxsize=2)
+    u = cirq.testing.random_unitary(4)
+
+    first = cache.two_qubit_matrix_to_operations(a, b, u, True)
+    assert first == cirq.two_qubit_matrix_to_operations(a, b, u, True)
+    assert (cache.hits, cache.misses, len(cache)) == (0, 1, 1)
+
+    # Hits move the cached operations onto the requested qubits, and ignore
+    # global phase.
+    assert cache.two_qubit_matrix_to_operations(a, b, u, True) == first
+    moved = cache.two_qubit_matrix_to_operations(c, a, u * 1j, True)
+    assert moved == [
+        op.transform_qubits({
+            a: c,
+            b: a
+        }.__getitem__) for op in first
+    ]
+    assert_ops_implement_unitary(c, a, moved, u)
+    assert (cache.hits, cache.misses) == (2, 1)
+
+    # Different options are cached separately.
+    cache.two_qubit_matrix_to_operations(a, b, u, False)
+    assert (cache.hits, cache.misses, len(cache)) == (2, 2, 2)
+
+    # The least recently used decomposition is forgotten first.
+    cache.two_qubit_matrix_to_operations(a, b, u, True)
+    cache.two_qubit_matrix_to_operations(a, b, cirq.unitary(cirq.CNOT), True)
+    assert len(cache) == 2
+    cache.two_qubit_matrix_to_operations(a, b, u, True)
+    assert (cache.hits, cache.misses) == (4, 3)
+    cache.two_qubit_matrix_to_operations(a, b, u, False)
+    assert (cache.hits, cache.misses) == (4, 4)
+
+    cache.clear()
+    assert (cache.hits, cache.misses, len(cache)) == (0, 0, 0)
+    assert repr(cache) == 'cirq.TwoQubitDecompositionCache(maxsize=2)'
+
+
+def test_decomposition_cache_disabled():
+    a, b = cirq.LineQubit.range(2)
+    cache = cirq.TwoQubitDecompositionCache(maxsize=0)
+    for _ in range(2):
+        cache.two_qubit_matrix_to_operations(a, b, cirq.unitary(cirq.CNOT),
+                                             True)
+    assert (cache.hits, cache.misses, len(cache)) == (0, 2, 0)
+
+
+def test_decomposition_cache_from_several_threads():
+    a, b = cirq.LineQubit.range(2)
+    cache = cirq.TwoQubitDecompositionCache(maxsize=2)
+    unitaries = [cirq.testing.random_unitary(4) for _ in range(3)]
+    errors = []
+
+    def work():
+        try:
+            for _ in range(10):
+                for u in unitaries:
+                    operations = cache.two_qubit_matrix_to_operations(
+                        a, b, u, True)
+                    assert_ops_implement_unitary(a, b, operations, u)
+        except Exception as e:  # coverage: ignore
+            errors.append(e)
+
+    threads = [threading.Thread(target=work) for _ in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert errors == []
+    assert cache.hits + cache.misses == 4 * 10 * 3
+    assert len(cache) == 2
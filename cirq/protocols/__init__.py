@@ -14,6 +14,7 @@
 
 
 from cirq.protocols.apply_unitary import (
+    apply_diagonal,
     apply_unitary,
     ApplyUnitaryArgs,
     SupportsApplyUnitary,
@@ -99,3 +100,7 @@ from cirq.protocols.unitary import (
     SupportsUnitary,
     unitary,
 )
+from cirq.protocols.unitary_diagonal import (
+    SupportsUnitaryDiagonal,
+    unitary_diagonal,
+)
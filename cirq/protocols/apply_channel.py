@@ -14,7 +14,8 @@
 
 """A protocol for implementing high performance channel evolutions."""
 
-from typing import Any, Iterable, Optional, Sequence, TypeVar, Tuple, Union
+from typing import (Any, Dict, Iterable, Optional, Sequence, TypeVar, Tuple,
+                    Union)
 
 import numpy as np
 from typing_extensions import Protocol
@@ -252,11 +253,14 @@ def _apply_unitary(val: Any, args: 'ApplyChannelArgs') -> Optional[np.ndarray]:
     left_result = apply_unitary(val, left_args, None)
     if left_result is None:
         return None
-    right_args = ApplyUnitaryArgs(
-            target_tensor=np.conjugate(left_result),
-            available_buffer=args.out_buffer,
-            axes=args.right_axes)
+    np.conjugate(left_result, out=args.auxiliary_buffer1)
+    right_args = ApplyUnitaryArgs(target_tensor=args.auxiliary_buffer1,
+                                  available_buffer=args.out_buffer,
+                                  axes=args.right_axes)
     right_result = apply_unitary(val, right_args)
+    if right_result is args.auxiliary_buffer1:
+        # The unitary was applied inline, so the target tensor is free.
+        return np.conjugate(right_result, out=args.target_tensor)
     np.conjugate(right_result, out=right_result)
     return right_result
 
@@ -264,6 +268,10 @@ def _apply_unitary(val: Any, args: 'ApplyChannelArgs') -> Optional[np.ndarray]:
 def _apply_krauss(krauss: Union[Tuple[np.ndarray], Sequence[Any]],
         args: 'ApplyChannelArgs') -> np.ndarray:
     """Directly apply the kraus operators to the target tensor."""
+    result = _apply_krauss_elementwise(krauss, args)
+    if result is not None:
+        return result
+
     # Initialize output.
     args.out_buffer[:] = 0
     # Stash initial state into buffer0.
@@ -276,6 +284,67 @@ def _apply_krauss(krauss: Union[Tuple[np.ndarray], Sequence[Any]],
     return _apply_krauss_multi_qubit(krauss, args)
 
 
+def _apply_krauss_elementwise(krauss: Union[Tuple[Any], Sequence[Any]],
+                              args: 'ApplyChannelArgs') -> Optional[np.ndarray]:
+    r"""Applies channels that map basis states to basis states elementwise.
+
+    Each krauss operator A must be of the form D X where D is diagonal and X
+    flips a fixed subset of the qubits, which is the case for e.g. Pauli,
+    dephasing and amplitude damping channels. As
+        $$
+        (D X \rho X^\dagger D^\dagger)_{ab}
+            = d_a d_b^* \rho_{a \oplus x, b \oplus x},
+        $$
+    the krauss operators with the same flips are summed into a single factor
+    that multiplies the correspondingly flipped target tensor elementwise.
+
+    Returns None if the krauss operators are not of this form.
+    """
+    num_qubits = len(args.left_axes)
+    basis = np.arange(1 << num_qubits)
+    factors = {}  # type: Dict[int, np.ndarray]
+    for krauss_op in krauss:
+        krauss_op = np.asarray(krauss_op)
+        rows, cols = np.nonzero(krauss_op)
+        if len(rows) == 0:
+            continue
+        flips = rows ^ cols
+        if np.any(flips != flips[0]):
+            return None
+        flip = int(flips[0])
+        diagonal = krauss_op[basis, basis ^ flip]
+        factors[flip] = (factors.get(flip, 0) +
+                         np.outer(diagonal, np.conjugate(diagonal)))
+
+    # Shape the factors so that they broadcast against the target tensor.
+    axes = args.left_axes + args.right_axes
+    shape = [1] * args.target_tensor.ndim
+    for axis in axes:
+        shape[axis] = 2
+    order = np.argsort(axes)
+
+    def broadcastable(factor: np.ndarray) -> np.ndarray:
+        factor = np.reshape(factor, (2,) * 2 * num_qubits)
+        return np.reshape(np.transpose(factor, order), shape)
+
+    if list(factors) == [0]:
+        args.target_tensor *= broadcastable(factors[0])
+        return args.target_tensor
+
+    args.out_buffer[...] = 0
+    for flip, factor in factors.items():
+        flipped = [slice(None)] * args.target_tensor.ndim
+        for i in range(num_qubits):
+            if flip & (1 << (num_qubits - 1 - i)):
+                flipped[args.left_axes[i]] = slice(None, None, -1)
+                flipped[args.right_axes[i]] = slice(None, None, -1)
+        np.multiply(args.target_tensor[tuple(flipped)],
+                    broadcastable(factor),
+                    out=args.auxiliary_buffer0)
+        args.out_buffer += args.auxiliary_buffer0
+    return args.out_buffer
+
+
 def _apply_krauss_single_qubit(krauss: Union[Tuple[Any], Sequence[Any]],
         args: 'ApplyChannelArgs') -> np.ndarray:
     """Use slicing to apply single qubit channel."""
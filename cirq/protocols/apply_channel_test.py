@@ -207,6 +207,40 @@ def test_apply_channel_channel_fallback_two_qubit_random():
         np.testing.assert_almost_equal(result, expected)
 
 
+# Diagonal channels are applied inline, others write into the out buffer.
+@pytest.mark.parametrize('channel,indices,result_is_out_buf', [
+    (cirq.depolarize(0.1), [1], True),
+    (cirq.asymmetric_depolarize(0.1, 0.2, 0.05), [2], True),
+    (cirq.phase_damp(0.3), [0], False),
+    (cirq.amplitude_damp(0.3), [1], True),
+    (cirq.generalized_amplitude_damp(0.2, 0.3), [2], True),
+    (cirq.CNOT, [2, 0], True),
+    (cirq.CZ**0.3, [1, 2], False),
+])
+def test_apply_channel_elementwise(channel, indices, result_is_out_buf):
+    state = cirq.testing.random_superposition(8)
+    rho = np.reshape(np.outer(state, np.conjugate(state)), (2,) * 6)
+    right_indices = [i + 3 for i in indices]
+
+    expected = np.zeros_like(rho)
+    for krauss in cirq.channel(channel):
+        krauss_tensor = np.reshape(krauss, (2,) * 2 * len(indices))
+        expected += cirq.targeted_conjugate_about(krauss_tensor, rho, indices,
+                                                  right_indices)
+
+    class HasChannel():
+
+        def _channel_(self):
+            return cirq.channel(channel)
+
+    result = apply_channel(HasChannel(),
+                           rho.copy(),
+                           indices,
+                           right_indices,
+                           assert_result_is_out_buf=result_is_out_buf)
+    np.testing.assert_almost_equal(result, expected)
+
+
 def test_apply_channel_no_protocols_implemented():
     class NoProtocols:
         pass
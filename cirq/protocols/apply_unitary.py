@@ -22,6 +22,7 @@ from typing_extensions import Protocol
 
 from cirq import linalg
 from cirq.protocols.unitary import unitary
+from cirq.protocols.unitary_diagonal import unitary_diagonal
 from cirq.type_workarounds import NotImplementedType
 
 
@@ -166,6 +167,8 @@ def apply_unitary(unitary_value: Any,
 
     If `unitary_value` defines an `_apply_unitary_` method, that method will be
     used to apply `unitary_value`'s unitary effect to the target tensor.
+    Otherwise, if `unitary_value` defines a `_unitary_diagonal_` method, the
+    target tensor is multiplied in place by the diagonal of its unitary.
     Otherwise, if `unitary_value` defines a `_unitary_` method, its unitary
     matrix will be retrieved and applied using a generic method. Otherwise the
     application fails, and either an exception is raised or the specified
@@ -209,6 +212,11 @@ def apply_unitary(unitary_value: Any,
         if result is not NotImplemented and result is not None:
             return result
 
+    # Diagonal unitaries only multiply each amplitude by a phase.
+    diagonal = unitary_diagonal(unitary_value, None)
+    if diagonal is not None:
+        return apply_diagonal(diagonal, args)
+
     # Fallback to using the object's _unitary_ matrix.
     matrix = unitary(unitary_value, None)
     if matrix is not None:
@@ -236,3 +244,48 @@ def apply_unitary(unitary_value: Any,
         "object of type '{}' has no _apply_unitary_ or _unitary_ methods "
         "(or they returned None or NotImplemented).".format(
             type(unitary_value)))
+
+
+def apply_diagonal(diagonal: np.ndarray, args: ApplyUnitaryArgs) -> np.ndarray:
+    """Left-multiplies the target tensor in place by a diagonal unitary.
+
+    Args:
+        diagonal: The diagonal of the unitary, ordered like the rows of the
+            unitary matrix acting on `args.axes`.
+        args: The target tensor and the axes to apply the unitary to. The
+            available buffer isn't used.
+
+    Returns:
+        `args.target_tensor`, which has been multiplied in place.
+    """
+    n = len(args.axes)
+    diagonal = np.asarray(diagonal)
+    nontrivial = np.flatnonzero(diagonal != 1)
+    if 2 * len(nontrivial) <= len(diagonal):
+        # Only touch the parts of the tensor whose phase changes.
+        for k in nontrivial:
+            little_endian = sum(
+                1 << i for i in range(n) if k & (1 << (n - 1 - i)))
+            args.target_tensor[args.subspace_index(little_endian)] *= (
+                diagonal[k])
+        return args.target_tensor
+
+    # Multiply the whole tensor at once by the phases broadcast over the
+    # other axes.
+    ndim = args.target_tensor.ndim
+    order = np.argsort(args.axes)
+    shape = [1] * ndim
+    for axis in args.axes:
+        shape[axis] = 2
+    phases = np.reshape(
+        np.transpose(
+            np.reshape(diagonal.astype(args.target_tensor.dtype), (2,) * n),
+            order), shape)
+    # Numpy's inner loop runs over the innermost axes that aren't broadcast,
+    # so it is much faster when the phases are dense over the last few axes.
+    window = min(ndim, 8)
+    if max(args.axes) >= ndim - window:
+        phases = np.array(
+            np.broadcast_to(phases, shape[:ndim - window] + [2] * window))
+    args.target_tensor *= phases
+    return args.target_tensor
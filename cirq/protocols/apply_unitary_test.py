@@ -47,6 +47,11 @@ def test_apply_unitary_presence_absence():
             args.available_buffer[one] = -args.target_tensor[one]
             return args.available_buffer
 
+    class HasUnitaryDiagonal:
+
+        def _unitary_diagonal_(self) -> np.ndarray:
+            return np.diag(m)
+
     class HasApplyMutateInline:
         def _apply_unitary_(self, args: cirq.ApplyUnitaryArgs) -> np.ndarray:
             one = args.subspace_index(1)
@@ -62,6 +67,7 @@ def test_apply_unitary_presence_absence():
         HasApplyReturnsNotImplementedButHasUnitary(),
         HasApplyOutputInBuffer(),
         HasApplyMutateInline(),
+        HasUnitaryDiagonal(),
     ]
 
     def make_input():
@@ -103,3 +109,22 @@ def test_apply_unitary_presence_absence():
             s,
             cirq.ApplyUnitaryArgs(make_input(), buf, [0]),
             default=None) is not None
+
+
+@pytest.mark.parametrize('axes',
+                         [[0], [5], [3, 1], [0, 9], [9, 2, 7], [8, 4, 9, 0]])
+def test_apply_diagonal(axes):
+    n = len(axes)
+    state = cirq.testing.random_superposition(1 << 10).astype(np.complex64)
+    state.shape = (2,) * 10
+    for diagonal in [
+            np.exp(1j * np.arange(1 << n)),
+            np.concatenate([np.ones((1 << n) - 1), [1j]]),
+    ]:
+        expected = cirq.targeted_left_multiply(
+            np.diag(diagonal).reshape((2,) * (2 * n)), state, axes)
+        target = state.copy()
+        result = cirq.apply_diagonal(diagonal,
+                                     cirq.ApplyUnitaryArgs(target, None, axes))
+        assert result is target
+        np.testing.assert_allclose(result, expected, atol=1e-6)
@@ -0,0 +1,87 @@
+# Copyright 2019 The Cirq Developers
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     https://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from typing import Any, TypeVar, Union
+
+import numpy as np
+from typing_extensions import Protocol
+
+from cirq.type_workarounds import NotImplementedType
+
+# This is a special indicator value used by the unitary_diagonal method to
+# determine whether or not the caller provided a 'default' argument. It is
+# checked for using `is`.
+RaiseTypeErrorIfNotProvided = np.array([])  # type: np.ndarray
+
+TDefault = TypeVar('TDefault')
+
+
+class SupportsUnitaryDiagonal(Protocol):
+    """An object whose unitary matrix may be diagonal."""
+
+    def _unitary_diagonal_(self) -> Union[np.ndarray, NotImplementedType]:
+        """The diagonal of this value's unitary matrix, if it is diagonal.
+
+        This method is used by the global `cirq.unitary_diagonal` method, and
+        lets `cirq.apply_unitary` (and simulators) apply the unitary effect as
+        an elementwise multiplication by phases instead of a general matrix
+        multiplication. If this method is not present, or returns
+        NotImplemented, the value is treated as not being known to have a
+        diagonal unitary. (Returning NotImplemented is useful when a class
+        only sometimes has a diagonal unitary, e.g. cirq.Z**c does but
+        cirq.X**c and cirq.Z**sympy.Symbol('a') don't.)
+
+        The order of the entries matches the order of the rows of the value's
+        unitary matrix, as returned by `cirq.unitary`.
+
+        Returns:
+            A one dimensional array with the diagonal of the unitary matrix
+            describing this value, or NotImplemented if the value's unitary
+            isn't known to be diagonal.
+        """
+
+
+def unitary_diagonal(val: Any, default: TDefault = RaiseTypeErrorIfNotProvided
+                    ) -> Union[np.ndarray, TDefault]:
+    """Returns the diagonal of the given value's unitary, if it is diagonal.
+
+    Args:
+        val: The value whose unitary's diagonal should be returned.
+        default: Determines the fallback behavior when `val` isn't known to
+            have a diagonal unitary. If `default` is not set, a TypeError is
+            raised. If default is set to a value, that value is returned.
+
+    Returns:
+        If `val` has a _unitary_diagonal_ method and its result is not
+        NotImplemented, that result is returned. Otherwise, if a default value
+        was specified, the default value is returned.
+
+    Raises:
+        TypeError: `val` doesn't have a _unitary_diagonal_ method (or that
+            method returned NotImplemented) and also no default value was
+            specified.
+    """
+    getter = getattr(val, '_unitary_diagonal_', None)
+    result = NotImplemented if getter is None else getter()
+    if result is not NotImplemented:
+        return result
+
+    if default is not RaiseTypeErrorIfNotProvided:
+        return default
+
+    if getter is None:
+        raise TypeError("object of type '{}' "
+                        "has no _unitary_diagonal_ method.".format(type(val)))
+    raise TypeError("object of type '{}' does have a _unitary_diagonal_ "
+                    "method, but it returned NotImplemented.".format(type(val)))
@@ -0,0 +1,78 @@
+# Copyright 2019 The Cirq Developers
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     https://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import numpy as np
+import pytest
+import sympy
+
+import cirq
+
+
+def test_unitary_diagonal():
+    d = np.array([1, 1j])
+
+    class NoMethod:
+        pass
+
+    class ReturnsNotImplemented:
+
+        def _unitary_diagonal_(self):
+            return NotImplemented
+
+    class ReturnsDiagonal:
+
+        def _unitary_diagonal_(self):
+            return d
+
+    with pytest.raises(TypeError, match='no _unitary_diagonal_ method'):
+        _ = cirq.unitary_diagonal(NoMethod())
+    with pytest.raises(TypeError, match='returned NotImplemented'):
+        _ = cirq.unitary_diagonal(ReturnsNotImplemented())
+    assert cirq.unitary_diagonal(NoMethod(), None) is None
+    assert cirq.unitary_diagonal(ReturnsNotImplemented(), 5) == 5
+    assert cirq.unitary_diagonal(ReturnsDiagonal()) is d
+    assert cirq.unitary_diagonal(ReturnsDiagonal(), None) is d
+
+
+@pytest.mark.parametrize('val', [
+    cirq.Z**0.3,
+    cirq.Rz(0.5),
+    cirq.S,
+    cirq.CZ**-0.7,
+    cirq.CCZ**0.2,
+    cirq.ZZ**0.4,
+    cirq.IdentityGate(2),
+    cirq.ControlledGate(cirq.Z**0.1, num_controls=2),
+    (cirq.CZ**0.5)(cirq.LineQubit(0), cirq.LineQubit(1)),
+    cirq.ControlledOperation([cirq.LineQubit(0)],
+                             cirq.ZZ(cirq.LineQubit(1), cirq.LineQubit(2))),
+])
+def test_diagonal_gates(val):
+    np.testing.assert_allclose(np.diag(cirq.unitary_diagonal(val)),
+                               cirq.unitary(val),
+                               atol=1e-8)
+
+
+@pytest.mark.parametrize('val', [
+    cirq.X,
+    cirq.H,
+    cirq.CNOT,
+    cirq.XX**0.5,
+    cirq.Z**sympy.Symbol('a'),
+    cirq.ControlledGate(cirq.X),
+    cirq.ControlledOperation([cirq.LineQubit(0)], cirq.Y(cirq.LineQubit(1))),
+    cirq.measure(cirq.LineQubit(0)),
+])
+def test_non_diagonal_gates(val):
+    assert cirq.unitary_diagonal(val, None) is None
@@ -14,6 +14,14 @@
 
 """Base simulation classes and generic simulators."""
 
+from cirq.sim.clifford_simulator import (
+    CliffordSimulator,
+    CliffordSimulatorStepResult,
+)
+
+from cirq.sim.clifford_tableau import (
+    CliffordTableau,)
+
 from cirq.sim.density_matrix_utils import (
     measure_density_matrix,
     sample_density_matrix,
@@ -48,6 +56,9 @@ from cirq.sim.sparse_simulator import (
     SparseSimulatorStep,
 )
 
+from cirq.sim.trajectory_simulator import (
+    TrajectorySimulator,)
+
 from cirq.sim.wave_function_simulator import (
     SimulatesIntermediateWaveFunction,
     WaveFunctionSimulatorState,
@@ -0,0 +1,256 @@
+# Copyright 2019 The Cirq Developers
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     https://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Simulator for Clifford circuits using stabilizer tableaux."""
+
+import collections
+
+from typing import Any, Dict, Iterator, List, Union
+
+import numpy as np
+
+from cirq import circuits, ops, protocols, study, value
+from cirq.sim import clifford_tableau, simulation_plan, simulator
+
+# Operations on more qubits than this are decomposed before simulation.
+_MAX_GATE_QUBITS = 3
+
+
+class CliffordSimulator(simulator.SimulatesSamples,
+                        simulator.SimulatesIntermediateState):
+    """A simulator for Clifford circuits, using stabilizer tableaux.
+
+    The state of a circuit made of Clifford gates (e.g. H, S, CNOT, CZ, the
+    Paulis, `cirq.SingleQubitCliffordGate` and `cirq.PauliInteractionGate`)
+    and measurements in the computational basis is a stabilizer state, which
+    is stored as a `cirq.CliffordTableau`. Simulating a gate then takes time
+    linear in the number of qubits and a measurement at most quadratic, so
+    circuits on hundreds or thousands of qubits can be simulated.
+
+    Any operation with a unitary on at most three qubits that maps Pauli
+    operators to Pauli operators is supported (whatever its type), as are
+    mixtures of such unitaries (e.g. `cirq.depolarize`) and operations that
+    decompose into supported operations. Simulating any other operation
+    raises an error.
+
+    Like `cirq.Simulator` this supports `run`, `run_sweep`, `simulate` and
+    `simulate_moment_steps`. The simulator state is a `cirq.CliffordTableau`,
+    and the initial state of a simulation must be a computational basis
+    state, given as an int (or a `cirq.CliffordTableau`).
+
+        simulator = cirq.CliffordSimulator()
+        result = simulator.run(circuit, repetitions=1000)
+    """
+
+    def __init__(self, *, seed: value.RANDOM_STATE_OR_SEED_LIKE = None):
+        """A Clifford simulator.
+
+        Args:
+            seed: The seed or `np.random.RandomState` used for measurements
+                and mixtures. Defaults to numpy's global random state.
+        """
+        self._prng = value.parse_random_state(seed)
+        self._plans = simulation_plan.SimulationPlanCache()
+
+    def _run(self, circuit: circuits.Circuit,
+             param_resolver: study.ParamResolver,
+             repetitions: int) -> Dict[str, np.ndarray]:
+        """See definition in `cirq.SimulatesSamples`."""
+        param_resolver = param_resolver or study.ParamResolver({})
+        plan = self._plans.get(
+            circuit, lambda: self._plan(circuit, ops.QubitOrder.DEFAULT))
+
+        def is_stochastic(op: ops.Operation) -> bool:
+            return protocols.is_measurement(op) or (
+                not protocols.has_unitary(op) and protocols.has_mixture(op))
+
+        if circuit.are_all_matches_terminal(is_stochastic):
+            for step_result in self._base_iterator(plan,
+                                                   param_resolver,
+                                                   initial_state=0,
+                                                   perform_measurements=False):
+                pass
+            # Terminal mixtures don't change the measurement results.
+            return step_result.sample_measurement_ops(plan.measurement_ops,
+                                                      repetitions)
+
+        measurements = {}  # type: Dict[str, List[np.ndarray]]
+        for _ in range(repetitions):
+            for step_result in self._base_iterator(plan,
+                                                   param_resolver,
+                                                   initial_state=0):
+                for k, v in step_result.measurements.items():
+                    measurements.setdefault(k,
+                                            []).append(np.array(v, dtype=bool))
+        return {k: np.array(v) for k, v in measurements.items()}
+
+    def _plan(self, circuit: circuits.Circuit, qubit_order: ops.QubitOrderOrList
+             ) -> simulation_plan.SimulationPlan:
+        """Decomposes a circuit into measurements and small operations."""
+
+        def on_stuck(bad_op: ops.Operation):
+            return TypeError(
+                "Can't simulate operations that aren't measurements, don't "
+                "have a unitary or mixture on at most {} qubits and can't be "
+                "decomposed: {!r}".format(_MAX_GATE_QUBITS, bad_op))
+
+        def keep(potential_op: ops.Operation) -> bool:
+            return (protocols.is_measurement(potential_op) or
+                    (len(potential_op.qubits) <= _MAX_GATE_QUBITS and
+                     (protocols.has_unitary(potential_op) or
+                      protocols.has_mixture(potential_op))))
+
+        non_display_moments = ([
+            op
+            for op in moment
+            if not isinstance(op, (ops.SamplesDisplay, ops.WaveFunctionDisplay,
+                                   ops.DensityMatrixDisplay))
+        ]
+                               for moment in circuit)
+        return simulation_plan.SimulationPlan(circuit,
+                                              qubit_order,
+                                              keep=keep,
+                                              on_stuck_raise=on_stuck,
+                                              moments=non_display_moments)
+
+    def _simulator_iterator(
+            self,
+            circuit: circuits.Circuit,
+            param_resolver: study.ParamResolver,
+            qubit_order: ops.QubitOrderOrList,
+            initial_state: Union[int, clifford_tableau.CliffordTableau],
+    ) -> Iterator:
+        """See definition in `cirq.SimulatesIntermediateState`."""
+        param_resolver = param_resolver or study.ParamResolver({})
+        actual_initial_state = 0 if initial_state is None else initial_state
+        return self._base_iterator(self._plan(circuit, qubit_order),
+                                   param_resolver, actual_initial_state)
+
+    def _base_iterator(
+            self,
+            plan: simulation_plan.SimulationPlan,
+            param_resolver: study.ParamResolver,
+            initial_state: Union[int, clifford_tableau.CliffordTableau],
+            perform_measurements: bool = True,
+    ) -> Iterator:
+        """Iterates over the steps of a simulation of the circuit."""
+        if isinstance(initial_state, clifford_tableau.CliffordTableau):
+            if initial_state.num_qubits != plan.num_qubits:
+                raise ValueError(
+                    'initial state has {} qubits but expected {}'.format(
+                        initial_state.num_qubits, plan.num_qubits))
+            tableau = initial_state.copy()
+        elif isinstance(initial_state, (int, np.integer)):
+            tableau = clifford_tableau.CliffordTableau(plan.num_qubits,
+                                                       int(initial_state))
+        else:
+            raise TypeError(
+                'initial_state must be an int or a cirq.CliffordTableau, '
+                'not {!r}'.format(initial_state))
+        if len(plan) == 0:
+            yield CliffordSimulatorStepResult(tableau, {}, plan.qubit_map,
+                                              self._prng)
+
+        for moment in plan.resolved_moments(param_resolver):
+            measurements = collections.defaultdict(
+                list)  # type: Dict[str, List[bool]]
+            for op, indices in moment:
+                if protocols.has_unitary(op):
+                    tableau.apply(self._action(op, protocols.unitary(op)),
+                                  indices)
+                elif protocols.is_measurement(op):
+                    meas = ops.op_gate_of_type(op, ops.MeasurementGate)
+                    if meas is None:
+                        raise ValueError(
+                            'CliffordSimulator can only simulate measurements '
+                            'in the computational basis, but {!r} is not a '
+                            'cirq.MeasurementGate.'.format(op))
+                    if perform_measurements:
+                        invert_mask = meas.invert_mask or len(indices) * (
+                            False,)
+                        bits = [tableau.measure(i, self._prng) for i in indices]
+                        measurements[protocols.measurement_key(meas)].extend(
+                            bit ^ mask for bit, mask in zip(bits, invert_mask))
+                else:
+                    probs, unitaries = zip(*protocols.mixture(op))
+                    index = self._prng.choice(len(unitaries), p=probs)
+                    tableau.apply(self._action(op, unitaries[index]), indices)
+            yield CliffordSimulatorStepResult(tableau, measurements,
+                                              plan.qubit_map, self._prng)
+
+    def _action(self, op: ops.Operation,
+                matrix: np.ndarray) -> clifford_tableau.PauliAction:
+        action = clifford_tableau.pauli_action(matrix)
+        if action is None:
+            raise ValueError(
+                'CliffordSimulator can only simulate Clifford operations, '
+                'but {!r} is not a Clifford operation.'.format(op))
+        return action
+
+
+class CliffordSimulatorStepResult(simulator.StepResult):
+    """A single step in the simulation of the CliffordSimulator.
+
+    Attributes:
+        qubit_map: A map from the Qubits in the Circuit to the the index
+            of this qubit in the tableau.
+        measurements: A dictionary from measurement gate key to measurement
+            results, ordered by the qubits that the measurement operates on.
+    """
+
+    def __init__(self,
+                 tableau: clifford_tableau.CliffordTableau,
+                 measurements: Dict[str, List[bool]],
+                 qubit_map: Dict[ops.Qid, int],
+                 seed: value.RANDOM_STATE_OR_SEED_LIKE = None) -> None:
+        """CliffordSimulatorStepResult.
+
+        Args:
+            tableau: The state at this step. Can be mutated.
+            measurements: The measurements for this step of the simulation.
+            qubit_map: A map from qid to the index of the qubit in the
+                tableau.
+            seed: The seed or `np.random.RandomState` used for sampling.
+        """
+        super().__init__(measurements)
+        self._tableau = tableau
+        self.qubit_map = qubit_map
+        self._prng = value.parse_random_state(seed)
+
+    def simulator_state(self) -> clifford_tableau.CliffordTableau:
+        return self._tableau
+
+    def stabilizers(self) -> List[ops.PauliString]:
+        """Returns the Pauli strings that stabilize the state at this step."""
+        qubits = sorted(self.qubit_map, key=self.qubit_map.__getitem__)
+        paulis = {'X': ops.X, 'Y': ops.Y, 'Z': ops.Z}  # type: Dict[str, Any]
+        return [
+            ops.PauliString(
+                {q: paulis[p]
+                 for q, p in zip(qubits, row)
+                 if p != 'I'}, -1 if negative else 1)
+            for negative, row in self._tableau.stabilizers()
+        ]
+
+    def state_vector(self) -> np.ndarray:
+        """Returns the wave function at this step (up to a global phase).
+
+        The qubits are ordered by `qubit_map` in big endian order, as for
+        `cirq.SparseSimulatorStep.state_vector`. This takes time and memory
+        exponential in the number of qubits.
+        """
+        return self._tableau.state_vector()
+
+    def sample(self, qubits: List[ops.Qid], repetitions: int = 1) -> np.ndarray:
+        indices = [self.qubit_map[q] for q in qubits]
+        return self._tableau.sample(indices, repetitions, self._prng)
@@ -0,0 +1,226 @@
+# Copyright 2019 The Cirq Developers
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     https://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import numpy as np
+import pytest
+import sympy
+
+import cirq
+
+
+def test_run_bit_flips():
+    q0, q1 = cirq.LineQubit.range(2)
+    simulator = cirq.CliffordSimulator()
+    for b0 in [0, 1]:
+        for b1 in [0, 1]:
+            circuit = cirq.Circuit.from_ops((cirq.X**b0)(q0), (cirq.X**b1)(q1),
+                                            cirq.measure(q0), cirq.measure(q1))
+            result = simulator.run(circuit, repetitions=3)
+            np.testing.assert_equal(result.measurements, {
+                '0': [[b0]] * 3,
+                '1': [[b1]] * 3
+            })
+
+
+def test_run_ghz_on_many_qubits():
+    qubits = cirq.LineQubit.range(200)
+    circuit = cirq.Circuit.from_ops(cirq.H(
+        qubits[0]), [cirq.CNOT(a, b) for a, b in zip(qubits, qubits[1:])],
+                                    cirq.measure(*qubits, key='m'))
+    result = cirq.CliffordSimulator(seed=1).run(circuit, repetitions=100)
+    m = result.measurements['m']
+    assert m.shape == (100, 200)
+    np.testing.assert_equal(m, np.repeat(m[:, :1], 200, axis=1))
+    assert 0 < np.sum(m[:, 0]) < 100
+
+
+def test_run_intermediate_measurements_and_mixtures():
+    q0, q1 = cirq.LineQubit.range(2)
+    circuit = cirq.Circuit.from_ops(
+        cirq.H(q0), cirq.CNOT(q0, q1), cirq.measure(q0, key='a'),
+        cirq.bit_flip(1)(q1), cirq.measure(q1, key='b', invert_mask=(True,)),
+        cirq.depolarize(0.5)(q0))
+    result = cirq.CliffordSimulator(seed=2).run(circuit, repetitions=50)
+    np.testing.assert_equal(result.measurements['a'], result.measurements['b'])
+    assert 0 < np.sum(result.measurements['a']) < 50
+
+
+def test_run_param_resolver():
+    q0 = cirq.LineQubit(0)
+    circuit = cirq.Circuit.from_ops(
+        cirq.X(q0)**sympy.Symbol('t'), cirq.measure(q0, key='m'))
+    results = cirq.CliffordSimulator().run_sweep(circuit,
+                                                 cirq.Points('t', [0, 1]),
+                                                 repetitions=2)
+    np.testing.assert_equal(results[0].measurements['m'], [[0], [0]])
+    np.testing.assert_equal(results[1].measurements['m'], [[1], [1]])
+
+
+def test_run_non_clifford():
+    q0 = cirq.LineQubit(0)
+    circuit = cirq.Circuit.from_ops(cirq.H(q0), cirq.T(q0), cirq.measure(q0))
+    with pytest.raises(ValueError, match='not a Clifford'):
+        cirq.CliffordSimulator().run(circuit)
+
+
+def test_run_not_unitary():
+
+    class BadOp(cirq.Operation):
+
+        def __init__(self, qubits):
+            self._qubits = qubits
+
+        @property
+        def qubits(self):
+            return self._qubits
+
+        def with_qubits(self, *new_qubits):
+            # coverage: ignore
+            return BadOp(self._qubits)
+
+    q0 = cirq.LineQubit(0)
+    with pytest.raises(TypeError, match="Can't simulate"):
+        cirq.CliffordSimulator().run(cirq.Circuit.from_ops(BadOp([q0])))
+
+
+def test_run_measurement_not_in_computational_basis():
+
+    class XBasisMeasurement(cirq.Operation):
+
+        def __init__(self, qubits):
+            self._qubits = qubits
+
+        @property
+        def qubits(self):
+            return self._qubits
+
+        def with_qubits(self, *new_qubits):
+            # coverage: ignore
+            return XBasisMeasurement(new_qubits)
+
+        def _measurement_key_(self):
+            return 'x'
+
+        def _channel_(self):
+            return (np.diag([0.5, 0.5]), np.array([[0.5, 0.5], [0.5, 0.5]]))
+
+    q0 = cirq.LineQubit(0)
+    with pytest.raises(ValueError, match='computational basis'):
+        cirq.CliffordSimulator().run(
+            cirq.Circuit.from_ops(XBasisMeasurement([q0])))
+
+
+def test_simulate_matches_simulator():
+    qubits = cirq.LineQubit.range(4)
+    gates = {
+        cirq.X: 1,
+        cirq.Y: 1,
+        cirq.Z: 1,
+        cirq.H: 1,
+        cirq.S: 1,
+        cirq.X**0.5: 1,
+        cirq.CNOT: 2,
+        cirq.CZ: 2,
+        cirq.ISWAP: 2,
+        cirq.CCZ**2: 3,
+    }
+    for _ in range(5):
+        circuit = cirq.testing.random_circuit(qubits,
+                                              n_moments=10,
+                                              op_density=0.8,
+                                              gate_domain=gates)
+        for step, expected in zip(
+                cirq.CliffordSimulator().simulate_moment_steps(
+                    circuit, qubit_order=qubits, initial_state=3),
+                cirq.Simulator().simulate_moment_steps(circuit,
+                                                       qubit_order=qubits,
+                                                       initial_state=3)):
+            cirq.testing.assert_allclose_up_to_global_phase(
+                step.state_vector(), expected.state_vector(), atol=1e-6)
+
+
+def test_simulate_measurements():
+    q0, q1 = cirq.LineQubit.range(2)
+    circuit = cirq.Circuit.from_ops(cirq.H(q0), cirq.CNOT(q0, q1),
+                                    cirq.measure(q0, q1, key='m'))
+    result = cirq.CliffordSimulator().simulate(circuit)
+    bits = result.measurements['m']
+    assert bits[0] == bits[1]
+    assert isinstance(result.final_simulator_state, cirq.CliffordTableau)
+    np.testing.assert_allclose(result.final_simulator_state.state_vector(),
+                               np.eye(4)[3 if bits[0] else 0])
+
+
+def test_simulate_initial_state():
+    q0, q1 = cirq.LineQubit.range(2)
+    circuit = cirq.Circuit.from_ops(cirq.X(q0), cirq.I(q1))
+    simulator = cirq.CliffordSimulator()
+    result = simulator.simulate(circuit, initial_state=1)
+    assert str(result.final_simulator_state) == '-ZI\n-IZ'
+
+    tableau = cirq.CliffordTableau(2, initial_state=2)
+    result = simulator.simulate(circuit, initial_state=tableau)
+    assert str(result.final_simulator_state) == '+ZI\n+IZ'
+    assert str(tableau) == '-ZI\n+IZ'
+
+    with pytest.raises(ValueError, match='qubits'):
+        simulator.simulate(circuit, initial_state=cirq.CliffordTableau(3))
+    with pytest.raises(TypeError, match='initial_state'):
+        simulator.simulate(circuit, initial_state=np.array([1, 0, 0, 0]))
+
+
+def test_simulate_empty_circuit():
+    result = cirq.CliffordSimulator().simulate(cirq.Circuit())
+    assert result.final_simulator_state.num_qubits == 0
+
+
+def test_step_stabilizers():
+    q0, q1 = cirq.LineQubit.range(2)
+    circuit = cirq.Circuit.from_ops(cirq.H(q0), cirq.CNOT(q0, q1), cirq.Y(q0))
+    step = list(cirq.CliffordSimulator().simulate_moment_steps(circuit))[-1]
+    stabilizers = step.stabilizers()
+    assert stabilizers == [
+        cirq.PauliString({
+            q0: cirq.X,
+            q1: cirq.X
+        }, -1),
+        cirq.PauliString({
+            q0: cirq.Z,
+            q1: cirq.Z
+        }, -1),
+    ]
+    samples = step.sample([q1, q0], repetitions=10)
+    np.testing.assert_equal(samples[:, 0], np.logical_not(samples[:, 1]))
+
+
+def test_clifford_gate_types():
+    q0, q1 = cirq.LineQubit.range(2)
+    circuit = cirq.Circuit.from_ops(
+        cirq.SingleQubitCliffordGate.X_sqrt(q0),
+        cirq.PauliInteractionGate(cirq.X, False, cirq.Z, True)(q0, q1),
+        cirq.SingleQubitCliffordGate.from_xz_map((cirq.Y, False),
+                                                 (cirq.X, True))(q1))
+    step = list(cirq.CliffordSimulator().simulate_moment_steps(circuit))[-1]
+    cirq.testing.assert_allclose_up_to_global_phase(
+        step.state_vector(), circuit.apply_unitary_effect_to_state(), atol=1e-6)
+
+
+def test_randomized_benchmarking():
+    results = cirq.experiments.single_qubit_randomized_benchmarking(
+        cirq.CliffordSimulator(),
+        cirq.GridQubit(0, 0),
+        num_clifford_range=[5, 50],
+        num_circuits=5,
+        repetitions=100)
+    np.testing.assert_allclose(np.asarray(results.data)[:, 1], 1)
@@ -0,0 +1,340 @@
+# Copyright 2019 The Cirq Developers
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     https://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Stabilizer tableaux, which represent stabilizer states efficiently."""
+
+import functools
+
+from typing import Callable, List, Optional, Sequence, Tuple, Type, Union
+
+import numpy as np
+
+from cirq import value
+
+# The Pauli matrices, indexed by (x << 1) | z bits as used in tableau rows.
+_PAULIS = np.array([
+    [[1, 0], [0, 1]],
+    [[1, 0], [0, -1]],
+    [[0, 1], [1, 0]],
+    [[0, -1j], [1j, 0]],
+])
+_PAULI_NAMES = 'IZXY'
+
+# How a Clifford unitary acting on k qubits conjugates the k-qubit Paulis. The
+# Paulis are encoded as integers with bits (x_j << 2j) | (z_j << 2j + 1) for
+# the j'th qubit; the first array maps each Pauli to its image, and the second
+# tells if the image has a negative sign.
+PauliAction = Tuple[np.ndarray, np.ndarray]
+
+
+def pauli_action(matrix: np.ndarray,
+                 atol: float = 1e-6) -> Optional[PauliAction]:
+    """Computes how a unitary matrix conjugates Pauli operators.
+
+    Args:
+        matrix: A unitary matrix acting on k qubits, in the big endian basis
+            order used by `cirq.unitary`.
+        atol: The tolerance used to decide if an image is a Pauli.
+
+    Returns:
+        The images of the 4**k Paulis (see `PauliAction`), or None if the
+        matrix is not a Clifford unitary.
+    """
+    return _pauli_action(matrix.shape,
+                         matrix.astype(np.complex128).tobytes(), atol)
+
+
+@functools.lru_cache(maxsize=256)
+def _pauli_action(shape: Tuple[int, ...], data: bytes,
+                  atol: float) -> Optional[PauliAction]:
+    matrix = np.frombuffer(data, dtype=np.complex128).reshape(shape)
+    num_qubits = shape[0].bit_length() - 1
+    paulis = _pauli_matrices(num_qubits)
+    images = np.einsum('ab,pbc,dc->pad', matrix, paulis, matrix.conj())
+    # Coordinates of the images in the (orthogonal) Pauli basis.
+    coefficients = np.einsum('qab,pba->pq', paulis, images) / shape[0]
+    targets = np.argmax(np.abs(coefficients), axis=1)
+    signs = coefficients[np.arange(len(targets)), targets]
+    if not np.allclose(np.abs(signs), 1, atol=atol) or not np.allclose(
+            signs.imag, 0, atol=atol):
+        return None
+    return targets, signs.real < 0
+
+
+def _pauli_matrices(num_qubits: int) -> np.ndarray:
+    """Returns the Pauli matrices on k qubits, indexed as in `PauliAction`."""
+    matrices = []
+    for code in range(1 << (2 * num_qubits)):
+        matrix = np.eye(1)
+        for j in range(num_qubits):
+            x, z = (code >> (2 * j)) & 1, (code >> (2 * j + 1)) & 1
+            matrix = np.kron(matrix, _PAULIS[(x << 1) | z])
+        matrices.append(matrix)
+    return np.array(matrices)
+
+
+def _phase_power(x1: np.ndarray, z1: np.ndarray, x2: np.ndarray,
+                 z2: np.ndarray) -> np.ndarray:
+    """Returns the power of i from multiplying Pauli operators.
+
+    This sums the function g of Aaronson and Gottesman over the qubits (the
+    last axis of the bit arrays): the product of the single qubit Paulis
+    with bits (x1, z1) and (x2, z2) is i**g times the Pauli with bits
+    (x1 ^ x2, z1 ^ z2). g is 1 for the products XY, YZ and ZX, -1 for YX, ZY
+    and XZ, and 0 otherwise.
+    """
+    y1 = x1 & z1
+    y2 = x2 & z2
+    only_x1, only_z1 = x1 & ~z1, z1 & ~x1
+    only_x2, only_z2 = x2 & ~z2, z2 & ~x2
+    plus = (only_x1 & y2) | (y1 & only_z2) | (only_z1 & only_x2)
+    minus = (y1 & only_x2) | (only_z1 & y2) | (only_x1 & only_z2)
+    return (np.count_nonzero(plus, axis=-1) - np.count_nonzero(minus, axis=-1))
+
+
+class CliffordTableau:
+    """A stabilizer state, represented by a tableau of Pauli generators.
+
+    This is the representation of Aaronson and Gottesman ("Improved
+    simulation of stabilizer circuits", arXiv:quant-ph/0406196). A state of n
+    qubits is the unique state stabilized by n commuting Pauli operators
+    (the stabilizers). These are stored together with n destabilizers, each
+    Pauli operator being a row of bits telling which qubits it acts on with
+    an X or Z (or both, for a Y) and a sign bit. Applying a Clifford gate or
+    a measurement then takes time polynomial in the number of qubits.
+    """
+
+    def __init__(self, num_qubits: int, initial_state: int = 0) -> None:
+        """Creates a tableau for a computational basis state.
+
+        Args:
+            num_qubits: The number of qubits of the state.
+            initial_state: The computational basis state, in big endian order
+                (so the first qubit is the most significant bit).
+
+        Raises:
+            ValueError: The initial state is not a state of the qubits.
+        """
+        if not 0 <= initial_state < 1 << num_qubits:
+            raise ValueError(
+                'initial state was {} but expected state for {} qubits'.format(
+                    initial_state, num_qubits))
+        self._num_qubits = num_qubits
+        # Rows 0 to n-1 are the destabilizers and rows n to 2n-1 the
+        # stabilizers. The sign bits have a single column, except while
+        # sampling (see `sample`).
+        self._xs = np.zeros((2 * num_qubits, num_qubits), dtype=bool)
+        self._zs = np.zeros((2 * num_qubits, num_qubits), dtype=bool)
+        self._rs = np.zeros((2 * num_qubits, 1), dtype=bool)
+        diagonal = np.arange(num_qubits)
+        self._xs[diagonal, diagonal] = True
+        self._zs[num_qubits + diagonal, diagonal] = True
+        for i in range(num_qubits):
+            self._rs[num_qubits +
+                     i, 0] = bool((initial_state >> (num_qubits - 1 - i)) & 1)
+
+    @property
+    def num_qubits(self) -> int:
+        return self._num_qubits
+
+    def copy(self) -> 'CliffordTableau':
+        result = CliffordTableau(0)
+        result._num_qubits = self._num_qubits
+        result._xs = self._xs.copy()
+        result._zs = self._zs.copy()
+        result._rs = self._rs.copy()
+        return result
+
+    def apply(self, action: PauliAction, axes: Sequence[int]) -> None:
+        """Applies a Clifford unitary to the qubits at the given indices.
+
+        Args:
+            action: How the unitary conjugates Paulis, see `pauli_action`.
+            axes: The qubits the unitary acts on.
+        """
+        targets, flips = action
+        codes = np.zeros(2 * self._num_qubits, dtype=np.int64)
+        for j, axis in enumerate(axes):
+            codes |= self._xs[:, axis].astype(np.int64) << (2 * j)
+            codes |= self._zs[:, axis].astype(np.int64) << (2 * j + 1)
+        images = targets[codes]
+        self._rs[:, 0] ^= flips[codes]
+        for j, axis in enumerate(axes):
+            self._xs[:, axis] = (images >> (2 * j)) & 1
+            self._zs[:, axis] = (images >> (2 * j + 1)) & 1
+
+    def measure(self, axis: int,
+                seed: value.RANDOM_STATE_OR_SEED_LIKE = None) -> bool:
+        """Measures a qubit in the computational basis, collapsing the state.
+
+        Args:
+            axis: The qubit to measure.
+            seed: The seed or `np.random.RandomState` used to pick the result
+                of a measurement with a random outcome.
+
+        Returns:
+            The result of the measurement.
+        """
+        prng = value.parse_random_state(seed)
+        sign = self._measure(axis, lambda: np.array([prng.randint(2)]))
+        return bool(sign[0])
+
+    def sample(self,
+               axes: Sequence[int],
+               repetitions: int = 1,
+               seed: value.RANDOM_STATE_OR_SEED_LIKE = None) -> np.ndarray:
+        """Samples measurements of the given qubits, without collapsing.
+
+        The results of measuring a stabilizer state are an affine function
+        of the outcomes of the measurements that are random. So rather than
+        measuring once per repetition, the measurements are done once on a
+        copy of the tableau whose signs are affine functions of the random
+        outcomes (with one column for the constant, and one per random
+        outcome), and random bits are then fed through the functions.
+
+        Args:
+            axes: The qubits to measure.
+            repetitions: The number of samples to take.
+            seed: The seed or `np.random.RandomState` used for sampling.
+
+        Returns:
+            A (repetitions, len(axes)) array of booleans with the results.
+        """
+        tableau = self.copy()
+        tableau._rs = np.zeros((2 * self._num_qubits, 1 + len(axes)),
+                               dtype=bool)
+        tableau._rs[:, 0] = self._rs[:, 0]
+        num_random = 0
+
+        def random_sign() -> np.ndarray:
+            nonlocal num_random
+            num_random += 1
+            sign = np.zeros(1 + len(axes), dtype=bool)
+            sign[num_random] = True
+            return sign
+
+        functions = np.array(
+            [tableau._measure(axis, random_sign) for axis in axes],
+            dtype=np.uint8)
+        functions = np.reshape(functions, (len(axes), 1 + len(axes)))
+        bits = value.parse_random_state(seed).randint(2,
+                                                      size=(repetitions,
+                                                            num_random),
+                                                      dtype=np.uint8)
+        results = bits.dot(functions[:, 1:1 + num_random].T) + functions[:, 0]
+        return (results & 1).astype(bool)
+
+    def stabilizers(self) -> List[Tuple[bool, str]]:
+        """Returns the stabilizers of the state.
+
+        Returns:
+            For each stabilizer, if it has a negative sign and the Paulis it
+            applies to each qubit, as a string of 'I', 'X', 'Y' and 'Z'.
+        """
+        n = self._num_qubits
+        return [(bool(self._rs[row, 0]),
+                 ''.join(_PAULI_NAMES[(x << 1) | z]
+                         for x, z in zip(self._xs[row], self._zs[row])))
+                for row in range(n, 2 * n)]
+
+    def state_vector(self, dtype: Type[np.number] = np.complex64) -> np.ndarray:
+        """Returns the wave function of the state (up to a global phase).
+
+        This takes time and memory exponential in the number of qubits, so it
+        is only meant for small states.
+
+        Args:
+            dtype: The `numpy.dtype` of the result.
+
+        Returns:
+            The wave function, in big endian order.
+        """
+        n = self._num_qubits
+        # A basis state with a nonzero amplitude, which is then projected
+        # onto the state by each of the stabilizer projectors (1 + S) / 2.
+        basis_state = self.copy()
+        bits = [
+            basis_state._measure(axis, lambda: np.zeros(1, dtype=bool))[0]
+            for axis in range(n)
+        ]
+        state = np.zeros((2,) * n, dtype=np.complex128)
+        state[tuple(int(bit) for bit in bits)] = 1
+        for negative, paulis in self.stabilizers():
+            image = state
+            for axis, pauli in enumerate(paulis):
+                index = [slice(None)] * n  # type: List[Union[slice, int]]
+                index[axis] = 1
+                if pauli in 'ZY':
+                    image = image.copy()
+                    image[tuple(index)] *= -1
+                if pauli in 'XY':
+                    image = np.flip(image, axis)
+            phase = (-1 if negative else 1) * 1j**paulis.count('Y')
+            state = (state + phase * image) / 2
+        state /= np.linalg.norm(state)
+        return np.reshape(state, 1 << n).astype(dtype)
+
+    def _measure(self, axis: int,
+                 random_sign: Callable[[], np.ndarray]) -> np.ndarray:
+        """Measures a qubit, returning the sign bits of the result.
+
+        Args:
+            axis: The qubit to measure.
+            random_sign: Returns the sign bits to use if the result is random.
+        """
+        n = self._num_qubits
+        stabilizers = np.flatnonzero(self._xs[n:, axis])
+        if len(stabilizers):
+            # A stabilizer anticommutes with Z on the qubit: the result is
+            # random, and Z replaces that stabilizer.
+            p = n + stabilizers[0]
+            rows = np.flatnonzero(self._xs[:, axis])
+            self._rowsum(rows[rows != p], p)
+            self._xs[p - n] = self._xs[p]
+            self._zs[p - n] = self._zs[p]
+            self._rs[p - n] = self._rs[p]
+            self._xs[p] = False
+            self._zs[p] = False
+            self._zs[p, axis] = True
+            self._rs[p] = random_sign()
+            return self._rs[p].copy()
+
+        # Z on the qubit is the product of the stabilizers paired with the
+        # destabilizers that anticommute with it, and its sign is the result.
+        rows = n + np.flatnonzero(self._xs[:n, axis])
+        xs = self._xs[rows]
+        zs = self._zs[rows]
+        # The partial products, before multiplying by each of the rows.
+        partial_xs = np.logical_xor.accumulate(xs, axis=0)[:-1]
+        partial_zs = np.logical_xor.accumulate(zs, axis=0)[:-1]
+        power = np.sum(_phase_power(xs[1:], zs[1:], partial_xs, partial_zs))
+        sign = np.logical_xor.reduce(self._rs[rows], axis=0)
+        sign[0] ^= power % 4 == 2
+        return sign
+
+    def _rowsum(self, rows: np.ndarray, i: int) -> None:
+        """Left multiplies the Paulis in the given rows by the one in row i."""
+        if not len(rows):
+            return
+        powers = _phase_power(self._xs[i], self._zs[i], self._xs[rows],
+                              self._zs[rows])
+        # Commuting Paulis multiply to a Pauli with a sign, flipped if the
+        # power of i is 2 (mod 4).
+        self._rs[rows] ^= self._rs[i]
+        self._rs[rows, 0] ^= powers % 4 == 2
+        self._xs[rows] ^= self._xs[i]
+        self._zs[rows] ^= self._zs[i]
+
+    def __str__(self):
+        return '\n'.join(('-' if negative else '+') + paulis
+                         for negative, paulis in self.stabilizers())
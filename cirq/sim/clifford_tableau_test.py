@@ -0,0 +1,145 @@
+# Copyright 2019 The Cirq Developers
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     https://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import numpy as np
+import pytest
+
+import cirq
+from cirq.sim import clifford_tableau
+
+CLIFFORD_GATES = {
+    cirq.X: 1,
+    cirq.Y: 1,
+    cirq.Z: 1,
+    cirq.H: 1,
+    cirq.S: 1,
+    cirq.CNOT: 2,
+    cirq.CZ: 2,
+    cirq.SWAP: 2,
+    cirq.ISWAP: 2,
+}
+
+
+def apply_circuit(tableau, circuit, qubits):
+    for op in circuit.all_operations():
+        tableau.apply(clifford_tableau.pauli_action(cirq.unitary(op)),
+                      [qubits.index(q) for q in op.qubits])
+
+
+def test_initial_state():
+    tableau = cirq.CliffordTableau(3, initial_state=0b101)
+    assert tableau.num_qubits == 3
+    assert tableau.stabilizers() == [(True, 'ZII'), (False, 'IZI'),
+                                     (True, 'IIZ')]
+    np.testing.assert_allclose(tableau.state_vector(), np.eye(8)[5])
+    assert str(tableau) == '-ZII\n+IZI\n-IIZ'
+
+
+def test_invalid_initial_state():
+    with pytest.raises(ValueError, match='initial state'):
+        cirq.CliffordTableau(2, initial_state=4)
+    with pytest.raises(ValueError, match='initial state'):
+        cirq.CliffordTableau(2, initial_state=-1)
+
+
+def test_pauli_action():
+    targets, flips = clifford_tableau.pauli_action(cirq.unitary(cirq.H))
+    # H maps Z to X, X to Z and Y to -Y.
+    np.testing.assert_equal(targets, [0, 2, 1, 3])
+    np.testing.assert_equal(flips, [False, False, False, True])
+    assert clifford_tableau.pauli_action(cirq.unitary(cirq.T)) is None
+    assert clifford_tableau.pauli_action(cirq.unitary(cirq.CCZ)) is None
+    assert clifford_tableau.pauli_action(cirq.unitary(cirq.CCX)) is None
+    assert clifford_tableau.pauli_action(cirq.unitary(cirq.X**0.5)) is not None
+
+
+def test_random_circuits_match_wave_functions():
+    qubits = cirq.LineQubit.range(5)
+    for _ in range(10):
+        circuit = cirq.testing.random_circuit(qubits,
+                                              n_moments=10,
+                                              op_density=0.8,
+                                              gate_domain=CLIFFORD_GATES)
+        tableau = cirq.CliffordTableau(5)
+        apply_circuit(tableau, circuit, qubits)
+        cirq.testing.assert_allclose_up_to_global_phase(
+            tableau.state_vector(),
+            circuit.apply_unitary_effect_to_state(qubit_order=qubits),
+            atol=1e-6)
+
+
+def test_random_circuits_match_wave_functions_after_measurements():
+    qubits = cirq.LineQubit.range(4)
+    for seed in range(10):
+        circuit = cirq.testing.random_circuit(qubits,
+                                              n_moments=10,
+                                              op_density=0.8,
+                                              gate_domain=CLIFFORD_GATES)
+        tableau = cirq.CliffordTableau(4)
+        apply_circuit(tableau, circuit, qubits)
+        state = circuit.apply_unitary_effect_to_state(qubit_order=qubits)
+        for axis in [2, 0, 3, 1]:
+            bit = tableau.measure(axis, seed=seed)
+            projected = np.reshape(state.copy(), (2,) * 4)
+            projected[(slice(None),) * axis + (int(not bit),)] = 0
+            state = np.reshape(projected, 16)
+            assert np.linalg.norm(state) > 0.5
+            state /= np.linalg.norm(state)
+            cirq.testing.assert_allclose_up_to_global_phase(
+                tableau.state_vector(), state, atol=1e-6)
+
+
+def test_measure():
+    q0, q1, q2 = cirq.LineQubit.range(3)
+    circuit = cirq.Circuit.from_ops(cirq.H(q0), cirq.CNOT(q0, q1), cirq.X(q2))
+    results = set()
+    for seed in range(10):
+        tableau = cirq.CliffordTableau(3)
+        apply_circuit(tableau, circuit, [q0, q1, q2])
+        assert tableau.measure(2, seed=seed)
+        bit = tableau.measure(1, seed=seed)
+        assert tableau.measure(0, seed=seed) == bit
+        # The state has collapsed.
+        assert tableau.measure(1, seed=seed + 1) == bit
+        np.testing.assert_allclose(tableau.state_vector(),
+                                   np.eye(8)[7 if bit else 1])
+        results.add(bit)
+    assert results == {False, True}
+
+
+def test_sample():
+    qubits = cirq.LineQubit.range(4)
+    circuit = cirq.Circuit.from_ops(cirq.H(qubits[0]),
+                                    cirq.CNOT(qubits[0], qubits[1]),
+                                    cirq.H(qubits[2]), cirq.X(qubits[3]),
+                                    cirq.CNOT(qubits[2], qubits[3]))
+    tableau = cirq.CliffordTableau(4)
+    apply_circuit(tableau, circuit, qubits)
+    before = tableau.stabilizers()
+    samples = tableau.sample([1, 0, 2, 3], repetitions=1000, seed=1234)
+    assert samples.shape == (1000, 4)
+    assert tableau.stabilizers() == before
+    np.testing.assert_equal(samples[:, 0], samples[:, 1])
+    # Qubits 2 and 3 are in the state (|01> + |10>) / sqrt(2).
+    np.testing.assert_equal(samples[:, 3], np.logical_not(samples[:, 2]))
+    assert 400 < np.sum(samples[:, 0]) < 600
+    assert 400 < np.sum(samples[:, 2]) < 600
+    assert 150 < np.sum(samples[:, 0] & samples[:, 2]) < 350
+    assert tableau.sample([0], repetitions=0).shape == (0, 1)
+
+
+def test_sample_deterministic():
+    tableau = cirq.CliffordTableau(2, initial_state=2)
+    np.testing.assert_equal(tableau.sample([1, 0], repetitions=3),
+                            [[False, True]] * 3)
@@ -16,14 +16,14 @@
 
 import collections
 
-from typing import (
-        cast, Dict, Iterator, List, Optional, TYPE_CHECKING, Type, Union)
+from typing import (Callable, cast, Dict, Iterator, List, Optional,
+                    TYPE_CHECKING, Tuple, Type, Union)
 
 import numpy as np
 
 from cirq import (circuits, linalg, ops, protocols, schedules, study, value,
                   devices)
-from cirq.sim import density_matrix_utils, simulator
+from cirq.sim import density_matrix_utils, simulation_plan, simulator
 
 if TYPE_CHECKING:
     # pylint: disable=unused-import
@@ -128,44 +128,56 @@ class DensityMatrixSimulator(simulator.SimulatesSamples,
 
         self._dtype = dtype
         self.noise = noise
+        self._plans = simulation_plan.SimulationPlanCache()
+        self._buffers = _BufferPool()
 
     def _run(self, circuit: circuits.Circuit,
              param_resolver: study.ParamResolver,
              repetitions: int) -> Dict[str, np.ndarray]:
         """See definition in `cirq.SimulatesSamples`."""
         param_resolver = param_resolver or study.ParamResolver({})
-        resolved_circuit = protocols.resolve_parameters(circuit,
-                                                        param_resolver)
+        if self.noise == devices.NO_NOISE:
+            # The plan is cached, so repeatedly running the same circuit (e.g.
+            # over a parameter sweep) only decomposes the circuit once.
+            plan = self._plans.get(
+                circuit, lambda: self._plan(circuit, ops.QubitOrder.DEFAULT))
+            plan_factory = lambda: plan
+        else:
+            # Noise models may be stateful, so noise is added to the resolved
+            # circuit anew for every simulation.
+            resolved_circuit = protocols.resolve_parameters(
+                circuit, param_resolver)
+            plan_factory = lambda: self._plan(resolved_circuit, ops.QubitOrder.
+                                              DEFAULT)
 
         if circuit.are_all_measurements_terminal():
-            return self._run_sweep_sample(resolved_circuit, repetitions)
+            return self._run_sweep_sample(plan_factory(), param_resolver,
+                                          repetitions)
         else:
-            return self._run_sweep_repeat(resolved_circuit, repetitions)
+            return self._run_sweep_repeat(plan_factory, param_resolver,
+                                          repetitions)
 
-    def _run_sweep_sample(self,
-                          circuit: circuits.Circuit,
+    def _run_sweep_sample(self, plan: simulation_plan.SimulationPlan,
+                          param_resolver: study.ParamResolver,
                           repetitions: int) -> Dict[str, np.ndarray]:
-        for step_result in self._base_iterator(
-                circuit=circuit,
-                qubit_order=ops.QubitOrder.DEFAULT,
-                initial_state=0,
-                perform_measurements=False):
+        for step_result in self._base_iterator(plan=plan,
+                                               param_resolver=param_resolver,
+                                               initial_state=0,
+                                               perform_measurements=False):
             pass
-        measurement_ops = [op for _, op, _ in
-                           circuit.findall_operations_with_gate_type(
-                               ops.MeasurementGate)]
-        return step_result.sample_measurement_ops(measurement_ops, repetitions)
+        return step_result.sample_measurement_ops(plan.measurement_ops,
+                                                  repetitions)
 
-    def _run_sweep_repeat(self,
-                          circuit: circuits.Circuit,
-                          repetitions: int) -> Dict[str, np.ndarray]:
+    def _run_sweep_repeat(
+            self, plan_factory: Callable[[], simulation_plan.SimulationPlan],
+            param_resolver: study.ParamResolver,
+            repetitions: int) -> Dict[str, np.ndarray]:
         measurements = {}  # type: Dict[str, List[np.ndarray]]
         for _ in range(repetitions):
-            all_step_results = self._base_iterator(
-                circuit,
-                qubit_order=ops.QubitOrder.DEFAULT,
-                initial_state=0,
-                perform_measurements=True)
+            all_step_results = self._base_iterator(plan_factory(),
+                                                   param_resolver,
+                                                   initial_state=0,
+                                                   perform_measurements=True)
             for step_result in all_step_results:
                 for k, v in step_result.measurements.items():
                     if not k in measurements:
@@ -190,25 +202,12 @@ class DensityMatrixSimulator(simulator.SimulatesSamples,
         param_resolver = param_resolver or study.ParamResolver({})
         resolved_circuit = protocols.resolve_parameters(circuit, param_resolver)
         actual_initial_state = 0 if initial_state is None else initial_state
-        return self._base_iterator(resolved_circuit,
-                                   qubit_order,
-                                   actual_initial_state)
-
-    def _base_iterator(
-            self,
-            circuit: circuits.Circuit,
-            qubit_order: ops.QubitOrderOrList,
-            initial_state: Union[int, np.ndarray],
-            perform_measurements: bool = True) -> Iterator:
-        qubits = ops.QubitOrder.as_qubit_order(qubit_order).order_for(
-            circuit.all_qubits())
-        num_qubits = len(qubits)
-        qubit_map = {q: i for i, q in enumerate(qubits)}
-        matrix = density_matrix_utils.to_valid_density_matrix(
-            initial_state, num_qubits, self._dtype)
-        if len(circuit) == 0:
-            yield DensityMatrixStepResult(matrix, {}, qubit_map, self._dtype)
-        matrix = np.reshape(matrix, (2,) * num_qubits * 2)
+        return self._base_iterator(self._plan(resolved_circuit, qubit_order),
+                                   param_resolver, actual_initial_state)
+
+    def _plan(self, circuit: circuits.Circuit, qubit_order: ops.QubitOrderOrList
+             ) -> simulation_plan.SimulationPlan:
+        """Adds noise to the circuit and decomposes it into channels."""
 
         def on_stuck(bad_op: ops.Operation):
             return TypeError(
@@ -226,59 +225,102 @@ class DensityMatrixSimulator(simulator.SimulatesSamples,
                                    ops.DensityMatrixDisplay))
                     )
 
-        matrix = np.reshape(matrix, (2,) * num_qubits * 2)
         noisy_moments = self.noise.noisy_moments(circuit,
                                                  sorted(circuit.all_qubits()))
+        return simulation_plan.SimulationPlan(circuit,
+                                              qubit_order,
+                                              keep=keep,
+                                              on_stuck_raise=on_stuck,
+                                              moments=noisy_moments)
+
+    def _base_iterator(self,
+                       plan: simulation_plan.SimulationPlan,
+                       param_resolver: study.ParamResolver,
+                       initial_state: Union[int, np.ndarray],
+                       perform_measurements: bool = True) -> Iterator:
+        num_qubits = plan.num_qubits
+        qubit_map = plan.qubit_map
+        matrix = density_matrix_utils.to_valid_density_matrix(
+            initial_state, num_qubits, self._dtype)
+        if len(plan) == 0:
+            yield DensityMatrixStepResult(matrix, {}, qubit_map, self._dtype)
+        matrix = np.reshape(matrix, (2,) * num_qubits * 2)
+
+        # Workspace for applying channels, reused for every operation. The
+        # buffers that don't end up holding the final density matrix are
+        # returned to the pool for the next simulation.
+        workspace = self._buffers.take(matrix.shape, self._dtype, 3)
+        try:
+            for channel_ops_and_measurements in plan.resolved_moments(
+                    param_resolver):
+                measurements = collections.defaultdict(
+                    list)  # type: Dict[str, List[bool]]
+
+                for op, indices in channel_ops_and_measurements:
+                    if isinstance(op,
+                                  (ops.SamplesDisplay, ops.WaveFunctionDisplay,
+                                   ops.DensityMatrixDisplay)):
+                        continue
+                    # TODO: support more general measurements.
+                    meas = ops.op_gate_of_type(op, ops.MeasurementGate)
+                    if meas:
+                        if perform_measurements:
+                            invert_mask = (meas.invert_mask or
+                                           num_qubits * (False,))
+                            # Measure updates inline.
+                            bits, _ = (
+                                density_matrix_utils.measure_density_matrix(
+                                    matrix, indices, matrix))
+                            corrected = [
+                                bit ^ mask
+                                for bit, mask in zip(bits, invert_mask)
+                            ]
+                            key = protocols.measurement_key(meas)
+                            measurements[key].extend(corrected)
+                    else:
+                        matrix = self._apply_channel(op, indices, matrix,
+                                                     workspace)
+                yield DensityMatrixStepResult(density_matrix=matrix,
+                                              measurements=measurements,
+                                              qubit_map=qubit_map,
+                                              dtype=self._dtype)
+        finally:
+            self._buffers.give(workspace)
+
+    def _apply_channel(self, op: ops.Operation, indices: List[int],
+                       matrix: np.ndarray,
+                       workspace: List[np.ndarray]) -> np.ndarray:
+        """Applies the channel of an operation to the density matrix.
+
+        Args:
+            op: The operation to apply.
+            indices: The indices of the qubits the operation acts on.
+            matrix: The density matrix, as a (2, 2, ..., 2) tensor.
+            workspace: Three buffers shaped like the density matrix. If the
+                result is written into one of them, it is swapped with the
+                density matrix.
 
-        for moment in noisy_moments:
-            measurements = collections.defaultdict(
-                list)  # type: Dict[str, List[bool]]
-
-            channel_ops_and_measurements = protocols.decompose(
-                moment, keep=keep, on_stuck_raise=on_stuck)
-
-            for op in channel_ops_and_measurements:
-                indices = [qubit_map[qubit] for qubit in op.qubits]
-                if isinstance(op,
-                              (ops.SamplesDisplay,
-                                  ops.WaveFunctionDisplay,
-                                  ops.DensityMatrixDisplay)):
-                    continue
-                # TODO: support more general measurements.
-                meas = ops.op_gate_of_type(op, ops.MeasurementGate)
-                if meas:
-                    if perform_measurements:
-                        invert_mask = meas.invert_mask or num_qubits * (False,)
-                        # Measure updates inline.
-                        bits, _ = density_matrix_utils.measure_density_matrix(
-                            matrix, indices, matrix)
-                        corrected = [bit ^ mask for bit, mask in
-                                     zip(bits, invert_mask)]
-                        key = protocols.measurement_key(meas)
-                        measurements[key].extend(corrected)
-                else:
-                    # TODO: Use apply_channel similar to apply_unitary.
-                    gate = cast(ops.GateOperation, op).gate
-                    channel = protocols.channel(gate)
-                    sum_buffer = np.zeros((2,) * 2 * num_qubits,
-                                          dtype=self._dtype)
-                    buffer = np.empty((2,) * 2 * num_qubits, dtype=self._dtype)
-                    out = np.empty((2,) * 2 * num_qubits, dtype=self._dtype)
-                    for krauss in channel:
-                        krauss_tensor = np.reshape(krauss.astype(self._dtype),
-                                                   (2,) * gate.num_qubits() * 2)
-                        result = linalg.targeted_conjugate_about(krauss_tensor,
-                                                                 matrix,
-                                                                 indices,
-                                                                 buffer=buffer,
-                                                                 out=out)
-                        sum_buffer += result
-                    np.copyto(dst=matrix, src=sum_buffer)
-            yield DensityMatrixStepResult(
-                    density_matrix=matrix,
-                    measurements=measurements,
-                    qubit_map=qubit_map,
-                    dtype=self._dtype)
+        Returns:
+            The density matrix after applying the channel, either `matrix` or
+            a buffer from the workspace.
+        """
+        num_qubits = matrix.ndim // 2
+        result = protocols.apply_channel(
+            op,
+            protocols.ApplyChannelArgs(
+                target_tensor=matrix,
+                out_buffer=workspace[0],
+                auxiliary_buffer0=workspace[1],
+                auxiliary_buffer1=workspace[2],
+                left_axes=indices,
+                right_axes=[num_qubits + i for i in indices]))
+        for i, buffer in enumerate(workspace):
+            if result is buffer:
+                workspace[i] = matrix
+                return result
+        if result is not matrix:
+            np.copyto(dst=matrix, src=result)
+        return matrix
 
     def _create_simulator_trial_result(self,
             params: study.ParamResolver,
@@ -432,6 +474,39 @@ def _compute_samples_display_value(display: ops.SamplesDisplay,
     return display.value_derived_from_samples(samples)
 
 
+class _BufferPool:
+    """Keeps the workspace buffers of finished simulations for reuse.
+
+    Only buffers of the most recently requested shape and dtype are kept, as
+    simulations of large density matrices can't afford to hold on to buffers
+    of other sizes.
+    """
+
+    def __init__(self, max_size: int = 3) -> None:
+        self._max_size = max_size
+        self._key = None  # type: Optional[Tuple[Tuple[int, ...], Any]]
+        self._free = []  # type: List[np.ndarray]
+
+    def take(self, shape: Tuple[int, ...], dtype: Type[np.number],
+             count: int) -> List[np.ndarray]:
+        """Returns `count` buffers, reusing free buffers where possible."""
+        key = (tuple(shape), np.dtype(dtype))
+        if key != self._key:
+            self._key = key
+            self._free = []
+        return [
+            self._free.pop() if self._free else np.empty(shape, dtype=dtype)
+            for _ in range(count)
+        ]
+
+    def give(self, buffers: List[np.ndarray]) -> None:
+        """Makes buffers that are no longer used available for reuse."""
+        for buffer in buffers:
+            if (len(self._free) < self._max_size and
+                (buffer.shape, buffer.dtype) == self._key):
+                self._free.append(buffer)
+
+
 class DensityMatrixStepResult(simulator.StepResult):
     """A single step in the simulation of the DensityMatrixSimulator.
 
@@ -100,6 +100,51 @@ def test_run_mixture(dtype):
     assert q0_measurements == {0, 1}
 
 
+@pytest.mark.parametrize('dtype', [np.complex64, np.complex128])
+def test_simulate_channels_match_krauss_operators(dtype):
+    qubits = cirq.LineQubit.range(3)
+    q0, q1, q2 = qubits
+    circuit = cirq.Circuit.from_ops(cirq.H(q0), cirq.CNOT(q0, q2),
+                                    cirq.depolarize(0.2)(q2),
+                                    cirq.amplitude_damp(0.3)(q0),
+                                    cirq.ISWAP(q1, q0)**0.5,
+                                    cirq.phase_damp(0.4)(q1),
+                                    cirq.Y(q2)**0.25)
+    simulator = cirq.DensityMatrixSimulator(dtype=dtype)
+    result = simulator.simulate(circuit, qubit_order=qubits)
+
+    expected = np.zeros((2,) * 6, dtype=np.complex128)
+    expected[(0,) * 6] = 1
+    for op in circuit.all_operations():
+        indices = [qubits.index(q) for q in op.qubits]
+        expected = sum(
+            cirq.targeted_conjugate_about(
+                np.reshape(krauss, (2,) * 2 * len(indices)), expected, indices)
+            for krauss in cirq.channel(op))
+    np.testing.assert_allclose(result.final_density_matrix,
+                               np.reshape(expected, (8, 8)),
+                               atol=1e-6)
+
+
+def test_simulate_reuses_workspace_between_simulations():
+    q0, q1 = cirq.LineQubit.range(2)
+    simulator = cirq.DensityMatrixSimulator()
+    first = simulator.simulate(
+        cirq.Circuit.from_ops(cirq.X(q0),
+                              cirq.depolarize(0.1)(q1)))
+    second = simulator.simulate(
+        cirq.Circuit.from_ops(cirq.bit_flip(0.5)(q0), cirq.X(q1)))
+
+    # The workspace buffers are shared, but the final states are not.
+    assert (first.final_density_matrix.base is
+            not second.final_density_matrix.base)
+    np.testing.assert_allclose(np.diag(first.final_density_matrix),
+                               [0, 0, 0.9333333, 0.0666667],
+                               atol=1e-6)
+    np.testing.assert_allclose(np.diag(second.final_density_matrix),
+                               [0, 0.5, 0, 0.5])
+
+
 @pytest.mark.parametrize('dtype', [np.complex64, np.complex128])
 def test_run_channel(dtype):
     q0, q1 = cirq.LineQubit.range(2)
@@ -17,7 +17,7 @@ from typing import List, Tuple, Type, Union
 
 import numpy as np
 
-from cirq import linalg
+from cirq import linalg, value
 from cirq.sim import wave_function
 
 
@@ -74,10 +74,12 @@ def to_valid_density_matrix(
     return np.outer(state_vector, np.conj(state_vector))
 
 
-def sample_density_matrix(
-    density_matrix: np.ndarray,
-    indices: List[int],
-    repetitions: int=1) -> np.ndarray:
+def sample_density_matrix(density_matrix: np.ndarray,
+                          indices: List[int],
+                          repetitions: int = 1,
+                          *,
+                          seed: value.RANDOM_STATE_OR_SEED_LIKE = None,
+                          pack_bits: bool = False) -> np.ndarray:
     """Samples repeatedly from measurements in the computational basis.
 
     Note that this does not modify the density_matrix.
@@ -92,12 +94,18 @@ def sample_density_matrix(
             xth index of v, when expressed as a bitstring, has its largest
             values in the 0th index.
         repetitions: The number of times to sample the density matrix.
+        seed: A seed or `np.random.RandomState` used to draw the samples.
+            Defaults to numpy's global random state.
+        pack_bits: If True, the measurement results of each repetition are
+            packed into bytes (see `np.packbits`), the first measured qubit
+            being the most significant bit of the first byte.
 
     Returns:
         Measurement results with True corresponding to the ``|1⟩`` state.
         The outer list is for repetitions, and the inner corresponds to
         measurements ordered by the supplied qubits. These lists
-        are wrapped as an numpy ndarray.
+        are wrapped as an numpy ndarray. If `pack_bits` is True, the inner
+        lists are instead the packed bits, as a numpy ndarray of uint8.
 
     Raises:
         ValueError: ``repetitions`` is less than one or size of ``matrix`` is
@@ -112,18 +120,14 @@ def sample_density_matrix(
     _validate_indices(num_qubits, indices)
 
     if repetitions == 0 or len(indices) == 0:
-        return np.zeros(shape=(repetitions, len(indices)))
+        return wave_function._sample_bits(np.ones(1), len(indices), repetitions,
+                                          seed, pack_bits)
 
     # Calculate the measurement probabilities.
     probs = _probs(density_matrix, indices, num_qubits)
 
-    # We now have the probability vector, correctly ordered, so sample over
-    # it. Note that we us ints here, since numpy's choice does not allow for
-    # choosing from a list of tuples or list of lists.
-    result = np.random.choice(len(probs), size=repetitions, p=probs)
-    # Convert to bools and rearrange to match repetition being the outer list.
-    return np.transpose([(1 & (result >> i)).astype(np.bool) for i in
-                         range(len(indices))])
+    return wave_function._sample_bits(probs, len(indices), repetitions, seed,
+                                      pack_bits)
 
 
 def measure_density_matrix(
@@ -209,22 +213,14 @@ def measure_density_matrix(
 
 
 def _probs(density_matrix: np.ndarray, indices: List[int],
-    num_qubits: int) -> List[float]:
+           num_qubits: int) -> np.ndarray:
     """Returns the probabilities for a measurement on the given indices."""
     # Only diagonal elements matter.
     all_probs = np.diagonal(
         np.reshape(density_matrix, (2 ** num_qubits, 2 ** num_qubits)))
     # Shape into a tensor
-    tensor = np.reshape(all_probs, [2] * num_qubits)
-
-    # Calculate the probabilities for measuring the particular results.
-    probs = [
-        np.sum(np.abs(tensor[linalg.slice_for_qubits_equal_to(indices, b)]))
-        for b in range(2 ** len(indices))]
-
-    # To deal with rounding issues, ensure that the probabilities sum to 1.
-    probs /= np.sum(probs) # type: ignore
-    return probs
+    tensor = np.reshape(np.abs(all_probs), [2] * num_qubits)
+    return wave_function._marginal_probs(tensor, indices)
 
 
 def _validate_num_qubits(density_matrix: np.ndarray) -> int:
@@ -268,6 +268,37 @@ def test_sample_density_matrix_no_indices():
     np.testing.assert_almost_equal(bits, np.zeros(shape=(1, 0)))
 
 
+def test_sample_density_matrix_seed():
+    state = cirq.testing.random_superposition(8)
+    matrix = np.outer(state, state.conj())
+    samples = cirq.sample_density_matrix(matrix, [0, 2],
+                                         repetitions=100,
+                                         seed=1234)
+    np.testing.assert_equal(
+        samples,
+        cirq.sample_density_matrix(matrix, [0, 2],
+                                   repetitions=100,
+                                   seed=np.random.RandomState(1234)))
+
+
+def test_sample_density_matrix_pack_bits():
+    matrix = cirq.to_valid_density_matrix(0b101, num_qubits=3)
+    packed = cirq.sample_density_matrix(matrix, [2, 1, 0],
+                                        repetitions=2,
+                                        pack_bits=True)
+    np.testing.assert_equal(packed, [[0b10100000]] * 2)
+
+
+def test_sample_density_matrix_frequencies():
+    matrix = np.diag([0.1, 0, 0.3, 0.6])
+    samples = cirq.sample_density_matrix(matrix, [1, 0],
+                                         repetitions=10000,
+                                         seed=0)
+    outcomes = samples[:, 0] + 2 * samples[:, 1]
+    frequencies = np.bincount(outcomes, minlength=4) / 10000
+    np.testing.assert_allclose(frequencies, [0.1, 0, 0.3, 0.6], atol=0.02)
+
+
 def test_measure_density_matrix_computational_basis():
     results = []
     for x in range(8):
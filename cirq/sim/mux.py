@@ -19,7 +19,12 @@ from typing import List, Optional, Type, Union
 import numpy as np
 
 from cirq import circuits, protocols, study, schedules, devices
-from cirq.sim import sparse_simulator, density_matrix_simulator
+from cirq.sim import (sparse_simulator, density_matrix_simulator,
+                      trajectory_simulator)
+
+# Noisy circuits on more qubits than this are sampled using trajectories, as
+# the memory needed by the density matrix grows as 4**n.
+MAX_DENSITY_MATRIX_QUBITS = 12
 
 
 def sample(program: Union[circuits.Circuit, schedules.Schedule],
@@ -30,6 +35,11 @@ def sample(program: Union[circuits.Circuit, schedules.Schedule],
            dtype: Type[np.number] = np.complex64) -> study.TrialResult:
     """Simulates sampling from the given circuit or schedule.
 
+    Noiseless unitary programs are simulated with `cirq.Simulator`. Other
+    programs are simulated with `cirq.DensityMatrixSimulator`, or, if they act
+    on more than `MAX_DENSITY_MATRIX_QUBITS` qubits, with
+    `cirq.TrajectorySimulator`.
+
     Args:
         program: The circuit or schedule to sample from.
         noise: Noise model to use while running the simulation.
@@ -47,6 +57,14 @@ def sample(program: Union[circuits.Circuit, schedules.Schedule],
             param_resolver=param_resolver,
             repetitions=repetitions)
 
+    circuit = (program if isinstance(program, circuits.Circuit) else
+               program.to_circuit())
+    if len(circuit.all_qubits()) > MAX_DENSITY_MATRIX_QUBITS:
+        return trajectory_simulator.TrajectorySimulator(
+            dtype=dtype, noise=noise).run(program=circuit,
+                                          param_resolver=param_resolver,
+                                          repetitions=repetitions)
+
     return density_matrix_simulator.DensityMatrixSimulator(
         dtype=dtype, noise=noise).run(program=program,
                                       param_resolver=param_resolver,
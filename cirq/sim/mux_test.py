@@ -48,6 +48,18 @@ def test_sample():
     assert results.histogram(key=q) == collections.Counter({0: 1})
 
 
+def test_sample_many_noisy_qubits():
+    qubits = cirq.LineQubit.range(cirq.sim.mux.MAX_DENSITY_MATRIX_QUBITS + 1)
+    circuit = cirq.Circuit.from_ops(cirq.X.on_each(*qubits),
+                                    cirq.measure(*qubits, key='m'))
+    # Too large for the density matrix simulator, so trajectories are used.
+    results = cirq.sample(circuit,
+                          noise=cirq.ConstantQubitNoiseModel(
+                              cirq.amplitude_damp(1)),
+                          repetitions=3)
+    assert results.histogram(key='m') == collections.Counter({0: 3})
+
+
 def test_sample_sweep():
     q = cirq.NamedQubit('q')
     c = cirq.Circuit.from_ops(
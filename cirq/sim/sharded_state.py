@@ -0,0 +1,236 @@
+# Copyright 2019 The Cirq Developers
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     https://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Multi-threaded application of unitaries to sharded state vectors."""
+
+from typing import Any, Dict, List
+
+import numpy as np
+
+from cirq import linalg, ops, protocols, value
+from cirq.sim import wave_function
+
+# Probabilities are computed from at most 2**_CHUNK_QUBITS amplitudes at a
+# time, bounding the size of the temporary arrays.
+_CHUNK_QUBITS = 16
+
+
+class ShardedStateVector:
+    """Applies unitaries to a state vector in parallel, shard by shard.
+
+    The state, a (2, 2, ..., 2) tensor, is split along its first
+    `num_prefix_qubits` axes (the prefix qubits) into 2**num_prefix_qubits
+    contiguous shards. An operation that only acts on the remaining (local)
+    axes acts on every shard independently, so the shards are updated in
+    parallel by a thread pool.
+
+    An operation that acts on a prefix qubit is handled by first exchanging
+    that qubit's axis with the axis of a local qubit the operation doesn't act
+    on. Rather than exchanging the axes back afterwards, the permutation of
+    the axes is tracked, and the logical order of the qubits is only restored
+    by `restore_order` when the state is needed (e.g. for mixtures).
+    Measurements and their probabilities are also computed shard by shard,
+    so that no temporary as large as the state is allocated.
+
+    The wrapped `data` is any object with `state` and `buffer` attributes,
+    which are updated in place as the state moves between the two arrays.
+    """
+
+    def __init__(self, data: Any, num_prefix_qubits: int, pool: Any) -> None:
+        """Shards a state.
+
+        Args:
+            data: An object holding the state tensor in its `state` attribute
+                and an equally shaped workspace array in its `buffer`
+                attribute.
+            num_prefix_qubits: The state is split into 2**num_prefix_qubits
+                shards. Must be less than the number of qubits.
+            pool: A pool (e.g. a `multiprocessing.dummy.Pool`) whose `map` is
+                used to process the shards in parallel.
+        """
+        self._data = data
+        self._num_qubits = data.state.ndim
+        self._num_prefix_qubits = num_prefix_qubits
+        self._num_shards = 1 << num_prefix_qubits
+        self._pool = pool
+        # The physical axis of the state that holds each (logical) qubit.
+        self._axes = list(range(self._num_qubits))
+
+    def apply_unitary(self, op: ops.Operation, indices: List[int]) -> None:
+        """Applies a unitary operation to the qubits at the given indices."""
+        axes = [self._axes[i] for i in indices]
+        prefix_axes = [a for a in axes if a < self._num_prefix_qubits]
+        if prefix_axes:
+            # Use the least significant local axes, which are the least likely
+            # to be needed as prefix axes again.
+            free_axes = [
+                a for a in range(self._num_qubits - 1, self._num_prefix_qubits -
+                                 1, -1) if a not in axes
+            ]
+            if len(free_axes) < len(prefix_axes):
+                self._apply_unsharded(op, axes)
+                return
+            self._exchange(dict(zip(prefix_axes, free_axes)))
+            axes = [self._axes[i] for i in indices]
+
+        local_axes = [a - self._num_prefix_qubits for a in axes]
+        in_buffer = self._pool.map(
+            lambda shard: self._apply_to_shard(op, local_axes, shard),
+            range(self._num_shards))
+        if all(in_buffer):
+            self._data.state, self._data.buffer = (self._data.buffer,
+                                                   self._data.state)
+        elif any(in_buffer):
+            shards = [s for s in range(self._num_shards) if in_buffer[s]]
+            self._pool.map(self._copy_buffer_shard_to_state, shards)
+
+    def measure(self,
+                indices: List[int],
+                seed: value.RANDOM_STATE_OR_SEED_LIKE = None) -> List[bool]:
+        """Measures the qubits at the given indices, collapsing the state.
+
+        Args:
+            indices: The qubits to measure.
+            seed: The seed or `np.random.RandomState` used to pick the result.
+
+        Returns:
+            The measurement results, one bit per measured qubit.
+        """
+        p = self._num_prefix_qubits
+        axes = [self._axes[i] for i in indices]
+        prefix_shape = (2,) * p
+        probs = self.probabilities(indices)
+        result = value.parse_random_state(seed).choice(len(probs), p=probs)
+        bits = [bool(1 & (result >> i)) for i in range(len(indices))]
+
+        prefix_bits = {a: bit for a, bit in zip(axes, bits) if a < p}
+        local_slice = linalg.slice_for_qubits_equal_to(
+            [a - p for a in axes if a >= p],
+            sum(1 << i for i, bit in enumerate(
+                bit for a, bit in zip(axes, bits) if a >= p) if bit))
+        scale = 1 / np.sqrt(probs[result])
+
+        def collapse_shard(shard: int) -> None:
+            block = self._shard(self._data.state, shard)
+            shard_bits = np.unravel_index(shard, prefix_shape)
+            if any(shard_bits[a] != bit for a, bit in prefix_bits.items()):
+                block.fill(0)
+                return
+            kept = block[local_slice] * scale
+            block.fill(0)
+            block[local_slice] = kept
+
+        self._pool.map(collapse_shard, range(self._num_shards))
+        return bits
+
+    def probabilities(self, indices: List[int]) -> np.ndarray:
+        """Returns the probabilities of measuring the qubits at the indices.
+
+        The state is read in chunks, shard by shard, so no temporary as large
+        as the state is allocated.
+
+        Returns:
+            The probabilities of the outcomes, indexed so that the k'th bit
+            (in little endian order) of an outcome is the result for the k'th
+            measured qubit, as in `cirq.slice_for_qubits_equal_to`.
+        """
+        axes = [self._axes[i] for i in indices]
+        # The state is read in chunks split along its first c physical axes.
+        c = max(self._num_prefix_qubits, self._num_qubits - _CHUNK_QUBITS)
+        chunk_axes = sorted(a for a in axes if a < c)
+        local_axes = sorted(a - c for a in axes if a >= c)
+        other_axes = tuple(
+            a for a in range(self._num_qubits - c) if a not in local_axes)
+        chunks_per_shard = 1 << (c - self._num_prefix_qubits)
+        chunk_shape = (2,) * c
+
+        def shard_probs(shard: int) -> np.ndarray:
+            chunks = np.reshape(self._data.state,
+                                (1 << c,) + self._data.state.shape[c:])
+            tensor = np.zeros((2,) * len(axes))
+            for chunk in range(shard * chunks_per_shard,
+                               (shard + 1) * chunks_per_shard):
+                chunk_bits = np.unravel_index(chunk, chunk_shape)
+                tensor[tuple(chunk_bits[a] for a in chunk_axes)] += np.sum(
+                    np.abs(chunks[chunk])**2, axis=other_axes, dtype=np.float64)
+            return tensor
+
+        # The probabilities of the measured axes, in increasing axis order.
+        tensor = np.sum(self._pool.map(shard_probs, range(self._num_shards)),
+                        axis=0)
+        sorted_axes = chunk_axes + [a + c for a in local_axes]
+        return wave_function._marginal_probs(
+            tensor, [sorted_axes.index(a) for a in axes])
+
+    def restore_order(self) -> None:
+        """Puts the qubits of the state back in their logical order."""
+        if self._axes == list(range(self._num_qubits)):
+            return
+        # Physical axis self._axes[q] holds qubit q, so this transposition
+        # moves it to axis q.
+        self._permute(self._axes)
+        self._axes = list(range(self._num_qubits))
+
+    def _apply_unsharded(self, op: ops.Operation, axes: List[int]) -> None:
+        result = protocols.apply_unitary(
+            op,
+            protocols.ApplyUnitaryArgs(self._data.state, self._data.buffer,
+                                       axes))
+        if result is self._data.buffer:
+            self._data.state, self._data.buffer = (self._data.buffer,
+                                                   self._data.state)
+        elif result is not self._data.state:
+            np.copyto(self._data.state, result)
+
+    def _apply_to_shard(self, op: ops.Operation, axes: List[int],
+                        shard: int) -> bool:
+        """Applies the operation to a shard, returning if the result is in
+        the buffer."""
+        state = self._shard(self._data.state, shard)
+        buffer = self._shard(self._data.buffer, shard)
+        result = protocols.apply_unitary(
+            op, protocols.ApplyUnitaryArgs(state, buffer, axes))
+        if result is buffer:
+            return True
+        if result is not state:
+            np.copyto(state, result)
+        return False
+
+    def _copy_buffer_shard_to_state(self, shard: int) -> None:
+        np.copyto(self._shard(self._data.state, shard),
+                  self._shard(self._data.buffer, shard))
+
+    def _shard(self, tensor: np.ndarray, shard: int) -> np.ndarray:
+        return np.reshape(tensor, (self._num_shards,) +
+                          tensor.shape[self._num_prefix_qubits:])[shard]
+
+    def _exchange(self, swaps: Dict[int, int]) -> None:
+        """Exchanges pairs of physical axes of the state."""
+        permutation = list(range(self._num_qubits))
+        for a, b in swaps.items():
+            permutation[a], permutation[b] = b, a
+        self._permute(permutation)
+        self._axes = [permutation[a] for a in self._axes]
+
+    def _permute(self, permutation: List[int]) -> None:
+        """Transposes the state (into the buffer) in parallel."""
+        transposed = np.transpose(self._data.state, permutation)
+        prefix_shape = (2,) * self._num_prefix_qubits
+
+        def copy_shard(shard: int) -> None:
+            np.copyto(self._shard(self._data.buffer, shard),
+                      transposed[np.unravel_index(shard, prefix_shape)])
+
+        self._pool.map(copy_shard, range(self._num_shards))
+        self._data.state, self._data.buffer = (self._data.buffer,
+                                               self._data.state)
@@ -0,0 +1,149 @@
+# Copyright 2019 The Cirq Developers
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     https://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import multiprocessing.dummy
+
+import numpy as np
+import pytest
+
+import cirq
+from cirq.sim import sharded_state
+
+
+class StateAndBuffer:
+
+    def __init__(self, state):
+        self.state = state
+        self.buffer = np.empty_like(state)
+
+
+def apply_sharded(circuit, qubits, num_prefix_qubits, pool):
+    state = cirq.testing.random_superposition(2**len(qubits)).astype(
+        np.complex128)
+    data = StateAndBuffer(np.reshape(state.copy(), (2,) * len(qubits)))
+    shards = sharded_state.ShardedStateVector(data, num_prefix_qubits, pool)
+    for op in circuit.all_operations():
+        shards.apply_unitary(op, [qubits.index(q) for q in op.qubits])
+    shards.restore_order()
+    expected = circuit.apply_unitary_effect_to_state(state, qubit_order=qubits)
+    np.testing.assert_allclose(np.reshape(data.state, -1), expected, atol=1e-8)
+
+
+@pytest.mark.parametrize('num_prefix_qubits', [1, 2, 3])
+def test_random_circuits(num_prefix_qubits):
+    qubits = cirq.LineQubit.range(6)
+    with multiprocessing.dummy.Pool(1 << num_prefix_qubits) as pool:
+        for _ in range(5):
+            circuit = cirq.testing.random_circuit(qubits,
+                                                  n_moments=10,
+                                                  op_density=0.8)
+            apply_sharded(circuit, qubits, num_prefix_qubits, pool)
+
+
+def test_gate_on_all_prefix_qubits():
+    qubits = cirq.LineQubit.range(4)
+    circuit = cirq.Circuit.from_ops(cirq.H(qubits[0]),
+                                    cirq.CCX(qubits[0], qubits[1], qubits[3]),
+                                    cirq.CNOT(qubits[1], qubits[0]),
+                                    cirq.SWAP(qubits[0], qubits[2]))
+    with multiprocessing.dummy.Pool(4) as pool:
+        apply_sharded(circuit, qubits, 2, pool)
+
+
+def test_gate_without_free_local_qubits():
+    qubits = cirq.LineQubit.range(3)
+    circuit = cirq.Circuit.from_ops(cirq.H.on_each(*qubits), cirq.CCZ(*qubits),
+                                    cirq.CSWAP(qubits[2], qubits[0], qubits[1]))
+    with multiprocessing.dummy.Pool(4) as pool:
+        apply_sharded(circuit, qubits, 2, pool)
+
+
+def test_mixed_result_locations():
+
+    class ResultInBufferForOddShards(cirq.SingleQubitGate):
+        calls = 0
+
+        def _has_unitary_(self):
+            return True
+
+        def _unitary_(self):
+            # coverage: ignore
+            return np.eye(2)
+
+        def _apply_unitary_(self, args):
+            ResultInBufferForOddShards.calls += 1
+            if args.target_tensor[(0,) * args.target_tensor.ndim] == 0.5:
+                np.copyto(args.available_buffer, args.target_tensor)
+                return args.available_buffer
+            return args.target_tensor
+
+    state = np.full((2, 2, 2), 0.5, dtype=np.complex64)
+    state[1, 0, 0] = 0
+    data = StateAndBuffer(state.copy())
+    with multiprocessing.dummy.Pool(2) as pool:
+        shards = sharded_state.ShardedStateVector(data, 1, pool)
+        shards.apply_unitary(ResultInBufferForOddShards().on(cirq.LineQubit(0)),
+                             [2])
+    assert ResultInBufferForOddShards.calls == 2
+    np.testing.assert_equal(data.state, state)
+
+
+@pytest.mark.parametrize('indices', [[0], [3], [4, 0], [1, 5, 2], [0, 1]])
+def test_measure(indices):
+    qubits = cirq.LineQubit.range(6)
+    state = cirq.testing.random_superposition(64).astype(np.complex128)
+    data = StateAndBuffer(np.reshape(state.copy(), (2,) * 6))
+    with multiprocessing.dummy.Pool(4) as pool:
+        shards = sharded_state.ShardedStateVector(data, 2, pool)
+        # Moves qubits 0 and 1 out of the prefix.
+        shards.apply_unitary(cirq.CZ(qubits[0], qubits[1]), [0, 1])
+        bits = shards.measure(indices, seed=np.random.RandomState(5))
+        shards.restore_order()
+
+    state = cirq.Circuit.from_ops(
+        cirq.CZ(qubits[0], qubits[1]),
+        cirq.IdentityGate(6).on(*qubits)).apply_unitary_effect_to_state(state)
+    expected_bits, expected_state = cirq.measure_state_vector(
+        state, indices, seed=np.random.RandomState(5))
+    assert bits == expected_bits
+    np.testing.assert_allclose(np.reshape(data.state, -1),
+                               expected_state,
+                               atol=1e-8)
+
+
+def test_measure_without_prefix_qubits():
+    data = StateAndBuffer(np.reshape(np.array([0, 0.6, 0, 0.8j]), (2, 2)))
+    with multiprocessing.dummy.Pool(1) as pool:
+        shards = sharded_state.ShardedStateVector(data, 0, pool)
+        assert shards.measure([1]) == [1]
+        assert shards.measure([0], seed=np.random.RandomState(1)) in ([0], [1])
+    assert np.count_nonzero(data.state) == 1
+    np.testing.assert_allclose(abs(np.sum(data.state)), 1)
+
+
+@pytest.mark.parametrize('chunk_qubits', [2, 4, 6])
+@pytest.mark.parametrize('indices', [[0], [5], [4, 0], [1, 5, 2], [0, 1]])
+def test_probabilities(monkeypatch, chunk_qubits, indices):
+    monkeypatch.setattr(sharded_state, '_CHUNK_QUBITS', chunk_qubits)
+    qubits = cirq.LineQubit.range(6)
+    state = cirq.testing.random_superposition(64).astype(np.complex64)
+    data = StateAndBuffer(np.reshape(state.copy(), (2,) * 6))
+    with multiprocessing.dummy.Pool(2) as pool:
+        shards = sharded_state.ShardedStateVector(data, 1, pool)
+        # Moves qubit 0 out of the prefix.
+        shards.apply_unitary(cirq.CZ(qubits[0], qubits[1]), [0, 1])
+        probs = shards.probabilities(indices)
+    np.testing.assert_allclose(probs,
+                               cirq.sim.wave_function._probs(state, indices, 6),
+                               atol=1e-6)
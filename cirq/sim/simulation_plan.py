@@ -0,0 +1,165 @@
+# Copyright 2019 The Cirq Developers
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     https://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Circuits prepared once for simulation and reused across parameters."""
+
+from typing import Any, Callable, Iterable, Iterator, List, Optional, Tuple
+
+from cirq import circuits, ops, protocols, study
+
+# An operation paired with the indices of the qubits it acts on. The indices
+# are None for a parameterized operation that still needs to be resolved.
+_PlanEntry = Tuple[ops.Operation, Optional[List[int]]]
+
+
+class SimulationPlan:
+    """A circuit decomposed and indexed once, to be simulated many times.
+
+    Building a plan computes the qubit order of the circuit, decomposes its
+    operations into operations the simulator knows how to apply, and records
+    the qubit indices that each of them acts on. Parameterized operations
+    can't be decomposed before their parameters are known, so they are
+    recorded as slots. Resolving the plan for a parameter resolver only
+    resolves and decomposes the operations in these slots, reusing the rest
+    of the plan as is.
+
+    Attributes:
+        circuit: The (unresolved) circuit the plan was built from.
+        qubits: The qubits of the circuit, in simulation order.
+        qubit_map: A map from each qubit to its index in `qubits`.
+        measurement_ops: The measurement operations of the circuit, in order.
+    """
+
+    def __init__(self,
+                 circuit: circuits.Circuit,
+                 qubit_order: ops.QubitOrderOrList,
+                 keep: Callable[[ops.Operation], bool],
+                 on_stuck_raise: Callable[[ops.Operation], Any],
+                 moments: Optional[Iterable[ops.OP_TREE]] = None) -> None:
+        """Decomposes and indexes the circuit.
+
+        Args:
+            circuit: The circuit to prepare for simulation.
+            qubit_order: Determines the order of the qubits in the simulation.
+            keep: The predicate used to decompose operations (see
+                `cirq.decompose`).
+            on_stuck_raise: Creates the error raised when an operation can't
+                be decomposed into operations satisfying `keep`.
+            moments: The OP_TREEs to simulate, one per moment. Defaults to the
+                moments of the circuit; simulators that e.g. add noise to the
+                circuit can pass the modified moments instead.
+        """
+        self.circuit = circuit.copy()
+        self.qubits = ops.QubitOrder.as_qubit_order(qubit_order).order_for(
+            circuit.all_qubits())
+        self.qubit_map = {q: i for i, q in enumerate(self.qubits)}
+        self.measurement_ops = [
+            op for _, op, _ in circuit.findall_operations_with_gate_type(
+                ops.MeasurementGate)
+        ]
+        self._keep = keep
+        self._on_stuck_raise = on_stuck_raise
+
+        def keep_or_slot(op: ops.Operation) -> bool:
+            return protocols.is_parameterized(op) or keep(op)
+
+        self._moments = []  # type: List[List[_PlanEntry]]
+        self._moments_with_slots = []  # type: List[bool]
+        for moment in (circuit if moments is None else moments):
+            entries = []  # type: List[_PlanEntry]
+            has_slots = False
+            for op in protocols.decompose(moment,
+                                          keep=keep_or_slot,
+                                          on_stuck_raise=on_stuck_raise):
+                if protocols.is_parameterized(op):
+                    entries.append((op, None))
+                    has_slots = True
+                else:
+                    entries.append((op, self._indices(op)))
+            self._moments.append(entries)
+            self._moments_with_slots.append(has_slots)
+
+    @property
+    def num_qubits(self) -> int:
+        return len(self.qubits)
+
+    def __len__(self) -> int:
+        return len(self._moments)
+
+    def _indices(self, op: ops.Operation) -> List[int]:
+        return [self.qubit_map[q] for q in op.qubits]
+
+    def resolved_moments(self, param_resolver: study.ParamResolver
+                        ) -> Iterator[List[Tuple[ops.Operation, List[int]]]]:
+        """Yields the decomposed operations of each moment, with parameters.
+
+        Args:
+            param_resolver: The resolver used for the parameterized slots.
+
+        Yields:
+            For each moment, a list of the (resolved) operations to apply and
+            the indices of the qubits they act on. Moments without slots are
+            shared between calls and must not be mutated.
+        """
+        for entries, has_slots in zip(self._moments, self._moments_with_slots):
+            if not has_slots:
+                yield entries  # type: ignore
+                continue
+            resolved = []  # type: List[Tuple[ops.Operation, List[int]]]
+            for op, indices in entries:
+                if indices is not None:
+                    resolved.append((op, indices))
+                    continue
+                for sub_op in protocols.decompose(
+                        protocols.resolve_parameters(op, param_resolver),
+                        keep=self._keep,
+                        on_stuck_raise=self._on_stuck_raise):
+                    resolved.append((sub_op, self._indices(sub_op)))
+            yield resolved
+
+
+class SimulationPlanCache:
+    """Remembers the plans built for the most recently simulated circuits.
+
+    Circuits are mutable, so a cached plan is only used for a circuit that is
+    equal to the circuit the plan was built from.
+    """
+
+    def __init__(self, max_size: int = 4) -> None:
+        self._max_size = max_size
+        # Most recently used plans come last.
+        self._plans = []  # type: List[SimulationPlan]
+
+    def get(self, circuit: circuits.Circuit,
+            build: Callable[[], SimulationPlan]) -> SimulationPlan:
+        """Returns the cached plan for the circuit, building it if needed.
+
+        Args:
+            circuit: The circuit to get a plan for.
+            build: Builds the plan when none is cached.
+        """
+        for i, plan in enumerate(self._plans):
+            if plan.circuit == circuit:
+                del self._plans[i]
+                self._plans.append(plan)
+                return plan
+        plan = build()
+        self._plans.append(plan)
+        del self._plans[:-self._max_size]
+        return plan
+
+    def clear(self) -> None:
+        self._plans = []
+
+    def __len__(self) -> int:
+        return len(self._plans)
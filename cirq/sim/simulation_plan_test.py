@@ -0,0 +1,204 @@
+# Copyright 2019 The Cirq Developers
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     https://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+from unittest import mock
+
+import numpy as np
+import pytest
+import sympy
+
+import cirq
+from cirq.sim import simulation_plan
+
+
+def _on_stuck(op):
+    return TypeError('stuck: {!r}'.format(op))
+
+
+def _plan(circuit, qubit_order=cirq.QubitOrder.DEFAULT):
+    return simulation_plan.SimulationPlan(circuit,
+                                          qubit_order,
+                                          keep=cirq.has_unitary,
+                                          on_stuck_raise=_on_stuck)
+
+
+def test_plan_indexes_and_decomposes():
+    a, b = cirq.LineQubit.range(2)
+    circuit = cirq.Circuit.from_ops(cirq.H(a), cirq.SWAP(a, b),
+                                    cirq.measure(a, b))
+    plan = simulation_plan.SimulationPlan(cirq.Circuit.from_ops(
+        cirq.H(a), cirq.CCZ(a, b, cirq.LineQubit(2))),
+                                          cirq.QubitOrder.DEFAULT,
+                                          keep=lambda op: len(op.qubits) < 3,
+                                          on_stuck_raise=_on_stuck)
+    assert plan.qubits == tuple(cirq.LineQubit.range(3))
+    assert plan.qubit_map == {
+        q: i for i, q in enumerate(cirq.LineQubit.range(3))
+    }
+    assert plan.num_qubits == 3
+    assert len(plan) == 2
+    moments = list(plan.resolved_moments(cirq.ParamResolver({})))
+    assert moments[0] == [(cirq.H(a), [0])]
+    assert len(moments[1]) > 1
+    assert all(len(op.qubits) < 3 for op, _ in moments[1])
+
+    plan = simulation_plan.SimulationPlan(
+        circuit, [b, a],
+        keep=lambda op: cirq.has_unitary(op) or cirq.is_measurement(op),
+        on_stuck_raise=_on_stuck)
+    assert plan.qubits == (b, a)
+    assert plan.measurement_ops == [cirq.measure(a, b)]
+    moments = list(plan.resolved_moments(cirq.ParamResolver({})))
+    assert moments == [[(cirq.H(a), [1])], [(cirq.SWAP(a, b), [1, 0])],
+                       [(cirq.measure(a, b), [1, 0])]]
+
+
+def test_plan_resolves_slots():
+    a, b = cirq.LineQubit.range(2)
+    t = sympy.Symbol('t')
+    circuit = cirq.Circuit.from_ops(cirq.X(a),
+                                    cirq.Y(b)**t, cirq.CZ(a, b),
+                                    cirq.CZ(a, b)**(2 * t))
+    plan = _plan(circuit)
+
+    first = list(plan.resolved_moments(cirq.ParamResolver({'t': 0.5})))
+    second = list(plan.resolved_moments(cirq.ParamResolver({'t': 0.25})))
+    assert first[0] == [(cirq.X(a), [0]), (cirq.Y(b)**0.5, [1])]
+    assert second[0] == [(cirq.X(a), [0]), (cirq.Y(b)**0.25, [1])]
+    assert first[1] == [(cirq.CZ(a, b), [0, 1])]
+    assert second[2] == [(cirq.CZ(a, b)**0.5, [0, 1])]
+    # Moments without parameters are shared rather than rebuilt.
+    assert first[1] is second[1]
+
+
+def test_plan_decomposes_resolved_slots():
+
+    class ParameterizedComposite(cirq.SingleQubitGate):
+
+        def __init__(self, exponent):
+            self.exponent = exponent
+
+        def _is_parameterized_(self):
+            return cirq.is_parameterized(self.exponent)
+
+        def _resolve_parameters_(self, resolver):
+            return ParameterizedComposite(resolver.value_of(self.exponent))
+
+        def _decompose_(self, qubits):
+            yield cirq.X(qubits[0])**self.exponent
+            yield cirq.Z(qubits[0])
+
+    a = cirq.LineQubit(0)
+    plan = simulation_plan.SimulationPlan(
+        cirq.Circuit.from_ops(ParameterizedComposite(sympy.Symbol('t')).on(a)),
+        cirq.QubitOrder.DEFAULT,
+        keep=lambda op: not isinstance(op.gate, ParameterizedComposite),
+        on_stuck_raise=_on_stuck)
+    moments = list(plan.resolved_moments(cirq.ParamResolver({'t': 0.5})))
+    assert moments == [[(cirq.X(a)**0.5, [0]), (cirq.Z(a), [0])]]
+
+
+def test_plan_stuck():
+
+    class NoUnitary(cirq.SingleQubitGate):
+        pass
+
+    with pytest.raises(TypeError, match='stuck'):
+        _plan(cirq.Circuit.from_ops(NoUnitary().on(cirq.LineQubit(0))))
+
+
+def test_plan_custom_moments():
+    a = cirq.LineQubit(0)
+    circuit = cirq.Circuit.from_ops(cirq.X(a))
+    plan = simulation_plan.SimulationPlan(circuit,
+                                          cirq.QubitOrder.DEFAULT,
+                                          keep=cirq.has_unitary,
+                                          on_stuck_raise=_on_stuck,
+                                          moments=[[cirq.X(a),
+                                                    cirq.Z(a)]])
+    assert list(plan.resolved_moments(cirq.ParamResolver({}))) == [[
+        (cirq.X(a), [0]), (cirq.Z(a), [0])
+    ]]
+
+
+def test_cache():
+    a = cirq.LineQubit(0)
+    cache = simulation_plan.SimulationPlanCache(max_size=2)
+    circuit = cirq.Circuit.from_ops(cirq.X(a))
+    build = mock.Mock(side_effect=lambda: _plan(circuit))
+
+    plan = cache.get(circuit, build)
+    assert build.call_count == 1
+    assert cache.get(circuit, build) is plan
+    assert cache.get(circuit.copy(), build) is plan
+    assert build.call_count == 1
+    assert len(cache) == 1
+
+    # Mutating the circuit invalidates the plan.
+    circuit.append(cirq.Y(a))
+    assert cache.get(circuit, build) is not plan
+    assert build.call_count == 2
+    assert len(cache) == 2
+
+    # The least recently used plan is evicted.
+    other = cirq.Circuit.from_ops(cirq.Z(a))
+    cache.get(other, lambda: _plan(other))
+    assert len(cache) == 2
+    cache.get(cirq.Circuit.from_ops(cirq.X(a)), build)
+    assert build.call_count == 3
+
+    cache.clear()
+    assert len(cache) == 0
+
+
+@pytest.mark.parametrize('simulator', [
+    cirq.Simulator(),
+    cirq.DensityMatrixSimulator(),
+])
+def test_run_sweep_builds_plan_once(simulator):
+    a, b = cirq.LineQubit.range(2)
+    t = sympy.Symbol('t')
+    circuit = cirq.Circuit.from_ops(
+        cirq.X(a)**t, cirq.CNOT(a, b), cirq.measure(a, b, key='m'))
+    with mock.patch.object(simulator, '_plan',
+                           wraps=simulator._plan) as mock_plan:
+        results = simulator.run_sweep(circuit,
+                                      cirq.Linspace('t', 0, 1, 3),
+                                      repetitions=2)
+        np.testing.assert_equal(results[0].measurements['m'],
+                                [[False, False]] * 2)
+        np.testing.assert_equal(results[2].measurements['m'],
+                                [[True, True]] * 2)
+        assert mock_plan.call_count == 1
+
+        simulator.run(circuit.copy(), cirq.ParamResolver({'t': 1}))
+        assert mock_plan.call_count == 1
+
+        circuit.append(cirq.X(b))
+        result = simulator.run(circuit, cirq.ParamResolver({'t': 1}))
+        np.testing.assert_equal(result.measurements['m'], [[True, True]])
+        assert mock_plan.call_count == 2
+
+
+def test_density_matrix_simulator_with_noise_does_not_cache():
+    a = cirq.LineQubit(0)
+    circuit = cirq.Circuit.from_ops(cirq.X(a), cirq.measure(a, key='m'))
+    simulator = cirq.DensityMatrixSimulator(
+        noise=cirq.ConstantQubitNoiseModel(cirq.bit_flip(0)))
+    with mock.patch.object(simulator, '_plan',
+                           wraps=simulator._plan) as mock_plan:
+        for _ in range(2):
+            result = simulator.run(circuit)
+            np.testing.assert_equal(result.measurements['m'], [[True]])
+        assert mock_plan.call_count == 2
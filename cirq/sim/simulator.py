@@ -468,9 +468,8 @@ class StepResult(metaclass=abc.ABCMeta):
             bounds[key] = (current_index, current_index + len(op.qubits))
             all_qubits.extend(op.qubits)
             current_index += len(op.qubits)
-        indexed_sample = self.sample(all_qubits, repetitions)
-        return {k: np.array([x[s:e] for x in indexed_sample]) for k, (s, e) in
-                bounds.items()}
+        indexed_sample = np.asarray(self.sample(all_qubits, repetitions))
+        return {k: indexed_sample[:, s:e] for k, (s, e) in bounds.items()}
 
 
 @value.value_equality(unhashable=True)
@@ -15,13 +15,27 @@
 """A simulator that uses numpy's einsum or sparse matrix operations."""
 
 import collections
+import functools
+import hashlib
+import json
+import multiprocessing.dummy
+import os
 
-from typing import Dict, Iterator, List, Union
+from typing import (Any, Callable, Dict, Iterable, Iterator, List, Optional,
+                    Sequence, Tuple, Type, Union)
 
 import numpy as np
 
 from cirq import circuits, linalg, ops, protocols, study
-from cirq.sim import simulator, wave_function, wave_function_simulator
+from cirq.sim import (sharded_state, simulation_plan, simulator, wave_function,
+                      wave_function_simulator)
+
+# Memory mapped states are streamed through memory in blocks of at most this
+# many qubits.
+_MEMMAP_BLOCK_QUBITS = 24
+
+# Diagonal unitaries are merged into phase tensors on at most this many qubits.
+_MAX_DIAGONAL_QUBITS = 10
 
 
 # Mutable named tuple to hold state and a buffer.
@@ -31,6 +45,425 @@ class _StateAndBuffer():
         self.buffer = buffer
 
 
+class _Trajectory():
+    """A group of repetitions that share a state and a measurement history.
+
+    Attributes:
+        data: The state (and scratch buffer) of the trajectory.
+        repetitions: The number of repetitions following this trajectory.
+        history: The measurement results seen by the trajectory so far, as
+            a tuple of (moment index, measurement key, bits) records.
+    """
+
+    def __init__(self, data: _StateAndBuffer, repetitions: int,
+                 history: Tuple[Tuple[int, str, List[bool]], ...]):
+        self.data = data
+        self.repetitions = repetitions
+        self.history = history
+
+
+class _PendingBranch():
+    """A not yet simulated child of a trajectory that hit a stochastic op.
+
+    All of the children of a trajectory share its state until they are
+    resolved. Every child but the last one resolved works on a copy, while
+    the last one takes over the parent's state and buffer.
+    """
+
+    def __init__(self, parent: _Trajectory, siblings: List[int],
+                 repetitions: int,
+                 record: Optional[Tuple[int, str, List[bool]]],
+                 transition: Callable[[_StateAndBuffer], None]):
+        self._parent = parent
+        self._siblings = siblings
+        self._repetitions = repetitions
+        self._record = record
+        self._transition = transition
+
+    @staticmethod
+    def split(parent: _Trajectory, outcomes: Sequence[Tuple[int, Optional[
+            Tuple[int, str, List[bool]]], Callable[[_StateAndBuffer], None]]]
+             ) -> List['_PendingBranch']:
+        """Creates one pending branch per (repetitions, record, transition).
+        """
+        siblings = [len(outcomes)]
+        return [
+            _PendingBranch(parent, siblings, int(repetitions), record,
+                           transition)
+            for repetitions, record, transition in outcomes
+        ]
+
+    def resolve(self, update_state: bool = True) -> _Trajectory:
+        """Applies the branch's outcome, returning the child trajectory.
+
+        Args:
+            update_state: If False, the child shares its parent's (stale)
+                state and only its measurement history is updated.
+        """
+        self._siblings[0] -= 1
+        parent_data = self._parent.data
+        if not update_state:
+            data = parent_data
+        elif self._siblings[0]:
+            data = _StateAndBuffer(state=parent_data.state,
+                                   buffer=np.empty_like(parent_data.state))
+            self._transition(data)
+            if data.buffer is parent_data.state:
+                data.buffer = np.empty_like(parent_data.state)
+        else:
+            data = parent_data
+            self._transition(data)
+        history = self._parent.history
+        if self._record is not None:
+            history += (self._record,)
+        return _Trajectory(data, self._repetitions, history)
+
+
+def _trajectories_to_measurements(trajectories: List[_Trajectory],
+                                  repetitions: int) -> Dict[str, np.ndarray]:
+    """Expands finished trajectories into per-repetition measurement results.
+
+    The repetitions are shuffled so that trajectories which share a history
+    do not end up grouped together in the output.
+    """
+    blocks = collections.defaultdict(list)  # type: Dict[str, List[np.ndarray]]
+    for trajectory in trajectories:
+        # Bits measured by the same key within a moment form a single row.
+        rows = collections.OrderedDict(
+        )  # type: Dict[Tuple[int, str], List[bool]]
+        for moment_index, key, bits in trajectory.history:
+            rows.setdefault((moment_index, key), []).extend(bits)
+        per_key = collections.defaultdict(
+            list)  # type: Dict[str, List[List[bool]]]
+        for (_, key), bits in rows.items():
+            per_key[key].append(bits)
+        for key, key_rows in per_key.items():
+            block = np.array(key_rows, dtype=bool)
+            blocks[key].append(
+                np.broadcast_to(block, (trajectory.repetitions,) + block.shape))
+    permutation = np.random.permutation(repetitions)
+    return {
+        k: np.concatenate(v)[permutation].reshape((-1, v[0].shape[-1]))
+        for k, v in blocks.items()
+    }
+
+
+class _SerialPool():
+    """A stand-in for a thread pool that maps in the calling thread."""
+
+    def map(self, func: Callable[[Any], Any],
+            iterable: Iterable[Any]) -> List[Any]:
+        return [func(item) for item in iterable]
+
+
+class _MemmapStorage():
+    """The files backing the state of a memory mapped simulation.
+
+    The state and its buffer are stored as `.npy` files in a directory. After
+    a moment is simulated, the files are flushed and a checkpoint file records
+    which of them holds the state, the index of the moment and the
+    measurement results so far, so that the simulation can be resumed.
+    Checkpoints are identified by a key describing the simulation.
+    """
+
+    _FILES = ('state0.npy', 'state1.npy')
+    _CHECKPOINT = 'checkpoint.json'
+
+    def __init__(self, directory: str, key: str) -> None:
+        self._directory = directory
+        self._key = key
+        self._files = []  # type: List[np.ndarray]
+
+    def _path(self, name: str) -> str:
+        return os.path.join(self._directory, name)
+
+    def allocate(self, num_qubits: int,
+                 dtype: Type[np.number]) -> _StateAndBuffer:
+        """Creates (or overwrites) the files for a new simulation."""
+        os.makedirs(self._directory, exist_ok=True)
+        # The old checkpoint refers to the files being overwritten.
+        if os.path.exists(self._path(self._CHECKPOINT)):
+            os.remove(self._path(self._CHECKPOINT))
+        self._files = [
+            np.lib.format.open_memmap(self._path(name),
+                                      mode='w+',
+                                      dtype=dtype,
+                                      shape=(2,) * num_qubits)
+            for name in self._FILES
+        ]
+        return _StateAndBuffer(state=self._files[0], buffer=self._files[1])
+
+    def save(self, moment_index: int, data: _StateAndBuffer,
+             measurements: Dict[str, List[bool]]) -> None:
+        """Checkpoints the state after the given moment."""
+        data.state.flush()
+        checkpoint = {
+            'key': self._key,
+            'moment': moment_index,
+            'state': self._FILES[1 if data.state is self._files[1] else 0],
+            'measurements':
+            {k: [bool(bit) for bit in v] for k, v in measurements.items()},
+        }
+        temporary_path = self._path(self._CHECKPOINT + '.tmp')
+        with open(temporary_path, 'w') as f:
+            json.dump(checkpoint, f)
+        # Replacing the checkpoint is atomic, so a crash never leaves a
+        # partially written checkpoint behind.
+        os.replace(temporary_path, self._path(self._CHECKPOINT))
+
+    def load(self
+            ) -> Optional[Tuple[int, _StateAndBuffer, Dict[str, List[bool]]]]:
+        """Returns the moment index, state and measurements of the checkpoint.
+
+        Returns None if there is no checkpoint of this simulation.
+        """
+        try:
+            with open(self._path(self._CHECKPOINT)) as f:
+                checkpoint = json.load(f)
+        except FileNotFoundError:
+            return None
+        if checkpoint['key'] != self._key:
+            return None
+        self._files = [
+            np.lib.format.open_memmap(self._path(name), mode='r+')
+            for name in self._FILES
+        ]
+        state, buffer = self._files
+        if checkpoint['state'] != self._FILES[0]:
+            state, buffer = buffer, state
+        return (checkpoint['moment'], _StateAndBuffer(state=state,
+                                                      buffer=buffer),
+                checkpoint['measurements'])
+
+
+class _FusedOperation(ops.Operation):
+    """A run of unitary operations merged into a single dense unitary."""
+
+    def __init__(self, qubits: Sequence[ops.Qid], matrix: np.ndarray,
+                 operations: Sequence[ops.Operation]) -> None:
+        self._qubits = tuple(qubits)
+        self._matrix = matrix
+        self._tensor = np.reshape(matrix, (2,) * (2 * len(self._qubits)))
+        self._operations = tuple(operations)
+
+    @property
+    def qubits(self) -> Tuple[ops.Qid, ...]:
+        return self._qubits
+
+    def with_qubits(self, *new_qubits: ops.Qid) -> '_FusedOperation':
+        qubit_map = dict(zip(self._qubits, new_qubits))
+        return _FusedOperation(new_qubits, self._matrix, [
+            op.transform_qubits(qubit_map.__getitem__)
+            for op in self._operations
+        ])
+
+    def _has_unitary_(self) -> bool:
+        return True
+
+    def _unitary_(self) -> np.ndarray:
+        return self._matrix
+
+    def _apply_unitary_(self, args: protocols.ApplyUnitaryArgs) -> np.ndarray:
+        # np.tensordot goes through BLAS, which is much faster than the
+        # np.einsum used by targeted_left_multiply for larger fused blocks.
+        n = len(self._qubits)
+        axes = list(args.axes)
+        result = np.tensordot(self._tensor.astype(args.target_tensor.dtype,
+                                                  copy=False),
+                              args.target_tensor,
+                              axes=(list(range(n, 2 * n)), axes))
+        np.copyto(dst=args.available_buffer,
+                  src=np.moveaxis(result, list(range(n)), axes))
+        return args.available_buffer
+
+    def __repr__(self):
+        return '_FusedOperation(qubits={!r}, operations={!r})'.format(
+            self._qubits, list(self._operations))
+
+
+class _UnitaryFuser():
+    """Greedily merges runs of unitary operations acting on few qubits.
+
+    Operations are added in the order they are to be applied. Unitary
+    operations are accumulated into pending blocks, each acting on at most
+    `max_qubits` qubits; an operation joins the blocks it overlaps if the
+    result still fits, and otherwise those blocks are released and the
+    operation starts a new block of its own. Released blocks are returned as
+    single operations (fused into a dense matrix if they contain more than
+    one operation) that can be applied in the order returned.
+
+    Attributes:
+        sweeps_saved: The number of operations absorbed into fused blocks,
+            i.e. the number of passes over the full state that applying the
+            released operations saves compared to the original operations.
+    """
+
+    def __init__(self, max_qubits: int, dtype: Type[np.number]) -> None:
+        self._max_qubits = max_qubits
+        self._dtype = dtype
+        # Pending blocks, each a pair of (qubits, operations).
+        self._blocks = [
+        ]  # type: List[Tuple[List[ops.Qid], List[ops.Operation]]]
+        self.sweeps_saved = 0
+
+    def add(self, op: ops.Operation) -> List[ops.Operation]:
+        """Adds a unitary operation, returning any released operations."""
+        touched = [
+            block for block in self._blocks
+            if any(q in op.qubits for q in block[0])
+        ]
+        qubits = [q for block in touched for q in block[0]]
+        qubits.extend(q for q in op.qubits if q not in qubits)
+        if len(qubits) <= self._max_qubits:
+            for block in touched:
+                self._blocks.remove(block)
+            self._blocks.append(
+                (qubits, [o for block in touched for o in block[1]] + [op]))
+            return []
+        released = self._release(touched)
+        if len(op.qubits) > self._max_qubits:
+            return released + [op]
+        self._blocks.append((list(op.qubits), [op]))
+        return released
+
+    def flush(self, qubits: Optional[Iterable[ops.Qid]] = None
+             ) -> List[ops.Operation]:
+        """Releases the blocks touching the given qubits (default: all)."""
+        if qubits is None:
+            return self._release(list(self._blocks))
+        qubit_set = frozenset(qubits)
+        return self._release([
+            block for block in self._blocks if qubit_set.intersection(block[0])
+        ])
+
+    def _release(self, blocks: List[Tuple[List[ops.Qid], List[ops.Operation]]]
+                ) -> List[ops.Operation]:
+        released = []
+        for block in blocks:
+            self._blocks.remove(block)
+            released.append(self._fuse(*block))
+        return released
+
+    def _fuse(self, qubits: List[ops.Qid],
+              operations: List[ops.Operation]) -> ops.Operation:
+        if len(operations) == 1:
+            return operations[0]
+        self.sweeps_saved += len(operations) - 1
+        n = len(qubits)
+        qubit_map = {q: i for i, q in enumerate(qubits)}
+        state = np.eye(1 << n, dtype=self._dtype).reshape((2,) * (2 * n))
+        buffer = np.empty_like(state)
+        for op in operations:
+            result = protocols.apply_unitary(
+                op,
+                args=protocols.ApplyUnitaryArgs(
+                    state, buffer, [qubit_map[q] for q in op.qubits]))
+            if result is buffer:
+                buffer = state
+            state = result
+        return _FusedOperation(qubits, state.reshape((1 << n, 1 << n)),
+                               operations)
+
+
+class _DiagonalOperation(ops.Operation):
+    """Diagonal unitary operations merged into a single tensor of phases."""
+
+    def __init__(self, qubits: Sequence[ops.Qid], diagonal: np.ndarray,
+                 operations: Sequence[ops.Operation]) -> None:
+        self._qubits = tuple(qubits)
+        self._diagonal = diagonal
+        self._operations = tuple(operations)
+
+    @property
+    def qubits(self) -> Tuple[ops.Qid, ...]:
+        return self._qubits
+
+    def with_qubits(self, *new_qubits: ops.Qid) -> '_DiagonalOperation':
+        qubit_map = dict(zip(self._qubits, new_qubits))
+        return _DiagonalOperation(new_qubits, self._diagonal, [
+            op.transform_qubits(qubit_map.__getitem__)
+            for op in self._operations
+        ])
+
+    def _has_unitary_(self) -> bool:
+        return True
+
+    def _unitary_(self) -> np.ndarray:
+        return np.diag(self._diagonal)
+
+    def _unitary_diagonal_(self) -> np.ndarray:
+        return self._diagonal
+
+    def __repr__(self):
+        return '_DiagonalOperation(qubits={!r}, operations={!r})'.format(
+            self._qubits, list(self._operations))
+
+
+class _DiagonalMerger():
+    """Merges diagonal unitary operations into single passes over the state.
+
+    This has the same interface as `_UnitaryFuser`, and is used when dense
+    fusion isn't enabled. Diagonal unitaries (e.g. Z, CZ, CCZ and ZZ rotations)
+    commute with each other, so instead of multiplying the state by the
+    phases of each one separately, the pending diagonal operations are
+    merged into one tensor of phases on at most `max_qubits` qubits that is
+    applied in a single pass. Other operations are released straight away
+    unless they act on a pending qubit, in which case the pending diagonal
+    operations are released before them.
+
+    Attributes:
+        sweeps_saved: The number of operations absorbed into merged diagonal
+            operations.
+    """
+
+    def __init__(self, max_qubits: int) -> None:
+        self._max_qubits = max_qubits
+        self._qubits = []  # type: List[ops.Qid]
+        self._operations = []  # type: List[Tuple[ops.Operation, np.ndarray]]
+        self.sweeps_saved = 0
+
+    def add(self, op: ops.Operation) -> List[ops.Operation]:
+        """Adds a unitary operation, returning any released operations."""
+        diagonal = protocols.unitary_diagonal(op, None)
+        if diagonal is None or len(op.qubits) > self._max_qubits:
+            return self.flush(op.qubits) + [op]
+        new_qubits = [q for q in op.qubits if q not in self._qubits]
+        released = []  # type: List[ops.Operation]
+        if len(self._qubits) + len(new_qubits) > self._max_qubits:
+            released = self.flush()
+            new_qubits = list(op.qubits)
+        self._qubits.extend(new_qubits)
+        self._operations.append((op, diagonal))
+        return released
+
+    def flush(self, qubits: Optional[Iterable[ops.Qid]] = None
+             ) -> List[ops.Operation]:
+        """Releases the pending operations if they touch the given qubits
+        (default: always)."""
+        if not self._operations:
+            return []
+        if qubits is not None and not frozenset(qubits).intersection(
+                self._qubits):
+            return []
+        qubits, operations = self._qubits, self._operations
+        self._qubits, self._operations = [], []
+        if len(operations) == 1:
+            return [operations[0][0]]
+        self.sweeps_saved += len(operations) - 1
+        qubit_map = {q: i for i, q in enumerate(qubits)}
+        phases = np.ones((2,) * len(qubits), dtype=np.complex128)
+        buffer = np.empty_like(phases)
+        for op, diagonal in operations:
+            protocols.apply_diagonal(
+                diagonal,
+                protocols.ApplyUnitaryArgs(phases, buffer,
+                                           [qubit_map[q] for q in op.qubits]))
+        return [
+            _DiagonalOperation(qubits, np.reshape(phases, -1),
+                               [op for op, _ in operations])
+        ]
+
+
 class Simulator(simulator.SimulatesSamples,
                 wave_function_simulator.SimulatesIntermediateWaveFunction):
     """A sparse matrix wave function simulator that uses numpy.
@@ -60,7 +493,11 @@ class Simulator(simulator.SimulatesSamples,
 
     The simulation performs optimizations if the number of repetitions is
     greater than one and all measurements in the circuit are terminal (at the
-    end of the circuit). These methods return `TrialResult`s which contain both
+    end of the circuit). If measurements or mixtures are not terminal, the
+    repetitions are simulated together, sharing the simulation of the circuit
+    up to each stochastic operation and only branching into separate
+    simulations for outcomes that actually occur. These methods return
+    `TrialResult`s which contain both
     the measurement results, but also the parameters used for the parameterized
     circuit operations. The initial state of a run is always the all 0s state
     in the computational basis.
@@ -120,18 +557,154 @@ class Simulator(simulator.SimulatesSamples,
     See `Simulator` for the definitions of the supported methods.
     """
 
-    def __init__(self, *, dtype=np.complex64):
+    def __init__(self,
+                 *,
+                 dtype=np.complex64,
+                 max_fused_qubits: Optional[int] = None,
+                 num_prefix_qubits: int = 0,
+                 min_qubits_before_shard: int = 18,
+                 memmap_directory: Optional[str] = None,
+                 resume: bool = False):
         """A sparse matrix simulator.
 
         Args:
             dtype: The `numpy.dtype` used by the simulation. One of
             `numpy.complex64` or `numpy.complex128`
+            max_fused_qubits: If set, runs of unitary operations acting
+                together on at most this many qubits are merged into a single
+                dense unitary before being applied to the state, so that the
+                full state is swept over fewer times. Within `simulate` and
+                `simulate_moment_steps` only operations from the same moment
+                are merged, while `run` merges across moments. The number of
+                sweeps saved is accumulated in `fused_sweeps_saved`. If this
+                isn't set, only diagonal unitaries (e.g. Z, CZ and ZZ
+                rotations) are merged, into passes that multiply the state by
+                phases.
+            num_prefix_qubits: If positive, the wave function is split into
+                2**num_prefix_qubits shards, and unitary operations are
+                applied to the shards in parallel by as many threads. Gates
+                acting on the (most significant) prefix qubits are handled
+                by exchanging those qubits with other qubits. Measurements and
+                mixtures are simulated on the whole wave function. The
+                threads are kept until `close` is called, or until the end of
+                a `with` block using the simulator.
+            min_qubits_before_shard: The wave function is only sharded when
+                simulating at least this many qubits, as small wave functions
+                are faster to simulate in a single thread.
+            memmap_directory: If set, the wave function and its scratch buffer
+                are stored in memory mapped files in this directory (which
+                should be on a fast local disk), so that wave functions larger
+                than the available memory can be simulated. Unitaries are
+                applied by streaming the state through memory in blocks, and
+                only gates on the most significant qubits need extra sweeps
+                over the files, so it is worth combining this with
+                `max_fused_qubits`. The state is checkpointed after every
+                moment. A directory can only be used by one simulation at a
+                time, and the states in the results of a simulation refer to
+                the files, so they are overwritten by the next simulation.
+            resume: If True, simulations with a `memmap_directory` continue
+                from the checkpoint in that directory, provided it was written
+                by a simulation of the same circuit, parameters, qubit order
+                and initial state. The first step then has the state and all
+                of the measurement results of the checkpointed moment.
         """
         if dtype not in {np.complex64, np.complex128}:
             raise ValueError(
                 'dtype must be complex64 or complex128 but was {}'.format(
                     dtype))
+        if max_fused_qubits is not None and max_fused_qubits < 1:
+            raise ValueError(
+                'max_fused_qubits must be positive but was {}'.format(
+                    max_fused_qubits))
+        if num_prefix_qubits < 0:
+            raise ValueError(
+                'num_prefix_qubits must not be negative but was {}'.format(
+                    num_prefix_qubits))
         self._dtype = dtype
+        self._max_fused_qubits = max_fused_qubits
+        self._fused_sweeps_saved = 0
+        self._plans = simulation_plan.SimulationPlanCache()
+        self._num_prefix_qubits = num_prefix_qubits
+        self._min_qubits_before_shard = min_qubits_before_shard
+        self._pool = None  # type: Optional[multiprocessing.pool.ThreadPool]
+        self._memmap_directory = memmap_directory
+        self._resume = resume
+
+    def close(self) -> None:
+        """Stops the threads used to simulate sharded wave functions.
+
+        The simulator can still be used afterwards, and starts new threads
+        if it needs them.
+        """
+        if self._pool is not None:
+            self._pool.close()
+            self._pool.join()
+            self._pool = None
+
+    def __enter__(self) -> 'Simulator':
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
+
+    @property
+    def fused_sweeps_saved(self) -> int:
+        """The number of full state sweeps saved so far by gate fusion.
+
+        This counts the operations absorbed into fused unitaries (or, if
+        `max_fused_qubits` wasn't specified, into merged diagonal unitaries)
+        over every pass this simulator has made over a circuit.
+        """
+        return self._fused_sweeps_saved
+
+    def _fuser(self) -> Union[_UnitaryFuser, _DiagonalMerger]:
+        if self._max_fused_qubits is None:
+            return _DiagonalMerger(_MAX_DIAGONAL_QUBITS)
+        return _UnitaryFuser(self._max_fused_qubits, self._dtype)
+
+    def _shards(self, data: _StateAndBuffer,
+                memmapped: bool) -> Optional[sharded_state.ShardedStateVector]:
+        """Returns the sharded state, if the state should be sharded."""
+        num_qubits = data.state.ndim
+        parallel = (self._num_prefix_qubits > 0 and
+                    num_qubits >= self._min_qubits_before_shard and
+                    num_qubits > self._num_prefix_qubits)
+        if not parallel and not memmapped:
+            return None
+        num_prefix_qubits = self._num_prefix_qubits if parallel else 0
+        if memmapped:
+            # Sharding keeps the state in the mapped files, and streams it
+            # through memory one block at a time.
+            num_prefix_qubits = max(num_prefix_qubits,
+                                    num_qubits - _MEMMAP_BLOCK_QUBITS)
+        if not parallel:
+            return sharded_state.ShardedStateVector(data, num_prefix_qubits,
+                                                    _SerialPool())
+        if self._pool is None:
+            self._pool = multiprocessing.dummy.Pool(
+                1 << self._num_prefix_qubits)
+        return sharded_state.ShardedStateVector(data, num_prefix_qubits,
+                                                self._pool)
+
+    def _fuse_operations(self, operations: Iterable[Tuple[int, ops.Operation]]
+                        ) -> List[Tuple[int, ops.Operation]]:
+        """Fuses the unitaries in a stream of (moment index, op) pairs.
+
+        Fused operations are paired with the moment index of the operation
+        that caused them to be released.
+        """
+        fuser = self._fuser()
+        fused = []  # type: List[Tuple[int, ops.Operation]]
+        moment_index = 0
+        for moment_index, op in operations:
+            if protocols.has_unitary(op):
+                fused.extend((moment_index, f) for f in fuser.add(op))
+            else:
+                fused.extend((moment_index, f) for f in fuser.flush(op.qubits))
+                fused.append((moment_index, op))
+        fused.extend((moment_index, f) for f in fuser.flush())
+        self._fused_sweeps_saved += fuser.sweeps_saved
+        return fused
 
     def _run(
         self,
@@ -140,49 +713,207 @@ class Simulator(simulator.SimulatesSamples,
         repetitions: int) -> Dict[str, List[np.ndarray]]:
         """See definition in `cirq.SimulatesSamples`."""
         param_resolver = param_resolver or study.ParamResolver({})
-        resolved_circuit = protocols.resolve_parameters(circuit, param_resolver)
+        # The plan is cached, so repeatedly running the same circuit (e.g.
+        # over a parameter sweep) only decomposes the circuit once.
+        plan = self._plans.get(
+            circuit, lambda: self._plan(circuit, ops.QubitOrder.DEFAULT))
+
         def measure_or_mixture(op):
             return protocols.is_measurement(op) or protocols.has_mixture(op)
         if circuit.are_all_matches_terminal(measure_or_mixture):
-            return self._run_sweep_sample(resolved_circuit, repetitions)
+            return self._run_sweep_sample(plan, param_resolver, repetitions)
+        elif self._memmap_directory is not None:
+            # There is only room for one memory mapped state.
+            return self._run_sweep_repeat_each(plan, param_resolver,
+                                               repetitions)
         else:
-            return self._run_sweep_repeat(resolved_circuit, repetitions)
+            return self._run_sweep_repeat(plan, param_resolver, repetitions)
 
-    def _run_sweep_sample(
-        self,
-        circuit: circuits.Circuit,
-        repetitions: int) -> Dict[str, List[np.ndarray]]:
+    def _run_sweep_sample(self, plan: simulation_plan.SimulationPlan,
+                          param_resolver: study.ParamResolver,
+                          repetitions: int) -> Dict[str, List[np.ndarray]]:
         for step_result in self._base_iterator(
-                circuit=circuit,
-                qubit_order=ops.QubitOrder.DEFAULT,
+                plan=plan,
+                param_resolver=param_resolver,
                 initial_state=0,
-                perform_measurements=False):
+                perform_measurements=False,
+                # Memory mapped states are checkpointed after every moment.
+                fuse_across_moments=self._memmap_directory is None):
             pass
         # We can ignore the mixtures since this is a run method which
         # does not return the state.
-        measurement_ops = [op for _, op, _ in
-                           circuit.findall_operations_with_gate_type(
-                                   ops.MeasurementGate)]
-        return step_result.sample_measurement_ops(measurement_ops, repetitions)
+        return step_result.sample_measurement_ops(plan.measurement_ops,
+                                                  repetitions)
 
-    def _run_sweep_repeat(
-        self,
-        circuit: circuits.Circuit,
-        repetitions: int) -> Dict[str, List[np.ndarray]]:
+    def _run_sweep_repeat(self, plan: simulation_plan.SimulationPlan,
+                          param_resolver: study.ParamResolver,
+                          repetitions: int) -> Dict[str, List[np.ndarray]]:
+        """Runs repetitions of a circuit with non-terminal stochastic ops.
+
+        Rather than re-simulating the circuit once per repetition, the
+        repetitions are simulated together as a tree of trajectories. The
+        deterministic prefix of the circuit is simulated once, and at every
+        measurement or mixture the repetitions that reach it are split
+        (multinomially) among the possible outcomes. Each outcome that is
+        chosen by at least one repetition is then evolved once on behalf of
+        all of the repetitions that share its measurement history.
+        """
+        if repetitions == 0:
+            return {}
+
+        num_qubits = plan.num_qubits
+        qubit_map = plan.qubit_map
+        moment_ops = self._fuse_operations(
+            (i, op)
+            for i, moment in enumerate(plan.resolved_moments(param_resolver))
+            for op, _ in moment)
+
+        state = wave_function.to_valid_state_vector(0, num_qubits, self._dtype)
+        root = _Trajectory(data=_StateAndBuffer(state=np.reshape(
+            state, (2,) * num_qubits),
+                                                buffer=np.empty(
+                                                    (2,) * num_qubits,
+                                                    dtype=self._dtype)),
+                           repetitions=repetitions,
+                           history=())
+
+        leaves = []  # type: List[_Trajectory]
+        pending = [
+            (0, root)
+        ]  # type: List[Tuple[int, Union[_Trajectory, _PendingBranch]]]
+        while pending:
+            start, next_trajectory = pending.pop()
+            trajectory = (next_trajectory.resolve() if isinstance(
+                next_trajectory, _PendingBranch) else next_trajectory)
+            for op_index in range(start, len(moment_ops)):
+                moment_index, op = moment_ops[op_index]
+                indices = [qubit_map[qubit] for qubit in op.qubits]
+                if protocols.has_unitary(op):
+                    self._simulate_unitary(op, trajectory.data, indices)
+                    continue
+                if protocols.is_measurement(op):
+                    branches = self._measurement_branches(
+                        op, trajectory, indices, moment_index, num_qubits)
+                elif protocols.has_mixture(op):
+                    branches = self._mixture_branches(op, trajectory, indices)
+                else:
+                    continue
+                if branches is None:
+                    continue
+                if op_index == len(moment_ops) - 1:
+                    # Nothing reads the post-measurement states, so only the
+                    # measurement records are needed.
+                    leaves.extend(
+                        b.resolve(update_state=False) for b in branches)
+                else:
+                    pending.extend((op_index + 1, b) for b in branches)
+                break
+            else:
+                leaves.append(trajectory)
+
+        return _trajectories_to_measurements(leaves, repetitions)
+
+    def _run_sweep_repeat_each(self, plan: simulation_plan.SimulationPlan,
+                               param_resolver: study.ParamResolver,
+                               repetitions: int) -> Dict[str, List[np.ndarray]]:
+        """Runs repetitions of a circuit one at a time."""
         measurements = {}  # type: Dict[str, List[np.ndarray]]
         for _ in range(repetitions):
             all_step_results = self._base_iterator(
-                    circuit,
-                    qubit_order=ops.QubitOrder.DEFAULT,
-                    initial_state=0)
-
+                plan=plan,
+                param_resolver=param_resolver,
+                initial_state=0,
+                save_checkpoints=False)
             for step_result in all_step_results:
                 for k, v in step_result.measurements.items():
-                    if not k in measurements:
-                        measurements[k] = []
-                    measurements[k].append(np.array(v, dtype=bool))
+                    measurements.setdefault(k,
+                                            []).append(np.array(v, dtype=bool))
         return {k: np.array(v) for k, v in measurements.items()}
 
+    def _plan(self, circuit: circuits.Circuit, qubit_order: ops.QubitOrderOrList
+             ) -> simulation_plan.SimulationPlan:
+        """Decomposes a circuit's non-display ops into simulatable ops."""
+
+        def on_stuck(bad_op: ops.Operation):
+            return TypeError(
+                "Can't simulate unknown operations that don't specify a "
+                "_unitary_ method, a _decompose_ method, "
+                "(_has_unitary_ + _apply_unitary_) methods,"
+                "(_has_mixture_ + _mixture_) methods, or are measurements."
+                ": {!r}".format(bad_op))
+
+        def keep(potential_op: ops.Operation) -> bool:
+            # The order of this is optimized to call has_xxx methods first.
+            return (protocols.has_unitary(potential_op) or
+                    protocols.has_mixture(potential_op) or
+                    protocols.is_measurement(potential_op))
+
+        non_display_moments = ([
+            op
+            for op in moment
+            if not isinstance(op, (ops.SamplesDisplay, ops.WaveFunctionDisplay,
+                                   ops.DensityMatrixDisplay))
+        ]
+                               for moment in circuit)
+        return simulation_plan.SimulationPlan(circuit,
+                                              qubit_order,
+                                              keep=keep,
+                                              on_stuck_raise=on_stuck,
+                                              moments=non_display_moments)
+
+    def _measurement_branches(self, op: ops.Operation, trajectory: _Trajectory,
+                              indices: List[int], moment_index: int,
+                              num_qubits: int
+                             ) -> Optional[List[_PendingBranch]]:
+        """Splits a trajectory's repetitions over a measurement's outcomes.
+
+        Returns None if the measurement does not need to be simulated.
+        """
+        meas = ops.op_gate_of_type(op, ops.MeasurementGate)
+        # TODO: support measurement outside computational basis.
+        if not meas:
+            return None
+        invert_mask = meas.invert_mask or num_qubits * (False,)
+        key = protocols.measurement_key(meas)
+        probs = wave_function._probs(trajectory.data.state, indices, num_qubits)
+        counts = np.random.multinomial(trajectory.repetitions, probs)
+
+        def project(data: _StateAndBuffer, result: int) -> None:
+            result_slice = linalg.slice_for_qubits_equal_to(indices, result)
+            np.copyto(dst=data.buffer, src=0)
+            data.buffer[result_slice] = data.state[result_slice]
+            data.buffer /= np.sqrt(probs[result])
+            data.state, data.buffer = data.buffer, data.state
+
+        outcomes = []
+        for result in np.flatnonzero(counts):
+            bits = [bool(1 & (result >> i)) for i in range(len(indices))]
+            corrected = [bit ^ mask for bit, mask in zip(bits, invert_mask)]
+            outcomes.append((counts[result], (moment_index, key, corrected),
+                             functools.partial(project, result=result)))
+        return _PendingBranch.split(trajectory, outcomes)
+
+    def _mixture_branches(self, op: ops.Operation, trajectory: _Trajectory,
+                          indices: List[int]) -> List[_PendingBranch]:
+        """Splits a trajectory's repetitions over a mixture's unitaries."""
+        probs, unitaries = zip(*protocols.mixture(op))
+        counts = np.random.multinomial(trajectory.repetitions, probs)
+        shape = (2,) * (2 * len(indices))
+
+        def apply(data: _StateAndBuffer, index: int) -> None:
+            unitary = unitaries[index].astype(self._dtype).reshape(shape)
+            result = linalg.targeted_left_multiply(unitary,
+                                                   data.state,
+                                                   indices,
+                                                   out=data.buffer)
+            data.buffer = data.state
+            data.state = result
+
+        return _PendingBranch.split(
+            trajectory,
+            [(counts[index], None, functools.partial(apply, index=index))
+             for index in np.flatnonzero(counts)])
+
     def _simulator_iterator(
             self,
             circuit: circuits.Circuit,
@@ -199,80 +930,161 @@ class Simulator(simulator.SimulatesSamples,
         be safely castable to an appropriate dtype for the simulator.
         """
         param_resolver = param_resolver or study.ParamResolver({})
-        resolved_circuit = protocols.resolve_parameters(circuit, param_resolver)
         actual_initial_state = 0 if initial_state is None else initial_state
-        return self._base_iterator(resolved_circuit,
-                                   qubit_order,
+        return self._base_iterator(self._plan(circuit, qubit_order),
+                                   param_resolver,
                                    actual_initial_state,
                                    perform_measurements=True)
 
     def _base_iterator(
             self,
-            circuit: circuits.Circuit,
-            qubit_order: ops.QubitOrderOrList,
+            plan: simulation_plan.SimulationPlan,
+            param_resolver: study.ParamResolver,
             initial_state: Union[int, np.ndarray],
-            perform_measurements: bool=True,
+            perform_measurements: bool = True,
+            fuse_across_moments: bool = False,
+            save_checkpoints: bool = True,
     ) -> Iterator:
-        qubits = ops.QubitOrder.as_qubit_order(qubit_order).order_for(
-                circuit.all_qubits())
-        num_qubits = len(qubits)
-        qubit_map = {q: i for i, q in enumerate(qubits)}
-        state = wave_function.to_valid_state_vector(initial_state,
-                                                    num_qubits,
-                                                    self._dtype)
-        if len(circuit) == 0:
+        """Iterates over the steps of a simulation of the circuit.
+
+        Args:
+            plan: The decomposed circuit to simulate.
+            param_resolver: Parameters to run with the circuit.
+            initial_state: The initial state of the simulation.
+            perform_measurements: Whether measurements are simulated.
+            fuse_across_moments: When gate fusion is enabled, whether unitaries
+                from different moments may be fused. If this is True, only the
+                state of the final step is guaranteed to be correct (this
+                also allows sharded states to stay permuted between moments).
+            save_checkpoints: Whether memory mapped states are checkpointed
+                (and resumed from checkpoints).
+        """
+        num_qubits = plan.num_qubits
+        qubit_map = plan.qubit_map
+        if len(plan) == 0:
+            state = wave_function.to_valid_state_vector(initial_state,
+                                                        num_qubits, self._dtype)
             yield SparseSimulatorStep(state, {}, qubit_map, self._dtype)
+            return
 
-        def on_stuck(bad_op: ops.Operation):
-            return TypeError(
-                "Can't simulate unknown operations that don't specify a "
-                "_unitary_ method, a _decompose_ method, "
-                "(_has_unitary_ + _apply_unitary_) methods,"
-                "(_has_mixture_ + _mixture_) methods, or are measurements."
-                ": {!r}".format(bad_op))
+        storage = None  # type: Optional[_MemmapStorage]
+        if self._memmap_directory is not None:
+            storage = _MemmapStorage(
+                self._memmap_directory,
+                self._checkpoint_key(plan, param_resolver, initial_state,
+                                     perform_measurements))
+        checkpoint = (storage.load() if storage is not None and
+                      save_checkpoints and self._resume else None)
+        all_measurements = {}  # type: Dict[str, List[bool]]
+        first_moment = 0
+        if checkpoint is None:
+            data = self._initial_data(initial_state, num_qubits, storage)
+        else:
+            moment_index, data, all_measurements = checkpoint
+            first_moment = moment_index + 1
+        fuser = self._fuser()
+        shards = self._shards(data, memmapped=storage is not None)
+        # Memory mapped states are sampled from shard by shard, so that no
+        # copy of the state is made in memory.
+        sampled_shards = shards if storage is not None else None
+        if checkpoint is not None:
+            yield SparseSimulatorStep(state_vector=data.state,
+                                      measurements=dict(all_measurements),
+                                      qubit_map=qubit_map,
+                                      dtype=self._dtype,
+                                      shards=sampled_shards)
 
-        def keep(potential_op: ops.Operation) -> bool:
-            # The order of this is optimized to call has_xxx methods first.
-            return (protocols.has_unitary(potential_op)
-                    or protocols.has_mixture(potential_op)
-                    or protocols.is_measurement(potential_op))
-
-        data = _StateAndBuffer(
-                state=np.reshape(state, (2,) * num_qubits),
-                buffer=np.empty((2,) * num_qubits, dtype=self._dtype))
-        for moment in circuit:
+        def simulate_unitary(op: ops.Operation, indices: List[int]) -> None:
+            if shards is None:
+                self._simulate_unitary(op, data, indices)
+            else:
+                shards.apply_unitary(op, indices)
+
+        def simulate_fused(fused_ops: List[ops.Operation]) -> None:
+            for fused_op in fused_ops:
+                simulate_unitary(
+                    fused_op, [qubit_map[qubit] for qubit in fused_op.qubits])
+
+        for moment_index, unitary_ops_and_measurements in enumerate(
+                plan.resolved_moments(param_resolver)):
+            if moment_index < first_moment:
+                continue
             measurements = collections.defaultdict(
                     list)  # type: Dict[str, List[bool]]
 
-            non_display_ops = (op for op in moment
-                               if not isinstance(op, (ops.SamplesDisplay,
-                                                      ops.WaveFunctionDisplay,
-                                                      ops.DensityMatrixDisplay
-                                                      )))
-            unitary_ops_and_measurements = protocols.decompose(
-                non_display_ops,
-                keep=keep,
-                on_stuck_raise=on_stuck)
-
-            for op in unitary_ops_and_measurements:
-                indices = [qubit_map[qubit] for qubit in op.qubits]
+            for op, indices in unitary_ops_and_measurements:
                 if protocols.has_unitary(op):
-                    self._simulate_unitary(op, data, indices)
-                elif protocols.is_measurement(op):
+                    simulate_fused(fuser.add(op))
+                    continue
+                simulate_fused(fuser.flush(op.qubits))
+                if protocols.is_measurement(op):
                     # Do measurements second, since there may be mixtures that
                     # operate as measurements.
                     # TODO: support measurement outside the computational basis.
                     if perform_measurements:
                         self._simulate_measurement(op, data, indices,
-                                                   measurements, num_qubits)
+                                                   measurements, num_qubits,
+                                                   shards)
                 elif protocols.has_mixture(op):
+                    if shards is not None:
+                        shards.restore_order()
                     self._simulate_mixture(op, data, indices)
 
-            yield SparseSimulatorStep(
-                state_vector=data.state,
-                measurements=measurements,
-                qubit_map=qubit_map,
-                dtype=self._dtype)
+            if not fuse_across_moments or moment_index == len(plan) - 1:
+                simulate_fused(fuser.flush())
+                self._fused_sweeps_saved += fuser.sweeps_saved
+                fuser.sweeps_saved = 0
+                if shards is not None:
+                    shards.restore_order()
+                if storage is not None and save_checkpoints:
+                    all_measurements.update(measurements)
+                    storage.save(moment_index, data, all_measurements)
+            yield SparseSimulatorStep(state_vector=data.state,
+                                      measurements=measurements,
+                                      qubit_map=qubit_map,
+                                      dtype=self._dtype,
+                                      shards=sampled_shards)
+
+    def _checkpoint_key(self, plan: simulation_plan.SimulationPlan,
+                        param_resolver: study.ParamResolver,
+                        initial_state: Union[int, np.ndarray],
+                        perform_measurements: bool) -> str:
+        """Returns a key identifying the checkpoints of a simulation."""
+        if isinstance(initial_state, np.ndarray):
+            initial_state = hashlib.sha256(initial_state.tobytes()).hexdigest()
+        description = repr(
+            (plan.circuit, plan.qubits, param_resolver, initial_state,
+             perform_measurements, np.dtype(self._dtype).name))
+        return hashlib.sha256(description.encode()).hexdigest()
+
+    def _initial_data(self, initial_state: Union[int, np.ndarray],
+                      num_qubits: int,
+                      storage: Optional[_MemmapStorage]) -> _StateAndBuffer:
+        """Allocates the state and buffer, and sets the initial state."""
+        if storage is not None and isinstance(initial_state, int):
+            if initial_state < 0:
+                raise ValueError('initial_state must be positive')
+            if initial_state >= 2**num_qubits:
+                raise ValueError(
+                    'initial state was {} but expected state for {} '
+                    'qubits'.format(initial_state, num_qubits))
+            # Newly allocated files are filled with zeros, so only the one
+            # nonzero amplitude is written and no copy is made in memory.
+            data = storage.allocate(num_qubits, self._dtype)
+            data.state[np.unravel_index(initial_state, data.state.shape)] = 1
+            return data
+        # For a computational basis state this is a mostly untouched array
+        # of zeros, so it doesn't take up memory even for large states.
+        state = np.reshape(
+            wave_function.to_valid_state_vector(initial_state, num_qubits,
+                                                self._dtype), (2,) * num_qubits)
+        if storage is None:
+            return _StateAndBuffer(state=state,
+                                   buffer=np.empty((2,) * num_qubits,
+                                                   dtype=self._dtype))
+        data = storage.allocate(num_qubits, self._dtype)
+        np.copyto(data.state, state)
+        return data
 
     def _simulate_unitary(self, op: ops.Operation, data: _StateAndBuffer,
             indices: List[int]) -> None:
@@ -287,18 +1099,25 @@ class Simulator(simulator.SimulatesSamples,
             data.buffer = data.state
         data.state = result
 
-    def _simulate_measurement(self, op: ops.Operation, data: _StateAndBuffer,
-            indices: List[int], measurements: Dict[str, List[bool]],
-            num_qubits: int) -> None:
+    def _simulate_measurement(
+            self,
+            op: ops.Operation,
+            data: _StateAndBuffer,
+            indices: List[int],
+            measurements: Dict[str, List[bool]],
+            num_qubits: int,
+            shards: Optional[sharded_state.ShardedStateVector] = None) -> None:
         """Simulate an op that is a measurement in the computataional basis."""
         meas = ops.op_gate_of_type(op, ops.MeasurementGate)
         # TODO: support measurement outside computational basis.
         if meas:
             invert_mask = meas.invert_mask or num_qubits * (False,)
             # Measure updates inline.
-            bits, _ = wave_function.measure_state_vector(data.state,
-                                                         indices,
-                                                         data.state)
+            if shards is not None:
+                bits = shards.measure(indices)
+            else:
+                bits, _ = wave_function.measure_state_vector(
+                    data.state, indices, data.state)
             corrected = [bit ^ mask for bit, mask in
                          zip(bits, invert_mask)]
             key = protocols.measurement_key(meas)
@@ -324,7 +1143,12 @@ class SparseSimulatorStep(wave_function.StateVectorMixin,
                           wave_function_simulator.WaveFunctionStepResult):
     """A `StepResult` that includes `StateVectorMixin` methods."""
 
-    def __init__(self, state_vector, measurements, qubit_map, dtype):
+    def __init__(self,
+                 state_vector,
+                 measurements,
+                 qubit_map,
+                 dtype,
+                 shards: Optional[sharded_state.ShardedStateVector] = None):
         """Results of a step of the simulator.
 
         Attributes:
@@ -334,9 +1158,13 @@ class SparseSimulatorStep(wave_function.StateVectorMixin,
                 method).
             measurements: A dictionary from measurement gate key to measurement
                 results, ordered by the qubits that the measurement operates on.
+            shards: If given, the sharded state that `sample` computes the
+                measurement probabilities from, shard by shard, instead of
+                from the whole state vector at once.
         """
         super().__init__(measurements=measurements, qubit_map=qubit_map)
         self._dtype = dtype
+        self._shards = shards
         self._state_vector = np.reshape(state_vector, 2 ** len(qubit_map))
 
     def simulator_state(
@@ -382,5 +1210,11 @@ class SparseSimulatorStep(wave_function.StateVectorMixin,
     def sample(self, qubits: List[ops.Qid],
                repetitions: int = 1) -> np.ndarray:
         indices = [self.qubit_map[qubit] for qubit in qubits]
-        return wave_function.sample_state_vector(self._state_vector, indices,
-                                                 repetitions)
+        if self._shards is None or not indices or repetitions <= 0:
+            return wave_function.sample_state_vector(self._state_vector,
+                                                     indices, repetitions)
+        return wave_function._sample_bits(self._shards.probabilities(indices),
+                                          len(indices),
+                                          repetitions,
+                                          seed=None,
+                                          pack_bits=False)
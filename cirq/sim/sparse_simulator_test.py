@@ -12,6 +12,7 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import tracemalloc
 from unittest import mock
 import numpy as np
 import pytest
@@ -90,8 +91,9 @@ def test_run_repetitions_measure_at_end(dtype):
 def test_run_repetitions_measurement_not_terminal(dtype):
     q0, q1 = cirq.LineQubit.range(2)
     simulator = cirq.Simulator(dtype=dtype)
-    with mock.patch.object(simulator, '_base_iterator',
-                           wraps=simulator._base_iterator) as mock_sim:
+    with mock.patch.object(simulator,
+                           '_simulate_unitary',
+                           wraps=simulator._simulate_unitary) as mock_sim:
         for b0 in [0, 1]:
             for b1 in [0, 1]:
                 circuit = cirq.Circuit.from_ops((cirq.X**b0)(q0),
@@ -104,7 +106,64 @@ def test_run_repetitions_measurement_not_terminal(dtype):
                 np.testing.assert_equal(result.measurements,
                                         {'0': [[b0]] * 3, '1': [[b1]] * 3})
                 assert result.repetitions == 3
-        assert  mock_sim.call_count == 12
+        # Deterministic measurements never branch, so each gate is only
+        # simulated once regardless of the number of repetitions.
+        assert mock_sim.call_count == 16
+
+
+@pytest.mark.parametrize('dtype', [np.complex64, np.complex128])
+def test_run_repetitions_shares_prefix_and_branches(dtype):
+    q0, q1 = cirq.LineQubit.range(2)
+    simulator = cirq.Simulator(dtype=dtype)
+    circuit = cirq.Circuit.from_ops(cirq.H(q0), cirq.measure(q0, key='a'),
+                                    cirq.CNOT(q0, q1), cirq.measure(q1,
+                                                                    key='b'),
+                                    cirq.H(q1))
+    with mock.patch.object(simulator,
+                           '_simulate_unitary',
+                           wraps=simulator._simulate_unitary) as mock_sim:
+        result = simulator.run(circuit, repetitions=1000)
+    # H once, then CNOT and H once per measurement outcome.
+    assert mock_sim.call_count <= 5
+    assert result.measurements['a'].shape == (1000, 1)
+    assert result.measurements['a'].dtype == bool
+    np.testing.assert_equal(result.measurements['a'], result.measurements['b'])
+    assert 300 < np.sum(result.measurements['a']) < 700
+
+
+@pytest.mark.parametrize('dtype', [np.complex64, np.complex128])
+def test_run_repetitions_branches_on_mixtures(dtype):
+    q0, q1 = cirq.LineQubit.range(2)
+    simulator = cirq.Simulator(dtype=dtype)
+    circuit = cirq.Circuit.from_ops(
+        cirq.bit_flip(0.5)(q0), cirq.measure(q0, key='a'),
+        cirq.bit_flip(0.5)(q1), cirq.CNOT(q0, q1), cirq.measure(q1, key='b'),
+        cirq.measure(q0, key='c'))
+    result = simulator.run(circuit, repetitions=1000)
+    assert 300 < np.sum(result.measurements['b']) < 700
+    np.testing.assert_equal(result.measurements['a'], result.measurements['c'])
+
+
+@pytest.mark.parametrize('dtype', [np.complex64, np.complex128])
+def test_run_repetitions_zero_with_intermediate_measurement(dtype):
+    q0 = cirq.LineQubit(0)
+    simulator = cirq.Simulator(dtype=dtype)
+    circuit = cirq.Circuit.from_ops(cirq.H(q0), cirq.measure(q0), cirq.H(q0))
+    result = simulator.run(circuit, repetitions=0)
+    assert result.measurements == {}
+
+
+@pytest.mark.parametrize('dtype', [np.complex64, np.complex128])
+def test_run_repetitions_multiple_qubit_measurement_with_invert(dtype):
+    q0, q1 = cirq.LineQubit.range(2)
+    simulator = cirq.Simulator(dtype=dtype)
+    circuit = cirq.Circuit.from_ops(
+        cirq.H(q0), cirq.CNOT(q0, q1),
+        cirq.measure(q0, q1, key='m', invert_mask=(True, False)), cirq.H(q0))
+    result = simulator.run(circuit, repetitions=100)
+    bits = result.measurements['m']
+    assert bits.shape == (100, 2)
+    np.testing.assert_equal(bits[:, 0], np.logical_not(bits[:, 1]))
 
 
 @pytest.mark.parametrize('dtype', [np.complex64, np.complex128])
@@ -590,3 +649,408 @@ def test_simulate_measurement_inversions():
 
     c = cirq.Circuit.from_ops(cirq.measure(q, key='q', invert_mask=(False,)))
     assert cirq.Simulator().simulate(c).measurements == {'q': np.array([False])}
+
+
+def test_invalid_max_fused_qubits():
+    with pytest.raises(ValueError, match='positive'):
+        cirq.Simulator(max_fused_qubits=0)
+
+
+@pytest.mark.parametrize('max_fused_qubits', [1, 2, 3, 5])
+def test_simulate_fused_matches_unfused(max_fused_qubits):
+    circuit = cirq.testing.random_circuit(qubits=5,
+                                          n_moments=20,
+                                          op_density=0.8,
+                                          gate_domain={
+                                              cirq.X: 1,
+                                              cirq.H: 1,
+                                              cirq.T: 1,
+                                              cirq.CZ: 2,
+                                              cirq.CNOT: 2,
+                                              cirq.ISWAP: 2,
+                                              cirq.CCZ: 3,
+                                          })
+    expected = cirq.Simulator(dtype=np.complex128).simulate(circuit)
+    simulator = cirq.Simulator(dtype=np.complex128,
+                               max_fused_qubits=max_fused_qubits)
+    actual = simulator.simulate(circuit)
+    np.testing.assert_allclose(actual.final_state,
+                               expected.final_state,
+                               atol=1e-8)
+
+    for expected_step, actual_step in zip(
+            cirq.Simulator(dtype=np.complex128).simulate_moment_steps(circuit),
+            simulator.simulate_moment_steps(circuit)):
+        np.testing.assert_allclose(actual_step.state_vector(),
+                                   expected_step.state_vector(),
+                                   atol=1e-8)
+
+
+def test_run_fused_saves_sweeps():
+    q0, q1, q2 = cirq.LineQubit.range(3)
+    circuit = cirq.Circuit.from_ops(cirq.H(q0), cirq.H(q1), cirq.H(q2),
+                                    cirq.CZ(q0, q1), cirq.H(q1), cirq.X(q2),
+                                    cirq.CNOT(q1, q2), cirq.H(q1),
+                                    cirq.measure(q0, q1, q2, key='m'))
+    simulator = cirq.Simulator(max_fused_qubits=2)
+    with mock.patch.object(simulator,
+                           '_simulate_unitary',
+                           wraps=simulator._simulate_unitary) as mock_sim:
+        simulator.run(circuit, repetitions=10)
+    # {H(q0), H(q1), CZ, H(q1)} and {H(q2), X(q2)} are fused before CNOT
+    # forces them out, and the final H(q1) is fused with the CNOT.
+    assert mock_sim.call_count == 3
+    assert simulator.fused_sweeps_saved == 5
+    assert cirq.Simulator().fused_sweeps_saved == 0
+
+
+def test_run_fused_deterministic_result():
+    q0, q1 = cirq.LineQubit.range(2)
+    circuit = cirq.Circuit.from_ops(cirq.X(q0), cirq.H(q1), cirq.CNOT(q0, q1),
+                                    cirq.H(q1), cirq.measure(q0, q1, key='m'))
+    simulator = cirq.Simulator(max_fused_qubits=2)
+    result = simulator.run(circuit, repetitions=5)
+    np.testing.assert_equal(result.measurements['m'], [[True, False]] * 5)
+    assert simulator.fused_sweeps_saved == 3
+
+
+def test_run_fused_intermediate_measurements():
+    q0, q1 = cirq.LineQubit.range(2)
+    circuit = cirq.Circuit.from_ops(cirq.H(q0), cirq.CNOT(q0, q1),
+                                    cirq.measure(q0, key='a'), cirq.H(q0),
+                                    cirq.Z(q0), cirq.H(q0), cirq.X(q1),
+                                    cirq.measure(q0, q1, key='b'))
+    simulator = cirq.Simulator(max_fused_qubits=2)
+    result = simulator.run(circuit, repetitions=20)
+    a = result.measurements['a'][:, 0]
+    b = result.measurements['b']
+    np.testing.assert_equal(b[:, 0], np.logical_not(a))
+    np.testing.assert_equal(b[:, 1], np.logical_not(a))
+    assert simulator.fused_sweeps_saved > 0
+
+
+def test_fused_operation():
+    q0, q1 = cirq.LineQubit.range(2)
+    simulator = cirq.Simulator(max_fused_qubits=2)
+    fused = simulator._fuse_operations([(0, cirq.H(q0)), (0, cirq.CZ(q0, q1))])
+    assert len(fused) == 1
+    op = fused[0][1]
+    assert op.qubits == (q0, q1)
+    np.testing.assert_allclose(cirq.unitary(op),
+                               cirq.Circuit.from_ops(cirq.H(q0), cirq.CZ(
+                                   q0, q1)).to_unitary_matrix(),
+                               atol=1e-7)
+    a, b = cirq.NamedQubit('a'), cirq.NamedQubit('b')
+    moved = op.with_qubits(a, b)
+    assert moved.qubits == (a, b)
+    np.testing.assert_allclose(cirq.unitary(moved), cirq.unitary(op))
+    assert repr(moved) == (
+        '_FusedOperation(qubits=(cirq.NamedQubit(\'a\'), '
+        'cirq.NamedQubit(\'b\')), operations=[cirq.H.on(cirq.NamedQubit(\'a\'))'
+        ', cirq.CZ.on(cirq.NamedQubit(\'a\'), cirq.NamedQubit(\'b\'))])')
+
+
+def test_simulate_merges_diagonal_operations():
+    qubits = cirq.LineQubit.range(5)
+    circuit = cirq.Circuit()
+    for _ in range(2):
+        circuit.append(cirq.H.on_each(*qubits))
+        circuit.append(cirq.ZZ(a, b)**0.3 for a, b in zip(qubits, qubits[1:]))
+        circuit.append(cirq.Rz(0.2).on_each(*qubits))
+        circuit.append(cirq.CCZ(*qubits[:3])**0.4)
+        circuit.append(cirq.X(q)**0.5 for q in qubits)
+    simulator = cirq.Simulator(dtype=np.complex128)
+    result = simulator.simulate(circuit)
+    np.testing.assert_allclose(
+        result.final_state,
+        circuit.apply_unitary_effect_to_state(initial_state=0),
+        atol=1e-8)
+    assert simulator.fused_sweeps_saved > 0
+
+    with mock.patch('cirq.sim.sparse_simulator._MAX_DIAGONAL_QUBITS', 2):
+        result = cirq.Simulator(dtype=np.complex128).simulate(circuit)
+    np.testing.assert_allclose(
+        result.final_state,
+        circuit.apply_unitary_effect_to_state(initial_state=0),
+        atol=1e-8)
+
+
+def test_run_merged_diagonal_intermediate_measurements():
+    q0, q1, q2 = cirq.LineQubit.range(3)
+    circuit = cirq.Circuit.from_ops(cirq.H(q0), cirq.H(q1), cirq.S(q0),
+                                    cirq.CZ(q1, q2), cirq.T(q1),
+                                    cirq.measure(q2, key='a'), cirq.S(q0),
+                                    cirq.T(q1)**-1, cirq.H(q0), cirq.H(q1),
+                                    cirq.measure(q0, q1, key='b'))
+    simulator = cirq.Simulator()
+    result = simulator.run(circuit, repetitions=10)
+    # The S gates make a Z, so q0 ends up in |1>, and the other diagonal
+    # gates on q1 cancel or act on |0> on q2.
+    np.testing.assert_equal(result.measurements['a'], [[False]] * 10)
+    np.testing.assert_equal(result.measurements['b'], [[True, False]] * 10)
+    assert simulator.fused_sweeps_saved > 0
+
+
+def test_diagonal_merger():
+    q0, q1, q2 = cirq.LineQubit.range(3)
+    simulator = cirq.Simulator()
+    merged = [
+        op for _, op in simulator._fuse_operations([
+            (0, cirq.Z(q0)),
+            (0, cirq.CZ(q1, q2)),
+            (0, cirq.H(q0)),
+            (1, cirq.S(q1)),
+            (1, cirq.measure(q2)),
+        ])
+    ]
+    # H doesn't commute with Z, so the pending Z and CZ are released first.
+    assert len(merged) == 4
+    assert merged[0].qubits == (q0, q1, q2)
+    np.testing.assert_allclose(cirq.unitary(merged[0]),
+                               cirq.Circuit.from_ops(cirq.Z(q0), cirq.CZ(
+                                   q1, q2)).to_unitary_matrix(),
+                               atol=1e-8)
+    assert merged[1:] == [cirq.H(q0), cirq.measure(q2), cirq.S(q1)]
+    assert simulator.fused_sweeps_saved == 1
+
+
+def test_diagonal_merger_passes_buffer():
+    q0, q1 = cirq.LineQubit.range(2)
+    with mock.patch('cirq.protocols.apply_diagonal',
+                    wraps=cirq.protocols.apply_diagonal) as apply_diagonal:
+        operations = [(0, cirq.T(q0)), (0, cirq.CZ(q0, q1))]
+        cirq.Simulator()._fuse_operations(operations)
+    assert apply_diagonal.call_count == 2
+    for (_, args), _ in apply_diagonal.call_args_list:
+        assert args.available_buffer.shape == args.target_tensor.shape
+        assert args.available_buffer is not args.target_tensor
+
+
+def test_diagonal_operation():
+    q0, q1 = cirq.LineQubit.range(2)
+    simulator = cirq.Simulator()
+    merged = simulator._fuse_operations([(0, cirq.T(q0)), (0, cirq.CZ(q0, q1))])
+    assert len(merged) == 1
+    op = merged[0][1]
+    np.testing.assert_allclose(cirq.unitary(op),
+                               cirq.Circuit.from_ops(cirq.T(q0), cirq.CZ(
+                                   q0, q1)).to_unitary_matrix(),
+                               atol=1e-8)
+    a, b = cirq.NamedQubit('a'), cirq.NamedQubit('b')
+    moved = op.with_qubits(a, b)
+    assert moved.qubits == (a, b)
+    np.testing.assert_allclose(cirq.unitary(moved), cirq.unitary(op))
+    assert repr(moved) == (
+        '_DiagonalOperation(qubits=(cirq.NamedQubit(\'a\'), '
+        'cirq.NamedQubit(\'b\')), operations=[cirq.T.on('
+        'cirq.NamedQubit(\'a\')), cirq.CZ.on(cirq.NamedQubit(\'a\'), '
+        'cirq.NamedQubit(\'b\'))])')
+
+
+def test_invalid_num_prefix_qubits():
+    with pytest.raises(ValueError, match='negative'):
+        cirq.Simulator(num_prefix_qubits=-1)
+
+
+@pytest.mark.parametrize('max_fused_qubits', [None, 2])
+def test_simulate_sharded_matches_unsharded(max_fused_qubits):
+    circuit = cirq.testing.random_circuit(qubits=5,
+                                          n_moments=20,
+                                          op_density=0.8)
+    expected = cirq.Simulator(dtype=np.complex128).simulate(circuit)
+    simulator = cirq.Simulator(dtype=np.complex128,
+                               max_fused_qubits=max_fused_qubits,
+                               num_prefix_qubits=2,
+                               min_qubits_before_shard=0)
+    actual = simulator.simulate(circuit)
+    np.testing.assert_allclose(actual.final_state,
+                               expected.final_state,
+                               atol=1e-8)
+
+    for expected_step, actual_step in zip(
+            cirq.Simulator(dtype=np.complex128).simulate_moment_steps(circuit),
+            simulator.simulate_moment_steps(circuit)):
+        np.testing.assert_allclose(actual_step.state_vector(),
+                                   expected_step.state_vector(),
+                                   atol=1e-8)
+
+
+def test_run_sharded_intermediate_measurements():
+    q0, q1, q2 = cirq.LineQubit.range(3)
+    circuit = cirq.Circuit.from_ops(cirq.H(q0), cirq.CNOT(q0, q1),
+                                    cirq.measure(q0, key='a'), cirq.H(q0),
+                                    cirq.Z(q0), cirq.H(q0), cirq.X(q1),
+                                    cirq.SWAP(q1, q2),
+                                    cirq.bit_flip(1)(q0),
+                                    cirq.measure(q0, q1, q2, key='b'))
+    simulator = cirq.Simulator(num_prefix_qubits=1, min_qubits_before_shard=0)
+    result = simulator.run(circuit, repetitions=20)
+    a = result.measurements['a'][:, 0]
+    b = result.measurements['b']
+    np.testing.assert_equal(b[:, 0], a)
+    np.testing.assert_equal(b[:, 1], False)
+    np.testing.assert_equal(b[:, 2], np.logical_not(a))
+
+
+def test_close_stops_sharding_threads():
+    q0, q1 = cirq.LineQubit.range(2)
+    circuit = cirq.Circuit.from_ops(cirq.H(q0), cirq.CNOT(q0, q1))
+    with cirq.Simulator(num_prefix_qubits=1,
+                        min_qubits_before_shard=0) as simulator:
+        simulator.simulate(circuit)
+        pool = simulator._pool
+        assert pool is not None
+        workers = list(pool._pool)
+        assert all(worker.is_alive() for worker in workers)
+    assert simulator._pool is None
+    assert not any(worker.is_alive() for worker in workers)
+
+    # The simulator still works, with new threads.
+    result = simulator.simulate(circuit)
+    np.testing.assert_allclose(result.final_state,
+                               np.array([1, 0, 0, 1]) / np.sqrt(2),
+                               atol=1e-7)
+    assert simulator._pool is not pool
+    simulator.close()
+    simulator.close()
+    assert simulator._pool is None
+
+
+def test_simulate_not_sharded_below_min_qubits():
+    q0, q1 = cirq.LineQubit.range(2)
+    simulator = cirq.Simulator(num_prefix_qubits=1)
+    result = simulator.simulate(cirq.Circuit.from_ops(cirq.X(q0), cirq.H(q1)))
+    np.testing.assert_allclose(result.final_state,
+                               np.array([0, 0, 1, 1]) / np.sqrt(2),
+                               atol=1e-7)
+    assert simulator._pool is None
+
+
+@pytest.mark.parametrize('num_prefix_qubits', [0, 2])
+def test_simulate_memmapped_matches_in_memory(tmpdir, num_prefix_qubits):
+    circuit = cirq.testing.random_circuit(qubits=6,
+                                          n_moments=15,
+                                          op_density=0.8)
+    expected = cirq.Simulator(dtype=np.complex128).simulate(circuit)
+    simulator = cirq.Simulator(dtype=np.complex128,
+                               num_prefix_qubits=num_prefix_qubits,
+                               min_qubits_before_shard=0,
+                               max_fused_qubits=2,
+                               memmap_directory=str(tmpdir))
+    with mock.patch('cirq.sim.sparse_simulator._MEMMAP_BLOCK_QUBITS', 3):
+        actual = simulator.simulate(circuit)
+    np.testing.assert_allclose(actual.final_state,
+                               expected.final_state,
+                               atol=1e-8)
+    assert sorted(tmpdir.listdir()) == [
+        tmpdir.join('checkpoint.json'),
+        tmpdir.join('state0.npy'),
+        tmpdir.join('state1.npy')
+    ]
+
+
+def test_simulate_memmapped_initial_state(tmpdir):
+    q0, q1 = cirq.LineQubit.range(2)
+    circuit = cirq.Circuit.from_ops(cirq.X(q0), cirq.I(q1))
+    simulator = cirq.Simulator(memmap_directory=str(tmpdir))
+    result = simulator.simulate(circuit, initial_state=1)
+    np.testing.assert_allclose(result.final_state, [0, 0, 0, 1])
+    result = simulator.simulate(circuit,
+                                initial_state=np.array([0, 0.6, 0, 0.8j],
+                                                       dtype=np.complex64))
+    np.testing.assert_allclose(result.final_state, [0, 0.8j, 0, 0.6], atol=1e-7)
+
+
+def test_run_memmapped(tmpdir):
+    q0, q1, q2 = cirq.LineQubit.range(3)
+    circuit = cirq.Circuit.from_ops(cirq.H(q0), cirq.CNOT(q0, q1),
+                                    cirq.measure(q0, key='a'), cirq.H(q0),
+                                    cirq.Z(q0), cirq.H(q0), cirq.X(q1),
+                                    cirq.SWAP(q1, q2),
+                                    cirq.bit_flip(1)(q0),
+                                    cirq.measure(q0, q1, q2, key='b'))
+    simulator = cirq.Simulator(memmap_directory=str(tmpdir))
+    with mock.patch('cirq.sim.sparse_simulator._MEMMAP_BLOCK_QUBITS', 1):
+        result = simulator.run(circuit, repetitions=10)
+        terminal = simulator.run(circuit[:2] + circuit[-1:], repetitions=10)
+    a = result.measurements['a'][:, 0]
+    b = result.measurements['b']
+    np.testing.assert_equal(b[:, 0], a)
+    np.testing.assert_equal(b[:, 1], False)
+    np.testing.assert_equal(b[:, 2], np.logical_not(a))
+    b = terminal.measurements['b']
+    np.testing.assert_equal(b[:, 0], b[:, 1])
+    np.testing.assert_equal(b[:, 2], False)
+
+
+def test_run_memmapped_never_copies_state(tmpdir):
+    num_qubits = 20
+    qubits = cirq.LineQubit.range(num_qubits)
+    circuit = cirq.Circuit.from_ops(
+        cirq.H(qubits[0]), cirq.CNOT(qubits[0], qubits[-1]),
+        cirq.Z.on_each(*qubits), cirq.measure(qubits[0], qubits[-1], key='m'))
+    simulator = cirq.Simulator(memmap_directory=str(tmpdir))
+    with mock.patch('cirq.sim.sparse_simulator._MEMMAP_BLOCK_QUBITS', 18):
+        tracemalloc.start()
+        try:
+            result = simulator.run(circuit, repetitions=10)
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+    # A complex64 state takes 8 bytes per amplitude.
+    assert peak < 2**num_qubits
+    m = result.measurements['m']
+    np.testing.assert_equal(m[:, 0], m[:, 1])
+
+
+def test_simulate_memmapped_invalid_initial_state(tmpdir):
+    circuit = cirq.Circuit.from_ops(cirq.X.on_each(*cirq.LineQubit.range(2)))
+    simulator = cirq.Simulator(memmap_directory=str(tmpdir))
+    with pytest.raises(ValueError, match='positive'):
+        simulator.simulate(circuit, initial_state=-1)
+    with pytest.raises(ValueError, match='2 qubits'):
+        simulator.simulate(circuit, initial_state=4)
+
+
+def test_simulate_resumes_from_checkpoint(tmpdir):
+    q0, q1, q2 = cirq.LineQubit.range(3)
+    circuit = cirq.Circuit.from_ops(cirq.H(q0), cirq.CNOT(q0, q1),
+                                    cirq.measure(q1, key='m'), cirq.H(q2),
+                                    cirq.CZ(q1, q2), cirq.H(q2))
+    simulator = cirq.Simulator(memmap_directory=str(tmpdir))
+    steps = simulator.simulate_moment_steps(circuit)
+    for _ in range(4):
+        next(steps)
+    steps.close()
+
+    resumed = cirq.Simulator(memmap_directory=str(tmpdir), resume=True)
+    with mock.patch.object(resumed,
+                           '_simulate_measurement',
+                           wraps=resumed._simulate_measurement) as measure:
+        assert len(list(resumed.simulate_moment_steps(circuit))) == 2
+        result = resumed.simulate(circuit)
+    assert measure.call_count == 0
+    m = result.measurements['m'][0]
+    expected = np.zeros(8)
+    expected[7 if m else 0] = 1
+    np.testing.assert_allclose(result.final_state, expected, atol=1e-7)
+
+
+def test_resume_ignores_checkpoints_of_other_simulations(tmpdir):
+    q0, q1 = cirq.LineQubit.range(2)
+    circuit = cirq.Circuit(
+        [cirq.Moment([cirq.X(q0)]),
+         cirq.Moment([cirq.X(q1)])])
+    cirq.Simulator(memmap_directory=str(tmpdir)).simulate(circuit)
+    simulator = cirq.Simulator(memmap_directory=str(tmpdir), resume=True)
+    result = simulator.simulate(circuit[:1], qubit_order=[q0, q1])
+    np.testing.assert_allclose(result.final_state, [0, 0, 1, 0])
+    result = simulator.simulate(circuit, initial_state=1)
+    np.testing.assert_allclose(result.final_state, [0, 0, 1, 0])
+    result = simulator.simulate(circuit, initial_state=1)
+    np.testing.assert_allclose(result.final_state, [0, 0, 1, 0])
+    # Without resuming, the checkpoint is discarded.
+    cirq.Simulator(memmap_directory=str(tmpdir)).simulate(circuit,
+                                                          initial_state=1)
+    result = simulator.simulate(circuit, initial_state=1)
+    np.testing.assert_allclose(result.final_state, [0, 0, 1, 0])
@@ -0,0 +1,321 @@
+# Copyright 2019 The Cirq Developers
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     https://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Simulator that samples noisy circuits one quantum trajectory at a time."""
+
+import multiprocessing
+
+from typing import Any, Dict, List, Optional, Tuple, Type
+
+import numpy as np
+
+from cirq import circuits, devices, linalg, ops, protocols, study, value
+from cirq.sim import simulation_plan, simulator, wave_function
+
+# Kinds of compiled operations.
+_UNITARY = 'unitary'
+_MIXTURE = 'mixture'
+_CHANNEL = 'channel'
+_MEASUREMENT = 'measurement'
+
+# A compiled operation: its kind, the indices of the qubits it acts on, and
+# the data needed to apply it (which depends on the kind).
+_Instruction = Tuple[str, List[int], Any]
+
+
+class TrajectorySimulator(simulator.SimulatesSamples):
+    """A noisy circuit simulator using the Monte Carlo wave function method.
+
+    Instead of evolving a density matrix, whose size grows as 4**n for n
+    qubits, this simulator evolves a wave function for every repetition (a
+    "quantum trajectory"). Whenever a channel is applied, one of its krauss
+    operators is chosen at random, with a probability given by the norm of
+    the state it produces, and the state is renormalized. Mixtures choose one
+    of their unitaries according to their probabilities. Measurements
+    collapse the wave function. Averaged over trajectories this reproduces the
+    statistics of the density matrix simulation, while only using memory
+    proportional to 2**n.
+
+    The simulator accepts the same noise models as the
+    `cirq.DensityMatrixSimulator`, and any operation that supports
+    `cirq.unitary`, `cirq.mixture` or `cirq.channel`, or is a measurement.
+
+    Trajectories are independent, so they can be simulated by a pool of
+    processes. In that case each process is given its own seed, drawn from the
+    simulator's random state.
+
+        simulator = cirq.TrajectorySimulator(noise=noise, num_processes=4)
+        result = simulator.run(circuit, repetitions=1000)
+        counts = result.histogram(key='m')
+    """
+
+    def __init__(self,
+                 *,
+                 dtype: Type[np.number] = np.complex64,
+                 noise: devices.NoiseModel = devices.NO_NOISE,
+                 seed: value.RANDOM_STATE_OR_SEED_LIKE = None,
+                 num_processes: Optional[int] = None):
+        """A trajectory simulator.
+
+        Args:
+            dtype: The `numpy.dtype` used by the simulation. One of
+                `numpy.complex64` or `numpy.complex128`.
+            noise: A noise model to apply while simulating.
+            seed: The seed or `np.random.RandomState` used to sample
+                trajectories and measurements. Defaults to numpy's global
+                random state.
+            num_processes: The number of processes used to simulate
+                trajectories. Defaults to simulating them in this process.
+        """
+        if dtype not in {np.complex64, np.complex128}:
+            raise ValueError(
+                'dtype must be complex64 or complex128, was {}'.format(dtype))
+        if num_processes is not None and num_processes < 1:
+            raise ValueError(
+                'num_processes must be positive, was {}'.format(num_processes))
+
+        self._dtype = dtype
+        self.noise = noise
+        self._prng = value.parse_random_state(seed)
+        self._num_processes = num_processes
+
+    def _run(self, circuit: circuits.Circuit,
+             param_resolver: study.ParamResolver,
+             repetitions: int) -> Dict[str, np.ndarray]:
+        """See definition in `cirq.SimulatesSamples`."""
+        param_resolver = param_resolver or study.ParamResolver({})
+        resolved_circuit = protocols.resolve_parameters(circuit, param_resolver)
+        num_processes = min(self._num_processes or 1, repetitions)
+        if num_processes <= 1:
+            return self._run_trajectories(resolved_circuit, repetitions)
+
+        counts = [
+            len(chunk)
+            for chunk in np.array_split(np.arange(repetitions), num_processes)
+        ]
+        seeds = self._prng.randint(2**31, size=num_processes)
+        with multiprocessing.Pool(num_processes) as pool:
+            results = pool.map(
+                _run_trajectories_in_process,
+                [(self._dtype, self.noise, int(seed), resolved_circuit, count)
+                 for seed, count in zip(seeds, counts)])
+        return {
+            key: np.concatenate([result[key] for result in results
+                                ]) for key in results[0]
+        }
+
+    def _plan(self,
+              circuit: circuits.Circuit) -> simulation_plan.SimulationPlan:
+        """Adds noise to the circuit and decomposes it into channels."""
+
+        def on_stuck(bad_op: ops.Operation):
+            return TypeError(
+                "Can't simulate operations that don't implement "
+                "SupportsUnitary, SupportsApplyUnitary, SupportsMixture, "
+                "SupportsChannel or is a measurement: {!r}".format(bad_op))
+
+        def keep(potential_op: ops.Operation) -> bool:
+            return (protocols.has_channel(potential_op) or (ops.op_gate_of_type(
+                potential_op, ops.MeasurementGate) is not None) or
+                    isinstance(potential_op,
+                               (ops.SamplesDisplay, ops.WaveFunctionDisplay,
+                                ops.DensityMatrixDisplay)))
+
+        noisy_moments = self.noise.noisy_moments(circuit,
+                                                 sorted(circuit.all_qubits()))
+        return simulation_plan.SimulationPlan(circuit,
+                                              ops.QubitOrder.DEFAULT,
+                                              keep=keep,
+                                              on_stuck_raise=on_stuck,
+                                              moments=noisy_moments)
+
+    def _run_trajectories(self, circuit: circuits.Circuit,
+                          repetitions: int) -> Dict[str, np.ndarray]:
+        """Samples the measurements of a resolved circuit.
+
+        Args:
+            circuit: The circuit to simulate, without unresolved parameters.
+            repetitions: The number of trajectories to simulate.
+
+        Returns:
+            A dictionary from measurement key to a (repetitions, qubits)
+            array with the measurement results.
+        """
+        plan = self._plan(circuit)
+        instructions = [
+            self._compile(op, indices)
+            for moment in plan.resolved_moments(study.ParamResolver({}))
+            for op, indices in moment
+            if not isinstance(op, (ops.SamplesDisplay, ops.WaveFunctionDisplay,
+                                   ops.DensityMatrixDisplay))
+        ]
+        measurements = {
+            protocols.measurement_key(op): np.zeros(
+                (repetitions, len(op.qubits)), dtype=bool)
+            for op in plan.measurement_ops
+        }
+        if repetitions == 0:
+            return measurements
+
+        state = np.empty((2,) * plan.num_qubits, dtype=self._dtype)
+        buffer = np.empty_like(state)
+        if (circuit.are_all_measurements_terminal() and
+                all(kind in (_UNITARY, _MEASUREMENT)
+                    for kind, _, _ in instructions)):
+            # Without randomness before the measurements all trajectories are
+            # the same, so simulate one and sample from it.
+            state, _ = self._simulate(
+                [i for i in instructions if i[0] != _MEASUREMENT], state,
+                buffer, measurements, 0)
+            self._sample_measurements(
+                [i for i in instructions if i[0] == _MEASUREMENT], state,
+                repetitions, measurements)
+            return measurements
+
+        for repetition in range(repetitions):
+            state, buffer = self._simulate(instructions, state, buffer,
+                                           measurements, repetition)
+        return measurements
+
+    def _compile(self, op: ops.Operation, indices: List[int]) -> _Instruction:
+        """Prepares the data needed to apply an operation to a trajectory."""
+        num_qubits = len(indices)
+        meas = ops.op_gate_of_type(op, ops.MeasurementGate)
+        if meas:
+            invert_mask = np.zeros(num_qubits, dtype=bool)
+            invert_mask[:len(meas.invert_mask)] = meas.invert_mask
+            return _MEASUREMENT, indices, (protocols.measurement_key(meas),
+                                           invert_mask)
+        if protocols.has_unitary(op):
+            return _UNITARY, indices, op
+        if protocols.has_mixture(op):
+            probabilities, unitaries = zip(*protocols.mixture(op))
+            # Unitaries that act as the identity don't need to be applied.
+            tensors = [
+                None if np.allclose(u, np.eye(1 << num_qubits)) else np.reshape(
+                    u.astype(self._dtype), (2,) * 2 * num_qubits)
+                for u in unitaries
+            ]
+            return _MIXTURE, indices, (np.cumsum(probabilities), tensors)
+        return _CHANNEL, indices, [
+            np.reshape(krauss.astype(self._dtype), (2,) * 2 * num_qubits)
+            for krauss in protocols.channel(op)
+        ]
+
+    def _simulate(self, instructions: List[_Instruction], state: np.ndarray,
+                  buffer: np.ndarray, measurements: Dict[str, np.ndarray],
+                  repetition: int) -> Tuple[np.ndarray, np.ndarray]:
+        """Simulates a trajectory from the all zeros state.
+
+        Args:
+            instructions: The compiled operations to apply.
+            state: Space for the state of the trajectory.
+            buffer: Workspace with the same shape and dtype as `state`.
+            measurements: The arrays the measurement results are written to.
+            repetition: The row of the measurement results to write to.
+
+        Returns:
+            The final state of the trajectory and the free buffer, which are
+            `state` and `buffer` in some order.
+        """
+        state.fill(0)
+        state[(0,) * state.ndim] = 1
+        for kind, indices, data in instructions:
+            if kind == _UNITARY:
+                result = protocols.apply_unitary(
+                    data, protocols.ApplyUnitaryArgs(state, buffer, indices))
+                if result is buffer:
+                    buffer = state
+                state = result
+            elif kind == _MIXTURE:
+                cumulative, tensors = data
+                index = min(
+                    np.searchsorted(cumulative,
+                                    self._prng.random_sample() * cumulative[-1],
+                                    side='right'),
+                    len(tensors) - 1)
+                if tensors[index] is not None:
+                    linalg.targeted_left_multiply(tensors[index],
+                                                  state,
+                                                  indices,
+                                                  out=buffer)
+                    state, buffer = buffer, state
+            elif kind == _CHANNEL:
+                self._apply_random_krauss(data, indices, state, buffer)
+                state, buffer = buffer, state
+            else:
+                key, invert_mask = data
+                bits, _ = wave_function.measure_state_vector(state,
+                                                             indices,
+                                                             out=state,
+                                                             seed=self._prng)
+                measurements[key][repetition] = np.logical_xor(
+                    bits, invert_mask)
+        return state, buffer
+
+    def _apply_random_krauss(self, krauss_tensors: List[np.ndarray],
+                             indices: List[int], state: np.ndarray,
+                             out: np.ndarray) -> None:
+        """Writes the state after a randomly chosen krauss operator into out.
+
+        Each krauss operator K is chosen with probability |K state|^2, and the
+        resulting state is normalized.
+        """
+        remaining = self._prng.random_sample()
+        probabilities = []  # type: List[float]
+        for krauss_tensor in krauss_tensors:
+            linalg.targeted_left_multiply(krauss_tensor,
+                                          state,
+                                          indices,
+                                          out=out)
+            probability = np.vdot(out, out).real
+            probabilities.append(probability)
+            if remaining < probability:
+                break
+            remaining -= probability
+        else:
+            # Rounding errors left no krauss operator chosen, so use the most
+            # likely one.
+            index = int(np.argmax(probabilities))
+            linalg.targeted_left_multiply(krauss_tensors[index],
+                                          state,
+                                          indices,
+                                          out=out)
+            probability = probabilities[index]
+        out /= np.sqrt(probability)
+
+    def _sample_measurements(self, instructions: List[_Instruction],
+                             state: np.ndarray, repetitions: int,
+                             measurements: Dict[str, np.ndarray]) -> None:
+        """Samples all the (terminal) measurements from a final state."""
+        indices = [
+            index for _, op_indices, _ in instructions for index in op_indices
+        ]
+        samples = wave_function.sample_state_vector(state,
+                                                    indices,
+                                                    repetitions,
+                                                    seed=self._prng)
+        start = 0
+        for _, op_indices, (key, invert_mask) in instructions:
+            end = start + len(op_indices)
+            measurements[key][:] = samples[:, start:end] ^ invert_mask
+            start = end
+
+
+def _run_trajectories_in_process(
+        args: Tuple[Type[np.number], devices.NoiseModel, int, circuits.
+                    Circuit, int]) -> Dict[str, np.ndarray]:
+    dtype, noise, seed, circuit, repetitions = args
+    return TrajectorySimulator(dtype=dtype, noise=noise,
+                               seed=seed)._run_trajectories(
+                                   circuit, repetitions)
@@ -0,0 +1,163 @@
+# Copyright 2019 The Cirq Developers
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     https://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import numpy as np
+import pytest
+import sympy
+
+import cirq
+
+
+def test_invalid_dtype():
+    with pytest.raises(ValueError, match='complex'):
+        cirq.TrajectorySimulator(dtype=np.int32)
+
+
+def test_invalid_num_processes():
+    with pytest.raises(ValueError, match='num_processes'):
+        cirq.TrajectorySimulator(num_processes=0)
+
+
+@pytest.mark.parametrize('dtype', [np.complex64, np.complex128])
+def test_run_bit_flips(dtype):
+    q0, q1 = cirq.LineQubit.range(2)
+    simulator = cirq.TrajectorySimulator(dtype=dtype)
+    for b0 in [0, 1]:
+        for b1 in [0, 1]:
+            circuit = cirq.Circuit.from_ops((cirq.X**b0)(q0), (cirq.X**b1)(q1),
+                                            cirq.measure(q0), cirq.measure(q1))
+            result = simulator.run(circuit, repetitions=3)
+            np.testing.assert_equal(result.measurements, {
+                '0': [[b0]] * 3,
+                '1': [[b1]] * 3
+            })
+
+
+def test_run_invert_mask():
+    q0, q1 = cirq.LineQubit.range(2)
+    circuit = cirq.Circuit.from_ops(
+        cirq.X(q0), cirq.measure(q0, q1, key='m', invert_mask=(True,)),
+        cirq.bit_flip(0)(q1), cirq.measure(q1, key='n', invert_mask=(True,)))
+    result = cirq.TrajectorySimulator().run(circuit, repetitions=2)
+    np.testing.assert_equal(result.measurements, {
+        'm': [[False, False]] * 2,
+        'n': [[True]] * 2
+    })
+
+
+def test_run_no_repetitions():
+    q0 = cirq.LineQubit(0)
+    circuit = cirq.Circuit.from_ops(cirq.bit_flip(0.5)(q0), cirq.measure(q0))
+    result = cirq.TrajectorySimulator().run(circuit, repetitions=0)
+    assert result.measurements['0'].shape == (0, 1)
+
+
+def test_run_no_measurements():
+    q0 = cirq.LineQubit(0)
+    circuit = cirq.Circuit.from_ops(cirq.X(q0), cirq.amplitude_damp(0.5)(q0))
+    result = cirq.TrajectorySimulator().run(circuit, repetitions=2)
+    assert result.measurements == {}
+
+
+def test_run_not_channel_op():
+
+    class BadOp(cirq.Operation):
+
+        def __init__(self, qubits):
+            self._qubits = qubits
+
+        @property
+        def qubits(self):
+            return self._qubits
+
+        def with_qubits(self, *new_qubits):
+            # coverage: ignore
+            return BadOp(self._qubits)
+
+    q0 = cirq.LineQubit(0)
+    circuit = cirq.Circuit.from_ops([BadOp([q0])])
+    with pytest.raises(TypeError):
+        cirq.TrajectorySimulator().run(circuit)
+
+
+def test_run_seed_is_reproducible():
+    q0, q1 = cirq.LineQubit.range(2)
+    circuit = cirq.Circuit.from_ops(cirq.H(q0), cirq.measure(q0),
+                                    cirq.depolarize(0.3)(q1), cirq.CNOT(q0, q1),
+                                    cirq.measure(q1))
+    results = [
+        cirq.TrajectorySimulator(seed=1234).run(circuit, repetitions=50)
+        for _ in range(2)
+    ]
+    np.testing.assert_equal(results[0].measurements, results[1].measurements)
+
+
+def test_run_mixture_frequencies():
+    q0 = cirq.LineQubit(0)
+    circuit = cirq.Circuit.from_ops(
+        cirq.bit_flip(0.25)(q0), cirq.measure(q0, key='m'))
+    result = cirq.TrajectorySimulator(seed=0).run(circuit, repetitions=4000)
+    assert abs(result.histogram(key='m')[1] / 4000 - 0.25) < 0.03
+
+
+def test_run_channel_frequencies():
+    q0 = cirq.LineQubit(0)
+    circuit = cirq.Circuit.from_ops(cirq.H(q0),
+                                    cirq.amplitude_damp(0.5)(q0), cirq.H(q0),
+                                    cirq.measure(q0, key='m'))
+    # The state after damping is [[3/4, 1/(2 sqrt 2)], [1/(2 sqrt 2), 1/4]].
+    probability_one = 0.5 - 1 / (2 * np.sqrt(2))
+    result = cirq.TrajectorySimulator(seed=0).run(circuit, repetitions=4000)
+    assert abs(result.histogram(key='m')[1] / 4000 - probability_one) < 0.03
+
+
+def test_run_matches_density_matrix_simulator():
+    qubits = cirq.LineQubit.range(3)
+    circuit = cirq.Circuit.from_ops(cirq.H.on_each(*qubits),
+                                    cirq.CZ(qubits[0], qubits[1]),
+                                    cirq.CNOT(qubits[1], qubits[2]),
+                                    cirq.Y(qubits[0])**0.3)
+    noise = cirq.ConstantQubitNoiseModel(cirq.amplitude_damp(0.1))
+    density_matrix = cirq.DensityMatrixSimulator(
+        noise=noise).simulate(circuit).final_density_matrix
+
+    circuit.append(cirq.measure(*qubits, key='m'))
+    result = cirq.TrajectorySimulator(noise=noise, seed=0).run(circuit,
+                                                               repetitions=4000)
+    counts = result.histogram(key='m')
+    np.testing.assert_allclose([counts[i] / 4000 for i in range(8)],
+                               np.diag(density_matrix).real,
+                               atol=0.03)
+
+
+def test_run_param_resolver():
+    q0 = cirq.LineQubit(0)
+    circuit = cirq.Circuit.from_ops(
+        cirq.X(q0)**sympy.Symbol('t'), cirq.measure(q0, key='m'))
+    results = cirq.TrajectorySimulator().run_sweep(circuit,
+                                                   cirq.Points('t', [0, 1]),
+                                                   repetitions=2)
+    np.testing.assert_equal(results[0].measurements['m'], [[0], [0]])
+    np.testing.assert_equal(results[1].measurements['m'], [[1], [1]])
+
+
+def test_run_processes():
+    q0, q1 = cirq.LineQubit.range(2)
+    circuit = cirq.Circuit.from_ops(cirq.X(q0),
+                                    cirq.bit_flip(0.5)(q1),
+                                    cirq.measure(q0, q1, key='m'))
+    simulator = cirq.TrajectorySimulator(seed=0, num_processes=2)
+    result = simulator.run(circuit, repetitions=101)
+    assert result.measurements['m'].shape == (101, 2)
+    assert set(result.histogram(key='m')) == {2, 3}
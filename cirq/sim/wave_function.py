@@ -20,7 +20,7 @@ from typing import Dict, Iterable, List, Optional, Sequence, Tuple, Type, Union
 import abc
 import numpy as np
 
-from cirq import linalg, ops
+from cirq import linalg, ops, value
 
 
 class StateVectorMixin():
@@ -349,7 +349,10 @@ def validate_normalized_state(state: np.ndarray,
 
 def sample_state_vector(state: np.ndarray,
                         indices: List[int],
-                        repetitions: int=1) -> np.ndarray:
+                        repetitions: int = 1,
+                        *,
+                        seed: value.RANDOM_STATE_OR_SEED_LIKE = None,
+                        pack_bits: bool = False) -> np.ndarray:
     """Samples repeatedly from measurements in the computational basis.
 
     Note that this does not modify the passed in state.
@@ -363,12 +366,18 @@ def sample_state_vector(state: np.ndarray,
             in big endian order. That is the xth index of v, when expressed as
             a bitstring, has its largest values in the 0th index.
         repetitions: The number of times to sample the state.
+        seed: A seed or `np.random.RandomState` used to draw the samples.
+            Defaults to numpy's global random state.
+        pack_bits: If True, the measurement results of each repetition are
+            packed into bytes (see `np.packbits`), the first measured qubit
+            being the most significant bit of the first byte.
 
     Returns:
         Measurement results with True corresponding to the ``|1⟩`` state.
         The outer list is for repetitions, and the inner corresponds to
         measurements ordered by the supplied qubits. These lists
-        are wrapped as an numpy ndarray.
+        are wrapped as an numpy ndarray. If `pack_bits` is True, the inner
+        lists are instead the packed bits, as a numpy ndarray of uint8.
 
     Raises:
         ValueError: ``repetitions`` is less than one or size of ``state`` is not
@@ -383,24 +392,21 @@ def sample_state_vector(state: np.ndarray,
     _validate_indices(num_qubits, indices)
 
     if repetitions == 0 or len(indices) == 0:
-        return np.zeros(shape=(repetitions, len(indices)))
+        return _sample_bits(np.ones(1), len(indices), repetitions, seed,
+                            pack_bits)
 
     # Calculate the measurement probabilities.
     probs = _probs(state, indices, num_qubits)
 
-    # We now have the probability vector, correctly ordered, so sample over
-    # it. Note that we us ints here, since numpy's choice does not allow for
-    # choosing from a list of tuples or list of lists.
-    result = np.random.choice(len(probs), size=repetitions, p=probs)
-    # Convert to bools and rearrange to match repetition being the outer list.
-    return np.transpose([(1 & (result >> i)).astype(np.bool) for i in
-                         range(len(indices))])
+    return _sample_bits(probs, len(indices), repetitions, seed, pack_bits)
 
 
-def measure_state_vector(
-        state: np.ndarray,
-        indices: List[int],
-        out: np.ndarray = None) -> Tuple[List[bool], np.ndarray]:
+def measure_state_vector(state: np.ndarray,
+                         indices: List[int],
+                         out: np.ndarray = None,
+                         *,
+                         seed: value.RANDOM_STATE_OR_SEED_LIKE = None
+                        ) -> Tuple[List[bool], np.ndarray]:
     """Performs a measurement of the state in the computational basis.
 
     This does not modify `state` unless the optional `out` is `state`.
@@ -419,6 +425,8 @@ def measure_state_vector(
             same as the returned ndarray of the method. The shape and dtype of
             `out` will match that of state if `out` is None, otherwise it will
             match the shape and dtype of `out`.
+        seed: A seed or `np.random.RandomState` used to draw the measurement
+            result. Defaults to numpy's global random state.
 
     Returns:
         A tuple of a list and an numpy array. The list is an array of booleans
@@ -447,7 +455,7 @@ def measure_state_vector(
 
     # Calculate the measurement probabilities and then make the measurement.
     probs = _probs(state, indices, num_qubits)
-    result = np.random.choice(len(probs), p=probs)
+    result = value.parse_random_state(seed).choice(len(probs), p=probs)
     measurement_bits = [(1 & (result >> i)) for i in range(len(indices))]
 
     # Calculate the slice for the measurement result.
@@ -475,20 +483,75 @@ def measure_state_vector(
 
 
 def _probs(state: np.ndarray, indices: List[int],
-           num_qubits: int) -> List[float]:
+           num_qubits: int) -> np.ndarray:
     """Returns the probabilities for a measurement on the given indices."""
     # Tensor of squared amplitudes, shaped a rank [2, 2, .., 2] tensor.
-    tensor = np.reshape(state, [2] * num_qubits)
+    tensor = np.reshape(np.abs(state)**2, [2] * num_qubits)
+    return _marginal_probs(tensor, indices)
 
-    # Calculate the probabilities for measuring the particular results.
-    probs = [
-        np.linalg.norm(
-                tensor[linalg.slice_for_qubits_equal_to(indices, b)]) ** 2
-        for b in range(2 ** len(indices))]
+
+def _marginal_probs(tensor: np.ndarray, indices: List[int]) -> np.ndarray:
+    """Sums a probability tensor down to the outcomes of the given indices.
+
+    Args:
+        tensor: The probabilities of all computational basis states, shaped
+            as a rank [2, 2, ..., 2] tensor.
+        indices: The measured qubits.
+
+    Returns:
+        The normalized probabilities of the measurement outcomes. The k'th bit
+        (in little endian order) of an outcome's index is the result for the
+        k'th measured qubit, matching `cirq.slice_for_qubits_equal_to`.
+    """
+    other_axes = tuple(i for i in range(tensor.ndim) if i not in indices)
+    # The remaining axes are in increasing order of qubit index.
+    marginal = np.sum(tensor, axis=other_axes, dtype=np.float64)
+    remaining = sorted(indices)
+    # Make the first measured qubit the last (least significant) axis.
+    probs = np.transpose(marginal,
+                         [remaining.index(i) for i in reversed(indices)])
+    probs = np.reshape(probs, 1 << len(indices))
 
     # To deal with rounding issues, ensure that the probabilities sum to 1.
-    probs /= sum(probs) # type: ignore
-    return probs
+    return probs / np.sum(probs)
+
+
+def _sample_bits(probs: np.ndarray, num_bits: int, repetitions: int,
+                 seed: value.RANDOM_STATE_OR_SEED_LIKE,
+                 pack_bits: bool) -> np.ndarray:
+    """Samples measurement results from the probabilities of the outcomes.
+
+    Samples are drawn by binary searching uniform variates in the cumulative
+    distribution of the outcomes, rather than via `np.random.choice`, and the
+    results are written bit by bit to avoid large intermediate arrays.
+
+    Args:
+        probs: The probabilities of the outcomes, indexed as described in
+            `_marginal_probs`.
+        num_bits: The number of measured qubits.
+        repetitions: The number of samples to draw.
+        seed: The seed or `np.random.RandomState` used to draw the samples.
+        pack_bits: Whether to pack each sample's bits into bytes.
+
+    Returns:
+        A (repetitions, num_bits) boolean array, or if `pack_bits` is True a
+        (repetitions, ceil(num_bits / 8)) uint8 array of packed bits.
+    """
+    bits = np.zeros((repetitions, num_bits), dtype=bool)
+    if repetitions and num_bits:
+        prng = value.parse_random_state(seed)
+        cumulative = np.cumsum(probs)
+        samples = np.searchsorted(cumulative,
+                                  prng.random_sample(repetitions) *
+                                  cumulative[-1],
+                                  side='right')
+        # Guard against rounding up past the last outcome.
+        np.minimum(samples, len(probs) - 1, out=samples)
+        for i in range(num_bits):
+            bits[:, i] = (samples >> i) & 1
+    if pack_bits:
+        return np.packbits(bits, axis=1)
+    return bits
 
 
 def _validate_num_qubits(state: np.ndarray) -> int:
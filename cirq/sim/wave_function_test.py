@@ -381,6 +381,46 @@ def test_sample_no_indices_repetitions():
         np.zeros(shape=(2, 0)))
 
 
+def test_sample_state_seed():
+    state = np.ones(8) / np.sqrt(8)
+    samples = cirq.sample_state_vector(state, [0, 1, 2],
+                                       repetitions=100,
+                                       seed=1234)
+    np.testing.assert_equal(
+        samples,
+        cirq.sample_state_vector(state, [0, 1, 2],
+                                 repetitions=100,
+                                 seed=np.random.RandomState(1234)))
+    assert not np.array_equal(
+        samples,
+        cirq.sample_state_vector(state, [0, 1, 2], repetitions=100, seed=4321))
+
+
+def test_sample_state_pack_bits():
+    state = cirq.to_valid_state_vector(0b1011010011, 10)
+    indices = [0, 2, 4, 6, 8, 9, 1, 3, 5, 7]
+    bits = cirq.sample_state_vector(state, indices, repetitions=3)
+    packed = cirq.sample_state_vector(state,
+                                      indices,
+                                      repetitions=3,
+                                      pack_bits=True)
+    assert packed.dtype == np.uint8
+    np.testing.assert_equal(packed, np.packbits(bits, axis=1))
+    np.testing.assert_equal(packed, [[0b11001101, 0b10000000]] * 3)
+
+    np.testing.assert_equal(
+        cirq.sample_state_vector(state, [], repetitions=2, pack_bits=True),
+        np.zeros(shape=(2, 0), dtype=np.uint8))
+
+
+def test_sample_state_frequencies():
+    state = np.array([0.1, 0, 0.3, 0.6])**0.5
+    samples = cirq.sample_state_vector(state, [1, 0], repetitions=10000, seed=0)
+    outcomes = samples[:, 0] + 2 * samples[:, 1]
+    frequencies = np.bincount(outcomes, minlength=4) / 10000
+    np.testing.assert_allclose(frequencies, [0.1, 0, 0.3, 0.6], atol=0.02)
+
+
 def test_measure_state_computational_basis():
     results = []
     for x in range(8):
@@ -17,6 +17,9 @@
 from cirq.study.compute_displays_result import (
     ComputeDisplaysResult,)
 
+from cirq.study.packed_measurements import (
+    PackedMeasurements,)
+
 from cirq.study.resolver import (
     ParamResolver,
     ParamResolverOrSimilarType,
@@ -0,0 +1,233 @@
+# Copyright 2019 The Cirq Developers
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     https://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Measurement results that stay packed until they are looked at."""
+
+from typing import Dict, Iterator, Mapping, Optional, Sequence, Tuple
+
+import numpy as np
+
+# Reverses the order of the bits in each byte.
+_REVERSED_BITS = np.array(
+    [int('{:08b}'.format(i)[::-1], 2) for i in range(256)], dtype=np.uint8)
+
+# How many bits to unpack at once, bounding the size of temporary arrays.
+_CHUNK_BITS = 1 << 20
+
+
+class PackedMeasurements(Mapping[str, np.ndarray]):
+    """Measurement results kept as a single buffer of packed bits.
+
+    The data has the form <rep0><rep1>... where each repetition is
+    <key0_0>..<key0_{size0-1}><key1_0>... with bits packed in little-endian
+    order in each byte. This is how the Quantum Engine returns results.
+
+    This is a mapping from measurement key to a 2D array of boolean results,
+    like the `measurements` of a `cirq.TrialResult`. The array of a key is
+    only decoded when it is first looked up, so keys that are never looked
+    at cost nothing beyond their share of the packed bytes. `unpack` decodes
+    into a preallocated array, and `big_endian_ints` decodes straight to one
+    integer per repetition without creating the boolean array at all.
+
+    Attributes:
+        repetitions: The number of repetitions in the data.
+        key_sizes: The keys of the measurements in the data, and the number
+            of qubits each one measured, in the order of the data.
+    """
+
+    def __init__(self, data: bytes, repetitions: int,
+                 key_sizes: Sequence[Tuple[str, int]]) -> None:
+        """
+        Args:
+            data: The packed bits. The buffer is used without being copied.
+            repetitions: The number of repetitions in the data.
+            key_sizes: Keys and sizes of the measurements in the data.
+
+        Raises:
+            ValueError: There is not enough data for the repetitions and
+                measurements.
+        """
+        self._data = np.frombuffer(data, dtype=np.uint8)
+        self.repetitions = repetitions
+        self.key_sizes = tuple(key_sizes)
+        self._offsets = {}  # type: Dict[str, Tuple[int, int]]
+        offset = 0
+        for key, size in self.key_sizes:
+            self._offsets[key] = (offset, size)
+            offset += size
+        self._bits_per_rep = offset
+        num_bytes = -(-repetitions * self._bits_per_rep // 8)
+        if len(self._data) < num_bytes:
+            raise ValueError(
+                'Expected at least {} bytes of data but got {}.'.format(
+                    num_bytes, len(self._data)))
+        self._unpacked = {}  # type: Dict[str, np.ndarray]
+
+    @classmethod
+    def pack(cls, measurements: Sequence[Tuple[str, np.ndarray]]
+            ) -> 'PackedMeasurements':
+        """Packs measurement results into a single buffer.
+
+        Args:
+            measurements: A sequence of tuples, one for each measurement,
+                consisting of a string key and an array of boolean data. The
+                data should be a 2-D array indexed by (repetition,
+                qubit_index). All data for all measurements must have the
+                same number of repetitions.
+
+        Raises:
+            ValueError: The measurement data do not have compatible shapes.
+        """
+        shapes = [(key, np.shape(data)) for key, data in measurements]
+        if not all(len(shape) == 2 for _, shape in shapes):
+            raise ValueError("Expected 2-D data: shapes={}".format(shapes))
+        reps = shapes[0][1][0] if shapes else 0
+        if not all(shape[0] == reps for _, shape in shapes):
+            raise ValueError(
+                "Expected same reps for all keys: shapes={}".format(shapes))
+
+        key_sizes = [(key, shape[1]) for key, shape in shapes]
+        bits_per_rep = sum(size for _, size in key_sizes)
+        total_bits = reps * bits_per_rep
+        # Padded to a multiple of 8 bits.
+        bits = np.zeros(-(-total_bits // 8) * 8, dtype=bool)
+        rows = bits[:total_bits].reshape((reps, bits_per_rep))
+        offset = 0
+        for (_, data), (_, size) in zip(measurements, key_sizes):
+            rows[:, offset:offset + size] = data
+            offset += size
+        data = _REVERSED_BITS[np.packbits(bits)].tobytes()
+        return cls(data, reps, key_sizes)
+
+    @property
+    def data(self) -> np.ndarray:
+        """The packed bits, as a read-only array of bytes."""
+        return self._data
+
+    def __getitem__(self, key: str) -> np.ndarray:
+        result = self._unpacked.get(key)
+        if result is None:
+            result = self._unpacked[key] = self.unpack(key)
+        return result
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._offsets)
+
+    def __len__(self) -> int:
+        return len(self._offsets)
+
+    def unpack(self, key: str, out: Optional[np.ndarray] = None) -> np.ndarray:
+        """Decodes the results of one measurement.
+
+        Unlike looking the key up, this doesn't keep the decoded array.
+
+        Args:
+            key: The measurement key.
+            out: A boolean array of shape (repetitions, size) to decode the
+                results into. Defaults to a new array.
+
+        Returns:
+            The results, indexed by (repetition, qubit_index).
+
+        Raises:
+            KeyError: There is no measurement with the key.
+            ValueError: `out` doesn't have the right shape or dtype.
+        """
+        offset, size = self._offsets[key]
+        shape = (self.repetitions, size)
+        if out is None:
+            out = np.empty(shape, dtype=bool)
+        elif out.shape != shape or out.dtype != bool:
+            raise ValueError(
+                'Expected a bool array of shape {} but got {} of shape {}.'.
+                format(shape, out.dtype, out.shape))
+        for start, bits in self._chunks():
+            out[start:start + len(bits)] = bits[:, offset:offset + size]
+        return out
+
+    def big_endian_ints(self, key: str) -> np.ndarray:
+        """Decodes the results of one measurement into integers.
+
+        Each repetition becomes the big-endian integer of its bits, with the
+        first measured qubit determining the highest-value bit, as in
+        `cirq.TrialResult.histogram`.
+
+        Args:
+            key: The measurement key.
+
+        Returns:
+            An array of uint64, one for each repetition.
+
+        Raises:
+            KeyError: There is no measurement with the key.
+            ValueError: The measurement has more than 64 qubits.
+        """
+        offset, size = self._offsets[key]
+        if size > 64:
+            raise ValueError(
+                'Measurement {!r} has {} qubits, more than fit in 64-bit '
+                'integers.'.format(key, size))
+        powers = np.left_shift(np.uint64(1),
+                               np.arange(size - 1, -1, -1, dtype=np.uint64))
+        out = np.zeros(self.repetitions, dtype=np.uint64)
+        for start, bits in self._chunks():
+            out[start:start + len(bits)] = bits[:, offset:offset +
+                                                size].dot(powers)
+        return out
+
+    def _chunks(self) -> Iterator[Tuple[int, np.ndarray]]:
+        """Yields the bits of consecutive runs of repetitions.
+
+        Each chunk is the index of its first repetition, together with an
+        array of 0s and 1s indexed by (repetition, bit).
+        """
+        bits_per_rep = self._bits_per_rep
+        if not bits_per_rep:
+            return
+        reps_per_chunk = max(1, _CHUNK_BITS // bits_per_rep)
+        for start in range(0, self.repetitions, reps_per_chunk):
+            stop = min(start + reps_per_chunk, self.repetitions)
+            first_bit = start * bits_per_rep
+            num_bits = (stop - start) * bits_per_rep
+            raw = self._data[first_bit // 8:-(-(first_bit + num_bits) // 8)]
+            bits = np.unpackbits(_REVERSED_BITS[raw])
+            skip = first_bit % 8
+            yield start, bits[skip:skip + num_bits].reshape(
+                (stop - start, bits_per_rep))
+
+    def __eq__(self, other):
+        if isinstance(other, PackedMeasurements):
+            if (self.repetitions != other.repetitions or
+                    self.key_sizes != other.key_sizes):
+                return False
+            # Compare whole bytes, then the used bits of the last byte.
+            full, extra = divmod(self.repetitions * self._bits_per_rep, 8)
+            mask = (1 << extra) - 1
+            return (np.array_equal(self._data[:full], other._data[:full]) and
+                    (not extra or
+                     self._data[full] & mask == other._data[full] & mask))
+        if not isinstance(other, Mapping):
+            return NotImplemented
+        return (set(self) == set(other) and
+                all(np.array_equal(self[key], other[key]) for key in self))
+
+    def __ne__(self, other):
+        return not self == other
+
+    __hash__ = None  # type: ignore
+
+    def __repr__(self):
+        return ('cirq.PackedMeasurements(data={!r}, repetitions={!r}, '
+                'key_sizes={!r})').format(self._data.tobytes(),
+                                          self.repetitions,
+                                          list(self.key_sizes))
@@ -0,0 +1,131 @@
+# Copyright 2019 The Cirq Developers
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     https://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import numpy as np
+import pytest
+
+import cirq
+from cirq.study import packed_measurements
+
+
+def _random_bits(prng, *shape):
+    return prng.randint(2, size=shape).astype(bool)
+
+
+def test_pack_little_endian():
+    packed = cirq.PackedMeasurements.pack([
+        ('a', np.array([[1, 0, 0], [0, 1, 1]])),
+        ('b', np.array([[1], [0]])),
+    ])
+    assert packed.repetitions == 2
+    assert packed.key_sizes == (('a', 3), ('b', 1))
+    # Bits 1001 0110, the first in the lowest place.
+    assert packed.data.tobytes() == b'\x69'
+    assert not packed.data.flags.writeable
+
+
+@pytest.mark.parametrize('chunk_bits', [1, 8, 13, 1 << 20])
+def test_pack_unpack_round_trip(chunk_bits, monkeypatch):
+    monkeypatch.setattr(packed_measurements, '_CHUNK_BITS', chunk_bits)
+    prng = np.random.RandomState(1234)
+    a, b, c = (_random_bits(prng, 37, n) for n in (3, 0, 70))
+    packed = cirq.PackedMeasurements.pack([('a', a), ('b', b), ('c', c)])
+    assert len(packed.data) == -(-37 * 73 // 8)
+
+    results = cirq.PackedMeasurements(packed.data.tobytes(), 37,
+                                      packed.key_sizes)
+    assert list(results) == ['a', 'b', 'c']
+    assert len(results) == 3
+    for key, bits in [('a', a), ('b', b), ('c', c)]:
+        assert results[key].dtype == bool
+        np.testing.assert_array_equal(results[key], bits)
+    assert results['a'] is results['a']
+
+
+def test_unpack_into_preallocated_output():
+    prng = np.random.RandomState(1234)
+    a, b = _random_bits(prng, 20, 2), _random_bits(prng, 20, 5)
+    packed = cirq.PackedMeasurements.pack([('a', a), ('b', b)])
+    out = np.zeros((20, 5), dtype=bool)
+    assert packed.unpack('b', out=out) is out
+    np.testing.assert_array_equal(out, b)
+    assert packed.unpack('b') is not packed.unpack('b')
+
+    with pytest.raises(ValueError, match='shape'):
+        packed.unpack('a', out=out)
+    with pytest.raises(ValueError, match='bool'):
+        packed.unpack('b', out=np.zeros((20, 5), dtype=np.uint8))
+    with pytest.raises(KeyError):
+        packed.unpack('c')
+
+
+@pytest.mark.parametrize('chunk_bits', [5, 1 << 20])
+def test_big_endian_ints(chunk_bits, monkeypatch):
+    monkeypatch.setattr(packed_measurements, '_CHUNK_BITS', chunk_bits)
+    packed = cirq.PackedMeasurements.pack([
+        ('a', np.array([[1, 0, 0], [0, 1, 1], [1, 1, 1]])),
+        ('b', np.zeros((3, 0))),
+        ('c', np.ones((3, 64))),
+        ('d', np.ones((3, 65))),
+    ])
+    ints = packed.big_endian_ints('a')
+    assert ints.dtype == np.uint64
+    assert ints.tolist() == [0b100, 0b011, 0b111]
+    assert packed.big_endian_ints('b').tolist() == [0, 0, 0]
+    assert packed.big_endian_ints('c').tolist() == [2**64 - 1] * 3
+    with pytest.raises(ValueError, match='64'):
+        packed.big_endian_ints('d')
+
+
+def test_empty():
+    packed = cirq.PackedMeasurements.pack([])
+    assert packed.repetitions == 0
+    assert len(packed) == 0
+    assert cirq.PackedMeasurements(b'', 5, [('a', 0)])['a'].shape == (5, 0)
+
+
+def test_not_enough_data():
+    with pytest.raises(ValueError, match='at least 2 bytes'):
+        cirq.PackedMeasurements(b'\x00', 3, [('a', 3)])
+
+
+def test_pack_incompatible_shapes():
+    with pytest.raises(ValueError, match='2-D'):
+        cirq.PackedMeasurements.pack([('a', np.zeros(10))])
+    with pytest.raises(ValueError, match='same reps'):
+        cirq.PackedMeasurements.pack([('a', np.zeros((7, 3))),
+                                      ('b', np.zeros((8, 2)))])
+
+
+def test_repr():
+    packed = cirq.PackedMeasurements(b'\x05', 2, [('x', 2)])
+    assert repr(packed) == ("cirq.PackedMeasurements(data=b'\\x05', "
+                            "repetitions=2, key_sizes=[('x', 2)])")
+    cirq.testing.assert_equivalent_repr(packed)
+
+
+def test_equality():
+    a = np.array([[1, 0, 0], [0, 1, 1]], dtype=bool)
+    packed = cirq.PackedMeasurements.pack([('a', a)])
+    assert packed == cirq.PackedMeasurements.pack([('a', a)])
+    assert packed != cirq.PackedMeasurements.pack([('b', a)])
+    assert packed != cirq.PackedMeasurements.pack([('a', ~a)])
+    assert packed != cirq.PackedMeasurements.pack([('a', a[:1])])
+    # Padding bits are ignored.
+    assert packed == cirq.PackedMeasurements(b'\xf1', 2, [('a', 3)])
+
+    assert packed == {'a': a}
+    assert packed != {'a': ~a}
+    assert packed != {'a': a, 'b': a}
+    assert packed != 'a'
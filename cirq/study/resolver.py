@@ -14,6 +14,7 @@
 
 """Resolves ParameterValues to assigned values."""
 
+import numbers
 from typing import Dict, Union, TYPE_CHECKING, cast
 
 import sympy
@@ -71,6 +72,11 @@ class ParamResolver(object):
         """
         if isinstance(value, str):
             return self.param_dict.get(value, sympy.Symbol(value))
+        if isinstance(value, sympy.Symbol):
+            # Fast path for bare symbols, avoiding the cost of sympy's subs.
+            param_value = self.param_dict.get(value.name)
+            if isinstance(param_value, numbers.Real):
+                return float(param_value)
         if isinstance(value, sympy.Basic):
             v = value.subs(self.param_dict)
             return v if v.free_symbols else float(v)
@@ -14,7 +14,9 @@
 
 """Tests for parameter resolvers."""
 
+import numpy as np
 import sympy
+
 import cirq
 
 
@@ -34,6 +36,20 @@ def test_value_of():
     assert r.value_of(sympy.Symbol('b') / 0.1 - sympy.Symbol('a')) == 0.5
 
 
+def test_value_of_symbol():
+    r = cirq.ParamResolver({
+        'a': 1,
+        'b': np.float32(0.25),
+        'c': sympy.Symbol('d')
+    })
+    assert r.value_of(sympy.Symbol('x')) == sympy.Symbol('x')
+    assert r.value_of(sympy.Symbol('a')) == 1.0
+    assert isinstance(r.value_of(sympy.Symbol('a')), float)
+    assert r.value_of(sympy.Symbol('b')) == 0.25
+    assert isinstance(r.value_of(sympy.Symbol('b')), float)
+    assert r.value_of(sympy.Symbol('c')) == sympy.Symbol('d')
+
+
 def test_param_dict():
     r = cirq.ParamResolver({'a': 0.5, 'b': 0.1})
     r2 = cirq.ParamResolver(r)
@@ -14,15 +14,15 @@
 
 """Defines trial results."""
 
-from typing import (
-    Iterable, Callable, Tuple, TypeVar, Dict, Any, TYPE_CHECKING, Union
-)
+from typing import (Iterable, Callable, Tuple, TypeVar, Dict, Any,
+                    TYPE_CHECKING, Union, Mapping, Optional, List)
 
 import collections
 import numpy as np
 
 from cirq import value, ops
 from cirq.study import resolver
+from cirq.study.packed_measurements import PackedMeasurements
 
 if TYPE_CHECKING:
     # pylint: disable=unused-import
@@ -66,12 +66,30 @@ def _big_endian_int(bits: np.ndarray) -> int:
     return result
 
 
+def _big_endian_ints(measurements: Mapping[str, np.ndarray],
+                     key: str) -> Optional[np.ndarray]:
+    """Returns the big-endian integer of each repetition of a measurement.
+
+    Returns None when the measurement has too many qubits for the integers to
+    fit in 64 bits.
+    """
+    if isinstance(measurements, PackedMeasurements):
+        if dict(measurements.key_sizes)[key] > 64:
+            return None
+        return measurements.big_endian_ints(key)
+    bits = np.asarray(measurements[key])
+    if bits.ndim != 2 or bits.shape[1] > 64:
+        return None
+    powers = np.left_shift(
+        np.uint64(1), np.arange(bits.shape[1] - 1, -1, -1, dtype=np.uint64))
+    return bits.astype(bool, copy=False).dot(powers)
+
+
 def _bitstring(vals: Iterable[Any]) -> str:
     return ''.join('1' if v else '0' for v in vals)
 
 
-def _keyed_repeated_bitstrings(vals: Dict[str, np.ndarray]
-                               ) -> str:
+def _keyed_repeated_bitstrings(vals: Mapping[str, np.ndarray]) -> str:
     keyed_bitstrings = []
     for key in sorted(vals.keys()):
         reps = vals[key]
@@ -103,12 +121,19 @@ class TrialResult:
             by the qubits being measured.)
         repetitions: The number of times a circuit was sampled to get these
             results.
+
+    Histograms, parity expectations and `to_structured_array` work on a
+    column of big-endian integers per measurement key, one uint64 for each
+    repetition, which is computed the first time it is needed and kept.
+    Measurement arrays should therefore not be modified in place.
     """
 
-    def __init__(self, *,  # Forces keyword args.
-                 params: resolver.ParamResolver,
-                 measurements: Dict[str, np.ndarray],
-                 repetitions: int) -> None:
+    def __init__(
+            self,
+            *,  # Forces keyword args.
+            params: resolver.ParamResolver,
+            measurements: Mapping[str, np.ndarray],
+            repetitions: int) -> None:
         """
         Args:
             params: A ParamResolver of settings used for this result.
@@ -116,12 +141,74 @@ class TrialResult:
                 results. The value for each key is a 2-D array of booleans,
                 with the first index running over the repetitions, and the
                 second index running over the qubits for the corresponding
-                measurements.
+                measurements. May also be a `cirq.PackedMeasurements`, whose
+                histograms are counted without unpacking the results.
             repetitions: The number of times the circuit was sampled.
         """
         self.params = params
         self.measurements = measurements
         self.repetitions = repetitions
+        # The big-endian integer column of each key, along with the array (or
+        # the packed measurements) it was computed from.
+        self._columns = {}  # type: Dict[str, Tuple[Any, Optional[np.ndarray]]]
+
+    def _num_qubits(self, key: str) -> int:
+        if isinstance(self.measurements, PackedMeasurements):
+            return dict(self.measurements.key_sizes)[key]
+        return np.shape(self.measurements[key])[1]
+
+    def _column(self, key: str) -> Optional[np.ndarray]:
+        """Returns the big-endian integer of each repetition of a measurement.
+
+        Returns None when the measurement has more than 64 qubits.
+        """
+        source = (self.measurements if isinstance(
+            self.measurements, PackedMeasurements) else self.measurements[key])
+        cached = self._columns.get(key)
+        if cached is None or cached[0] is not source:
+            cached = (source, _big_endian_ints(self.measurements, key))
+            self._columns[key] = cached
+        return cached[1]
+
+    def _count_big_endian_ints(self, keys: Tuple[str, ...]
+                              ) -> Optional[Tuple[np.ndarray, np.ndarray]]:
+        """Counts how often each combination of big-endian integers occurred.
+
+        Returns:
+            The distinct combinations, as the rows of an array indexed by
+            (combination, key), and how often each one occurred. None when a
+            measurement has more than 64 qubits.
+        """
+        columns = []
+        for key in keys:
+            column = self._column(key)
+            if column is None:
+                return None
+            columns.append(column)
+        sizes = [self._num_qubits(key) for key in keys]
+        if sum(sizes) > 63:
+            return np.unique(np.stack(columns, axis=1),
+                             axis=0,
+                             return_counts=True)
+
+        # Fuse the columns into one integer per repetition, so that a single
+        # bincount or unique counts all of them.
+        combined = np.zeros(self.repetitions, dtype=np.uint64)
+        for column, size in zip(columns, sizes):
+            combined <<= np.uint64(size)
+            combined |= column
+        if sum(sizes) <= 16:
+            counts = np.bincount(combined.astype(np.intp), minlength=1)
+            present = np.flatnonzero(counts)
+            values, counts = present.astype(np.uint64), counts[present]
+        else:
+            values, counts = np.unique(combined, return_counts=True)
+
+        rows = np.empty((len(values), len(keys)), dtype=np.uint64)
+        for i in reversed(range(len(keys))):
+            rows[:, i] = values & np.uint64((1 << sizes[i]) - 1)
+            values = values >> np.uint64(sizes[i])
+        return rows, counts
 
     # Reason for 'type: ignore': https://github.com/python/mypy/issues/5273
     def multi_measurement_histogram(  # type: ignore
@@ -175,6 +262,12 @@ class TrialResult:
             results.
         """
         fixed_keys = tuple(_key_to_str(key) for key in keys)
+        if fold_func is _tuple_of_big_endian_int and fixed_keys:
+            counted = self._count_big_endian_ints(fixed_keys)
+            if counted is not None:
+                rows, counts = counted
+                return collections.Counter(
+                    dict(zip(map(tuple, rows.tolist()), counts.tolist())))
         samples = zip(*[self.measurements[sub_key]
                         for sub_key in fixed_keys])  # type: Iterable[Any]
         if len(fixed_keys) == 0:
@@ -226,10 +319,96 @@ class TrialResult:
             A counter indicating how often a measurement sampled various
             results.
         """
+        if fold_func is _big_endian_int:
+            counted = self._count_big_endian_ints((_key_to_str(key),))
+            if counted is not None:
+                rows, counts = counted
+                return collections.Counter(
+                    dict(zip(rows[:, 0].tolist(), counts.tolist())))
         return self.multi_measurement_histogram(
             keys=[key],
             fold_func=lambda e: fold_func(e[0]))
 
+    def z_parity_expectation(
+            self,
+            *,  # Forces keyword args.
+            keys: Iterable[TMeasurementKey],
+            masks: Optional[Iterable[int]] = None) -> float:
+        """Estimates the expectation value of a product of Z observables.
+
+        Each repetition contributes +1 when an even number of the selected
+        qubits were measured as 1, and -1 otherwise.
+
+        For example, with keys=['abc', 'd'] and masks=[0b101, 0b1], where the
+        measurement with key 'abc' measures qubits a, b, and c, this estimates
+        the expectation value of Z(a) * Z(c) * Z(d).
+
+        Args:
+            keys: Keys of the measurements whose qubits are included.
+            masks: For each key, the big-endian bitmask of the qubits to
+                include, with the first measured qubit as the highest bit as
+                in `histogram`. Defaults to all of the measured qubits.
+
+        Returns:
+            The average parity, between -1 and +1.
+
+        Raises:
+            ValueError: There are no repetitions, or the masks don't match
+                the keys.
+        """
+        fixed_keys = [_key_to_str(key) for key in keys]
+        fixed_masks = [None] * len(fixed_keys)  # type: List[Optional[int]]
+        if masks is not None:
+            fixed_masks = list(masks)
+        if len(fixed_masks) != len(fixed_keys):
+            raise ValueError('Got {} masks for {} keys.'.format(
+                len(fixed_masks), len(fixed_keys)))
+        if not self.repetitions:
+            raise ValueError('There are no repetitions to average over.')
+
+        parity = np.zeros(self.repetitions, dtype=np.uint64)
+        for key, mask in zip(fixed_keys, fixed_masks):
+            size = self._num_qubits(key)
+            if mask is not None and not 0 <= mask < 1 << size:
+                raise ValueError(
+                    'Mask {} does not fit the {} qubits of {!r}.'.format(
+                        bin(mask), size, key))
+            column = self._column(key)
+            if column is not None:
+                parity ^= column if mask is None else column & np.uint64(mask)
+                continue
+            bits = np.asarray(self.measurements[key], dtype=bool)
+            if mask is not None:
+                bits = bits[:, [(mask >> (size - 1 - i)) & 1 == 1
+                                for i in range(size)]]
+            parity ^= np.logical_xor.reduce(bits, axis=1).astype(np.uint64)
+
+        # The parity of the xor of all the selected bits.
+        for shift in [32, 16, 8, 4, 2, 1]:
+            parity ^= parity >> np.uint64(shift)
+        return 1 - 2 * float(np.mean(parity & np.uint64(1)))
+
+    def to_structured_array(self) -> np.ndarray:
+        """Returns the results as a numpy structured array.
+
+        The array has one record for each repetition, and one field for each
+        measurement key. Measurements of up to 64 qubits are uint64 fields
+        holding the big-endian integer of the results, with the first
+        measured qubit as the highest bit as in `histogram`. Wider ones are
+        fields of boolean subarrays, one entry for each qubit.
+        """
+        fields = []  # type: List[Tuple[Any, ...]]
+        for key in self.measurements:
+            if self._column(key) is None:
+                fields.append((key, bool, (self._num_qubits(key),)))
+            else:
+                fields.append((key, np.uint64))
+        result = np.empty(self.repetitions, dtype=fields)
+        for key in self.measurements:
+            column = self._column(key)
+            result[key] = self.measurements[key] if column is None else column
+        return result
+
     def __repr__(self):
         return ('cirq.TrialResult(params={!r}, '
                 'repetitions={!r}, '
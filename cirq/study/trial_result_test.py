@@ -193,3 +193,160 @@ def test_text_diagram_jupyter():
     p = FakePrinter()
     result._repr_pretty_(p, True)
     assert p.text_pretty == 'TrialResult(...)'
+
+
+def test_histogram_of_packed_measurements():
+    prng = np.random.RandomState(1234)
+    bits = prng.randint(2, size=(100, 5)).astype(bool)
+    wide = prng.randint(2, size=(100, 65)).astype(bool)
+    unpacked = cirq.TrialResult(params=cirq.ParamResolver({}),
+                                repetitions=100,
+                                measurements={
+                                    'a': bits,
+                                    'b': wide
+                                })
+    packed = cirq.TrialResult(params=cirq.ParamResolver({}),
+                              repetitions=100,
+                              measurements=cirq.PackedMeasurements.pack([
+                                  ('a', bits), ('b', wide)
+                              ]))
+    expected = collections.Counter(
+        int(''.join('1' if b else '0' for b in row), 2) for row in bits)
+    assert unpacked.histogram(key='a') == expected
+    assert packed.histogram(key='a') == expected
+    assert all(type(v) is int for v in packed.histogram(key='a'))
+    assert packed.histogram(key='b') == unpacked.histogram(key='b')
+    assert packed.histogram(key='a',
+                            fold_func=lambda e: e[0]) == (unpacked.histogram(
+                                key='a', fold_func=lambda e: e[0]))
+
+
+def _random_result(prng, repetitions, sizes):
+    return cirq.TrialResult(params=cirq.ParamResolver({}),
+                            repetitions=repetitions,
+                            measurements={
+                                key: prng.randint(2, size=(repetitions, size))
+                                for key, size in sizes.items()
+                            })
+
+
+def _slow_multi_measurement_histogram(result, keys):
+    return result.multi_measurement_histogram(
+        keys=keys,
+        fold_func=lambda e: tuple(
+            int(''.join(str(int(b)) for b in bits) or '0', 2) for bits in e))
+
+
+@pytest.mark.parametrize('keys', [
+    ['a'],
+    ['a', 'b'],
+    ['b', 'c'],
+    ['a', 'b', 'c'],
+    ['c', 'd'],
+    ['e', 'a'],
+    ['z'],
+])
+def test_multi_measurement_histogram_matches_slow_path(keys):
+    prng = np.random.RandomState(1234)
+    result = _random_result(prng, 300, {
+        'a': 3,
+        'b': 10,
+        'c': 40,
+        'd': 64,
+        'e': 65,
+        'z': 0
+    })
+    expected = _slow_multi_measurement_histogram(result, keys)
+    assert result.multi_measurement_histogram(keys=keys) == expected
+    for key in keys:
+        assert result.histogram(key=key) == collections.Counter({
+            k[0]: v for k, v in _slow_multi_measurement_histogram(
+                result, [key]).items()
+        })
+
+
+def test_histogram_no_repetitions():
+    result = _random_result(np.random.RandomState(1234), 0, {'a': 3, 'b': 2})
+    assert result.histogram(key='a') == collections.Counter()
+    assert result.multi_measurement_histogram(
+        keys=['a', 'b']) == collections.Counter()
+
+
+def test_histogram_follows_replaced_measurements():
+    result = cirq.TrialResult(params=cirq.ParamResolver({}),
+                              repetitions=2,
+                              measurements={'a': np.array([[0, 1], [0, 1]])})
+    assert result.histogram(key='a') == collections.Counter({1: 2})
+    result.measurements['a'] = np.array([[1, 1], [1, 0]])
+    assert result.histogram(key='a') == collections.Counter({3: 1, 2: 1})
+    result.measurements = cirq.PackedMeasurements.pack([('a',
+                                                         np.array([[0, 0],
+                                                                   [0, 0]]))])
+    assert result.histogram(key='a') == collections.Counter({0: 2})
+
+
+def test_z_parity_expectation():
+    prng = np.random.RandomState(1234)
+    result = _random_result(prng, 200, {'a': 3, 'b': 70})
+    a = result.measurements['a']
+    b = result.measurements['b']
+
+    def expected(*columns):
+        return np.mean(1 - 2 * (np.sum(columns, axis=0) % 2))
+
+    assert np.isclose(result.z_parity_expectation(keys=['a']), expected(*a.T))
+    assert np.isclose(
+        result.z_parity_expectation(keys=['a', 'b'], masks=[0b101, 1 << 69]),
+        expected(a[:, 0], a[:, 2], b[:, 0]))
+    assert np.isclose(
+        result.z_parity_expectation(keys=['b', 'a'], masks=[0b11, 0b010]),
+        expected(b[:, 68], b[:, 69], a[:, 1]))
+    assert result.z_parity_expectation(keys=['a'], masks=[0]) == 1
+    assert result.z_parity_expectation(keys=[]) == 1
+
+    q = cirq.NamedQubit('q')
+    ones = cirq.TrialResult(params=cirq.ParamResolver({}),
+                            repetitions=3,
+                            measurements={'q': np.ones((3, 1), dtype=bool)})
+    assert ones.z_parity_expectation(keys=[q]) == -1
+
+
+def test_z_parity_expectation_invalid():
+    result = _random_result(np.random.RandomState(1234), 5, {'a': 3})
+    with pytest.raises(ValueError, match='masks'):
+        result.z_parity_expectation(keys=['a'], masks=[1, 2])
+    with pytest.raises(ValueError, match='does not fit'):
+        result.z_parity_expectation(keys=['a'], masks=[0b1000])
+    with pytest.raises(ValueError, match='does not fit'):
+        result.z_parity_expectation(keys=['a'], masks=[-1])
+    with pytest.raises(KeyError):
+        result.z_parity_expectation(keys=['b'])
+    empty = _random_result(np.random.RandomState(1234), 0, {'a': 3})
+    with pytest.raises(ValueError, match='no repetitions'):
+        empty.z_parity_expectation(keys=['a'])
+
+
+def test_to_structured_array():
+    prng = np.random.RandomState(1234)
+    wide = prng.randint(2, size=(4, 65)).astype(bool)
+    result = cirq.TrialResult(params=cirq.ParamResolver({}),
+                              repetitions=4,
+                              measurements={
+                                  'a': np.array([[0, 1], [1, 1], [1, 0], [0,
+                                                                          0]]),
+                                  'wide': wide,
+                              })
+    array = result.to_structured_array()
+    assert array.shape == (4,)
+    assert array.dtype.names == ('a', 'wide')
+    assert array['a'].dtype == np.uint64
+    assert array['a'].tolist() == [1, 3, 2, 0]
+    assert array['wide'].dtype == bool
+    np.testing.assert_array_equal(array['wide'], wide)
+
+    packed = cirq.TrialResult(params=cirq.ParamResolver({}),
+                              repetitions=4,
+                              measurements=cirq.PackedMeasurements.pack([
+                                  ('a', result.measurements['a'])
+                              ]))
+    np.testing.assert_array_equal(packed.to_structured_array()['a'], array['a'])
@@ -254,7 +254,8 @@ def assert_has_consistent_apply_unitary(
     """Tests whether a value's _apply_unitary_ is correct.
 
     Contrasts the effects of the value's `_apply_unitary_` with the
-    matrix returned by the value's `_unitary_` method.
+    matrix returned by the value's `_unitary_` method, which must also agree
+    with the value's `_unitary_diagonal_` if it has one.
 
     Args:
         val: The value under test. Should have a `__pow__` method.
@@ -291,6 +292,12 @@ def assert_has_consistent_apply_unitary(
             axes=list(range(1, n + 1))),
         default=None)
 
+    # If your unitary is diagonal, its diagonal should match your unitary.
+    diagonal = protocols.unitary_diagonal(val, None)
+    if diagonal is not None:
+        assert expected is not None
+        np.testing.assert_allclose(np.diag(diagonal), expected, atol=atol)
+
     # If you don't have a unitary, you shouldn't be able to apply a unitary.
     if expected is None:
         assert actual is None
@@ -419,6 +419,19 @@ def test_assert_has_consistent_apply_unitary():
     cirq.testing.assert_has_consistent_apply_unitary(
         cirq.X)
 
+    class InconsistentDiagonal:
+
+        def _unitary_(self):
+            return np.diag([1, 1j])
+
+        def _unitary_diagonal_(self):
+            return np.array([1, -1j])
+
+    with pytest.raises(AssertionError):
+        cirq.testing.assert_has_consistent_apply_unitary(InconsistentDiagonal())
+
+    cirq.testing.assert_has_consistent_apply_unitary(cirq.CZ**0.3)
+
     cirq.testing.assert_has_consistent_apply_unitary(
         cirq.X.on(cirq.NamedQubit('q')))
 
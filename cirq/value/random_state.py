@@ -0,0 +1,44 @@
+# Copyright 2019 The Cirq Developers
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     https://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""Utilities for handling sources of randomness."""
+
+from typing import Union, cast
+
+import numpy as np
+
+RANDOM_STATE_OR_SEED_LIKE = Union[None, int, np.random.RandomState]
+
+
+def parse_random_state(random_state: RANDOM_STATE_OR_SEED_LIKE
+                      ) -> np.random.RandomState:
+    """Interpret an object as a pseudorandom number generator.
+
+    If `random_state` is None, returns the module `np.random`.
+    If `random_state` is an integer, returns
+    `np.random.RandomState(random_state)`.
+    Otherwise, returns `random_state` unmodified.
+
+    Args:
+        random_state: The object to be used as or converted to a pseudorandom
+            number generator.
+
+    Returns:
+        The pseudorandom number generator object.
+    """
+    if random_state is None:
+        return cast(np.random.RandomState, np.random)
+    elif isinstance(random_state, int):
+        return np.random.RandomState(random_state)
+    else:
+        return cast(np.random.RandomState, random_state)
@@ -0,0 +1,30 @@
+# Copyright 2019 The Cirq Developers
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     https://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import numpy as np
+
+import cirq
+
+
+def test_parse_random_state():
+    assert cirq.parse_random_state(None) is np.random
+
+    prng = np.random.RandomState(0)
+    assert cirq.parse_random_state(prng) is prng
+
+    first = cirq.parse_random_state(1234).random_sample(5)
+    second = cirq.parse_random_state(1234).random_sample(5)
+    np.testing.assert_equal(first, second)
+    assert not np.array_equal(first,
+                              cirq.parse_random_state(4321).random_sample(5))